@@ -5,8 +5,9 @@ from backend.config.setting import web3_config
 
 async def main():
     client = BlockchainClient()
+    await client.connect()
     tx = await client.add_admin(web3_config.contract_address)
-    print(f"Transaction hash: {tx['transactionHash'].hex()}")
+    print(f"Transaction hash: {tx['transactionHash'].to_0x_hex()}")
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
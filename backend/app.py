@@ -1,21 +1,27 @@
-import asyncio
-from loguru import logger
-from fastapi import FastAPI
+import time
+_import_started = time.perf_counter()
+
+from fastapi import FastAPI, Response
 from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
 
 from backend.routes.routes import router
-from backend.event_listener.event_listener import listen_events
+from backend.dependencies import get_services, close_services, startup_report
+from backend.utils.metrics import REGISTRY, CONTENT_TYPE, MetricsMiddleware
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    task = asyncio.create_task(listen_events())
-    logger.info("Bắt đầu lắng nghe sự kiện blockchain")
+    services = get_services()
     try:
+        with startup_report.phase('connect'):
+            await services.connect()
+        with startup_report.phase('warmup'):
+            await services.warm_up()
+        services.start_event_listener()
+        startup_report.log()
         yield
     finally:
-        task.cancel()
-        logger.info("Ngừng lắng nghe sự kiện blockchain")
+        await close_services()
 
 
 app = FastAPI(title="Hệ thống Chứng chỉ Số", lifespan=lifespan)
@@ -28,10 +34,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(router)
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Metrics dạng Prometheus text format.
+    """
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
+startup_report.record('import', time.perf_counter() - _import_started)
+
+
 if __name__ == '__main__':
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=5000)
-
@@ -0,0 +1,71 @@
+"""Full-database integrity audit of MongoDB certificates against the contract
+
+Đọc toàn bộ collection chứng chỉ theo từng lô và đối chiếu với contract tại một block cố định.
+In mỗi bản ghi không khớp (hoặc lỗi đọc) dạng JSON, dòng cuối là tổng kết.
+Exit code 1 nếu có bản ghi không khớp.
+
+Usage:
+    python -m backend.audit_certificates [--block N] [--batch-size 1000] [--all]
+"""
+
+import sys
+import json
+import time
+import asyncio
+import argparse
+
+from backend.db.connector import MongoDBClient
+from backend.config.setting import listener_config
+from backend.blockchain.blockchain import BlockchainClient
+from backend.blockchain.cross_verifier import CrossVerifier
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Audit MongoDB certificates against the contract")
+    parser.add_argument("--block", type=int, default=None, help="Block to read (default: head minus EVENT_CONFIRMATIONS)")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--all", action="store_true", help="Print consistent certificates too")
+    args = parser.parse_args()
+
+    mongo_client = MongoDBClient()
+    blockchain_client = BlockchainClient()
+    await asyncio.gather(mongo_client.ping(), blockchain_client.connect())
+    verifier = CrossVerifier(blockchain_client, cache=False)
+    block = args.block
+    if block is None:
+        block = await blockchain_client.get_block_number() - listener_config.confirmations
+
+    summary = {"block": block, "checked": 0, "consistent": 0, "mismatched": 0, "errors": 0}
+    started = time.perf_counter()
+
+    async def audit(records: list) -> None:
+        _, reports = await verifier.verify(records, block)
+        for report in reports:
+            summary["checked"] += 1
+            if report["consistent"] is None:
+                summary["errors"] += 1
+            elif report["consistent"]:
+                summary["consistent"] += 1
+                if not args.all:
+                    continue
+            else:
+                summary["mismatched"] += 1
+            print(json.dumps(report, ensure_ascii=False))
+
+    batch = []
+    async for record in mongo_client.iter_documents(mongo_client.cert_collection, {}, batch_size=args.batch_size):
+        batch.append(record)
+        if len(batch) >= args.batch_size:
+            await audit(batch)
+            batch = []
+    if batch:
+        await audit(batch)
+
+    summary["seconds"] = round(time.perf_counter() - started, 3)
+    print(json.dumps({"summary": summary}))
+    await mongo_client.close()
+    return 1 if summary["mismatched"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,186 @@
+"""Gas per operation of the v1 and v2 certificate contracts
+
+Deploy contract v1 và v2 trên chain eth-tester trong process (xem offline_stack), chạy cùng các thao tác
+qua BlockchainClient và đọc gasUsed từ biên nhận: deploy, issueCertificate, revokeCertificate,
+revokeCertificates và anchorMerkleRoot (theo --batch-sizes), revokeBatchedCertificate, migrateCertificates và migrateBatchedIds (v2).
+Mỗi thao tác in một dòng JSON (gas trung bình, min, max, gas mỗi chứng chỉ), cuối cùng là các dòng so sánh v2/v1.
+Với các thao tác theo lô, dòng "<thao tác> per extra ID" là gas biên của mỗi ID thêm vào lô (chênh lệch giữa
+lô lớn nhất và nhỏ nhất): với anchorMerkleRoot đó là chi phí ghi batchedIds (một slot storage mới) và calldata của ID.
+
+Usage:
+    python -m backend.benchmarks.contract_gas_benchmark --certificates 50 --batch-sizes 10,100
+"""
+
+import os
+
+# Cấu hình tối thiểu để import backend không cần .env; không có kết nối thật nào được mở
+for name, value in {
+    'INFURA_URL': 'http://127.0.0.1:8545',
+    'PRIVATE_KEY': '0x' + '11' * 32,
+    'CONTRACT_ADDRESS': '0x' + '00' * 20,
+    'MONGODB_URI': 'mongodb://127.0.0.1:27017/certificate_benchmark',
+}.items():
+    os.environ.setdefault(name, value)
+
+import sys
+import json
+import asyncio
+import argparse
+from loguru import logger
+from statistics import mean
+from collections import defaultdict
+from typing import Dict, List
+
+from backend.blockchain.blockchain import BlockchainClient, certificate_key, certificate_digest
+from backend.benchmarks.offline_stack import OfflineChain, DEFAULT_SOLC_VERSION
+
+
+BLOCK_GAS_LIMIT = 30000000
+
+
+def summarize(operation: str, version: int, samples: List[int], items: int = 1) -> Dict[str, object]:
+    return {
+        'operation': operation,
+        'version': version,
+        'samples': len(samples),
+        'gas_mean': round(mean(samples)),
+        'gas_min': min(samples),
+        'gas_max': max(samples),
+        'gas_per_certificate': round(mean(samples) / items),
+    }
+
+
+def marginal(operation: str, version: int, gas_by_size: Dict[int, int]) -> Dict[str, object]:
+    """
+    Gas biên của mỗi phần tử thêm vào lô, giữa lô nhỏ nhất và lớn nhất.
+    """
+    small, large = min(gas_by_size), max(gas_by_size)
+    return {
+        'operation': f'{operation} per extra ID',
+        'version': version,
+        'batch_sizes': [small, large],
+        'gas_per_id': round((gas_by_size[large] - gas_by_size[small]) / (large - small)),
+    }
+
+
+async def issue(client: BlockchainClient, cert_id: str) -> int:
+    recipient_hash = client.calculate_hash(f"Nguyễn Văn A {cert_id}")
+    course_hash = client.calculate_hash("Khóa học Python Nâng cao")
+    signature = client.create_signature(cert_id, recipient_hash, course_hash)
+    receipt = await client.issue_certificate(cert_id, recipient_hash, course_hash, signature)
+    return receipt['gasUsed']
+
+
+async def send_batch(client: BlockchainClient, build, items: list) -> int:
+    # Gas limit ước lượng cho đúng lô này (gas của hàm nhận mảng tăng theo số phần tử)
+    chunks = await client.plan_batches(build, items, len(items), BLOCK_GAS_LIMIT)
+    (_, receipt), = await client.send_batches(build, chunks)
+    if isinstance(receipt, Exception):
+        raise receipt
+    return receipt['gasUsed']
+
+
+async def measure(chain: OfflineChain, certificates: int, batch_sizes: List[int]) -> List[Dict[str, object]]:
+    client = chain.blockchain_client()
+    version = chain.contract_version
+    gas = defaultdict(list)
+    results = [summarize('deploy', version, [chain.deploy_gas])]
+    try:
+        for i in range(certificates):
+            gas['issueCertificate'].append(await issue(client, f"GAS-{i}"))
+        for i in range(certificates):
+            receipt = await client.revoke_certificate(f"GAS-{i}")
+            gas['revokeCertificate'].append(receipt['gasUsed'])
+        results += [summarize(name, version, samples) for name, samples in gas.items()]
+
+        for size in batch_sizes:
+            ids = [f"GAS-B{size}-{i}" for i in range(size)]
+            for cert_id in ids:
+                await issue(client, cert_id)
+            gas_used = await send_batch(client, client.contract.functions.revokeCertificates, ids)
+            results.append(summarize(f'revokeCertificates[{size}]', version, [gas_used], size))
+
+        recipient_hash = client.calculate_hash("Nguyễn Văn A")
+        course_hash = client.calculate_hash("Khóa học Python Nâng cao")
+        anchor = lambda chunk: client.contract.functions.anchorMerkleRoot(
+            client.merkle_tree(chunk).root, [record['id'] for record in chunk]
+        )
+        batched = []
+        anchor_gas = {}
+        for size in batch_sizes:
+            records = [
+                {'id': f"GAS-A{size}-{i}", 'recipientHash': recipient_hash, 'courseHash': course_hash}
+                for i in range(size)
+            ]
+            gas_used = await send_batch(client, anchor, records)
+            results.append(summarize(f'anchorMerkleRoot[{size}]', version, [gas_used], size))
+            anchor_gas[size] = gas_used
+            batched += records
+        if len(anchor_gas) > 1:
+            results.append(marginal('anchorMerkleRoot', version, anchor_gas))
+        for record in batched[:certificates]:
+            receipt = await client.revoke_batched_certificate(record['id'], recipient_hash, course_hash)
+            gas['revokeBatchedCertificate'].append(receipt['gasUsed'])
+        results.append(summarize('revokeBatchedCertificate', version, gas['revokeBatchedCertificate']))
+
+        if version == 2:
+            migrate_gas = {}
+            for size in batch_sizes:
+                ids = [f"GAS-M{size}-{i}" for i in range(size)]
+                digest = certificate_digest(recipient_hash, course_hash)
+                gas_used = await send_batch(client, lambda chunk: client.contract.functions.migrateCertificates(
+                    chunk, [digest] * len(chunk), [1700000000] * len(chunk), [False] * len(chunk)
+                ), ids)
+                results.append(summarize(f'migrateCertificates[{size}]', version, [gas_used], size))
+                root = client.w3.keccak(text=f"GAS-R{size}")
+                gas_used = await send_batch(client, lambda chunk: client.contract.functions.migrateBatchedIds(
+                    [certificate_key(cert_id) for cert_id in chunk], [root] * len(chunk)
+                ), [f"GAS-R{size}-{i}" for i in range(size)])
+                results.append(summarize(f'migrateBatchedIds[{size}]', version, [gas_used], size))
+                migrate_gas[size] = gas_used
+            if len(migrate_gas) > 1:
+                results.append(marginal('migrateBatchedIds', version, migrate_gas))
+    finally:
+        client.signer.shutdown()
+    return results
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Gas per operation of the v1 and v2 contracts")
+    parser.add_argument("--certificates", type=int, default=50, help="Certificates issued and revoked one by one")
+    parser.add_argument("--batch-sizes", default="10,100", help="Sizes of revokeCertificates, anchorMerkleRoot and migration batches")
+    parser.add_argument("--solc", default=DEFAULT_SOLC_VERSION, help="solc version used to compile the contracts")
+    parser.add_argument("--output", help="Write all results to this JSON file")
+    args = parser.parse_args()
+    batch_sizes = [int(size) for size in args.batch_sizes.split(",")]
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    results = []
+    for version in (1, 2):
+        for result in await measure(OfflineChain(args.solc, version), args.certificates, batch_sizes):
+            print(json.dumps(result), flush=True)
+            results.append(result)
+
+    by_version = {(result['operation'], result['version']): result for result in results}
+    for (operation, version), v1 in by_version.items():
+        v2 = by_version.get((operation, 2))
+        if version != 1 or v2 is None:
+            continue
+        field = 'gas_per_id' if 'gas_per_id' in v1 else 'gas_per_certificate'
+        comparison = {
+            'operation': operation,
+            f'v1_{field}': v1[field],
+            f'v2_{field}': v2[field],
+            'saving_percent': round(100 * (1 - v2[field] / v1[field]), 1),
+        }
+        print(json.dumps(comparison), flush=True)
+        results.append(comparison)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,331 @@
+"""Offline load benchmark on an in-process chain and a MongoDB stand-in
+
+Chạy ứng dụng FastAPI trong process (httpx ASGITransport) với BlockchainClient trên eth-tester
+(contract Certificate được biên dịch và deploy, xem offline_stack) và MongoDBClient trên mongomock,
+không cần INFURA_URL hay MongoDB. Các kịch bản, mỗi kịch bản ở từng mức concurrency:
+- issue: POST /api/issue-certificate (202, giao dịch đã gửi);
+- issue_confirmed: từ lúc gửi đến khi job hoàn tất (biên nhận, ghi MongoDB, render PDF);
+- issue_duplicate: POST /api/issue-certificate với ID đã cấp (409 từ reservation, không ký hay gửi giao dịch);
+- verify, verify_onchain: GET /api/verify-certificate/{id} (có/không đối chiếu contract);
+- events: GET /api/events;
+- ingest: EventIngestor (listen_events) đồng bộ lại toàn bộ sự kiện từ block đầu (tuần tự, concurrency 1).
+Mỗi kết quả là một dòng JSON: throughput (req/s), p50/p95/p99 (ms) và lỗi.
+--signers N chạy với N tài khoản admin gửi giao dịch (SignerPool) để so throughput cấp chứng chỉ theo số tài khoản.
+Với --baseline, kết quả được so với file baseline (tạo bằng --save-baseline trên cùng máy, cùng tham số chạy):
+throughput thấp hơn hoặc p95 cao hơn quá --tolerance, có lỗi mới, hay baseline được ghi với tham số khác, thì exit code 1.
+Baseline của CI (backend/benchmarks/baselines/load.json) được ghi trên runner của workflow backend (máy tham chiếu)
+với --requests 100 --concurrency 1,8; job load-benchmark so mỗi lần chạy với file đó.
+
+Usage:
+    python -m backend.benchmarks.load_benchmark --requests 200 --concurrency 1,8,32 --save-baseline baseline.json
+    python -m backend.benchmarks.load_benchmark --requests 200 --concurrency 1,8,32 --baseline baseline.json
+    python -m backend.benchmarks.load_benchmark --requests 100 --concurrency 1,8 --baseline backend/benchmarks/baselines/load.json
+"""
+
+import os
+
+# Cấu hình tối thiểu để import backend không cần .env; không có kết nối thật nào được mở
+for name, value in {
+    'INFURA_URL': 'http://127.0.0.1:8545',
+    'PRIVATE_KEY': '0x' + '11' * 32,
+    'CONTRACT_ADDRESS': '0x' + '00' * 20,
+    'MONGODB_URI': 'mongodb://127.0.0.1:27017/certificate_benchmark',
+    'JWT_SECRET_KEY': 'offline-benchmark',
+    'JOB_POLL_INTERVAL': '0.1',
+    'EVENT_CONFIRMATIONS': '0',
+}.items():
+    os.environ.setdefault(name, value)
+
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import jwt
+import httpx
+from loguru import logger
+from statistics import quantiles
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from backend.app import app
+from backend.dependencies import AppServices, use_services, close_services
+from backend.event_listener.event_listener import EventIngestor, CHECKPOINT_NAME
+from backend.benchmarks.offline_stack import OfflineChain, offline_mongo_client, DEFAULT_SOLC_VERSION
+
+
+SCENARIOS = ('issue', 'issue_confirmed', 'issue_duplicate', 'verify', 'verify_onchain', 'events', 'ingest')
+# Tham số chạy phải giống baseline thì so sánh mới có nghĩa
+COMPARED_META = ('requests', 'concurrency', 'scenarios', 'ingest_runs', 'contract_version', 'signers')
+DONE_STATUSES = ('completed', 'failed')
+
+
+class DuplicateAccepted(Exception):
+    """
+    An already issued ID was accepted by /api/issue-certificate (issue_duplicate scenario).
+    """
+
+
+def summarize(scenario: str, concurrency: int, latencies: List[float], seconds: float, errors: Counter) -> Dict[str, Any]:
+    latencies_ms = sorted(latency * 1000 for latency in latencies)
+    cuts = quantiles(latencies_ms, n=100, method='inclusive') if len(latencies_ms) > 1 else latencies_ms * 99
+    return {
+        'scenario': scenario,
+        'concurrency': concurrency,
+        'requests': len(latencies),
+        'seconds': round(seconds, 3),
+        'throughput': round(len(latencies) / seconds, 2) if seconds else 0.0,
+        'p50_ms': round(cuts[49], 2) if cuts else None,
+        'p95_ms': round(cuts[94], 2) if cuts else None,
+        'p99_ms': round(cuts[98], 2) if cuts else None,
+        'errors': dict(errors),
+    }
+
+
+async def drive(scenario: str, requests: int, concurrency: int, call: Callable[[int], Awaitable[int]]) -> Dict[str, Any]:
+    """
+    Gọi call(i) cho i trong [0, requests) với tối đa concurrency lời gọi đồng thời.
+    """
+    indices = iter(range(requests))
+    latencies: List[float] = []
+    errors = Counter()
+
+    async def worker():
+        for index in indices:
+            started = time.perf_counter()
+            try:
+                status = await call(index)
+                if status >= 400:
+                    errors[str(status)] += 1
+            except Exception as e:
+                errors[type(e).__name__] += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    return summarize(scenario, concurrency, latencies, time.perf_counter() - started, errors)
+
+
+async def wait_confirmed(services: AppServices, submitted: Dict[str, float], concurrency: int, timeout: float) -> Dict[str, Any]:
+    """
+    Đợi các job đã gửi hoàn tất; độ trễ mỗi job tính từ lúc gửi (độ phân giải ~50 ms).
+    """
+    pending = dict(submitted)
+    latencies: List[float] = []
+    errors = Counter()
+    started = min(submitted.values()) if submitted else time.perf_counter()
+    deadline = time.perf_counter() + timeout
+    while pending and time.perf_counter() < deadline:
+        for job_id in list(pending):
+            job = await services.mongo_client.find_job(job_id)
+            if job and job['status'] in DONE_STATUSES:
+                latencies.append(time.perf_counter() - pending.pop(job_id))
+                if job['status'] == 'failed':
+                    errors['failed'] += 1
+        await asyncio.sleep(0.05)
+    if pending:
+        errors['timeout'] += len(pending)
+    return summarize('issue_confirmed', concurrency, latencies, time.perf_counter() - started, errors)
+
+
+async def ingest(services: AppServices, runs: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    events = 0
+    for _ in range(runs):
+        await services.mongo_client.save_checkpoint(CHECKPOINT_NAME, 0)
+        ingestor = EventIngestor(
+            services.mongo_client, services.blockchain_client,
+            pdf_cache=services.pdf_cache, verify_cache=services.verify_cache, admin_keys=services.admin_keys
+        )
+        started = time.perf_counter()
+        events += await ingestor.sync()
+        latencies.append(time.perf_counter() - started)
+    result = summarize('ingest', 1, latencies, sum(latencies), Counter())
+    result['events_per_second'] = round(events / sum(latencies), 2) if latencies else 0.0
+    return result
+
+
+async def run_level(client: httpx.AsyncClient, services: AppServices, headers: Dict[str, str], args,
+                    concurrency: int, issued: List[str]) -> List[Dict[str, Any]]:
+    results = []
+    scenarios = set(args.scenarios)
+    submitted: Dict[str, float] = {}
+
+    async def issue(index: int) -> int:
+        cert_id = f"LOAD-{concurrency}-{index}"
+        sent_at = time.perf_counter()
+        response = await client.post('/api/issue-certificate', headers=headers, json={
+            'id': cert_id, 'recipient': f"Nguyễn Văn A {index}", 'course': "Khóa học Python Nâng cao"
+        })
+        if response.status_code == 202:
+            submitted[response.json()['jobId']] = sent_at
+            issued.append(cert_id)
+        return response.status_code
+
+    if scenarios & {'issue', 'issue_confirmed'}:
+        result = await drive('issue', args.requests, concurrency, issue)
+        if 'issue' in scenarios:
+            results.append(result)
+        if 'issue_confirmed' in scenarios:
+            results.append(await wait_confirmed(services, submitted, concurrency, args.confirm_timeout))
+
+    if 'issue_duplicate' in scenarios:
+        duplicates = list(issued)
+        if not duplicates:
+            duplicates = [f"DUPLICATE-{index}" for index in range(args.requests)]
+            await services.id_reservations.mark_issued(duplicates)
+
+        async def issue_duplicate(index: int) -> int:
+            response = await client.post('/api/issue-certificate', headers=headers, json={
+                'id': duplicates[index % len(duplicates)], 'recipient': "Nguyễn Văn A", 'course': "Khóa học Python Nâng cao"
+            })
+            # 409 là kết quả mong đợi
+            if response.status_code == 202:
+                raise DuplicateAccepted(duplicates[index % len(duplicates)])
+            return 200 if response.status_code == 409 else response.status_code
+
+        results.append(await drive('issue_duplicate', args.requests, concurrency, issue_duplicate))
+
+    ids = issued or [f"MISSING-{index}" for index in range(args.requests)]
+    if 'verify' in scenarios:
+        results.append(await drive('verify', args.requests, concurrency, lambda index: get_status(
+            client, f"/api/verify-certificate/{ids[index % len(ids)]}"
+        )))
+    if 'verify_onchain' in scenarios:
+        results.append(await drive('verify_onchain', args.requests, concurrency, lambda index: get_status(
+            client, f"/api/verify-certificate/{ids[index % len(ids)]}?onchain=true"
+        )))
+    if 'events' in scenarios:
+        results.append(await drive('events', args.requests, concurrency, lambda index: get_status(
+            client, "/api/events?limit=50"
+        )))
+    return results
+
+
+async def get_status(client: httpx.AsyncClient, url: str) -> int:
+    return (await client.get(url)).status_code
+
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any], tolerance: float,
+            meta: Optional[Dict[str, Any]] = None) -> List[str]:
+    """
+    So kết quả với baseline; trả về danh sách regression.
+
+    Args:
+        results (List[Dict[str, Any]]): Kết quả của lần chạy này.
+        baseline (Dict[str, Any]): Nội dung file baseline (meta, results).
+        tolerance (float): Mức giảm throughput / tăng p95 cho phép (tương đối).
+        meta (Optional[Dict[str, Any]]): Tham số của lần chạy này; phải khớp tham số của baseline.
+    """
+    regressions = []
+    for key in COMPARED_META:
+        expected, actual = baseline.get('meta', {}).get(key), (meta or {}).get(key)
+        if meta is not None and expected != actual:
+            regressions.append(f"baseline was recorded with {key}={expected}, this run uses {key}={actual}")
+    if regressions:
+        return regressions
+    current = {(result['scenario'], result['concurrency']): result for result in results}
+    for expected in baseline['results']:
+        key = (expected['scenario'], expected['concurrency'])
+        actual = current.get(key)
+        name = f"{key[0]}@{key[1]}"
+        if actual is None:
+            regressions.append(f"{name}: missing from this run")
+            continue
+        if actual['throughput'] < expected['throughput'] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {actual['throughput']} < baseline {expected['throughput']}")
+        if expected['p95_ms'] is not None and actual['p95_ms'] is not None \
+                and actual['p95_ms'] > expected['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {actual['p95_ms']} ms > baseline {expected['p95_ms']} ms")
+        if actual['errors'] and not expected['errors']:
+            regressions.append(f"{name}: errors {actual['errors']}")
+    return regressions
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description="Offline load benchmark")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario and concurrency level")
+    parser.add_argument("--concurrency", default="1,8,32")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--ingest-runs", type=int, default=5)
+    parser.add_argument("--confirm-timeout", type=float, default=300)
+    parser.add_argument("--solc", default=DEFAULT_SOLC_VERSION, help="solc version used to compile the contract")
+    parser.add_argument("--contract-version", type=int, choices=(1, 2), default=1)
+    parser.add_argument("--signers", type=int, default=1, help="Admin accounts sending transactions")
+    parser.add_argument("--output", help="Write all results to this JSON file")
+    parser.add_argument("--baseline", help="Fail when results regress against this JSON file")
+    parser.add_argument("--save-baseline", help="Write results as a new baseline file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression")
+    args = parser.parse_args()
+    args.concurrency = [int(level) for level in args.concurrency.split(",")]
+    args.scenarios = [scenario.strip() for scenario in args.scenarios.split(",") if scenario.strip()]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    chain = OfflineChain(args.solc, args.contract_version)
+    services = use_services(AppServices(
+        mongo_client=offline_mongo_client(), blockchain_client=chain.blockchain_client(args.signers)
+    ))
+    await services.connect()
+    await services.warm_up()
+    token = jwt.encode(
+        {'sub': 'benchmark', 'role': 'super_admin', 'exp': datetime.utcnow() + timedelta(hours=1)},
+        os.environ['JWT_SECRET_KEY'], algorithm='HS256'
+    )
+    headers = {'Authorization': f"Bearer {token}"}
+
+    results: List[Dict[str, Any]] = []
+    issued: List[str] = []
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://offline") as client:
+            for concurrency in args.concurrency:
+                for result in await run_level(client, services, headers, args, concurrency, issued):
+                    print(json.dumps(result), flush=True)
+                    results.append(result)
+        if 'ingest' in args.scenarios:
+            result = await ingest(services, args.ingest_runs)
+            print(json.dumps(result), flush=True)
+            results.append(result)
+        # Số giao dịch đã gửi từ mỗi tài khoản ký (nonce), để thấy tải được chia cho --signers tài khoản
+        signer_transactions = {
+            signer.address: chain.tester.get_nonce(signer.address) for signer in services.blockchain_client.signers.signers
+        }
+    finally:
+        await close_services()
+
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'requests': args.requests,
+            'concurrency': args.concurrency,
+            'scenarios': args.scenarios,
+            'ingest_runs': args.ingest_runs,
+            'contract_version': args.contract_version,
+            'signers': args.signers,
+            'signer_transactions': signer_transactions,
+            'created': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+        },
+        'results': results,
+    }
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance, report['meta'])
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
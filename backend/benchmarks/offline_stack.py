@@ -0,0 +1,266 @@
+"""In-process chain and MongoDB stand-in for offline benchmarks
+
+Logic:
+Chain: eth-tester (py-evm) chạy trong process. Contract v1 (contracts/certificate.sol) hoặc v2
+(contracts/certificate_v2.sol) được biên dịch bằng py-solc-x (xem backend.compile_contracts) và deploy
+bằng tài khoản test đầu tiên, tài khoản này cũng là admin ký giao dịch; các tài khoản test tiếp theo
+được addAdmin khi cần nhiều tài khoản gửi giao dịch (SignerPool).
+Mỗi giao dịch được mine ngay. Lời gọi RPC chạy trên một thread vì py-evm không thread-safe.
+MongoDB: mongomock (in-memory) bọc bằng adapter async có cùng phần API của AsyncMongoClient
+mà MongoDBClient dùng (find/cursor, find_one, insert, update, find_one_and_update, bulk_write, create_indexes),
+explain() mô phỏng cách planner chọn index (lọc bằng, sort, lọc khoảng) để kiểm tra MONGODB_QUERY_PLAN_CHECK offline.
+"""
+
+import itertools
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+import mongomock
+from pymongo import InsertOne, UpdateOne, UpdateMany, ReplaceOne, DeleteOne, DeleteMany
+
+from backend.config.setting import abi_config
+from backend.compile_contracts import CONTRACTS, DEFAULT_SOLC_VERSION, compile_certificate_contract, same_abi
+from backend.db.connector import MongoDBClient
+from backend.blockchain.blockchain import BlockchainClient, load_contract_abi
+
+
+def _is_equality(condition: Any) -> bool:
+    """
+    Điều kiện lọc bằng (giá trị, $eq hoặc $in): index có thể trả kết quả đúng thứ tự của trường tiếp theo.
+    """
+    if not isinstance(condition, dict):
+        return True
+    return set(condition) <= {'$eq', '$in'}
+
+
+class AsyncCursor:
+    def __init__(self, cursor, collection=None, query: Optional[Dict[str, Any]] = None):
+        self._cursor = cursor
+        self._collection = collection
+        self._query = query or {}
+        self._sort: List[tuple] = []
+
+    def sort(self, key_or_list, direction=None) -> "AsyncCursor":
+        self._sort = list(key_or_list) if isinstance(key_or_list, list) else [(key_or_list, direction or 1)]
+        self._cursor = self._cursor.sort(key_or_list, direction) if direction is not None else self._cursor.sort(key_or_list)
+        return self
+
+    def limit(self, limit: int) -> "AsyncCursor":
+        self._cursor = self._cursor.limit(limit)
+        return self
+
+    def batch_size(self, batch_size: int) -> "AsyncCursor":
+        return self
+
+    def _sort_covered(self, keys: List[tuple]) -> bool:
+        """
+        Index trả kết quả đúng thứ tự sort: các trường sort nằm ngay sau tiền tố lọc bằng của index,
+        cùng chiều (hoặc ngược chiều toàn bộ).
+        """
+        if not self._sort:
+            return True
+        start = 0
+        while start < len(keys) and keys[start][0] in self._query and _is_equality(self._query[keys[start][0]]):
+            start += 1
+        window = keys[start:start + len(self._sort)]
+        if [field for field, _ in window] != [field for field, _ in self._sort]:
+            return False
+        signs = {index_direction * sort_direction for (_, index_direction), (_, sort_direction) in zip(window, self._sort)}
+        return len(signs) == 1
+
+    async def explain(self) -> Dict[str, Any]:
+        """
+        Plan giống cursor.explain() của MongoDB (mongomock không có explain). Index được dùng khi trường đầu tiên
+        có trong bộ lọc, hoặc khi index phục vụ được sort và chứa trường lọc (không lọc: chỉ cần phục vụ sort).
+        Ưu tiên index phục vụ cả bộ lọc và sort; sort không được index phục vụ thì thêm stage SORT (sắp xếp
+        trong bộ nhớ). Không có index nào dùng được: COLLSCAN.
+        """
+        best = None
+        for name, index in self._collection.index_information().items():
+            keys = [(field, direction) for field, direction in index['key']]
+            fields = {field for field, _ in keys}
+            covered = self._sort_covered(keys)
+            filtered = keys[0][0] in self._query or (covered and bool(self._sort) and bool(fields & set(self._query)))
+            if not filtered and not (covered and self._sort and not self._query):
+                continue
+            rank = (covered, filtered)
+            if best is None or rank > best[0]:
+                best = (rank, name)
+
+        if best is None:
+            plan = {'stage': 'COLLSCAN'}
+            covered = not self._sort
+        else:
+            (covered, _), name = best
+            plan = {'stage': 'FETCH', 'inputStage': {'stage': 'IXSCAN', 'indexName': name}}
+        if not covered:
+            plan = {'stage': 'SORT', 'sortPattern': dict(self._sort), 'inputStage': plan}
+        return {'queryPlanner': {'winningPlan': plan}}
+
+    async def to_list(self, length: Optional[int] = None) -> List[Dict[str, Any]]:
+        return list(self._cursor if length is None else itertools.islice(self._cursor, length))
+
+    def __aiter__(self) -> "AsyncCursor":
+        return self
+
+    async def __anext__(self) -> Dict[str, Any]:
+        try:
+            return next(self._cursor)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class AsyncCollection:
+    def __init__(self, collection):
+        self._collection = collection
+        self.name = collection.name
+
+    def find(self, *args, **kwargs) -> AsyncCursor:
+        query = args[0] if args else kwargs.get('filter')
+        return AsyncCursor(self._collection.find(*args, **kwargs), self._collection, query)
+
+    async def find_one(self, *args, **kwargs):
+        return self._collection.find_one(*args, **kwargs)
+
+    async def insert_one(self, document, **kwargs):
+        return self._collection.insert_one(document)
+
+    async def insert_many(self, documents, ordered: bool = True, **kwargs):
+        return self._collection.insert_many(documents, ordered=ordered)
+
+    async def update_one(self, *args, **kwargs):
+        return self._collection.update_one(*args, **kwargs)
+
+    async def update_many(self, *args, **kwargs):
+        return self._collection.update_many(*args, **kwargs)
+
+    async def find_one_and_update(self, *args, **kwargs):
+        return self._collection.find_one_and_update(*args, **kwargs)
+
+    async def count_documents(self, *args, **kwargs) -> int:
+        return self._collection.count_documents(*args, **kwargs)
+
+    async def delete_many(self, *args, **kwargs):
+        return self._collection.delete_many(*args, **kwargs)
+
+    async def create_indexes(self, indexes, **kwargs):
+        return self._collection.create_indexes(indexes)
+
+    async def bulk_write(self, requests, ordered: bool = True, **kwargs):
+        # mongomock không nhận operation của pymongo 4.x, áp dụng từng operation
+        result = SimpleNamespace(
+            inserted_count=0, matched_count=0, modified_count=0, deleted_count=0, upserted_count=0
+        )
+        for request in requests:
+            if isinstance(request, InsertOne):
+                self._collection.insert_one(request._doc)
+                result.inserted_count += 1
+                continue
+            if isinstance(request, (DeleteOne, DeleteMany)):
+                delete = self._collection.delete_one if isinstance(request, DeleteOne) else self._collection.delete_many
+                result.deleted_count += delete(request._filter).deleted_count
+                continue
+            if isinstance(request, ReplaceOne):
+                outcome = self._collection.replace_one(request._filter, request._doc, upsert=request._upsert)
+            elif isinstance(request, UpdateOne):
+                outcome = self._collection.update_one(request._filter, request._doc, upsert=request._upsert)
+            elif isinstance(request, UpdateMany):
+                outcome = self._collection.update_many(request._filter, request._doc, upsert=request._upsert)
+            else:
+                raise TypeError(f"Unsupported bulk operation {type(request).__name__}")
+            result.matched_count += outcome.matched_count
+            result.modified_count += outcome.modified_count
+            result.upserted_count += int(outcome.upserted_id is not None)
+        return result
+
+
+class AsyncDatabase:
+    def __init__(self, database):
+        self._database = database
+        self.name = database.name
+        self._collections: Dict[str, AsyncCollection] = {}
+
+    def __getitem__(self, name: str) -> AsyncCollection:
+        if name not in self._collections:
+            self._collections[name] = AsyncCollection(self._database[name])
+        return self._collections[name]
+
+    async def command(self, command, *args, **kwargs) -> Dict[str, Any]:
+        return {'ok': 1.0}
+
+
+class AsyncMongoStandIn:
+    def __init__(self):
+        """
+        Client in-memory có phần API async của AsyncMongoClient mà MongoDBClient dùng.
+        """
+        self._client = mongomock.MongoClient()
+        self._databases: Dict[str, AsyncDatabase] = {}
+
+    def __getitem__(self, name: str) -> AsyncDatabase:
+        if name not in self._databases:
+            self._databases[name] = AsyncDatabase(self._client[name])
+        return self._databases[name]
+
+    @property
+    def admin(self) -> AsyncDatabase:
+        return self['admin']
+
+    async def close(self) -> None:
+        self._client.close()
+
+
+def offline_mongo_client(db_name: str = "certificate_benchmark") -> MongoDBClient:
+    return MongoDBClient(uri="mongomock://", db_name=db_name, client=AsyncMongoStandIn())
+
+
+class OfflineChain:
+    def __init__(self, solc_version: str = DEFAULT_SOLC_VERSION, contract_version: int = 1):
+        """
+        Chain eth-tester trong process với contract chứng chỉ đã deploy.
+
+        Args:
+            solc_version (str): Phiên bản solc dùng để biên dịch contract.
+            contract_version (int): Phiên bản contract (1 hoặc 2).
+        """
+        from web3 import Web3, EthereumTesterProvider
+        from eth_tester import EthereumTester, PyEVMBackend
+
+        abi, bytecode = compile_certificate_contract(solc_version, contract_version)
+        abi_path = abi_config.path_for(contract_version)
+        if not same_abi(abi, load_contract_abi(abi_path)):
+            raise RuntimeError(
+                f"{abi_path} does not match {CONTRACTS[contract_version][0]}, run python -m backend.compile_contracts"
+            )
+        self.contract_version = contract_version
+
+        backend = PyEVMBackend()
+        self.tester = EthereumTester(backend)
+        self.provider = EthereumTesterProvider(self.tester)
+        self.private_key = backend.account_keys[0].to_hex()
+        self.signer_keys = [key.to_hex() for key in backend.account_keys[1:]]
+        w3 = Web3(self.provider)
+        self.deployer = w3.eth.accounts[0]
+        tx_hash = w3.eth.contract(abi=abi, bytecode=bytecode).constructor().transact({'from': self.deployer})
+        receipt = w3.eth.get_transaction_receipt(tx_hash)
+        self.contract_address = receipt['contractAddress']
+        self.deploy_gas = receipt['gasUsed']
+        self.contract = w3.eth.contract(address=self.contract_address, abi=abi)
+
+    def blockchain_client(self, signers: int = 1) -> BlockchainClient:
+        """
+        BlockchainClient trên chain này với signers tài khoản gửi giao dịch (tài khoản thêm được addAdmin).
+        """
+        if not 1 <= signers <= len(self.signer_keys) + 1:
+            raise ValueError(f"signers must be between 1 and {len(self.signer_keys) + 1}")
+        signer_keys = self.signer_keys[:signers - 1]
+        for address in self.tester.get_accounts()[1:signers]:
+            if not self.contract.functions.admins(address).call():
+                self.contract.functions.addAdmin(address).transact({'from': self.deployer})
+        return BlockchainClient(
+            provider=self.provider,
+            private_key=self.private_key,
+            contract_address=self.contract_address,
+            max_workers=1,
+            contract_version=self.contract_version,
+            signer_keys=signer_keys
+        )
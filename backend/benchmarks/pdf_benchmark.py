@@ -0,0 +1,56 @@
+"""PDF render throughput benchmark
+
+Đo số PDF/giây của PdfRenderer với các kích thước pool khác nhau để chọn PDF_WORKERS
+cho các đợt cấp chứng chỉ hàng loạt.
+
+Usage:
+    python -m backend.benchmarks.pdf_benchmark --jobs 200 --workers 1,2,4,8
+"""
+
+import json
+import time
+import asyncio
+import argparse
+
+from backend.utils.pdf_renderer import PdfRenderer
+
+
+async def run(workers: int, jobs: int) -> dict:
+    renderer = PdfRenderer(workers=workers, max_pending=jobs)
+    await renderer.start()
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(*[
+            renderer.render(
+                cert_id=f"BENCH-{i}",
+                recipient="Nguyễn Văn A",
+                course="Khóa học Python Nâng cao",
+                issue_date="01/01/2024",
+                tx_hash="0x" + f"{i:064x}",
+            )
+            for i in range(jobs)
+        ])
+        elapsed = time.perf_counter() - started
+    finally:
+        renderer.shutdown()
+    return {
+        "workers": workers,
+        "jobs": jobs,
+        "seconds": round(elapsed, 3),
+        "pdfs_per_second": round(jobs / elapsed, 2),
+        "pdfs_per_second_per_worker": round(jobs / elapsed / workers, 2),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="PDF render throughput benchmark")
+    parser.add_argument("--jobs", type=int, default=200)
+    parser.add_argument("--workers", default="1,2,4")
+    args = parser.parse_args()
+
+    for workers in [int(w) for w in args.workers.split(",")]:
+        print(json.dumps(await run(workers, args.jobs)))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
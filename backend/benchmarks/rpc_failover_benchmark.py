@@ -0,0 +1,222 @@
+"""RPC transport failover and tail latency benchmark
+
+Chạy các JSON-RPC server giả cục bộ (độ trễ và lỗi điều khiển được) và đo MultiEndpointProvider qua Web3:
+- steady: ba endpoint nhanh/vừa/chậm, đọc phải dồn vào endpoint nhanh nhất;
+- failover: endpoint nhanh trả lỗi (HTTP 503, rate limit hoặc ngắt kết nối), đọc không được lỗi
+  (so với một HTTPProvider đơn trỏ vào cùng endpoint);
+- recovery: endpoint nhanh hoạt động lại, sau RPC_CIRCUIT_RESET giây nhận lại traffic;
+- writes: eth_sendRawTransaction chỉ đi tới endpoint ghim, và chuyển ghim khi endpoint đó ngừng hoạt động.
+Mỗi pha in một dòng JSON: p50/p95/p99 (ms), số lỗi, số request và số kết nối TCP mỗi server.
+Exit code 1 nếu provider trả lỗi khi vẫn còn endpoint khỏe hoặc ghi không đúng endpoint.
+
+Usage:
+    python -m backend.benchmarks.rpc_failover_benchmark --requests 2000 --threads 16 --failure error
+"""
+
+import sys
+import json
+import time
+import argparse
+import threading
+from web3 import Web3
+from loguru import logger
+from statistics import quantiles
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from backend.blockchain.rpc_transport import MultiEndpointProvider
+
+
+RESULTS = {
+    'web3_clientVersion': 'fake-rpc/1.0',
+    'eth_chainId': hex(11155111),
+    'eth_blockNumber': hex(1000),
+    'eth_getTransactionCount': '0x0',
+    'eth_sendRawTransaction': '0x' + '11' * 32,
+}
+
+
+class FakeRPCServer:
+    def __init__(self, name: str, latency: float):
+        """
+        JSON-RPC server giả chạy trên một thread.
+
+        Args:
+            name (str): Tên hiển thị trong kết quả.
+            latency (float): Độ trễ mỗi request (giây).
+        """
+        self.name = name
+        self.latency = latency
+        self.mode = 'ok'  # ok | error | rate_limit | down
+        self.requests = Counter()
+        self.connections = 0
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                time.sleep(server.latency)
+                calls = body if isinstance(body, list) else [body]
+                with server._lock:
+                    server.requests.update(call['method'] for call in calls)
+                if server.mode == 'down':
+                    self.close_connection = True
+                    return
+                if server.mode == 'error':
+                    self.send_response(503)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                responses = [server.respond(call) for call in calls]
+                payload = json.dumps(responses if isinstance(body, list) else responses[0]).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def respond(self, call: dict) -> dict:
+        if self.mode == 'rate_limit':
+            return {'jsonrpc': '2.0', 'id': call['id'], 'error': {'code': -32005, 'message': 'rate limit exceeded'}}
+        return {'jsonrpc': '2.0', 'id': call['id'], 'result': RESULTS.get(call['method'])}
+
+    def reset_counters(self) -> None:
+        with self._lock:
+            self.requests = Counter()
+            self.connections = 0
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def run_phase(w3: Web3, call, count: int, threads: int) -> dict:
+    def timed(_):
+        started = time.perf_counter()
+        try:
+            call(w3)
+            return time.perf_counter() - started, None
+        except Exception as e:
+            return time.perf_counter() - started, type(e).__name__
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        started = time.perf_counter()
+        results = list(pool.map(timed, range(count)))
+        elapsed = time.perf_counter() - started
+    latencies = [latency * 1000 for latency, _ in results]
+    cuts = quantiles(latencies, n=100)
+    return {
+        'requests': count,
+        'seconds': round(elapsed, 3),
+        'p50_ms': round(cuts[49], 2),
+        'p95_ms': round(cuts[94], 2),
+        'p99_ms': round(cuts[98], 2),
+        'errors': dict(Counter(error for _, error in results if error)),
+    }
+
+
+def report(phase: str, result: dict, servers: list, provider=None) -> dict:
+    result = dict(phase=phase, **result)
+    result['servers'] = {
+        server.name: {'requests': sum(server.requests.values()), 'connections': server.connections}
+        for server in servers
+    }
+    if provider is not None:
+        names = {server.url: server.name for server in servers}
+        result['circuits'] = {names[endpoint.url]: endpoint.state for endpoint in provider.endpoints}
+    print(json.dumps(result))
+    for server in servers:
+        server.reset_counters()
+    return result
+
+
+def read(w3: Web3):
+    return w3.eth.block_number
+
+
+def write(w3: Web3):
+    return w3.eth.send_raw_transaction(b'\x00')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RPC transport failover and tail latency benchmark")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--latencies", default="0.005,0.015,0.040", help="Latency (s) of the fast, medium and slow endpoints")
+    parser.add_argument("--failure", choices=("error", "rate_limit", "down"), default="error")
+    parser.add_argument("--circuit-reset", type=float, default=1.0)
+    args = parser.parse_args()
+    logger.remove()
+    logger.add(sys.stderr, level="ERROR")
+
+    fast, medium, slow = servers = [
+        FakeRPCServer(name, float(latency))
+        for name, latency in zip(("fast", "medium", "slow"), args.latencies.split(","))
+    ]
+    # Ghim ghi vào endpoint vừa để thấy đọc và ghi đi theo hai đường khác nhau
+    provider = MultiEndpointProvider(
+        [medium.url, fast.url, slow.url], pool_size=args.threads, circuit_reset=args.circuit_reset
+    )
+    w3 = Web3(provider)
+    single = Web3(Web3.HTTPProvider(fast.url, exception_retry_configuration=None))
+    failed = []
+
+    try:
+        run_phase(w3, read, len(servers) * 2, 1)  # đo EWMA ban đầu của từng endpoint
+        for server in servers:
+            server.reset_counters()
+
+        steady = report("steady", run_phase(w3, read, args.requests, args.threads), servers, provider)
+        # Server giả chạy cùng process nên độ trễ tăng theo tải; endpoint nhanh vẫn phải nhận phần lớn request
+        if steady['errors'] or steady['servers']['fast']['requests'] < args.requests * 0.5:
+            failed.append("steady: reads not routed to the fastest endpoint")
+
+        fast.mode = args.failure
+        result = report("failover", run_phase(w3, read, args.requests, args.threads), servers, provider)
+        if result['errors']:
+            failed.append("failover: reads failed while healthy endpoints remained")
+        report("failover_single_provider", run_phase(single, read, args.requests // 4, args.threads), servers)
+
+        fast.mode = 'ok'
+        time.sleep(args.circuit_reset)
+        result = report("recovery", run_phase(w3, read, args.requests, args.threads), servers, provider)
+        if result['servers']['fast']['requests'] < args.requests * 0.1:
+            failed.append("recovery: fastest endpoint did not get traffic back")
+
+        result = report("writes", run_phase(w3, write, args.requests // 4, args.threads), servers, provider)
+        if result['errors'] or result['servers']['medium']['requests'] != args.requests // 4:
+            failed.append("writes: transactions not pinned to the write endpoint")
+
+        medium.mode = 'down'
+        result = report("writes_failover", run_phase(w3, write, args.requests // 4, args.threads), servers, provider)
+        if result['errors'] or provider.write_endpoint.url == medium.url:
+            failed.append("writes_failover: write endpoint was not moved")
+    finally:
+        provider.close()
+        for server in servers:
+            server.stop()
+
+    for message in failed:
+        print(message, file=sys.stderr)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
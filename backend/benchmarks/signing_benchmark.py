@@ -0,0 +1,97 @@
+"""Certificate hashing and signing throughput benchmark
+
+So sánh create_signature (từng chứng chỉ) với CertificateSigner (khóa parse một lần, process pool)
+và báo cáo số chứng chỉ ký được mỗi giây trên mỗi core. Chữ ký của đường batch trùng từng byte với
+calculate_hash/create_signature được kiểm tra trong tests/test_signer.py.
+
+Usage:
+    python -m backend.benchmarks.signing_benchmark --certificates 2000 --workers 1,2,4
+"""
+
+import sys
+import json
+import time
+import asyncio
+import argparse
+from web3 import Web3
+from loguru import logger
+from eth_account import Account
+
+from backend.utils.utils import CertificateInput
+from backend.blockchain.blockchain import BlockchainClient
+from backend.blockchain.signer import CertificateSigner
+
+
+def single_call_client(private_key: str) -> BlockchainClient:
+    # Chỉ dùng calculate_hash/create_signature, không cần kết nối RPC
+    client = BlockchainClient.__new__(BlockchainClient)
+    client.w3 = Web3()
+    client.admin_account = Account.from_key(private_key)
+    return client
+
+
+def make_certificates(count: int) -> list:
+    return [
+        CertificateInput(id=f"BENCH-{i}", recipient=f"Nguyễn Văn A {i}", course="Khóa học Python Nâng cao")
+        for i in range(count)
+    ]
+
+
+def single_call(client: BlockchainClient, certificates: list) -> list:
+    signed = []
+    for cert in certificates:
+        recipient_hash = client.calculate_hash(cert.recipient)
+        course_hash = client.calculate_hash(cert.course)
+        signed.append((recipient_hash, course_hash, client.create_signature(cert.id, recipient_hash, course_hash)))
+    return signed
+
+
+async def run(private_key: str, certificates: list, workers: int) -> dict:
+    signer = CertificateSigner(private_key, workers=workers, process_threshold=1)
+    try:
+        await signer.sign_many(certificates[:workers])  # khởi động pool
+        started = time.perf_counter()
+        await signer.sign_many(certificates)
+        elapsed = time.perf_counter() - started
+    finally:
+        signer.shutdown()
+    return {
+        "path": "batch",
+        "workers": workers,
+        "certificates": len(certificates),
+        "seconds": round(elapsed, 3),
+        "per_second": round(len(certificates) / elapsed, 2),
+        "per_second_per_core": round(len(certificates) / elapsed / workers, 2),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Certificate signing throughput benchmark")
+    parser.add_argument("--certificates", type=int, default=2000)
+    parser.add_argument("--workers", default="1,2,4")
+    args = parser.parse_args()
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    private_key = Account.create().key.hex()
+    certificates = make_certificates(args.certificates)
+
+    client = single_call_client(private_key)
+    started = time.perf_counter()
+    single_call(client, certificates)
+    elapsed = time.perf_counter() - started
+    print(json.dumps({
+        "path": "create_signature",
+        "workers": 1,
+        "certificates": len(certificates),
+        "seconds": round(elapsed, 3),
+        "per_second": round(len(certificates) / elapsed, 2),
+        "per_second_per_core": round(len(certificates) / elapsed, 2),
+    }))
+
+    for workers in [int(w) for w in args.workers.split(",")]:
+        print(json.dumps(await run(private_key, certificates, workers)))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
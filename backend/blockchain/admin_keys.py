@@ -0,0 +1,64 @@
+"""In-memory admin key set for offline signature verification
+
+Logic:
+Giữ trạng thái (active/removed) của các địa chỉ admin trong bộ nhớ để kiểm tra người ký
+của chứng chỉ mà không cần truy vấn MongoDB hay RPC. Nạp từ collection admins khi khởi động
+và được cập nhật bởi event listener (AdminAdded/AdminRemoved) cũng như các API thêm/xóa admin.
+Tài khoản ký của backend chỉ được tin khi check_admins xác nhận chúng là admin trên contract.
+"""
+
+from loguru import logger
+from typing import Dict, Iterable, Optional
+
+
+ADMIN_ACTIVE = 'active'
+ADMIN_REMOVED = 'removed'
+
+
+class AdminKeySet:
+    def __init__(self, trusted: Iterable[str] = ()):
+        """
+        Khởi tạo tập admin.
+
+        Args:
+            trusted (Iterable[str]): Địa chỉ luôn được coi là admin (vd. tài khoản ký của backend, owner của contract).
+        """
+        self._trusted = {address.lower() for address in trusted}
+        self._statuses: Dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._trusted | set(self._statuses))
+
+    async def load(self, mongo_client) -> None:
+        """
+        Nạp trạng thái admin từ collection admins.
+        """
+        admins = await mongo_client.find_all_admins()
+        self._statuses = {
+            admin['address'].lower(): admin['status']
+            for admin in admins
+            if admin.get('address') and admin.get('status') in (ADMIN_ACTIVE, ADMIN_REMOVED)
+        }
+        logger.info(f"Admin key set loaded: {len(self)} addresses")
+
+    def trust(self, addresses: Iterable[str]) -> None:
+        """
+        Thay tập địa chỉ luôn được coi là admin (tài khoản ký đã được xác nhận trên contract).
+        """
+        self._trusted = {address.lower() for address in addresses}
+
+    def set_status(self, address: str, status: str) -> None:
+        address = address.lower()
+        if status != ADMIN_ACTIVE:
+            # Admin bị xóa trên contract không còn được tin, kể cả tài khoản ký của backend
+            self._trusted.discard(address)
+        self._statuses[address] = status
+
+    def status(self, address: str) -> Optional[str]:
+        """
+        Trạng thái của một địa chỉ: 'active', 'removed' hoặc None nếu chưa từng là admin.
+        """
+        address = address.lower()
+        if address in self._trusted:
+            return ADMIN_ACTIVE
+        return self._statuses.get(address)
@@ -3,39 +3,169 @@
 Logic:
 logic Web3 (kết nối, tính hash, tạo chữ ký, gửi giao dịch).
 Khởi tạo hợp đồng và cung cấp các hàm gọi smart contract.
+Hỗ trợ hai phiên bản contract (CONTRACT_VERSION): v1 lưu chứng chỉ theo key string,
+v2 theo key bytes32 = keccak256(id) và chỉ lưu digest, ngày cấp và cờ thu hồi.
+Các hàm ghi có cùng tham số ở cả hai phiên bản; chỉ lời gọi đọc theo key khác nhau.
+Giao dịch được gửi bởi pool tài khoản admin (SignerPool), mỗi tài khoản một chuỗi nonce;
+chữ ký chứng chỉ luôn được tạo bằng khóa của tài khoản gửi giao dịch cấp chứng chỉ đó.
 """
 
 import json
+import asyncio
+from typing import List, Optional, Sequence, Tuple
+from functools import lru_cache, partial
+from concurrent.futures import ThreadPoolExecutor
 from web3 import Web3
 from loguru import logger
-from eth_account import Account
 from eth_account.messages import encode_defunct
 from fastapi import HTTPException
+from hexbytes import HexBytes
+from web3.exceptions import TransactionNotFound
 from web3.middleware import ExtraDataToPOAMiddleware
 
-from backend.config.setting import web3_config, abi_config
+from backend.config.setting import web3_config, abi_config, fee_config
+from backend.blockchain.signer import CertificateSigner, recover_signer
+from backend.blockchain.signer_pool import SignerAccount, SignerPool
+from backend.blockchain.fee_oracle import FeeOracle
+from backend.blockchain.rpc_transport import MultiEndpointProvider
+from backend.utils.merkle import MerkleTree, certificate_leaf
+
+
+CONTRACT_VERSIONS = (1, 2)
+NONCE_ERROR_MARKERS = ('nonce too low', 'already known', 'replacement transaction underpriced')
+# Hàm chỉ owner của contract được gọi: luôn gửi từ tài khoản đầu tiên của pool
+OWNER_FUNCTIONS = frozenset({
+    'addAdmin', 'removeAdmin', 'migrateCertificates', 'migrateBatchedIds', 'migrateMerkleRoots', 'migrateRevokedLeaves', 'finalizeMigration'
+})
+
+
+def is_nonce_error(error: Exception) -> bool:
+    """
+    Lỗi do nonce cục bộ lệch với node (cần đồng bộ lại).
+    """
+    message = str(error).lower()
+    return any(marker in message for marker in NONCE_ERROR_MARKERS)
+
+
+def certificate_key(id: str) -> bytes:
+    """
+    Key của chứng chỉ trong contract v2: keccak256(id).
+    """
+    return Web3.keccak(text=id)
+
+
+def certificate_digest(recipient_hash: str, course_hash: str) -> bytes:
+    """
+    Digest lưu trong contract v2: keccak256(recipientHash, courseHash).
+    """
+    return Web3.keccak(HexBytes(recipient_hash) + HexBytes(course_hash))
+
+
+def _quantity(value) -> int:
+    """
+    Số nguyên JSON-RPC: chuỗi hex từ node, int khi provider đã format (eth-tester).
+    """
+    return value if isinstance(value, int) else int(value, 16)
+
+
+@lru_cache(maxsize=None)
+def load_contract_abi(path: str) -> list:
+    """
+    Đọc ABI của contract một lần cho mỗi process.
+    """
+    with open(path, 'r') as f:
+        return json.load(f)
 
 
 class BlockchainClient:
-    def __init__(self):
+    def __init__(self, provider=None, private_key: str = web3_config.private_key,
+                 contract_address: str = web3_config.contract_address, max_workers: int = web3_config.rpc_max_workers,
+                 contract_version: int = web3_config.contract_version,
+                 signer_keys: Sequence[str] = web3_config.extra_signer_keys):
         """
         Khởi tạo client blockchain với Web3.
+        Không có network I/O ở đây, gọi connect() để kiểm tra kết nối.
+
+        Args:
+            provider: Web3 provider (mặc định MultiEndpointProvider trên RPC_URLS).
+            private_key (str): Khóa ký của admin (owner của contract).
+            contract_address (str): Địa chỉ smart contract.
+            max_workers (int): Số thread chạy lời gọi RPC đồng bộ.
+            contract_version (int): Phiên bản contract (1: key string, 2: key bytes32 = keccak256(id)).
+            signer_keys (Sequence[str]): Khóa của các admin khác cùng gửi giao dịch (SIGNER_PRIVATE_KEYS).
         """
-        self.w3 = Web3(Web3.HTTPProvider(web3_config.infura_url))
+        if contract_version not in CONTRACT_VERSIONS:
+            raise ValueError(f"Unsupported contract version {contract_version}")
+        self.w3 = Web3(provider or MultiEndpointProvider(web3_config.endpoints))
         self.w3.middleware_onion.inject(ExtraDataToPOAMiddleware, layer=0)
-        if not self.w3.is_connected():
+        self.contract_version = contract_version
+        self.contract = self.w3.eth.contract(
+            address=contract_address, abi=load_contract_abi(abi_config.path_for(contract_version))
+        )
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="web3-rpc"
+        )
+        self.signers = SignerPool(self.w3, [private_key, *signer_keys], executor=self._executor)
+        self.admin_account = self.signers.primary.account
+        self.admin_address = self.signers.primary.address
+        self.nonce_manager = self.signers.primary.nonce_manager
+        self._pending_transactions = {}
+        self._chain_id = None
+        self.fee_oracle = FeeOracle(self.w3, executor=self._executor)
+        self.signer = CertificateSigner([private_key, *signer_keys])
+        logger.info(f"Initialize blockchain client with admin: {self.admin_address} ({len(self.signers)} signer accounts)")
+
+    async def connect(self) -> None:
+        """
+        Check the RPC connection.
+        """
+        if not await self._run(self.w3.is_connected):
             logger.error("Cannot connect to Sepolia")
             raise Exception("Cannot connect to Sepolia")
+        logger.info(f"Connected to {self.w3.provider}")
 
-        with open(abi_config.contract_abi_path, 'r') as f:
-            contract_abi = json.load(f)
+    async def _run(self, fn, *args, **kwargs):
+        """
+        Chạy lời gọi Web3 đồng bộ (HTTP) trên thread pool giới hạn để không chặn event loop.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(fn, *args, **kwargs))
 
-        self.contract = self.w3.eth.contract(
-            address=web3_config.contract_address, abi=contract_abi
-        )
-        self.admin_account = Account.from_key(web3_config.private_key)
-        self.admin_address = self.admin_account.address
-        logger.info(f"Initialize blockchain client with admin: {self.admin_address}")
+    async def get_block(self, block_identifier='latest'):
+        """
+        Lấy thông tin block.
+
+        Args:
+            block_identifier: Số block, hash hoặc 'latest'.
+
+        Returns:
+            dict: Dữ liệu block.
+        """
+        return await self._run(self.w3.eth.get_block, block_identifier)
+
+    async def get_block_number(self) -> int:
+        block_number = await self._run(lambda: self.w3.eth.block_number)
+        self.fee_oracle.observe_block(block_number)
+        return block_number
+
+    async def get_logs(self, from_block: int, to_block: int, topics: list) -> list:
+        """
+        Lấy log của smart contract trong một khoảng block bằng một lời gọi eth_getLogs.
+
+        Args:
+            from_block (int): Block bắt đầu.
+            to_block (int): Block kết thúc (bao gồm).
+            topics (list): Bộ lọc topics (vd. [[topic0 của các sự kiện]]).
+
+        Returns:
+            list: Danh sách log thô.
+        """
+        return await self._run(self.w3.eth.get_logs, {
+            'address': self.contract.address,
+            'fromBlock': from_block,
+            'toBlock': to_block,
+            'topics': topics
+        })
 
     def calculate_hash(self, data: str) -> str:
         """
@@ -43,7 +173,8 @@ class BlockchainClient:
         """
         return self.w3.to_hex(self.w3.keccak(text=data))
 
-    def create_signature(self, id: str, recipient_hash: str, course_hash: str) -> str:
+    def create_signature(self, id: str, recipient_hash: str, course_hash: str,
+                         signer: Optional[SignerAccount] = None) -> str:
         """
         Generate digital signature for certificate data.
 
@@ -51,6 +182,7 @@ class BlockchainClient:
             id (str): certificate ID.
             recipient_hash (str): Hash of recipient.
             course_hash (str): Hash of course.
+            signer (SignerAccount): Tài khoản sẽ gửi giao dịch cấp chứng chỉ (mặc định: admin chính).
 
         Returns:
             str: hex signature.
@@ -64,80 +196,491 @@ class BlockchainClient:
                 [id, self.w3.to_bytes(hexstr=recipient_hash), self.w3.to_bytes(hexstr=course_hash)]
             )
             signable_message = encode_defunct(message)
-            signed_message = Account.sign_message(
-                signable_message, 
-                private_key=web3_config.private_key
-            )
+            signed_message = (signer.account if signer else self.admin_account).sign_message(signable_message)
             logger.debug(f"Tạo chữ ký cho chứng chỉ ID: {id}")
-            return signed_message.signature.hex()
+            return signed_message.signature.to_0x_hex()
         except Exception as e:
             logger.error(f"Lỗi khi tạo chữ ký: {str(e)}")
             raise
 
-    async def send_transaction(self, function_call):
+    async def sign_certificates(self, certificates: list, signers: Optional[List[SignerAccount]] = None) -> list:
         """
-        Transaction send to blockchain.
+        Tính hash và chữ ký cho nhiều chứng chỉ (lô lớn chạy trên process pool).
+
+        Args:
+            certificates (list): Danh sách CertificateInput.
+            signers (List[SignerAccount]): Tài khoản sẽ gửi từng chứng chỉ (mặc định: admin chính).
+
+        Returns:
+            list: Danh sách (recipient_hash, course_hash, signature) theo đúng thứ tự.
+        """
+        addresses = None if signers is None else [signer.address for signer in signers]
+        return await self.signer.sign_many(certificates, addresses)
+
+    async def submit_transaction(self, function_call, gas: Optional[int] = None, signer: Optional[SignerAccount] = None):
+        """
+        Ký và gửi giao dịch, không chờ biên nhận.
+        Phí lấy từ fee oracle (cache theo block), gas limit theo ước lượng của từng hàm contract.
 
         Args:
             function_call: Hàm smart contract cần gọi.
+            gas (int): Gas limit cố định (mặc định theo ước lượng của hàm contract).
+            signer (SignerAccount): Tài khoản gửi (mặc định: owner cho hàm chỉ owner, còn lại tài khoản tải thấp nhất).
 
         Returns:
-            dict: Biên nhận giao dịch.
+            HexBytes: Transaction hash.
         """
+        if signer is None:
+            signer = self.signers.primary if function_call.fn_name in OWNER_FUNCTIONS else await self.signers.acquire()
+        nonce = None
         try:
-            txn = function_call.build_transaction({
-                'from': self.admin_address,
-                'nonce': self.w3.eth.get_transaction_count(self.admin_address),
-                'gas': 2000000,
-                'gasPrice': self.w3.eth.gas_price,
-            })
-            signed_txn = self.w3.eth.account.sign_transaction(txn, web3_config.private_key)
-            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.raw_transaction)
-            tx_receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
-            
-            if tx_receipt.status == 0:
-                logger.error(f"Transaction failed: {tx_hash.hex()}")
-                raise HTTPException(status_code=500, detail="Transaction failed on blockchain")
+            if self._chain_id is None:
+                self._chain_id = await self._run(lambda: self.w3.eth.chain_id)
+            tx = {'from': signer.address, 'chainId': self._chain_id}
+            tx['gas'] = gas or await self.fee_oracle.gas_limit(function_call, {'from': signer.address})
+            tx.update(await self.fee_oracle.fees())
+            # Lấy nonce, ký và gửi tuần tự theo từng tài khoản: các thread RPC không làm giao dịch tới node
+            # sai thứ tự nonce (node giữ giao dịch có nonce hở trong hàng đợi, eth-tester từ chối)
+            async with signer.send_lock:
+                nonce = await signer.nonce_manager.acquire()
+                try:
+                    tx = function_call.build_transaction(dict(tx, nonce=nonce))
+                    tx_hash = await self._run(self._sign_and_send, tx, signer)
+                except Exception as e:
+                    # Trả nonce trước khi nhả lock để giao dịch kế tiếp dùng lại, không để lại lỗ hổng
+                    if is_nonce_error(e):
+                        await signer.nonce_manager.resync()
+                    else:
+                        await signer.nonce_manager.release(nonce)
+                    raise
+        except Exception as e:
+            logger.error(f"Lỗi gửi giao dịch ({signer.address}, nonce {nonce}): {str(e)}")
+            raise HTTPException(status_code=500, detail=str(e))
+
+        self._pending_transactions[tx_hash.hex()] = {
+            'nonce': nonce,
+            'signer': signer,
+            'function': function_call.fn_name,
+            'tx': tx,
+            'hashes': [tx_hash.hex()],
+            'bumps': 0
+        }
+        logger.info(f"Transaction submitted: {tx_hash.hex()} ({signer.address}, nonce {nonce})")
+        return tx_hash
+
+    def _sign_and_send(self, tx: dict, signer: SignerAccount):
+        signed_txn = signer.account.sign_transaction(tx)
+        return self.w3.eth.send_raw_transaction(signed_txn.raw_transaction)
 
-            logger.info(f"Transaction successful: {tx_receipt['transactionHash'].hex()}")
-            return tx_receipt
+    async def replace_transaction(self, tx_hash):
+        """
+        Gửi lại giao dịch bị kẹt với cùng nonce và phí cao hơn (fee bump).
+
+        Args:
+            tx_hash: Hash của giao dịch (hoặc lần thay thế gần nhất) đang chờ.
+
+        Returns:
+            HexBytes: Hash của giao dịch thay thế, None nếu không thể/không cần thay thế.
+        """
+        entry = self._pending_transactions.get(tx_hash.hex())
+        if entry is None or entry['bumps'] >= fee_config.max_bumps:
+            return None
+        tx = {**entry['tx'], **self.fee_oracle.bumped_fees(entry['tx'], await self.fee_oracle.fees())}
+        try:
+            new_hash = await self._run(self._sign_and_send, tx, entry['signer'])
+        except Exception as e:
+            # 'nonce too low': giao dịch cũ vừa được mined
+            logger.warning(f"Không thể thay thế giao dịch {tx_hash.hex()}: {str(e)}")
+            return None
+        entry['tx'] = tx
+        entry['bumps'] += 1
+        entry['hashes'].append(new_hash.hex())
+        self._pending_transactions[new_hash.hex()] = entry
+        logger.warning(f"Transaction {tx_hash.hex()} replaced by {new_hash.hex()} (nonce {entry['nonce']}, bump {entry['bumps']})")
+        return new_hash
+
+    async def wait_for_receipt(self, tx_hash):
+        """
+        Chờ biên nhận giao dịch bằng cách poll, nhường event loop giữa các lần poll
+        để nhiều giao dịch có thể chờ cùng lúc. Giao dịch quá hạn còn trong mempool được
+        thay thế với phí cao hơn (tối đa FEE_MAX_BUMPS lần), mọi bản thay thế đều được poll.
+
+        Args:
+            tx_hash: Transaction hash trả về từ submit_transaction.
+
+        Returns:
+            dict: Biên nhận giao dịch.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + web3_config.tx_receipt_timeout
+        hashes = [tx_hash]
+        try:
+            tx_receipt = None
+            while tx_receipt is None:
+                for candidate in hashes:
+                    try:
+                        tx_receipt = await self._run(self.w3.eth.get_transaction_receipt, candidate)
+                        break
+                    except TransactionNotFound:
+                        pass
+                if tx_receipt is not None:
+                    break
+                if loop.time() >= deadline:
+                    replacement = None
+                    if not await self.handle_missing_transaction(hashes[-1]):
+                        replacement = await self.replace_transaction(hashes[-1])
+                    if replacement is None:
+                        raise HTTPException(status_code=504, detail=f"Transaction {tx_hash.hex()} not mined in time")
+                    hashes.append(replacement)
+                    deadline = loop.time() + web3_config.tx_receipt_timeout
+                await asyncio.sleep(web3_config.tx_poll_interval)
+        except HTTPException:
+            raise
         except Exception as e:
-            logger.error(f"Lỗi gửi giao dịch: {str(e)}")
+            logger.error(f"Lỗi chờ biên nhận giao dịch: {str(e)}")
             raise HTTPException(status_code=500, detail=str(e))
 
-    async def issue_certificate(self, id: str, recipient_hash: str, course_hash: str, signature: str):
+        await self.confirm_transaction(tx_receipt['transactionHash'], tx_receipt['gasUsed'])
+
+        if tx_receipt.status == 0:
+            logger.error(f"Transaction failed: {tx_receipt['transactionHash'].hex()}")
+            raise HTTPException(status_code=500, detail="Transaction failed on blockchain")
+
+        logger.info(f"Transaction successful: {tx_receipt['transactionHash'].hex()}")
+        return tx_receipt
+
+    async def confirm_transaction(self, tx_hash, gas_used: Optional[int] = None) -> None:
+        """
+        Giao dịch đã mined: giải phóng nonce khỏi danh sách đang chờ và cập nhật ước lượng gas.
+
+        Args:
+            tx_hash: Hash của giao dịch đã mined (bản gốc hoặc bản thay thế).
+            gas_used (int): gasUsed trong biên nhận.
+        """
+        entry = self._pending_transactions.pop(tx_hash.hex(), None)
+        if entry is None:
+            return
+        for other in entry['hashes']:
+            self._pending_transactions.pop(other, None)
+        self.fee_oracle.observe_gas_used(entry['function'], gas_used)
+        await entry['signer'].nonce_manager.confirm(entry['nonce'])
+
+    async def handle_missing_transaction(self, tx_hash) -> bool:
+        """
+        Giao dịch quá hạn: nếu node không còn biết giao dịch (bị drop) thì đồng bộ lại nonce
+        của tài khoản đã gửi nó (mọi tài khoản nếu không còn biết tài khoản gửi, vd. sau khi khởi động lại).
+
+        Returns:
+            bool: True nếu giao dịch đã bị drop.
+        """
+        try:
+            await self._run(self.w3.eth.get_transaction, tx_hash)
+            logger.warning(f"Transaction {tx_hash.hex()} still pending after timeout")
+            return False
+        except TransactionNotFound:
+            logger.warning(f"Transaction {tx_hash.hex()} dropped, resync nonce")
+            entry = self._pending_transactions.pop(tx_hash.hex(), None)
+            for other in (entry or {}).get('hashes', []):
+                self._pending_transactions.pop(other, None)
+            signers = [entry['signer']] if entry else self.signers.signers
+            for signer in signers:
+                await signer.nonce_manager.resync()
+            return True
+
+    async def batch_request(self, requests: list) -> list:
+        """
+        Gửi nhiều lời gọi JSON-RPC trong một HTTP round trip.
+
+        Args:
+            requests (list): Danh sách (method, params).
+
+        Returns:
+            list: Response thô (dict có 'result' hoặc 'error') theo đúng thứ tự.
+        """
+        if not hasattr(self.w3.provider, 'make_batch_request'):
+            # Provider không hỗ trợ batch (EthereumTesterProvider): gọi lần lượt, cùng dạng response
+            return await self._run(self._request_each, requests)
+        responses = await self._run(self.w3.provider.make_batch_request, requests)
+        if not isinstance(responses, list):
+            raise Exception(f"Batch request failed: {responses.get('error')}")
+        return responses
+
+    def _request_each(self, requests: list) -> list:
+        responses = []
+        for method, params in requests:
+            try:
+                responses.append({'result': self.w3.manager.request_blocking(method, params)})
+            except Exception as e:
+                responses.append({'error': {'message': str(e)}})
+        return responses
+
+    async def get_receipts(self, tx_hashes: list) -> dict:
+        """
+        Lấy biên nhận của nhiều giao dịch bằng một JSON-RPC batch request.
+        Cùng batch đọc số block head cho fee oracle (phí được cache theo block).
+
+        Args:
+            tx_hashes (list): Danh sách tx hash (hex).
+
+        Returns:
+            dict: tx hash -> biên nhận (transactionHash, blockNumber, status, gasUsed), None nếu chưa mined.
+        """
+        responses = await self.batch_request(
+            [('eth_getTransactionReceipt', [tx_hash]) for tx_hash in tx_hashes] + [('eth_blockNumber', [])]
+        )
+        head = responses.pop().get('result')
+        if head is not None:
+            self.fee_oracle.observe_block(_quantity(head))
+        receipts = {}
+        for tx_hash, response in zip(tx_hashes, responses):
+            raw = response.get('result')
+            receipts[tx_hash] = None if not raw else {
+                'transactionHash': HexBytes(raw['transactionHash']),
+                'blockNumber': _quantity(raw['blockNumber']),
+                'status': _quantity(raw['status']),
+                'gasUsed': _quantity(raw['gasUsed']),
+            }
+        return receipts
+
+    async def get_block_timestamps(self, block_numbers: list) -> dict:
+        """
+        Lấy timestamp của nhiều block bằng một JSON-RPC batch request.
+
+        Returns:
+            dict: Số block -> timestamp.
+        """
+        responses = await self.batch_request(
+            [('eth_getBlockByNumber', [hex(number), False]) for number in block_numbers]
+        )
+        return {
+            number: _quantity(response['result']['timestamp'])
+            for number, response in zip(block_numbers, responses)
+        }
+
+    async def send_transaction(self, function_call, wait: bool = True, gas: Optional[int] = None,
+                               signer: Optional[SignerAccount] = None):
+        """
+        Transaction send to blockchain.
+
+        Args:
+            function_call: Hàm smart contract cần gọi.
+            wait (bool): Chờ biên nhận hay chỉ trả về tx hash.
+            gas (int): Gas limit cố định (mặc định theo ước lượng của hàm contract).
+            signer (SignerAccount): Tài khoản gửi (mặc định chọn theo submit_transaction).
+
+        Returns:
+            dict: Biên nhận giao dịch (hoặc tx hash khi wait=False).
+        """
+        tx_hash = await self.submit_transaction(function_call, gas=gas, signer=signer)
+        if not wait:
+            return tx_hash
+        return await self.wait_for_receipt(tx_hash)
+
+    async def issue_certificate(self, id: str, recipient_hash: str, course_hash: str, signature: str, wait: bool = True,
+                                signer: Optional[SignerAccount] = None):
         """
         Gọi hàm issueCertificate trên smart contract.
+        Contract v1 yêu cầu người ký chứng chỉ là msg.sender, nên giao dịch được gửi từ tài khoản đã ký.
 
         Args:
             id (str): certificate ID.
             recipient_hash (str): Hash of recipient.
             course_hash (str): Hash of course.
             signature (str): Digital signature.
+            wait (bool): Chờ biên nhận hay chỉ trả về tx hash.
+            signer (SignerAccount): Tài khoản đã tạo chữ ký (mặc định: khôi phục từ chữ ký).
 
         Returns:
-            dict: Biên nhận giao dịch.
+            dict: Biên nhận giao dịch (hoặc tx hash khi wait=False).
         """
+        if signer is None:
+            signer = self.signers.get(recover_signer(id, recipient_hash, course_hash, signature))
         function_call = self.contract.functions.issueCertificate(
             id,
             self.w3.to_bytes(hexstr=recipient_hash),
             self.w3.to_bytes(hexstr=course_hash),
             self.w3.to_bytes(hexstr=signature)
         )
-        return await self.send_transaction(function_call)
+        return await self.send_transaction(function_call, wait=wait, signer=signer)
 
-    async def revoke_certificate(self, id: str):
+    async def revoke_certificate(self, id: str, wait: bool = True):
         """
         Gọi hàm revokeCertificate trên smart contract.
 
         Args:
             id (str): certificate ID.
+            wait (bool): Chờ biên nhận hay chỉ trả về tx hash.
 
         Returns:
-            dict: Biên nhận giao dịch.
+            dict: Biên nhận giao dịch (hoặc tx hash khi wait=False).
         """
         function_call = self.contract.functions.revokeCertificate(id)
-        return await self.send_transaction(function_call)
+        return await self.send_transaction(function_call, wait=wait)
+
+    async def plan_batches(self, build, items: list, size: int, gas_budget: int) -> List[Tuple[list, int]]:
+        """
+        Chia items thành các lô giao dịch vừa gas budget. Gas của hàm nhận mảng tăng theo số phần tử
+        nên mỗi lô được ước lượng riêng (eth_estimateGas), lô vượt gas_budget được chia đôi.
+
+        Args:
+            build: Hàm nhận một lô items, trả về lời gọi hàm contract.
+            items (list): Các phần tử cần gửi.
+            size (int): Số phần tử tối đa mỗi lô.
+            gas_budget (int): Gas limit tối đa mỗi giao dịch.
+
+        Returns:
+            List[Tuple[list, int]]: Danh sách (phần tử của lô, gas limit).
+        """
+        pending = [items[i:i + size] for i in range(0, len(items), size)]
+        chunks = []
+        while pending:
+            chunk = pending.pop(0)
+            estimate = await self._run(build(chunk).estimate_gas, {'from': self.signers.primary.address})
+            gas = int(estimate * fee_config.gas_limit_margin)
+            if gas > gas_budget and len(chunk) > 1:
+                middle = len(chunk) // 2
+                pending[:0] = [chunk[:middle], chunk[middle:]]
+                continue
+            chunks.append((chunk, gas))
+        return chunks
+
+    async def send_batches(self, build, chunks: List[Tuple[list, int]]) -> List[Tuple[list, object]]:
+        """
+        Gửi các lô liên tiếp (mỗi lô vào tài khoản có tải thấp nhất) rồi chờ biên nhận song song.
+
+        Args:
+            build: Hàm nhận một lô, trả về lời gọi hàm contract.
+            chunks (List[Tuple[list, int]]): Kết quả của plan_batches.
+
+        Returns:
+            List[Tuple[list, object]]: (phần tử của lô, biên nhận hoặc exception nếu lô thất bại).
+        """
+        tx_hashes = []
+        error = None
+        for chunk, gas in chunks:
+            try:
+                tx_hashes.append(await self.submit_transaction(build(chunk), gas=gas))
+            except Exception as e:
+                # Các lô còn lại không được gửi; lô đã gửi vẫn được chờ biên nhận
+                error = e
+                break
+        receipts = await asyncio.gather(
+            *[self.wait_for_receipt(tx_hash) for tx_hash in tx_hashes], return_exceptions=True
+        )
+        receipts += [error] * (len(chunks) - len(receipts))
+        return [(chunk, receipt) for (chunk, _), receipt in zip(chunks, receipts)]
+
+    async def revoke_certificates(self, ids: List[str]) -> List[Tuple[List[str], object]]:
+        """
+        Thu hồi nhiều chứng chỉ bằng revokeCertificates, mỗi lô (REVOKE_BATCH_SIZE, REVOKE_BATCH_GAS) một giao dịch.
+
+        Args:
+            ids (List[str]): certificate IDs (chưa bị thu hồi, không thuộc lô Merkle).
+
+        Returns:
+            List[Tuple[List[str], object]]: (ID của lô, biên nhận hoặc exception nếu lô thất bại).
+        """
+        build = self.contract.functions.revokeCertificates
+        chunks = await self.plan_batches(build, ids, web3_config.revoke_batch_size, web3_config.revoke_batch_gas)
+        logger.info(f"Revoke {len(ids)} certificates in {len(chunks)} revokeCertificates transactions")
+        return await self.send_batches(build, chunks)
+
+    @staticmethod
+    def merkle_tree(records: List[dict]) -> MerkleTree:
+        """
+        Cây Merkle của một lô chứng chỉ (id, recipientHash, courseHash).
+        """
+        return MerkleTree([
+            certificate_leaf(record['id'], record['recipientHash'], record['courseHash']) for record in records
+        ])
+
+    async def anchor_merkle_batches(self, records: List[dict]) -> List[Tuple[List[dict], object]]:
+        """
+        Anchor một lô chứng chỉ bằng anchorMerkleRoot(root, ids). Contract lưu một slot cho mỗi ID
+        nên lô được chia theo MERKLE_BATCH_SIZE, MERKLE_BATCH_GAS; mỗi phần có cây Merkle và giao dịch riêng.
+
+        Args:
+            records (List[dict]): Chứng chỉ (id, recipientHash, courseHash).
+
+        Returns:
+            List[Tuple[List[dict], object]]: (chứng chỉ của phần, biên nhận hoặc exception nếu giao dịch thất bại).
+        """
+        build = lambda chunk: self.contract.functions.anchorMerkleRoot(
+            self.merkle_tree(chunk).root, [record['id'] for record in chunk]
+        )
+        chunks = await self.plan_batches(build, records, web3_config.merkle_batch_size, web3_config.merkle_batch_gas)
+        logger.info(f"Anchor {len(records)} certificates in {len(chunks)} anchorMerkleRoot transactions")
+        return await self.send_batches(build, chunks)
+
+    async def revoke_batched_certificate(self, id: str, recipient_hash: str, course_hash: str, wait: bool = True):
+        """
+        Gọi hàm revokeBatchedCertificate để thu hồi chứng chỉ thuộc lô Merkle.
+
+        Args:
+            id (str): certificate ID.
+            recipient_hash (str): Hash of recipient.
+            course_hash (str): Hash of course.
+            wait (bool): Chờ biên nhận hay chỉ trả về tx hash.
+
+        Returns:
+            dict: Biên nhận giao dịch (hoặc tx hash khi wait=False).
+        """
+        function_call = self.contract.functions.revokeBatchedCertificate(
+            id,
+            self.w3.to_bytes(hexstr=recipient_hash),
+            self.w3.to_bytes(hexstr=course_hash)
+        )
+        return await self.send_transaction(function_call, wait=wait)
+
+    async def revoke_batched_certificates(self, certificates: List[dict]) -> List[Tuple[List[str], object]]:
+        """
+        Thu hồi nhiều chứng chỉ thuộc lô Merkle (một giao dịch revokeBatchedCertificate mỗi chứng chỉ).
+        Các giao dịch được gửi liên tiếp rồi chờ biên nhận song song.
+
+        Args:
+            certificates (List[dict]): Chứng chỉ (id, recipientHash, courseHash).
+
+        Returns:
+            List[Tuple[List[str], object]]: ([ID], biên nhận hoặc exception nếu giao dịch thất bại).
+        """
+        tx_hashes = []
+        error = None
+        for certificate in certificates:
+            try:
+                tx_hashes.append(await self.revoke_batched_certificate(
+                    certificate['id'], certificate['recipientHash'], certificate['courseHash'], wait=False
+                ))
+            except Exception as e:
+                error = e
+                break
+        receipts = await asyncio.gather(
+            *[self.wait_for_receipt(tx_hash) for tx_hash in tx_hashes], return_exceptions=True
+        )
+        receipts += [error] * (len(certificates) - len(receipts))
+        return [([certificate['id']], receipt) for certificate, receipt in zip(certificates, receipts)]
+
+    async def verify_merkle_proof(self, root: str, leaf: bytes, proof: list) -> bool:
+        """
+        Gọi hàm verifyMerkleProof: root đã được anchor, leaf chưa bị thu hồi và proof hợp lệ.
+
+        Args:
+            root (str): Merkle root (hex).
+            leaf (bytes): Leaf của chứng chỉ.
+            proof (list): Inclusion proof (hex).
+
+        Returns:
+            bool: True nếu chứng chỉ hợp lệ trên blockchain.
+        """
+        try:
+            function_call = self.contract.functions.verifyMerkleProof(
+                self.w3.to_bytes(hexstr=root),
+                leaf,
+                [self.w3.to_bytes(hexstr=node) for node in proof]
+            )
+            return await self._run(function_call.call)
+        except Exception as e:
+            logger.error(f"Lỗi kiểm tra Merkle proof: {str(e)}")
+            raise HTTPException(status_code=500, detail=str(e))
 
     async def verify_certificate(self, id: str):
         """
@@ -147,47 +690,51 @@ class BlockchainClient:
             id (str): certificate ID.
 
         Returns:
-            tuple: Dữ liệu chứng chỉ (id, recipientHash, courseHash, issueDate, signature).
+            tuple: Dữ liệu chứng chỉ, v1: (id, recipientHash, courseHash, issueDate, signature),
+                v2: (digest, issueDate, revoked).
         """
         try:
-            cert = self.contract.functions.verifyCertificate(id).call()
+            key = id if self.contract_version == 1 else certificate_key(id)
+            cert = await self._run(self.contract.functions.verifyCertificate(key).call)
             logger.debug(f"Tra cứu chứng chỉ ID: {id}")
             return cert
         except Exception as e:
             logger.error(f"Lỗi tra cứu chứng chỉ: {str(e)}")
             raise HTTPException(status_code=404, detail=f"Chứng chỉ ID {id} không tồn tại trên blockchain: {str(e)}")
-        
-    async def add_admin(self, new_admin_address: str):
+
+    async def add_admin(self, new_admin_address: str, wait: bool = True):
         """
         Gọi hàm addAdmin trên smart contract để thêm admin mới.
 
         Args:
             new_admin_address (str): Địa chỉ Ethereum của admin mới.
+            wait (bool): Chờ biên nhận hay chỉ trả về tx hash.
 
         Returns:
-            dict: Biên nhận giao dịch.
+            dict: Biên nhận giao dịch (hoặc tx hash khi wait=False).
         """
         try:
             function_call = self.contract.functions.addAdmin(new_admin_address)
-            return await self.send_transaction(function_call)
+            return await self.send_transaction(function_call, wait=wait)
         
         except Exception as e:
             logger.error(f"Lỗi khi thêm admin: {str(e)}")
             raise HTTPException(status_code=500, detail=str(e))
 
-    async def remove_admin(self, admin_address: str):
+    async def remove_admin(self, admin_address: str, wait: bool = True):
         """
         Remove an admin from the smart contract.
 
         Args:
             admin_address (str): Địa chỉ ví của admin cần xóa.
+            wait (bool): Chờ biên nhận hay chỉ trả về tx hash.
 
         Returns:
-            dict: Transaction receipt.
+            dict: Transaction receipt (or tx hash when wait=False).
         """
         try:
             function_call = self.contract.functions.removeAdmin(admin_address)
-            return await self.send_transaction(function_call)
+            return await self.send_transaction(function_call, wait=wait)
 
         except Exception as e:
             logger.error(f"Lỗi khi xóa admin: {str(e)}")
@@ -0,0 +1,235 @@
+"""On-chain cross-verification of MongoDB certificates
+
+Logic:
+So sánh bản ghi chứng chỉ trong MongoDB với trạng thái trên smart contract:
+- chứng chỉ cấp lẻ: certificates(id) phải khớp recipientHash, courseHash, issueDate, signature,
+  và bị xóa khỏi contract khi đã thu hồi; với contract v2, certificates(keccak256(id)) phải khớp
+  digest của recipientHash và courseHash, issueDate, và cờ revoked (chữ ký chỉ nằm trong sự kiện);
+- chứng chỉ thuộc lô Merkle: root phải được anchor (merkleRoots), revokedLeaves khớp trạng thái thu hồi,
+  và proof trong MongoDB phải dẫn tới root.
+Mọi eth_call được gửi theo JSON-RPC batch và cùng đọc tại một block cố định, kết quả được cache theo block.
+"""
+
+import time
+import asyncio
+from loguru import logger
+from hexbytes import HexBytes
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.config.setting import web3_config
+from backend.utils.merkle import certificate_leaf, verify_proof
+from backend.blockchain.blockchain import certificate_key, certificate_digest
+
+
+def normalize_hex(value) -> str:
+    """
+    Dạng so sánh của một giá trị hex (bytes hoặc chuỗi có/không 0x): chữ thường, không có 0x.
+    Bản ghi do API và event listener ghi (hoặc dữ liệu cũ) có thể khác nhau về prefix và chữ hoa.
+    """
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value).hex()
+    return (value or '').lower().removeprefix('0x')
+
+
+class CrossVerifier:
+    def __init__(self, blockchain_client, cache: bool = True):
+        """
+        Khởi tạo engine đối chiếu MongoDB với blockchain.
+
+        Args:
+            blockchain_client (BlockchainClient): Blockchain client.
+            cache (bool): Cache kết quả theo block (tắt khi audit toàn bộ database).
+        """
+        self.blockchain_client = blockchain_client
+        self.contract = blockchain_client.contract
+        self.contract_version = blockchain_client.contract_version
+        self.codec = blockchain_client.w3.codec
+        self.cache_enabled = cache
+        self._cache = OrderedDict()
+        self._in_flight = {}
+        self._pinned = None
+        self._pinned_at = 0.0
+
+    async def pinned_block(self) -> int:
+        """
+        Block dùng chung cho các lần đối chiếu trong ONCHAIN_BLOCK_REFRESH giây (để cache có hiệu quả).
+        """
+        now = time.monotonic()
+        if self._pinned is None or now - self._pinned_at >= web3_config.onchain_block_refresh:
+            self._pinned = await self.blockchain_client.get_block_number()
+            self._pinned_at = now
+        return self._pinned
+
+    def _block_cache(self, block: int) -> Dict[tuple, Any]:
+        if not self.cache_enabled:
+            return {}
+        if block not in self._cache:
+            self._cache[block] = {}
+            while len(self._cache) > web3_config.onchain_cache_blocks:
+                self._cache.popitem(last=False)
+        return self._cache[block]
+
+    async def call_many(self, calls: List[Tuple[str, tuple]], block: int) -> Dict[tuple, Any]:
+        """
+        Gọi nhiều hàm view của contract tại một block, theo lô RPC_BATCH_SIZE eth_call mỗi HTTP request.
+
+        Args:
+            calls (List[Tuple[str, tuple]]): Danh sách (tên hàm, tham số).
+            block (int): Block đọc dữ liệu.
+
+        Returns:
+            Dict[tuple, Any]: (tên hàm, tham số) -> kết quả đã decode (Exception nếu eth_call lỗi).
+        """
+        cache = self._block_cache(block)
+        results = {}
+        missing = []
+        waiting = []
+        for key in dict.fromkeys(calls):
+            if key in cache:
+                results[key] = cache[key]
+            elif (block, key) in self._in_flight:
+                waiting.append((key, self._in_flight[(block, key)]))
+            else:
+                missing.append(key)
+
+        loop = asyncio.get_running_loop()
+        futures = {key: loop.create_future() for key in missing}
+        for key, future in futures.items():
+            self._in_flight[(block, key)] = future
+        try:
+            for start in range(0, len(missing), web3_config.rpc_batch_size):
+                chunk = missing[start:start + web3_config.rpc_batch_size]
+                functions = [getattr(self.contract.functions, name)(*args) for name, args in chunk]
+                responses = await self.blockchain_client.batch_request([
+                    ('eth_call', [{'to': self.contract.address, 'data': fn._encode_transaction_data()}, hex(block)])
+                    for fn in functions
+                ])
+                for key, fn, response in zip(chunk, functions, responses):
+                    if 'error' in response:
+                        value = Exception(response['error'].get('message', str(response['error'])))
+                    else:
+                        types = [output['type'] for output in fn.abi['outputs']]
+                        value = self.codec.decode(types, HexBytes(response['result']))
+                        value = value[0] if len(value) == 1 else value
+                        cache[key] = value
+                    results[key] = value
+                    futures[key].set_result(value)
+        except Exception as e:
+            for future in futures.values():
+                if not future.done():
+                    future.set_exception(e)
+                    future.exception()
+            raise
+        finally:
+            for key in missing:
+                self._in_flight.pop((block, key), None)
+
+        # Lời gọi trùng với một batch khác đang chạy: chờ kết quả thay vì gọi lại
+        for key, future in waiting:
+            results[key] = await asyncio.shield(future)
+        return results
+
+    def _certificate_call(self, cert_id: str) -> Tuple[str, tuple]:
+        key = cert_id if self.contract_version == 1 else certificate_key(cert_id)
+        return ('certificates', (key,))
+
+    def _calls_for(self, record: Dict[str, Any]) -> List[Tuple[str, tuple]]:
+        if record.get('merkleRoot'):
+            leaf = certificate_leaf(record['id'], record['recipientHash'], record['courseHash'])
+            return [('merkleRoots', (HexBytes(record['merkleRoot']),)), ('revokedLeaves', (leaf,))]
+        return [self._certificate_call(record['id'])]
+
+    def _compare(self, record: Dict[str, Any], results: Dict[tuple, Any]) -> Dict[str, Any]:
+        mismatches = []
+        errors = [value for value in results.values() if isinstance(value, Exception)]
+        if errors:
+            return {'id': record['id'], 'consistent': None, 'mismatches': [], 'error': str(errors[0])}
+
+        revoked = bool(record.get('revoked'))
+        if record.get('merkleRoot'):
+            leaf = certificate_leaf(record['id'], record['recipientHash'], record['courseHash'])
+            if not results[('merkleRoots', (HexBytes(record['merkleRoot']),))]:
+                mismatches.append('merkleRoot')
+            if results[('revokedLeaves', (leaf,))] != revoked:
+                mismatches.append('revoked')
+            if not verify_proof(leaf, record.get('merkleProof', []), record['merkleRoot']):
+                mismatches.append('merkleProof')
+        elif self.contract_version == 2:
+            digest, issue_date, onchain_revoked = results[self._certificate_call(record['id'])]
+            exists = bool(issue_date) and not onchain_revoked
+            if exists == revoked:
+                mismatches.append('revoked' if exists else 'exists')
+            if issue_date:
+                try:
+                    expected = certificate_digest(record['recipientHash'], record['courseHash'])
+                except (KeyError, ValueError, TypeError):
+                    expected = None
+                if digest != expected:
+                    mismatches.append('digest')
+                if issue_date != record.get('issueDate'):
+                    mismatches.append('issueDate')
+        else:
+            cert_id, recipient_hash, course_hash, issue_date, signature = results[('certificates', (record['id'],))]
+            exists = bool(cert_id)
+            if exists == revoked:
+                # Không có trên contract nhưng chưa thu hồi, hoặc đã thu hồi nhưng vẫn còn trên contract
+                mismatches.append('revoked' if exists else 'exists')
+            if exists:
+                for field, value in (('recipientHash', recipient_hash), ('courseHash', course_hash), ('signature', signature)):
+                    if normalize_hex(value) != normalize_hex(record.get(field)):
+                        mismatches.append(field)
+                if issue_date != record.get('issueDate'):
+                    mismatches.append('issueDate')
+        return {'id': record['id'], 'consistent': not mismatches, 'mismatches': mismatches}
+
+    async def verify(self, records: List[Dict[str, Any]], block: Optional[int] = None) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Đối chiếu nhiều bản ghi MongoDB với contract tại cùng một block.
+
+        Args:
+            records (List[Dict[str, Any]]): Bản ghi chứng chỉ trong MongoDB.
+            block (int): Block đọc dữ liệu (None: block đang được pin).
+
+        Returns:
+            Tuple[int, List[Dict[str, Any]]]: (block, kết quả cho từng bản ghi: consistent, mismatches, error).
+        """
+        if block is None:
+            block = await self.pinned_block()
+        calls = []
+        record_calls = []
+        for record in records:
+            try:
+                record_calls.append(self._calls_for(record))
+            except (KeyError, ValueError, TypeError) as e:
+                record_calls.append(e)
+                continue
+            calls.extend(record_calls[-1])
+
+        values = await self.call_many(calls, block)
+        reports = []
+        for record, record_call in zip(records, record_calls):
+            if isinstance(record_call, Exception):
+                reports.append({'id': record.get('id'), 'consistent': False, 'mismatches': ['record'], 'error': f"Bản ghi thiếu dữ liệu: {record_call}"})
+                continue
+            reports.append(self._compare(record, {key: values[key] for key in record_call}))
+        inconsistent = sum(1 for report in reports if report['consistent'] is False)
+        if inconsistent:
+            logger.warning(f"{inconsistent}/{len(records)} certificates differ from the contract at block {block}")
+        return block, reports
+
+    async def verify_record(self, record: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        """
+        Đối chiếu một bản ghi tại block đang pin. Nếu không khớp, kiểm tra lại tại block mới nhất
+        (bản ghi có thể được ghi sau block đang pin).
+
+        Returns:
+            Tuple[int, Dict[str, Any]]: (block, kết quả đối chiếu).
+        """
+        block, (report,) = await self.verify([record])
+        if report['consistent'] is False:
+            latest = await self.blockchain_client.get_block_number()
+            if latest > block:
+                self._pinned, self._pinned_at = latest, time.monotonic()
+                block, (report,) = await self.verify([record], latest)
+        return block, report
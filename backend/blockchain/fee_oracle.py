@@ -0,0 +1,167 @@
+"""EIP-1559 fee oracle and per-function gas estimates
+
+Logic:
+Phí (base fee của block tiếp theo và priority fee) được lấy bằng một lời gọi eth_feeHistory
+và cache theo số block head, thay vì gọi eth_gasPrice cho từng giao dịch. Head do BlockchainClient báo
+(observe_block) từ các lần đọc sẵn có: batch lấy biên nhận của receipt tracker, get_block_number.
+Khi không có head mới trong FEE_REFRESH_INTERVAL giây (không có giao dịch đang chờ), cache hết hạn theo thời gian. Node không hỗ trợ EIP-1559 thì dùng gasPrice (legacy).
+Gas limit của mỗi hàm contract được ước lượng một lần (eth_estimateGas) rồi cập nhật
+theo gasUsed của các biên nhận gần nhất, thay vì cố định 2000000.
+"""
+
+import time
+import asyncio
+from loguru import logger
+from functools import partial
+from statistics import median
+from collections import defaultdict, deque
+from typing import Any, Dict, Optional
+
+from backend.config.setting import fee_config
+
+
+GWEI = 10 ** 9
+
+
+class FeeOracle:
+    def __init__(self, w3, executor=None):
+        """
+        Khởi tạo fee oracle.
+
+        Args:
+            w3 (Web3): Web3 instance.
+            executor (Executor): Thread pool cho lời gọi RPC đồng bộ.
+        """
+        self.w3 = w3
+        self.executor = executor
+        self._lock = asyncio.Lock()
+        self._fees: Optional[Dict[str, int]] = None
+        self._fees_block: Optional[int] = None
+        self._refreshed_at = 0.0
+        self._head_block: Optional[int] = None
+        self._head_seen_at = 0.0
+        self._gas_used = defaultdict(lambda: deque(maxlen=fee_config.gas_window))
+        self._gas_estimates: Dict[str, int] = {}
+
+    async def _call(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(fn, *args, **kwargs))
+
+    async def fees(self) -> Dict[str, int]:
+        """
+        Phí cho giao dịch mới.
+
+        Returns:
+            Dict[str, int]: {'maxFeePerGas', 'maxPriorityFeePerGas'} hoặc {'gasPrice'} với node legacy.
+        """
+        if not self._stale():
+            return self._fees
+        async with self._lock:
+            if self._stale():
+                await self._refresh()
+        return self._fees
+
+    def observe_block(self, block_number: int) -> None:
+        """
+        Ghi nhận số block head vừa đọc được; phí được làm mới khi head vượt block của lần lấy phí trước.
+
+        Args:
+            block_number (int): Số block mới nhất.
+        """
+        if self._head_block is None or block_number >= self._head_block:
+            self._head_block = block_number
+            self._head_seen_at = time.monotonic()
+
+    def _stale(self) -> bool:
+        if self._fees is None:
+            return True
+        now = time.monotonic()
+        if self._head_block is not None and now - self._head_seen_at < fee_config.refresh_interval:
+            return self._fees_block is None or self._head_block > self._fees_block
+        # Không có head mới gần đây: hết hạn theo thời gian
+        return now - self._refreshed_at >= fee_config.refresh_interval
+
+    async def _refresh(self) -> None:
+        head = self._head_block
+        try:
+            history = await self._call(
+                self.w3.eth.fee_history, fee_config.history_blocks, 'latest', [fee_config.priority_percentile]
+            )
+            if not history.get('baseFeePerGas'):
+                raise ValueError("empty baseFeePerGas")
+        except Exception as e:
+            logger.warning(f"eth_feeHistory unavailable, using legacy gasPrice: {str(e)}")
+            self._fees = {'gasPrice': await self._call(lambda: self.w3.eth.gas_price)}
+            self._fees_block = head
+            self._refreshed_at = time.monotonic()
+            return
+
+        latest_block = history['oldestBlock'] + len(history['baseFeePerGas']) - 2
+        self._refreshed_at = time.monotonic()
+        previous_block = self._fees_block
+        # Node trả feeHistory chậm hơn head đã thấy thì vẫn coi phí là của head đó, không làm mới liên tục
+        self._fees_block = max(latest_block, head) if head is not None else latest_block
+        if latest_block == previous_block:
+            return
+        # Phần tử cuối của baseFeePerGas là base fee của block tiếp theo
+        next_base_fee = history['baseFeePerGas'][-1]
+        priority_fee = await self._priority_fee(history)
+        max_fee = int(next_base_fee * fee_config.base_fee_multiplier) + priority_fee
+        if fee_config.max_fee_gwei is not None:
+            max_fee = min(max_fee, int(fee_config.max_fee_gwei * GWEI))
+            priority_fee = min(priority_fee, max_fee)
+        self._fees = {'maxFeePerGas': max_fee, 'maxPriorityFeePerGas': priority_fee}
+        logger.debug(f"Fees at block {latest_block}: base {next_base_fee}, priority {priority_fee}, max {max_fee}")
+
+    async def _priority_fee(self, history: Dict[str, Any]) -> int:
+        strategy = fee_config.priority_strategy
+        if strategy == 'fixed':
+            return int(fee_config.priority_fee_gwei * GWEI)
+        if strategy == 'node':
+            return await self._call(lambda: self.w3.eth.max_priority_fee)
+        rewards = [reward[0] for reward in history.get('reward') or [] if reward]
+        if not rewards:
+            return int(fee_config.priority_fee_gwei * GWEI)
+        return max(int(median(rewards)), 1)
+
+    def bumped_fees(self, tx: Dict[str, Any], current: Dict[str, int]) -> Dict[str, int]:
+        """
+        Phí cho giao dịch thay thế (cùng nonce): tăng ít nhất FEE_BUMP_PERCENT so với giao dịch cũ
+        và không thấp hơn phí hiện tại.
+        """
+        factor = 1 + fee_config.bump_percent / 100
+        fields = ('maxFeePerGas', 'maxPriorityFeePerGas') if 'maxFeePerGas' in tx else ('gasPrice',)
+        return {
+            field: max(int(tx[field] * factor) + 1, current.get(field, current.get('gasPrice', 0)))
+            for field in fields
+        }
+
+    async def gas_limit(self, function_call, tx: Dict[str, Any]) -> int:
+        """
+        Gas limit cho một lời gọi hàm contract.
+
+        Args:
+            function_call: Hàm smart contract cần gọi.
+            tx (Dict[str, Any]): Tham số giao dịch (from, ...) dùng khi cần eth_estimateGas.
+
+        Returns:
+            int: Gas limit (gasUsed lớn nhất gần đây hoặc ước lượng, nhân với GAS_LIMIT_MARGIN).
+        """
+        name = function_call.fn_name
+        observed = self._gas_used.get(name)
+        if observed:
+            base = max(observed)
+        elif name in self._gas_estimates:
+            base = self._gas_estimates[name]
+        else:
+            base = await self._call(function_call.estimate_gas, tx)
+            self._gas_estimates[name] = base
+            logger.info(f"Gas estimate for {name}: {base}")
+        return int(base * fee_config.gas_limit_margin)
+
+    def observe_gas_used(self, function_name: Optional[str], gas_used: Optional[int]) -> None:
+        """
+        Cập nhật ước lượng gas của một hàm từ gasUsed trong biên nhận.
+        """
+        if function_name and gas_used:
+            self._gas_used[function_name].append(gas_used)
@@ -0,0 +1,102 @@
+"""Nonce Manager for the admin account
+
+Logic:
+Cấp phát nonce cục bộ để nhiều giao dịch có thể chờ xác nhận cùng lúc.
+Chỉ hỏi blockchain (pending nonce) khi khởi động hoặc khi cần đồng bộ lại
+sau giao dịch gửi lỗi hoặc bị drop khỏi mempool.
+"""
+
+import heapq
+import asyncio
+from loguru import logger
+
+
+class NonceManager:
+    def __init__(self, w3, address: str, executor=None):
+        """
+        Khởi tạo nonce manager cho một tài khoản.
+
+        Args:
+            w3 (Web3): Web3 instance dùng để đọc pending nonce.
+            address (str): Địa chỉ ví gửi giao dịch.
+            executor (Executor): Thread pool cho lời gọi RPC đồng bộ (None: executor mặc định).
+        """
+        self.w3 = w3
+        self.address = address
+        self.executor = executor
+        self._lock = asyncio.Lock()
+        self._next_nonce = None
+        self._released = []
+        self._in_flight = set()
+
+    @property
+    def pending_count(self) -> int:
+        """
+        Number of nonces handed out and not yet confirmed or released.
+        """
+        return len(self._in_flight)
+
+    async def _fetch_pending_nonce(self) -> int:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, self.w3.eth.get_transaction_count, self.address, 'pending'
+        )
+
+    async def acquire(self) -> int:
+        """
+        Cấp nonce tiếp theo. Nonce bị trả lại (gửi lỗi) được dùng lại trước để không tạo lỗ hổng.
+
+        Returns:
+            int: Nonce cho giao dịch mới.
+        """
+        async with self._lock:
+            if self._next_nonce is None:
+                self._next_nonce = await self._fetch_pending_nonce()
+                logger.debug(f"Nonce sync for {self.address}: {self._next_nonce}")
+
+            if self._released:
+                nonce = heapq.heappop(self._released)
+            else:
+                nonce = self._next_nonce
+                self._next_nonce += 1
+            self._in_flight.add(nonce)
+            return nonce
+
+    async def confirm(self, nonce: int) -> None:
+        """
+        Đánh dấu nonce đã được dùng bởi một giao dịch đã mined.
+        """
+        async with self._lock:
+            self._in_flight.discard(nonce)
+
+    async def release(self, nonce: int) -> None:
+        """
+        Trả lại nonce của giao dịch chưa được broadcast để cấp lại.
+
+        Args:
+            nonce (int): Nonce cần trả lại.
+        """
+        async with self._lock:
+            self._in_flight.discard(nonce)
+            if self._next_nonce is None or nonce >= self._next_nonce:
+                return
+            heapq.heappush(self._released, nonce)
+            # Thu gọn phần đuôi để nonce tiếp theo liên tục
+            tail = self._next_nonce - 1
+            while tail in self._released:
+                self._released.remove(tail)
+                tail -= 1
+            self._next_nonce = tail + 1
+            heapq.heapify(self._released)
+            logger.debug(f"Released nonce {nonce} for {self.address}")
+
+    async def resync(self) -> None:
+        """
+        Bỏ trạng thái cục bộ, lần acquire tiếp theo sẽ đọc lại pending nonce từ blockchain.
+        Dùng khi node báo 'nonce too low' hoặc khi giao dịch bị drop.
+        """
+        async with self._lock:
+            self._next_nonce = None
+            self._released = []
+            self._in_flight.clear()
+            logger.warning(f"Resync nonce for {self.address}")
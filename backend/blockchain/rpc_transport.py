@@ -0,0 +1,234 @@
+"""Multi-endpoint JSON-RPC transport for Web3
+
+Logic:
+Mỗi endpoint (RPC_URLS) có một requests.Session dùng chung giữa các thread với connection pool
+giới hạn (RPC_POOL_SIZE) và keep-alive, thay vì session mặc định của HTTPProvider cho từng thread.
+Độ trễ mỗi endpoint được theo dõi bằng EWMA. Lời gọi đọc đi tới endpoint khỏe nhanh nhất,
+lỗi kết nối/HTTP/rate limit thì chuyển sang endpoint kế tiếp trong cùng lời gọi.
+Lời gọi ghi (gửi giao dịch, nonce, mempool) được ghim vào một endpoint để nonce 'pending'
+và mempool nhất quán; chỉ chuyển ghim khi endpoint đó lỗi.
+Sau RPC_FAILURE_THRESHOLD lỗi liên tiếp, circuit breaker mở và endpoint bị bỏ qua trong
+RPC_CIRCUIT_RESET giây, sau đó một request thử (half-open) quyết định đóng lại hay mở tiếp.
+"""
+
+import time
+import threading
+from loguru import logger
+from urllib.parse import urlsplit
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from web3.providers.base import JSONBaseProvider
+from web3.types import RPCEndpoint, RPCResponse
+
+from backend.config.setting import web3_config
+from backend.utils.metrics import RPC_REQUEST_SECONDS
+
+
+# Phải đi cùng endpoint với eth_sendRawTransaction (nonce pending, tra cứu mempool)
+WRITE_METHODS = frozenset({
+    'eth_sendRawTransaction',
+    'eth_sendTransaction',
+    'eth_getTransactionCount',
+    'eth_getTransactionByHash',
+})
+
+# Mã lỗi JSON-RPC của node khi bị giới hạn tốc độ (không phải lỗi của chính lời gọi)
+RATE_LIMIT_CODES = frozenset({-32005, 429})
+
+CIRCUIT_CLOSED = 'closed'
+CIRCUIT_OPEN = 'open'
+CIRCUIT_HALF_OPEN = 'half_open'
+
+
+class EndpointUnavailable(Exception):
+    """
+    Raised when an endpoint answers with a rate limit error.
+    """
+
+
+def redact_url(url: str) -> str:
+    """
+    Chỉ giữ scheme và host để không ghi API key (đường dẫn Infura) vào log.
+    """
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}" if parts.netloc else url
+
+
+class Endpoint:
+    def __init__(self, url: str, pool_size: int, timeout: float, alpha: float):
+        """
+        Một RPC endpoint với session riêng và thống kê sức khỏe.
+
+        Args:
+            url (str): URL JSON-RPC.
+            pool_size (int): Số kết nối keep-alive tối đa tới endpoint.
+            timeout (float): Timeout mỗi request (giây).
+            alpha (float): Hệ số EWMA cho độ trễ.
+        """
+        self.url = url
+        self.name = redact_url(url)
+        self.timeout = timeout
+        self.alpha = alpha
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.latency: Optional[float] = None
+        self.failures = 0
+        self.state = CIRCUIT_CLOSED
+        self.opened_at = 0.0
+        self.requests = 0
+        self.errors = 0
+
+    def post(self, data: bytes, headers: Dict[str, str]) -> bytes:
+        response = self.session.post(self.url, data=data, headers=headers, timeout=self.timeout)
+        response.raise_for_status()
+        return response.content
+
+    def record_success(self, elapsed: float) -> None:
+        self.requests += 1
+        self.latency = elapsed if self.latency is None else self.alpha * elapsed + (1 - self.alpha) * self.latency
+        self.failures = 0
+        if self.state != CIRCUIT_CLOSED:
+            logger.info(f"RPC endpoint {self.name} recovered, circuit closed")
+        self.state = CIRCUIT_CLOSED
+
+    def record_failure(self, threshold: int) -> None:
+        self.requests += 1
+        self.errors += 1
+        self.failures += 1
+        if self.state == CIRCUIT_HALF_OPEN or (self.state == CIRCUIT_CLOSED and self.failures >= threshold):
+            logger.warning(f"RPC endpoint {self.name} failed {self.failures} times, circuit opened")
+            self.state = CIRCUIT_OPEN
+            self.opened_at = time.monotonic()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'endpoint': self.name,
+            'state': self.state,
+            'latencyMs': round(self.latency * 1000, 2) if self.latency is not None else None,
+            'requests': self.requests,
+            'errors': self.errors,
+        }
+
+
+class MultiEndpointProvider(JSONBaseProvider):
+    def __init__(self, urls: Optional[Sequence[str]] = None, pool_size: int = web3_config.rpc_pool_size,
+                 timeout: float = web3_config.rpc_timeout, ewma_alpha: float = web3_config.rpc_ewma_alpha,
+                 failure_threshold: int = web3_config.rpc_failure_threshold,
+                 circuit_reset: float = web3_config.rpc_circuit_reset, **kwargs):
+        """
+        Khởi tạo provider nhiều endpoint.
+
+        Args:
+            urls (Sequence[str]): Danh sách URL JSON-RPC (mặc định RPC_URLS, hoặc INFURA_URL).
+            pool_size (int): Số kết nối keep-alive tối đa mỗi endpoint.
+            timeout (float): Timeout mỗi request (giây).
+            ewma_alpha (float): Hệ số EWMA cho độ trễ.
+            failure_threshold (int): Số lỗi liên tiếp để mở circuit breaker.
+            circuit_reset (float): Số giây circuit mở trước khi cho một request thử.
+        """
+        super().__init__(**kwargs)
+        urls = list(urls or web3_config.endpoints)
+        if not urls:
+            raise ValueError("At least one RPC endpoint is required")
+        self.endpoints = [Endpoint(url, pool_size, timeout, ewma_alpha) for url in urls]
+        self.failure_threshold = failure_threshold
+        self.circuit_reset = circuit_reset
+        self._write_endpoint = self.endpoints[0]
+        self._lock = threading.Lock()
+        self._headers = {'Content-Type': 'application/json', 'User-Agent': f"{__name__}.{type(self).__name__}"}
+        self._batch_seconds = RPC_REQUEST_SECONDS.labels('batch')
+
+    def __str__(self) -> str:
+        return f"RPC connection {', '.join(endpoint.name for endpoint in self.endpoints)}"
+
+    @property
+    def write_endpoint(self) -> Endpoint:
+        return self._write_endpoint
+
+    def _available(self, endpoint: Endpoint, now: float) -> bool:
+        if endpoint.state == CIRCUIT_CLOSED:
+            return True
+        if endpoint.state == CIRCUIT_OPEN and now - endpoint.opened_at >= self.circuit_reset:
+            # Half-open: chỉ một request thử cho tới khi có kết quả
+            endpoint.state = CIRCUIT_HALF_OPEN
+            return True
+        return False
+
+    def _candidates(self, write: bool) -> List[Endpoint]:
+        """
+        Thứ tự endpoint để thử cho một lời gọi.
+        Đọc: endpoint khả dụng theo EWMA tăng dần (chưa đo thì thử trước để có số liệu).
+        Ghi: endpoint đang ghim trước, rồi các endpoint khả dụng còn lại.
+        Endpoint đang mở circuit chỉ được thử cuối cùng, khi không còn lựa chọn nào khác.
+        """
+        with self._lock:
+            now = time.monotonic()
+            available = [endpoint for endpoint in self.endpoints if self._available(endpoint, now)]
+            available.sort(key=lambda endpoint: endpoint.latency or 0.0)
+            if write and self._write_endpoint in available:
+                available.remove(self._write_endpoint)
+                available.insert(0, self._write_endpoint)
+            unavailable = sorted(
+                (endpoint for endpoint in self.endpoints if endpoint not in available),
+                key=lambda endpoint: endpoint.opened_at
+            )
+        return available + unavailable
+
+    def _send(self, data: bytes, write: bool) -> Any:
+        last_error: Optional[Exception] = None
+        for endpoint in self._candidates(write):
+            started = time.perf_counter()
+            try:
+                response = self.decode_rpc_response(endpoint.post(data, self._headers))
+                if isinstance(response, dict) and (response.get('error') or {}).get('code') in RATE_LIMIT_CODES:
+                    raise EndpointUnavailable(response['error'].get('message', 'rate limited'))
+            except (requests.RequestException, ValueError, EndpointUnavailable) as e:
+                last_error = e
+                with self._lock:
+                    endpoint.record_failure(self.failure_threshold)
+                logger.warning(f"RPC endpoint {endpoint.name} failed: {type(e).__name__}: {str(e)}")
+                continue
+
+            with self._lock:
+                endpoint.record_success(time.perf_counter() - started)
+                if write and endpoint is not self._write_endpoint:
+                    logger.warning(f"Write endpoint moved from {self._write_endpoint.name} to {endpoint.name}")
+                    self._write_endpoint = endpoint
+            return response
+        raise last_error
+
+    def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        started = time.perf_counter()
+        try:
+            return self._send(self.encode_rpc_request(method, params), method in WRITE_METHODS)
+        finally:
+            RPC_REQUEST_SECONDS.labels(method).observe(time.perf_counter() - started)
+
+    def make_batch_request(self, batch_requests: List[Tuple[RPCEndpoint, Any]]):
+        write = any(method in WRITE_METHODS for method, _ in batch_requests)
+        started = time.perf_counter()
+        try:
+            response = self._send(self.encode_batch_rpc_request(batch_requests), write)
+        finally:
+            self._batch_seconds.observe(time.perf_counter() - started)
+        if not isinstance(response, list):
+            # Lỗi RPC của cả batch chỉ trả về một object lỗi
+            return response
+        return sorted(response, key=lambda item: item.get('id') if isinstance(item.get('id'), int) else -1)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """
+        Trạng thái từng endpoint (circuit, độ trễ EWMA, số request/lỗi).
+        """
+        with self._lock:
+            return [
+                dict(endpoint.stats(), write=endpoint is self._write_endpoint)
+                for endpoint in self.endpoints
+            ]
+
+    def close(self) -> None:
+        for endpoint in self.endpoints:
+            endpoint.session.close()
@@ -0,0 +1,193 @@
+"""Batched certificate hashing and signing
+
+Logic:
+Tính recipientHash, courseHash và chữ ký (EIP-191, giống create_signature) cho nhiều chứng chỉ.
+Khóa ký được parse một lần cho mỗi process thay vì mỗi lần Account.sign_message.
+Có thể giữ nhiều khóa (một khóa cho mỗi tài khoản gửi giao dịch); mỗi chứng chỉ được ký bằng khóa
+của tài khoản sẽ gửi nó, mọi khóa dùng chung một process pool.
+Lô nhỏ được ký ngay trong process hiện tại; lô lớn được chia đều cho một process pool
+(ECDSA và keccak là CPU-bound, thread pool bị GIL giới hạn). Kết quả giữ đúng thứ tự đầu vào.
+"""
+
+import asyncio
+import multiprocessing
+from loguru import logger
+from eth_keys import keys
+from eth_utils import keccak
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+from concurrent.futures import ProcessPoolExecutor
+
+from backend.config.setting import web3_config
+
+
+SignedCertificate = Tuple[str, str, str]
+
+_worker_keys: Dict[str, keys.PrivateKey] = {}
+
+
+def _init_worker(private_keys: Tuple[str, ...]) -> None:
+    global _worker_keys
+    _worker_keys = parse_private_keys(private_keys)
+
+
+def parse_private_key(private_key: str) -> keys.PrivateKey:
+    return keys.PrivateKey(bytes.fromhex(private_key[2:] if private_key.startswith('0x') else private_key))
+
+
+def parse_private_keys(private_keys: Sequence[str]) -> Dict[str, keys.PrivateKey]:
+    """
+    Parse nhiều khóa, theo checksum address của từng khóa (giữ thứ tự).
+    """
+    parsed = [parse_private_key(private_key) for private_key in private_keys]
+    return {key.public_key.to_checksum_address(): key for key in parsed}
+
+
+def hash_text(data: str) -> str:
+    """
+    keccak256 của chuỗi UTF-8 dạng hex có 0x (giống calculate_hash).
+    """
+    return '0x' + keccak(data.encode('utf-8')).hex()
+
+
+def certificate_digest(id: str, recipient_hash: bytes, course_hash: bytes) -> bytes:
+    """
+    EIP-191 hash của message solidity_keccak(id, recipientHash, courseHash), là dữ liệu được ký.
+    """
+    message = keccak(id.encode('utf-8') + recipient_hash + course_hash)
+    return keccak(b'\x19Ethereum Signed Message:\n32' + message)
+
+
+def recover_signer(id: str, recipient_hash: str, course_hash: str, signature: str) -> str:
+    """
+    Khôi phục địa chỉ đã ký chứng chỉ từ các trường đã lưu, không cần RPC.
+
+    Args:
+        id (str): certificate ID.
+        recipient_hash (str): Hash of recipient (hex).
+        course_hash (str): Hash of course (hex).
+        signature (str): Chữ ký 65 bytes (hex, r || s || v).
+
+    Returns:
+        str: Checksum address của người ký.
+    """
+    signature_bytes = bytes.fromhex(signature.removeprefix('0x'))
+    if len(signature_bytes) != 65:
+        raise ValueError("Chữ ký phải dài 65 bytes")
+    v = signature_bytes[64]
+    signature_obj = keys.Signature(vrs=(
+        v - 27 if v >= 27 else v,
+        int.from_bytes(signature_bytes[:32], 'big'),
+        int.from_bytes(signature_bytes[32:64], 'big')
+    ))
+    digest = certificate_digest(
+        id, bytes.fromhex(recipient_hash.removeprefix('0x')), bytes.fromhex(course_hash.removeprefix('0x'))
+    )
+    return signature_obj.recover_public_key_from_msg_hash(digest).to_checksum_address()
+
+
+def sign_certificate(key: keys.PrivateKey, id: str, recipient: str, course: str) -> SignedCertificate:
+    """
+    Hash và ký một chứng chỉ với khóa đã parse.
+
+    Returns:
+        SignedCertificate: (recipient_hash, course_hash, signature) giống calculate_hash/create_signature.
+    """
+    recipient_hash = keccak(recipient.encode('utf-8'))
+    course_hash = keccak(course.encode('utf-8'))
+    signature = key.sign_msg_hash(certificate_digest(id, recipient_hash, course_hash))
+    signature_bytes = signature.r.to_bytes(32, 'big') + signature.s.to_bytes(32, 'big') + bytes([signature.v + 27])
+    return '0x' + recipient_hash.hex(), '0x' + course_hash.hex(), '0x' + signature_bytes.hex()
+
+
+def _sign_chunk(certificates: List[Tuple[str, str, str, str]]) -> List[SignedCertificate]:
+    return [sign_certificate(_worker_keys[address], *certificate) for address, *certificate in certificates]
+
+
+class CertificateSigner:
+    def __init__(self, private_key: Union[str, Sequence[str]] = web3_config.private_key,
+                 workers: int = web3_config.signing_workers,
+                 process_threshold: int = web3_config.signing_process_threshold):
+        """
+        Khởi tạo signer. Process pool chỉ được tạo ở lô lớn đầu tiên.
+
+        Args:
+            private_key (str | Sequence[str]): Khóa ký của admin, hoặc danh sách khóa (khóa đầu tiên là mặc định).
+            workers (int): Số process ký song song.
+            process_threshold (int): Số chứng chỉ tối thiểu để dùng process pool.
+        """
+        self.private_keys = (private_key,) if isinstance(private_key, str) else tuple(private_key)
+        self.private_key = self.private_keys[0]
+        self.keys = parse_private_keys(self.private_keys)
+        self.address = next(iter(self.keys))
+        self.key = self.keys[self.address]
+        self.workers = max(1, workers)
+        self.process_threshold = process_threshold
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _addresses(self, certificates: list, addresses: Optional[Sequence[str]]) -> Sequence[str]:
+        if addresses is None:
+            return [self.address] * len(certificates)
+        if len(addresses) != len(certificates):
+            raise ValueError("Số địa chỉ ký phải bằng số chứng chỉ")
+        unknown = set(addresses) - set(self.keys)
+        if unknown:
+            raise ValueError(f"Không có khóa cho địa chỉ {sorted(unknown)}")
+        return addresses
+
+    def sign(self, certificates: list, addresses: Optional[Sequence[str]] = None) -> List[SignedCertificate]:
+        """
+        Ký tuần tự trong process hiện tại.
+
+        Args:
+            certificates (list): Danh sách CertificateInput.
+            addresses (Sequence[str]): Địa chỉ ký của từng chứng chỉ (mặc định: khóa đầu tiên).
+
+        Returns:
+            List[SignedCertificate]: (recipient_hash, course_hash, signature) theo đúng thứ tự.
+        """
+        addresses = self._addresses(certificates, addresses)
+        return [
+            sign_certificate(self.keys[address], c.id, c.recipient, c.course)
+            for address, c in zip(addresses, certificates)
+        ]
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(self.private_keys,)
+            )
+            logger.info(f"Signing pool started with {self.workers} workers")
+        return self._pool
+
+    async def sign_many(self, certificates: list, addresses: Optional[Sequence[str]] = None) -> List[SignedCertificate]:
+        """
+        Ký nhiều chứng chỉ; lô lớn được chia cho process pool.
+
+        Args:
+            certificates (list): Danh sách CertificateInput.
+            addresses (Sequence[str]): Địa chỉ ký của từng chứng chỉ (mặc định: khóa đầu tiên).
+
+        Returns:
+            List[SignedCertificate]: (recipient_hash, course_hash, signature) theo đúng thứ tự.
+        """
+        addresses = self._addresses(certificates, addresses)
+        if len(certificates) < self.process_threshold or self.workers == 1:
+            return await asyncio.to_thread(self.sign, certificates, addresses)
+
+        rows = [(address, c.id, c.recipient, c.course) for address, c in zip(addresses, certificates)]
+        size = -(-len(rows) // self.workers)
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        parts = await asyncio.gather(*[
+            loop.run_in_executor(pool, _sign_chunk, rows[i:i + size])
+            for i in range(0, len(rows), size)
+        ])
+        return [item for part in parts for item in part]
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
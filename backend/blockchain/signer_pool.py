@@ -0,0 +1,191 @@
+"""Pool of admin accounts sending transactions
+
+Logic:
+Mỗi tài khoản admin (PRIVATE_KEY và SIGNER_PRIVATE_KEYS) có nonce riêng, nên giao dịch của các tài khoản
+khác nhau được mined song song thay vì xếp hàng sau một chuỗi nonce duy nhất.
+Giao dịch mới được giao cho tài khoản đang có ít giao dịch chưa xác nhận nhất (cùng tải thì xoay vòng).
+Số dư mỗi tài khoản được cache (SIGNER_BALANCE_REFRESH giây); tài khoản dưới SIGNER_MIN_BALANCE_ETH
+hoặc không phải admin trên contract không nhận giao dịch mới.
+Tài khoản đầu tiên (PRIVATE_KEY) là owner của contract và gửi mọi lời gọi chỉ owner được phép.
+"""
+
+import time
+import asyncio
+from loguru import logger
+from functools import partial
+from fastapi import HTTPException
+from eth_account import Account
+from typing import Dict, List, Optional, Sequence
+
+from backend.config.setting import web3_config
+from backend.blockchain.nonce_manager import NonceManager
+
+
+WEI_PER_ETH = 10 ** 18
+
+
+class SignerAccount:
+    def __init__(self, w3, private_key: str, executor=None):
+        """
+        Một tài khoản gửi giao dịch với nonce riêng.
+
+        Args:
+            w3 (Web3): Web3 instance.
+            private_key (str): Khóa của tài khoản (phải là admin trên contract).
+            executor (Executor): Thread pool cho lời gọi RPC đồng bộ.
+        """
+        self.account = Account.from_key(private_key)
+        self.address = self.account.address
+        self.nonce_manager = NonceManager(w3, self.address, executor=executor)
+        # Giữ từ lúc lấy nonce tới khi gửi xong: giao dịch của cùng tài khoản tới node đúng thứ tự nonce
+        # dù thread pool RPC có nhiều thread
+        self.send_lock = asyncio.Lock()
+        self.balance: Optional[int] = None
+        self.enabled = True
+
+    @property
+    def load(self) -> int:
+        """
+        Số giao dịch đã gửi và chưa được xác nhận.
+        """
+        return self.nonce_manager.pending_count
+
+    @property
+    def balance_eth(self) -> Optional[float]:
+        return None if self.balance is None else self.balance / WEI_PER_ETH
+
+
+class SignerPool:
+    def __init__(self, w3, private_keys: Sequence[str], executor=None,
+                 min_balance_eth: float = web3_config.signer_min_balance_eth,
+                 balance_refresh: float = web3_config.signer_balance_refresh):
+        """
+        Khởi tạo pool. Không có network I/O ở đây.
+
+        Args:
+            w3 (Web3): Web3 instance.
+            private_keys (Sequence[str]): Khóa của các tài khoản, khóa đầu tiên là owner của contract.
+            executor (Executor): Thread pool cho lời gọi RPC đồng bộ.
+            min_balance_eth (float): Số dư tối thiểu (ETH) để nhận giao dịch mới.
+            balance_refresh (float): Số giây cache số dư.
+        """
+        self.w3 = w3
+        self.executor = executor
+        self.signers: List[SignerAccount] = []
+        for private_key in private_keys:
+            signer = SignerAccount(w3, private_key, executor=executor)
+            if signer.address not in self.by_address:
+                self.signers.append(signer)
+        self.min_balance = int(min_balance_eth * WEI_PER_ETH)
+        self.balance_refresh = balance_refresh
+        self._lock = asyncio.Lock()
+        self._refreshed_at = 0.0
+        self._cursor = 0
+
+    def __len__(self) -> int:
+        return len(self.signers)
+
+    @property
+    def primary(self) -> SignerAccount:
+        return self.signers[0]
+
+    @property
+    def by_address(self) -> Dict[str, SignerAccount]:
+        return {signer.address: signer for signer in self.signers}
+
+    @property
+    def addresses(self) -> List[str]:
+        return [signer.address for signer in self.signers]
+
+    @property
+    def pending_count(self) -> int:
+        return sum(signer.load for signer in self.signers)
+
+    def get(self, address: str) -> SignerAccount:
+        """
+        Tài khoản của pool theo địa chỉ (không phân biệt hoa thường).
+        """
+        for signer in self.signers:
+            if signer.address.lower() == address.lower():
+                return signer
+        raise ValueError(f"Địa chỉ {address} không thuộc pool tài khoản ký")
+
+    async def _call(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(fn, *args, **kwargs))
+
+    async def refresh_balances(self, force: bool = False) -> None:
+        """
+        Đọc lại số dư của mọi tài khoản nếu cache đã hết hạn.
+        """
+        if not force and time.monotonic() - self._refreshed_at < self.balance_refresh:
+            return
+        async with self._lock:
+            if not force and time.monotonic() - self._refreshed_at < self.balance_refresh:
+                return
+            balances = await asyncio.gather(*[
+                self._call(self.w3.eth.get_balance, signer.address) for signer in self.signers
+            ], return_exceptions=True)
+            for signer, balance in zip(self.signers, balances):
+                if isinstance(balance, Exception):
+                    logger.warning(f"Không đọc được số dư của {signer.address}: {str(balance)}")
+                    continue
+                if balance < self.min_balance and (signer.balance is None or signer.balance >= self.min_balance):
+                    logger.error(f"Signer {signer.address} balance low: {balance / WEI_PER_ETH} ETH")
+                signer.balance = balance
+            self._refreshed_at = time.monotonic()
+
+    async def check_admins(self, contract) -> List[str]:
+        """
+        Tắt các tài khoản chưa được addAdmin trên contract (giao dịch của chúng sẽ bị revert).
+
+        Returns:
+            List[str]: Địa chỉ trong pool là admin trên contract.
+        """
+        statuses = await asyncio.gather(*[
+            self._call(contract.functions.admins(signer.address).call) for signer in self.signers
+        ])
+        for signer, is_admin in zip(self.signers, statuses):
+            signer.enabled = bool(is_admin) or signer is self.primary
+            if not signer.enabled:
+                logger.error(f"Signer {signer.address} is not an admin on {contract.address}, disabled")
+        await self.refresh_balances(force=True)
+        logger.info(f"Signer pool: {sum(signer.enabled for signer in self.signers)}/{len(self)} accounts enabled")
+        return [signer.address for signer, is_admin in zip(self.signers, statuses) if is_admin]
+
+    def _available(self) -> List[SignerAccount]:
+        return [
+            signer for signer in self.signers
+            if signer.enabled and (signer.balance is None or signer.balance >= self.min_balance)
+        ]
+
+    async def assign(self, count: int) -> List[SignerAccount]:
+        """
+        Chọn tài khoản cho count giao dịch mới: mỗi giao dịch vào tài khoản có tải thấp nhất
+        (tính cả các giao dịch vừa được giao), cùng tải thì xoay vòng.
+
+        Args:
+            count (int): Số giao dịch.
+
+        Returns:
+            List[SignerAccount]: Tài khoản của từng giao dịch.
+        """
+        await self.refresh_balances()
+        available = self._available()
+        if not available:
+            raise HTTPException(status_code=503, detail="Không có tài khoản ký nào đủ số dư")
+        loads = {signer.address: signer.load for signer in available}
+        assigned = []
+        for _ in range(count):
+            order = available[self._cursor % len(available):] + available[:self._cursor % len(available)]
+            signer = min(order, key=lambda candidate: loads[candidate.address])
+            loads[signer.address] += 1
+            self._cursor = available.index(signer) + 1
+            assigned.append(signer)
+        return assigned
+
+    async def acquire(self) -> SignerAccount:
+        """
+        Chọn tài khoản có tải thấp nhất cho một giao dịch mới.
+        """
+        return (await self.assign(1))[0]
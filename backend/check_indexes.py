@@ -0,0 +1,19 @@
+import sys
+import asyncio
+
+from backend.db.connector import MongoDBClient
+
+async def main():
+    client = MongoDBClient()
+    await client.ping()
+    await client.ensure_indexes()
+    report = await client.explain_queries()
+    collscan = False
+    for name, stages in report.items():
+        print(f"{name}: {' -> '.join(stages)}")
+        collscan = collscan or "COLLSCAN" in stages
+    await client.close()
+    return 1 if collscan else 0
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
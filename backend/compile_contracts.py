@@ -0,0 +1,89 @@
+"""Compile the certificate contracts with solc and regenerate their ABI files
+
+Logic:
+Biên dịch contracts/certificate.sol (v1) và contracts/certificate_v2.sol (v2) bằng py-solc-x
+(cài solc DEFAULT_SOLC_VERSION nếu chưa có) và ghi ABI vào contracts/contract_abi.json,
+contracts/contract_v2_abi.json đúng như output của solc. Không sửa tay file ABI: sửa contract
+rồi chạy lại script này. Với --check, chỉ so ABI đã commit với output của solc (exit code 1 nếu khác).
+
+Usage:
+    python -m backend.compile_contracts
+    python -m backend.compile_contracts --check
+"""
+
+import os
+import sys
+import json
+import argparse
+from typing import Dict, Tuple
+
+from backend.utils.path import root_path
+
+
+CONTRACTS_DIR = os.path.abspath(os.path.join(root_path, "..", "contracts"))
+# Phiên bản contract -> (file nguồn, tên contract, file ABI)
+CONTRACTS = {
+    1: ("certificate.sol", "Certificate", "contract_abi.json"),
+    2: ("certificate_v2.sol", "CertificateV2", "contract_v2_abi.json"),
+}
+DEFAULT_SOLC_VERSION = "0.8.19"
+
+
+def compile_certificate_contract(solc_version: str = DEFAULT_SOLC_VERSION, contract_version: int = 1) -> Tuple[list, str]:
+    """
+    Biên dịch contract chứng chỉ (v1: contracts/certificate.sol, v2: contracts/certificate_v2.sol).
+
+    Returns:
+        Tuple[list, str]: (ABI, bytecode).
+    """
+    import solcx
+
+    if solc_version not in {str(version) for version in solcx.get_installed_solc_versions()}:
+        solcx.install_solc(solc_version)
+    source, name, _ = CONTRACTS[contract_version]
+    compiled = solcx.compile_files(
+        [os.path.join(CONTRACTS_DIR, source)], output_values=['abi', 'bin'], solc_version=solc_version
+    )
+    contract = next(output for key, output in compiled.items() if key.endswith(f':{name}'))
+    return contract['abi'], contract['bin']
+
+
+def abi_path(contract_version: int) -> str:
+    return os.path.join(CONTRACTS_DIR, CONTRACTS[contract_version][2])
+
+
+def same_abi(a: list, b: list) -> bool:
+    """
+    Hai ABI có cùng các entry (không phụ thuộc thứ tự).
+    """
+    entries = lambda abi: sorted(json.dumps(entry, sort_keys=True) for entry in abi)
+    return entries(a) == entries(b)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compile the certificate contracts and write their ABI files")
+    parser.add_argument("--solc", default=DEFAULT_SOLC_VERSION, help="solc version")
+    parser.add_argument("--check", action="store_true", help="Only check that the committed ABI files match solc")
+    args = parser.parse_args()
+
+    stale: Dict[int, str] = {}
+    for version in CONTRACTS:
+        abi, _ = compile_certificate_contract(args.solc, version)
+        path = abi_path(version)
+        with open(path) as f:
+            committed = json.load(f)
+        if same_abi(abi, committed):
+            print(f"{os.path.relpath(path)}: up to date")
+            continue
+        stale[version] = path
+        if not args.check:
+            with open(path, 'w') as f:
+                json.dump(abi, f, indent=4, sort_keys=True)
+            print(f"{os.path.relpath(path)}: written")
+        else:
+            print(f"{os.path.relpath(path)}: differs from solc {args.solc} output", file=sys.stderr)
+    return 1 if stale and args.check else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,5 @@
 import os
+from typing import List, Optional
 from pydantic import Field
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings
@@ -14,11 +15,143 @@ class Web3Config(BaseSettings):
         description="Private key for the admin account",
         alias='PRIVATE_KEY'
     )
+    signer_private_keys: Optional[str] = Field(
+        default=None,
+        description="Comma-separated private keys of extra admin accounts that also send transactions",
+        alias='SIGNER_PRIVATE_KEYS'
+    )
+    signer_min_balance_eth: float = Field(
+        default=0.01,
+        description="Balance (ETH) under which a signer account stops receiving new transactions",
+        alias='SIGNER_MIN_BALANCE_ETH'
+    )
+    signer_balance_refresh: float = Field(
+        default=30,
+        description="Seconds a signer account balance stays cached",
+        alias='SIGNER_BALANCE_REFRESH'
+    )
     contract_address: str = Field(
         description="Smart contract address on the Sepolia network",
         alias='CONTRACT_ADDRESS'
     )
-    
+    contract_version: int = Field(
+        default=1,
+        description="Version of the contract at CONTRACT_ADDRESS: 1 (string keys) or 2 (bytes32 keys, lean storage)",
+        alias='CONTRACT_VERSION'
+    )
+    rpc_max_workers: int = Field(
+        default=16,
+        description="Size of the thread pool running blocking Web3 HTTP calls",
+        alias='RPC_MAX_WORKERS'
+    )
+    tx_receipt_timeout: float = Field(
+        default=180,
+        description="Seconds to wait for a transaction receipt before treating it as dropped",
+        alias='TX_RECEIPT_TIMEOUT'
+    )
+    tx_poll_interval: float = Field(
+        default=2,
+        description="Seconds between transaction receipt polls",
+        alias='TX_POLL_INTERVAL'
+    )
+    signing_workers: int = Field(
+        default=os.cpu_count() or 1,
+        description="Number of worker processes signing large certificate batches",
+        alias='SIGNING_WORKERS'
+    )
+    signing_process_threshold: int = Field(
+        default=256,
+        description="Batch size from which certificates are signed on the process pool",
+        alias='SIGNING_PROCESS_THRESHOLD'
+    )
+    rpc_batch_size: int = Field(
+        default=200,
+        description="Maximum number of calls sent in one JSON-RPC batch request",
+        alias='RPC_BATCH_SIZE'
+    )
+    onchain_block_refresh: float = Field(
+        default=12,
+        description="Seconds an on-chain verification keeps reading at the same pinned block",
+        alias='ONCHAIN_BLOCK_REFRESH'
+    )
+    onchain_cache_blocks: int = Field(
+        default=4,
+        description="Number of recent pinned blocks whose on-chain reads stay cached",
+        alias='ONCHAIN_CACHE_BLOCKS'
+    )
+    merkle_batch_max_size: int = Field(
+        default=10000,
+        description="Maximum number of certificates in one batch issuance request",
+        alias='MERKLE_BATCH_MAX_SIZE'
+    )
+    merkle_batch_size: int = Field(
+        default=250,
+        description="Maximum number of certificate IDs anchored by one anchorMerkleRoot transaction",
+        alias='MERKLE_BATCH_SIZE'
+    )
+    merkle_batch_gas: int = Field(
+        default=8000000,
+        description="Gas budget of one anchorMerkleRoot transaction; larger chunks are split",
+        alias='MERKLE_BATCH_GAS'
+    )
+    revoke_batch_size: int = Field(
+        default=200,
+        description="Maximum number of certificate IDs revoked by one revokeCertificates transaction",
+        alias='REVOKE_BATCH_SIZE'
+    )
+    revoke_batch_gas: int = Field(
+        default=8000000,
+        description="Gas budget of one revokeCertificates transaction; larger chunks are split",
+        alias='REVOKE_BATCH_GAS'
+    )
+    revoke_max_ids: int = Field(
+        default=10000,
+        description="Maximum number of certificate IDs in one batch revocation request",
+        alias='REVOKE_MAX_IDS'
+    )
+    rpc_urls: Optional[str] = Field(
+        default=None,
+        description="Comma-separated JSON-RPC endpoints; the first one receives transactions (default: INFURA_URL)",
+        alias='RPC_URLS'
+    )
+    rpc_pool_size: int = Field(
+        default=32,
+        description="Maximum keep-alive HTTP connections per RPC endpoint",
+        alias='RPC_POOL_SIZE'
+    )
+    rpc_timeout: float = Field(
+        default=10,
+        description="Seconds before a JSON-RPC request to one endpoint times out",
+        alias='RPC_TIMEOUT'
+    )
+    rpc_ewma_alpha: float = Field(
+        default=0.3,
+        description="Smoothing factor of the per-endpoint latency EWMA",
+        alias='RPC_EWMA_ALPHA'
+    )
+    rpc_failure_threshold: int = Field(
+        default=3,
+        description="Consecutive failures that open an endpoint's circuit breaker",
+        alias='RPC_FAILURE_THRESHOLD'
+    )
+    rpc_circuit_reset: float = Field(
+        default=30,
+        description="Seconds an open circuit waits before a trial request",
+        alias='RPC_CIRCUIT_RESET'
+    )
+
+    @property
+    def extra_signer_keys(self) -> List[str]:
+        if not self.signer_private_keys:
+            return []
+        return [key.strip() for key in self.signer_private_keys.split(',') if key.strip() and key.strip() != self.private_key]
+
+    @property
+    def endpoints(self) -> List[str]:
+        if not self.rpc_urls:
+            return [self.infura_url]
+        return [url.strip() for url in self.rpc_urls.split(',') if url.strip()]
+
 class MongoDBConfig(BaseSettings):
     mongodb_uri: str = Field(
         description="MongoDB URI for connecting to the database",
@@ -44,6 +177,67 @@ class MongoDBConfig(BaseSettings):
         default='admin_logs',
         description="Name of the MongoDB collection for admin logs"
     )
+    job_collection_name: str = Field(
+        default='jobs',
+        description="Name of the MongoDB collection for asynchronous issuance jobs"
+    )
+    import_collection_name: str = Field(
+        default='imports',
+        description="Name of the MongoDB collection for bulk certificate imports"
+    )
+    sync_state_collection_name: str = Field(
+        default='sync_state',
+        description="Name of the MongoDB collection storing event ingestion checkpoints"
+    )
+    reservation_collection_name: str = Field(
+        default='reservations',
+        description="Name of the MongoDB collection reserving certificate IDs before issuance"
+    )
+    max_pool_size: int = Field(
+        default=100,
+        description="Maximum number of pooled connections per MongoDB server",
+        alias='MONGODB_MAX_POOL_SIZE'
+    )
+    min_pool_size: int = Field(
+        default=0,
+        description="Minimum number of pooled connections kept open per MongoDB server",
+        alias='MONGODB_MIN_POOL_SIZE'
+    )
+    max_idle_time_ms: Optional[int] = Field(
+        default=None,
+        description="Milliseconds a pooled connection may stay idle before being closed",
+        alias='MONGODB_MAX_IDLE_TIME_MS'
+    )
+    wait_queue_timeout_ms: Optional[int] = Field(
+        default=None,
+        description="Milliseconds an operation waits for a free pooled connection",
+        alias='MONGODB_WAIT_QUEUE_TIMEOUT_MS'
+    )
+    server_selection_timeout_ms: int = Field(
+        default=5000,
+        description="Milliseconds to wait for a suitable MongoDB server",
+        alias='MONGODB_SERVER_SELECTION_TIMEOUT_MS'
+    )
+    connect_timeout_ms: int = Field(
+        default=5000,
+        description="Milliseconds to wait when opening a MongoDB connection",
+        alias='MONGODB_CONNECT_TIMEOUT_MS'
+    )
+    socket_timeout_ms: Optional[int] = Field(
+        default=None,
+        description="Milliseconds to wait for a MongoDB response (None: no timeout)",
+        alias='MONGODB_SOCKET_TIMEOUT_MS'
+    )
+    read_preference: str = Field(
+        default='primary',
+        description="Read preference: primary, primaryPreferred, secondary, secondaryPreferred or nearest",
+        alias='MONGODB_READ_PREFERENCE'
+    )
+    query_plan_check: str = Field(
+        default='off',
+        description="Run explain() on connector queries and react to COLLSCAN or in-memory SORT plans: off, warn or fail",
+        alias='MONGODB_QUERY_PLAN_CHECK'
+    )
 
 class ABIConfig(BaseSettings):
     contract_abi_path: str = Field(
@@ -51,7 +245,238 @@ class ABIConfig(BaseSettings):
         description="Path to the smart contract ABI file",
         alias='CONTRACT_ABI_PATH'
     )
+    contract_v2_abi_path: str = Field(
+        default='contracts/contract_v2_abi.json',
+        description="Path to the ABI file of the v2 contract",
+        alias='CONTRACT_V2_ABI_PATH'
+    )
+
+    def path_for(self, version: int) -> str:
+        return self.contract_v2_abi_path if version == 2 else self.contract_abi_path
+
+class ListenerConfig(BaseSettings):
+    start_block: Optional[int] = Field(
+        default=None,
+        description="Block to backfill from when no checkpoint exists (unset: start at the chain head)",
+        alias='EVENT_START_BLOCK'
+    )
+    confirmations: int = Field(
+        default=2,
+        description="Blocks behind the head that are considered final enough to ingest",
+        alias='EVENT_CONFIRMATIONS'
+    )
+    poll_interval: float = Field(
+        default=10,
+        description="Seconds between polls once ingestion has caught up",
+        alias='EVENT_POLL_INTERVAL'
+    )
+    initial_chunk: int = Field(
+        default=2000,
+        description="Initial block range of one eth_getLogs request",
+        alias='EVENT_INITIAL_CHUNK'
+    )
+    min_chunk: int = Field(
+        default=1,
+        description="Smallest block range of one eth_getLogs request",
+        alias='EVENT_MIN_CHUNK'
+    )
+    max_chunk: int = Field(
+        default=50000,
+        description="Largest block range of one eth_getLogs request",
+        alias='EVENT_MAX_CHUNK'
+    )
+    target_logs: int = Field(
+        default=2000,
+        description="Logs per request above which the block range stops growing",
+        alias='EVENT_TARGET_LOGS'
+    )
+
+class JobConfig(BaseSettings):
+    poll_interval: float = Field(
+        default=3,
+        description="Seconds between batched receipt polls of the confirmation tracker",
+        alias='JOB_POLL_INTERVAL'
+    )
+    receipt_batch_size: int = Field(
+        default=100,
+        description="Maximum number of receipts fetched in one JSON-RPC batch",
+        alias='JOB_RECEIPT_BATCH_SIZE'
+    )
+    sse_refresh_interval: float = Field(
+        default=15,
+        description="Seconds between job re-reads (and keep-alives) on a job event stream",
+        alias='JOB_SSE_REFRESH_INTERVAL'
+    )
+    import_dir: str = Field(
+        default=os.path.join('backend', '.cache', 'imports'),
+        description="Directory storing uploaded import files so interrupted imports can resume",
+        alias='IMPORT_DIR'
+    )
+    import_batch_size: int = Field(
+        default=50,
+        description="Rows validated, signed and submitted together by a bulk import",
+        alias='IMPORT_BATCH_SIZE'
+    )
+    import_max_in_flight: int = Field(
+        default=200,
+        description="Maximum unconfirmed transactions of one bulk import, per signer account",
+        alias='IMPORT_MAX_IN_FLIGHT'
+    )
+    reservation_ttl: int = Field(
+        default=600,
+        description="Seconds before MongoDB drops a pending ID reservation whose transaction was never sent",
+        alias='RESERVATION_TTL'
+    )
+
+class FeeConfig(BaseSettings):
+    refresh_interval: float = Field(
+        default=12,
+        description="Fee cache lifetime when no new head block has been observed (about one block)",
+        alias='FEE_REFRESH_INTERVAL'
+    )
+    history_blocks: int = Field(
+        default=10,
+        description="Number of recent blocks sampled by eth_feeHistory",
+        alias='FEE_HISTORY_BLOCKS'
+    )
+    priority_strategy: str = Field(
+        default='percentile',
+        description="Priority fee strategy: percentile (median of recent rewards), node (eth_maxPriorityFeePerGas) or fixed",
+        alias='FEE_PRIORITY_STRATEGY'
+    )
+    priority_percentile: float = Field(
+        default=50,
+        description="Reward percentile of recent blocks used by the percentile strategy",
+        alias='FEE_PRIORITY_PERCENTILE'
+    )
+    priority_fee_gwei: float = Field(
+        default=1.5,
+        description="Priority fee in gwei for the fixed strategy (and fallback when no rewards are reported)",
+        alias='FEE_PRIORITY_FEE_GWEI'
+    )
+    base_fee_multiplier: float = Field(
+        default=2,
+        description="maxFeePerGas = next base fee * multiplier + priority fee",
+        alias='FEE_BASE_FEE_MULTIPLIER'
+    )
+    max_fee_gwei: Optional[float] = Field(
+        default=None,
+        description="Upper bound of maxFeePerGas in gwei (unset: no cap)",
+        alias='FEE_MAX_FEE_GWEI'
+    )
+    gas_limit_margin: float = Field(
+        default=1.25,
+        description="Gas limit = largest recent gasUsed (or estimate) of the function * margin",
+        alias='GAS_LIMIT_MARGIN'
+    )
+    gas_window: int = Field(
+        default=50,
+        description="Number of recent receipts per contract function kept for gas limits",
+        alias='GAS_WINDOW'
+    )
+    bump_percent: float = Field(
+        default=15,
+        description="Fee increase of a replacement transaction (nodes require at least 10%)",
+        alias='FEE_BUMP_PERCENT'
+    )
+    max_bumps: int = Field(
+        default=3,
+        description="Maximum fee bumps of one stuck transaction",
+        alias='FEE_MAX_BUMPS'
+    )
+
+class AuthConfig(BaseSettings):
+    bcrypt_workers: int = Field(
+        default=2,
+        description="Number of threads running bcrypt password checks",
+        alias='AUTH_BCRYPT_WORKERS'
+    )
+    bcrypt_max_pending: int = Field(
+        default=16,
+        description="Maximum number of password checks running or queued",
+        alias='AUTH_BCRYPT_MAX_PENDING'
+    )
+    bcrypt_queue_timeout: float = Field(
+        default=5,
+        description="Seconds a login waits for a password check slot before being rejected",
+        alias='AUTH_BCRYPT_QUEUE_TIMEOUT'
+    )
+    token_cache_size: int = Field(
+        default=1024,
+        description="Number of validated JWTs cached until their exp",
+        alias='AUTH_TOKEN_CACHE_SIZE'
+    )
+
+class PDFConfig(BaseSettings):
+    workers: int = Field(
+        default=os.cpu_count() or 1,
+        description="Number of worker processes rendering certificate PDFs",
+        alias='PDF_WORKERS'
+    )
+    max_pending: int = Field(
+        default=64,
+        description="Maximum number of PDF render jobs queued or running",
+        alias='PDF_MAX_PENDING'
+    )
+    queue_timeout: float = Field(
+        default=30,
+        description="Seconds a render job waits for a queue slot before being rejected",
+        alias='PDF_QUEUE_TIMEOUT'
+    )
+    mp_context: str = Field(
+        default='spawn',
+        description="Multiprocessing start method for PDF workers: spawn, forkserver or fork",
+        alias='PDF_MP_CONTEXT'
+    )
+    cache_dir: str = Field(
+        default=os.path.join('backend', '.cache', 'pdf'),
+        description="Directory of the on-disk certificate PDF cache",
+        alias='PDF_CACHE_DIR'
+    )
+    cache_memory_max_bytes: int = Field(
+        default=64 * 1024 * 1024,
+        description="Size limit of the in-memory PDF cache tier",
+        alias='PDF_CACHE_MEMORY_MAX_BYTES'
+    )
+    cache_disk_max_bytes: int = Field(
+        default=2 * 1024 * 1024 * 1024,
+        description="Size limit of the on-disk PDF cache tier",
+        alias='PDF_CACHE_DISK_MAX_BYTES'
+    )
+
+class CacheConfig(BaseSettings):
+    verify_max_entries: int = Field(
+        default=100000,
+        description="Maximum number of cached verification responses per worker",
+        alias='VERIFY_CACHE_MAX_ENTRIES'
+    )
+    verify_ttl: float = Field(
+        default=300,
+        description="Seconds a cached verification response stays valid",
+        alias='VERIFY_CACHE_TTL'
+    )
+    verify_negative_ttl: float = Field(
+        default=10,
+        description="Seconds a 'certificate not found' result stays cached",
+        alias='VERIFY_CACHE_NEGATIVE_TTL'
+    )
+    verify_shared_path: Optional[str] = Field(
+        default=None,
+        description="SQLite file shared by workers on the same host (unset: per-process cache only)",
+        alias='VERIFY_CACHE_SHARED_PATH'
+    )
+    verify_local_ttl: float = Field(
+        default=2,
+        description="Per-process TTL cap when the shared store is enabled",
+        alias='VERIFY_CACHE_LOCAL_TTL'
+    )
 
 web3_config = Web3Config()
 db_config = MongoDBConfig()
-abi_config = ABIConfig()
\ No newline at end of file
+abi_config = ABIConfig()
+listener_config = ListenerConfig()
+job_config = JobConfig()
+fee_config = FeeConfig()
+auth_config = AuthConfig()
+pdf_config = PDFConfig()
+cache_config = CacheConfig()
\ No newline at end of file
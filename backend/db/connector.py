@@ -1,37 +1,229 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from loguru import logger
-from pymongo import MongoClient
-from pymongo.errors import ConnectionFailure
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo.errors import BulkWriteError, ConnectionFailure
 from typing import List, Dict, Any, Optional
+from pymongo import AsyncMongoClient, IndexModel, UpdateOne, ReturnDocument, ASCENDING, DESCENDING
 
-from backend.config.setting import db_config
+from backend.config.setting import db_config, job_config
+from backend.utils.metrics import MONGO_OPERATION_SECONDS, instrument_async_methods
 
 
+class QueryPlanError(Exception):
+    """
+    Raised in 'fail' query plan check mode when a connector query falls back to COLLSCAN or an in-memory SORT.
+    """
+
+
+# Thứ tự của keyset pagination và export (mới nhất trước)
+ID_SORT = [("_id", DESCENDING)]
+
+# Stage bị MONGODB_QUERY_PLAN_CHECK báo: quét toàn collection, sắp xếp trong bộ nhớ (index không phục vụ sort)
+SLOW_PLAN_STAGES = {"COLLSCAN": "COLLSCAN", "SORT": "an in-memory SORT"}
+
+
+def _plan_stages(plan: Dict[str, Any]):
+    """
+    Duyệt tất cả stage trong một query plan (inputStage/inputStages lồng nhau).
+    """
+    if not isinstance(plan, dict):
+        return
+    if "stage" in plan:
+        yield plan["stage"]
+    for key in ("inputStage", "queryPlan", "winningPlan"):
+        if key in plan:
+            yield from _plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        yield from _plan_stages(child)
+
+
+@instrument_async_methods(MONGO_OPERATION_SECONDS, exclude=('close',))
 class MongoDBClient:
-    def __init__(self, uri: str = db_config.mongodb_uri, db_name: str = db_config.db_name):
+    def __init__(self, uri: str = db_config.mongodb_uri, db_name: str = db_config.db_name, client=None):
         """
-        Initialize MongoDB client.
+        Initialize async MongoDB client with a connection pool.
+        No network I/O happens here, call ping() to check the connection.
+
         Args:
             uri (str): MongoDB connection URI.
             db_name (str): Database name.
+            client: Client có cùng API với AsyncMongoClient dùng thay cho kết nối thật (vd. benchmark offline).
+        """
+        self.uri = uri
+        self.client = client or AsyncMongoClient(
+            uri,
+            maxPoolSize=db_config.max_pool_size,
+            minPoolSize=db_config.min_pool_size,
+            maxIdleTimeMS=db_config.max_idle_time_ms,
+            waitQueueTimeoutMS=db_config.wait_queue_timeout_ms,
+            serverSelectionTimeoutMS=db_config.server_selection_timeout_ms,
+            connectTimeoutMS=db_config.connect_timeout_ms,
+            socketTimeoutMS=db_config.socket_timeout_ms,
+            readPreference=db_config.read_preference,
+        )
+        self.db = self.client[db_name]
+        self.cert_collection = self.db[db_config.collection_name]
+
+        self.user_collection = self.db[db_config.user_collection_name]
+        self.admin_collection = self.db[db_config.admin_collection_name]
+        self.admin_log_collection = self.db[db_config.admin_log_collection_name]
+        self.sync_state_collection = self.db[db_config.sync_state_collection_name]
+        self.job_collection = self.db[db_config.job_collection_name]
+        self.import_collection = self.db[db_config.import_collection_name]
+        self.reservation_collection = self.db[db_config.reservation_collection_name]
+        self._checked_query_shapes = set()
+
+    async def ping(self) -> None:
+        """
+        Check the MongoDB connection.
         """
         try:
-            self.client = MongoClient(uri)
-            self.db = self.client[db_name]
-            self.cert_collection = self.db[db_config.collection_name]
-            
-            self.user_collection = self.db[db_config.user_collection_name]
-            self.admin_collection = self.db[db_config.admin_collection_name]
-            self.admin_log_collection = self.db[db_config.admin_log_collection_name]
-            
-            
-            self.client.admin.command("ping")
-            logger.info(f"Connected to MongoDB at {uri}, database: {db_name}")
+            await self.client.admin.command("ping")
+            logger.info(f"Connected to MongoDB at {self.uri}, database: {self.db.name}")
         except ConnectionFailure as e:
             logger.error(f"Failed to connect to MongoDB: {str(e)}")
             raise
 
-    def insert_certificate(self, certificate: Dict[str, Any]) -> str:
+    async def close(self) -> None:
+        await self.client.close()
+
+    async def ensure_indexes(self) -> None:
+        """
+        Create the indexes behind every connector lookup (idempotent, run at startup).
+        """
+        indexes = {
+            self.cert_collection: [
+                IndexModel([("id", ASCENDING)], unique=True, name="id_unique"),
+                # Trang sự kiện lọc theo event/revoked (bằng), sort _id, lọc issueDate (khoảng): thứ tự ESR
+                # (equality, sort, range) để MongoDB không phải sort trong bộ nhớ
+                IndexModel([("event", ASCENDING), ("_id", DESCENDING), ("issueDate", DESCENDING)], name="event_id_issueDate"),
+                IndexModel([("revoked", ASCENDING), ("_id", DESCENDING), ("issueDate", DESCENDING)], name="revoked_id_issueDate"),
+                IndexModel([("_id", DESCENDING), ("issueDate", DESCENDING)], name="id_issueDate"),
+                IndexModel([("merkleRoot", ASCENDING)], sparse=True, name="merkleRoot"),
+            ],
+            self.user_collection: [
+                IndexModel([("username", ASCENDING)], unique=True, name="username_unique"),
+            ],
+            self.admin_collection: [
+                IndexModel([("address", ASCENDING)], unique=True, name="address_unique"),
+                IndexModel([("event", ASCENDING), ("_id", DESCENDING), ("timestamp", DESCENDING)], name="event_id_timestamp"),
+                IndexModel([("_id", DESCENDING), ("timestamp", DESCENDING)], name="id_timestamp"),
+            ],
+            self.job_collection: [
+                IndexModel([("status", ASCENDING), ("createdAt", ASCENDING)], name="status_createdAt"),
+                IndexModel([("certId", ASCENDING), ("status", ASCENDING)], name="certId_status"),
+            ],
+            self.admin_log_collection: [
+                IndexModel([("address", ASCENDING), ("timestamp", DESCENDING)], name="address_timestamp"),
+                IndexModel([("timestamp", DESCENDING)], name="timestamp"),
+            ],
+            self.reservation_collection: [
+                # Reservation pending chưa gửi được giao dịch tự hết hạn (expiresAt bị xóa khi giao dịch đã gửi)
+                IndexModel([("expiresAt", ASCENDING)], expireAfterSeconds=0, name="expiresAt_ttl"),
+            ],
+        }
+        for collection, models in indexes.items():
+            try:
+                names = await collection.create_indexes(models)
+                logger.info(f"Indexes ready on {collection.name}: {', '.join(names)}")
+            except Exception as e:
+                # Ví dụ: dữ liệu cũ bị trùng khóa unique, không chặn khởi động
+                logger.error(f"Lỗi khi tạo index cho {collection.name}: {str(e)}")
+
+    @staticmethod
+    async def _explain(collection, query: Dict[str, Any], sort: Optional[List[tuple]] = None) -> List[str]:
+        cursor = collection.find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        plan = await cursor.explain()
+        return sorted(set(_plan_stages(plan.get("queryPlanner", {}))))
+
+    async def _check_query_plan(self, collection, query: Dict[str, Any], sort: Optional[List[tuple]] = None) -> None:
+        """
+        Diagnostic mode: explain() each query shape once and warn or fail on COLLSCAN or an in-memory SORT.
+
+        Args:
+            collection: Collection được truy vấn.
+            query (Dict[str, Any]): Bộ lọc của truy vấn.
+            sort (Optional[List[tuple]]): Thứ tự sắp xếp của truy vấn (None: không sort).
+        """
+        mode = db_config.query_plan_check
+        if mode == "off":
+            return
+        shape = (collection.name, tuple(sorted(query)), tuple(sort or ()))
+        if shape in self._checked_query_shapes:
+            return
+        self._checked_query_shapes.add(shape)
+
+        stages = await self._explain(collection, query, sort)
+        slow = [SLOW_PLAN_STAGES[stage] for stage in stages if stage in SLOW_PLAN_STAGES]
+        if not slow:
+            logger.debug(f"Query plan {shape}: {stages}")
+            return
+        sort_text = f" sorted by {[field for field, _ in sort]}" if sort else ""
+        message = f"Query on {collection.name} by {list(query)}{sort_text} uses {' and '.join(slow)}"
+        if mode == "fail":
+            raise QueryPlanError(message)
+        logger.warning(message)
+
+    def _query_shapes(self) -> Dict[str, tuple]:
+        """
+        Filtered queries issued by the connector, with placeholder values (and sort) for explain().
+        """
+        date_range = {"$gte": 0, "$lte": 0}
+        return {
+            "find_certificate": (self.cert_collection, {"id": ""}),
+            "find_user": (self.user_collection, {"username": ""}),
+            "update_admin": (self.admin_collection, {"address": ""}),
+            "certificate_events": (self.cert_collection, {}, ID_SORT),
+            "certificate_events_by_event": (self.cert_collection, {"event": ""}, ID_SORT),
+            "certificate_events_by_revoked": (self.cert_collection, {"revoked": False}, ID_SORT),
+            "certificate_events_by_date": (self.cert_collection, {"issueDate": date_range}, ID_SORT),
+            "certificate_events_by_event_date": (self.cert_collection, {"event": "", "issueDate": date_range}, ID_SORT),
+            "certificate_events_by_revoked_date": (self.cert_collection, {"revoked": False, "issueDate": date_range}, ID_SORT),
+            "admin_events_by_event": (self.admin_collection, {"event": ""}, ID_SORT),
+            "admin_events_by_date": (self.admin_collection, {"timestamp": date_range}, ID_SORT),
+            "admin_events_by_event_date": (self.admin_collection, {"event": "", "timestamp": date_range}, ID_SORT),
+            "find_active_job": (self.job_collection, {"certId": "", "status": {"$in": []}}),
+            "find_jobs_by_status": (self.job_collection, {"status": {"$in": []}}, [("createdAt", ASCENDING)]),
+            "find_certificate_ids": (self.cert_collection, {"id": {"$in": []}}),
+            "find_certificates_by_ids": (self.cert_collection, {"id": {"$in": []}}),
+            "find_job_cert_ids": (self.job_collection, {"certId": {"$in": []}, "status": {"$in": []}}),
+            "find_reservations": (self.reservation_collection, {"_id": {"$in": []}}),
+        }
+
+    async def explain_queries(self) -> Dict[str, List[str]]:
+        """
+        Explain every filtered connector query.
+
+        Returns:
+            Dict[str, List[str]]: Các stage trong winning plan của từng truy vấn.
+        """
+        report = {}
+        for name, (collection, query, *sort) in self._query_shapes().items():
+            report[name] = await self._explain(collection, query, *sort)
+        return report
+
+    async def find_user(self, username: str) -> Optional[Dict[str, Any]]:
+        """
+        Find user account by username.
+
+        Args:
+            username (str): Username.
+
+        Returns:
+            Optional[Dict[str, Any]]: User account hoặc None nếu không tìm thấy.
+        """
+        try:
+            query = {"username": username}
+            await self._check_query_plan(self.user_collection, query)
+            return await self.user_collection.find_one(query)
+        except Exception as e:
+            logger.error(f"Lỗi khi tìm người dùng: {str(e)}")
+            raise
+
+    async def insert_certificate(self, certificate: Dict[str, Any]) -> str:
         """
         Insert a certificate into MongoDB.
 
@@ -42,14 +234,32 @@ class MongoDBClient:
             str: Inserted product ID.
         """
         try:
-            result = self.cert_collection.insert_one(certificate)
+            result = await self.cert_collection.insert_one(certificate)
             logger.info(f"Add cerificate ID: {result.inserted_id}")
             return str(result.inserted_id)
         except Exception as e:
             logger.error(f"Lỗi khi thêm chứng chỉ: {str(e)}")
             raise
 
-    def update_certificate(self, cert_id: str, update_data: Dict[str, Any]) -> None:
+    async def insert_certificates(self, certificates: List[Dict[str, Any]]) -> int:
+        """
+        Insert many certificates into MongoDB in one round trip.
+
+        Args:
+            certificates (List[Dict[str, Any]]): Certificate data to insert.
+
+        Returns:
+            int: Number of inserted certificates.
+        """
+        try:
+            result = await self.cert_collection.insert_many(certificates, ordered=False)
+            logger.info(f"Add {len(result.inserted_ids)} certificates")
+            return len(result.inserted_ids)
+        except Exception as e:
+            logger.error(f"Lỗi khi thêm lô chứng chỉ: {str(e)}")
+            raise
+
+    async def update_certificate(self, cert_id: str, update_data: Dict[str, Any]) -> None:
         """
         Update certificate MongoDB.
 
@@ -58,7 +268,8 @@ class MongoDBClient:
             update_data (Dict[str, Any]): Dữ liệu cần cập nhật.
         """
         try:
-            result = self.cert_collection.update_one(
+            await self._check_query_plan(self.cert_collection, {"id": cert_id})
+            result = await self.cert_collection.update_one(
                 {"id": cert_id}, {"$set": update_data}
             )
             if result.matched_count == 0:
@@ -70,7 +281,7 @@ class MongoDBClient:
             raise
 
 
-    def find_certificate(self, cert_id: str) -> Optional[Dict[str, Any]]:
+    async def find_certificate(self, cert_id: str) -> Optional[Dict[str, Any]]:
         """
         Find certificate with ID.
 
@@ -81,7 +292,8 @@ class MongoDBClient:
             Optional[Dict[str, Any]]: Dữ liệu chứng chỉ hoặc None nếu không tìm thấy.
         """
         try:
-            cert = self.cert_collection.find_one({"id": cert_id})
+            await self._check_query_plan(self.cert_collection, {"id": cert_id})
+            cert = await self.cert_collection.find_one({"id": cert_id})
             if cert:
                 if "_id" in cert:
                     cert["_id"] = str(cert["_id"])
@@ -93,7 +305,7 @@ class MongoDBClient:
             logger.error(f"Lỗi khi tìm chứng chỉ: {str(e)}")
             raise
 
-    def find_all_certificates(self) -> List[Dict[str, Any]]:
+    async def find_all_certificates(self) -> List[Dict[str, Any]]:
         """
         Find all certificates.
 
@@ -101,9 +313,8 @@ class MongoDBClient:
             List[Dict[str, Any]]: List certificates.
         """
         try:
-            certificates = self.cert_collection.find({})
             result = []
-            for cert in certificates:
+            async for cert in self.cert_collection.find({}):
                 if "_id" in cert:
                     cert["_id"] = str(cert["_id"])
                 result.append(cert)
@@ -113,7 +324,118 @@ class MongoDBClient:
             logger.error(f"Lỗi khi lấy danh sách chứng chỉ: {str(e)}")
             raise
 
-    def update_admin(self, admin_address: str, status: str, tx_hash: str = None, event: str = None) -> None:
+    @staticmethod
+    def _page_query(query: Dict[str, Any], after: Optional[str]) -> Dict[str, Any]:
+        """
+        Thêm điều kiện keyset (_id < cursor) vào bộ lọc.
+        """
+        if not after:
+            return query
+        try:
+            return {**query, "_id": {"$lt": ObjectId(after)}}
+        except (InvalidId, TypeError):
+            raise ValueError(f"Cursor không hợp lệ: {after}")
+
+    @staticmethod
+    def _projection(fields: Optional[List[str]]) -> Optional[Dict[str, int]]:
+        return {field: 1 for field in fields} if fields else None
+
+    async def _find_page(
+        self,
+        collection,
+        query: Dict[str, Any],
+        after: Optional[str],
+        limit: int,
+        fields: Optional[List[str]]
+    ) -> tuple:
+        """
+        Keyset pagination on _id (mới nhất trước).
+
+        Returns:
+            tuple: (documents, next cursor hoặc None nếu đã hết).
+        """
+        await self._check_query_plan(collection, query, ID_SORT)
+        cursor = collection.find(
+            self._page_query(query, after), self._projection(fields)
+        ).sort(ID_SORT).limit(limit + 1)
+        documents = await cursor.to_list(length=limit + 1)
+        has_more = len(documents) > limit
+        documents = documents[:limit]
+        for document in documents:
+            document["_id"] = str(document["_id"])
+        next_cursor = documents[-1]["_id"] if has_more else None
+        return documents, next_cursor
+
+    async def find_certificates_page(
+        self,
+        query: Dict[str, Any],
+        after: Optional[str] = None,
+        limit: int = 50,
+        fields: Optional[List[str]] = None
+    ) -> tuple:
+        """
+        Find one page of certificates.
+
+        Args:
+            query (Dict[str, Any]): Bộ lọc (event, revoked, issueDate...).
+            after (Optional[str]): Cursor trả về từ trang trước.
+            limit (int): Số bản ghi tối đa.
+            fields (Optional[List[str]]): Các trường cần lấy (None: tất cả).
+
+        Returns:
+            tuple: (certificates, next cursor).
+        """
+        try:
+            return await self._find_page(self.cert_collection, query, after, limit, fields)
+        except Exception as e:
+            logger.error(f"Lỗi khi lấy trang chứng chỉ: {str(e)}")
+            raise
+
+    async def find_admins_page(
+        self,
+        query: Dict[str, Any],
+        after: Optional[str] = None,
+        limit: int = 50,
+        fields: Optional[List[str]] = None
+    ) -> tuple:
+        """
+        Find one page of admins.
+
+        Args:
+            query (Dict[str, Any]): Bộ lọc (event, timestamp...).
+            after (Optional[str]): Cursor trả về từ trang trước.
+            limit (int): Số bản ghi tối đa.
+            fields (Optional[List[str]]): Các trường cần lấy (None: tất cả).
+
+        Returns:
+            tuple: (admins, next cursor).
+        """
+        try:
+            return await self._find_page(self.admin_collection, query, after, limit, fields)
+        except Exception as e:
+            logger.error(f"Lỗi khi lấy trang admin: {str(e)}")
+            raise
+
+    async def iter_documents(
+        self,
+        collection,
+        query: Dict[str, Any],
+        fields: Optional[List[str]] = None,
+        batch_size: int = 500
+    ):
+        """
+        Stream documents from a collection without loading them all in memory.
+
+        Yields:
+            Dict[str, Any]: Từng bản ghi (_id đã chuyển sang str).
+        """
+        await self._check_query_plan(collection, query, ID_SORT)
+        cursor = collection.find(query, self._projection(fields)).sort(ID_SORT).batch_size(batch_size)
+        async for document in cursor:
+            document["_id"] = str(document["_id"])
+            yield document
+
+    async def update_admin(self, admin_address: str, status: str, tx_hash: str = None, event: str = None) -> None:
         """
         Update admin status.
 
@@ -131,7 +453,8 @@ class MongoDBClient:
                 update_data["txHash"] = tx_hash
             if event:
                 update_data["event"] = event
-            self.admin_collection.update_one(
+            await self._check_query_plan(self.admin_collection, {"address": admin_address})
+            await self.admin_collection.update_one(
                 {"address": admin_address},
                 {"$set": update_data},
                 upsert=True
@@ -141,7 +464,7 @@ class MongoDBClient:
             logger.error(f"Lỗi khi cập nhật admin: {str(e)}")
             raise
 
-    def find_all_admins(self) -> List[Dict[str, Any]]:
+    async def find_all_admins(self) -> List[Dict[str, Any]]:
         """
         Find all admins MongoDB.
 
@@ -149,9 +472,8 @@ class MongoDBClient:
             List[Dict[str, Any]]: List admin.
         """
         try:
-            admins = self.admin_collection.find({})
             result = []
-            for admin in admins:
+            async for admin in self.admin_collection.find({}):
                 if not isinstance(admin, dict):
                     logger.warn(f"Bản ghi admin không hợp lệ: {admin}")
                     continue
@@ -170,7 +492,310 @@ class MongoDBClient:
             logger.error(f"Lỗi khi lấy danh sách admin: {str(e)}")
             raise
 
-    def insert_admin_log(self, admin_data: Dict[str, Any]) -> None:
+    async def bulk_update_certificates(self, updates: List[tuple]) -> int:
+        """
+        Apply many certificate updates with one bulk_write (in order).
+
+        Args:
+            updates (List[tuple]): Danh sách (cert_id, update_data).
+
+        Returns:
+            int: Number of matched certificates.
+        """
+        if not updates:
+            return 0
+        try:
+            result = await self.cert_collection.bulk_write(
+                [UpdateOne({"id": cert_id}, {"$set": data}) for cert_id, data in updates],
+                ordered=True
+            )
+            logger.info(f"Bulk update {len(updates)} certificates, matched {result.matched_count}")
+            return result.matched_count
+        except Exception as e:
+            logger.error(f"Lỗi khi cập nhật lô chứng chỉ: {str(e)}")
+            raise
+
+    async def bulk_update_admins(self, updates: List[Dict[str, Any]]) -> None:
+        """
+        Upsert many admin status changes with one bulk_write (in order).
+
+        Args:
+            updates (List[Dict[str, Any]]): Danh sách (address, status, txHash, event, timestamp).
+        """
+        if not updates:
+            return
+        try:
+            await self.admin_collection.bulk_write(
+                [UpdateOne({"address": update["address"]}, {"$set": update}, upsert=True) for update in updates],
+                ordered=True
+            )
+            logger.info(f"Bulk update {len(updates)} admins")
+        except Exception as e:
+            logger.error(f"Lỗi khi cập nhật lô admin: {str(e)}")
+            raise
+
+    async def insert_job(self, job: Dict[str, Any]) -> None:
+        """
+        Insert an asynchronous job.
+
+        Args:
+            job (Dict[str, Any]): Job data (_id là job ID).
+        """
+        try:
+            await self.job_collection.insert_one(job)
+            logger.info(f"Add job ID: {job['_id']}")
+        except Exception as e:
+            logger.error(f"Lỗi khi thêm job: {str(e)}")
+            raise
+
+    async def insert_jobs(self, jobs: List[Dict[str, Any]]) -> None:
+        """
+        Insert many jobs in one round trip.
+
+        Args:
+            jobs (List[Dict[str, Any]]): Job data (_id là job ID).
+        """
+        if not jobs:
+            return
+        try:
+            await self.job_collection.insert_many(jobs, ordered=False)
+            logger.info(f"Add {len(jobs)} jobs")
+        except Exception as e:
+            logger.error(f"Lỗi khi thêm lô job: {str(e)}")
+            raise
+
+    async def update_job(self, job_id: str, update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Update a job and return its new state.
+
+        Args:
+            job_id (str): Job ID.
+            update_data (Dict[str, Any]): Dữ liệu cần cập nhật.
+
+        Returns:
+            Optional[Dict[str, Any]]: Job sau khi cập nhật.
+        """
+        try:
+            return await self.job_collection.find_one_and_update(
+                {"_id": job_id}, {"$set": update_data}, return_document=ReturnDocument.AFTER
+            )
+        except Exception as e:
+            logger.error(f"Lỗi khi cập nhật job: {str(e)}")
+            raise
+
+    async def bulk_update_jobs(self, updates: List[tuple]) -> None:
+        """
+        Update many jobs with one bulk_write.
+
+        Args:
+            updates (List[tuple]): Danh sách (job_id, update_data).
+        """
+        if not updates:
+            return
+        try:
+            await self.job_collection.bulk_write(
+                [UpdateOne({"_id": job_id}, {"$set": data}) for job_id, data in updates], ordered=False
+            )
+        except Exception as e:
+            logger.error(f"Lỗi khi cập nhật lô job: {str(e)}")
+            raise
+
+    async def find_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await self.job_collection.find_one({"_id": job_id})
+
+    async def find_active_job(self, cert_id: str, statuses: List[str]) -> Optional[Dict[str, Any]]:
+        """
+        Find a job of a certificate that is still in one of the given statuses.
+        """
+        query = {"certId": cert_id, "status": {"$in": statuses}}
+        await self._check_query_plan(self.job_collection, query)
+        return await self.job_collection.find_one(query)
+
+    async def find_jobs_by_status(self, statuses: List[str]) -> List[Dict[str, Any]]:
+        """
+        Find all jobs in the given statuses (jobs chưa hoàn tất khi khởi động lại).
+        """
+        query = {"status": {"$in": statuses}}
+        sort = [("createdAt", ASCENDING)]
+        await self._check_query_plan(self.job_collection, query, sort)
+        return await self.job_collection.find(query).sort(sort).to_list(length=None)
+
+    async def find_certificate_ids(self, cert_ids: List[str]) -> set:
+        """
+        IDs among cert_ids that already exist in the certificates collection.
+        """
+        query = {"id": {"$in": cert_ids}}
+        await self._check_query_plan(self.cert_collection, query)
+        cursor = self.cert_collection.find(query, {"id": 1, "_id": 0})
+        return {doc["id"] async for doc in cursor}
+
+    async def find_certificates_by_ids(self, cert_ids: List[str]) -> List[Dict[str, Any]]:
+        """
+        Certificates among cert_ids (id, revoked, txHash and the Merkle fields needed for revocation).
+        """
+        query = {"id": {"$in": cert_ids}}
+        await self._check_query_plan(self.cert_collection, query)
+        projection = {"_id": 0, "id": 1, "revoked": 1, "txHash": 1, "merkleRoot": 1, "recipientHash": 1, "courseHash": 1}
+        return await self.cert_collection.find(query, projection).to_list(length=None)
+
+    async def find_job_cert_ids(self, cert_ids: List[str], statuses: List[str]) -> set:
+        """
+        IDs among cert_ids that have a job in one of the given statuses.
+        """
+        query = {"certId": {"$in": cert_ids}, "status": {"$in": statuses}}
+        await self._check_query_plan(self.job_collection, query)
+        cursor = self.job_collection.find(query, {"certId": 1, "_id": 0})
+        return {doc["certId"] async for doc in cursor}
+
+    async def insert_reservations(self, cert_ids: List[str], token: str) -> set:
+        """
+        Reserve certificate IDs (status 'pending', _id là certificate ID) in one round trip.
+
+        Args:
+            cert_ids (List[str]): Certificate IDs.
+            token (str): Mã của lần giữ chỗ, dùng khi giải phóng.
+
+        Returns:
+            set: IDs đã có reservation (trùng khóa), không được giữ.
+        """
+        if not cert_ids:
+            return set()
+        now = datetime.utcnow()
+        reservations = [
+            {
+                "_id": cert_id,
+                "status": "pending",
+                "token": token,
+                "createdAt": int(now.timestamp()),
+                "expiresAt": now + timedelta(seconds=job_config.reservation_ttl)
+            }
+            for cert_id in cert_ids
+        ]
+        try:
+            await self.reservation_collection.insert_many(reservations, ordered=False)
+            return set()
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            if any(error.get("code") != 11000 for error in errors):
+                logger.error(f"Lỗi khi giữ chỗ ID chứng chỉ: {str(e)}")
+                raise
+            return {error["op"]["_id"] for error in errors}
+
+    async def find_reservations(self, cert_ids: List[str]) -> Dict[str, str]:
+        """
+        Status ('pending' or 'issued') of the reservations among cert_ids.
+        """
+        query = {"_id": {"$in": cert_ids}}
+        await self._check_query_plan(self.reservation_collection, query)
+        cursor = self.reservation_collection.find(query, {"status": 1})
+        return {doc["_id"]: doc["status"] async for doc in cursor}
+
+    async def hold_reservations(self, cert_ids: List[str], token: str) -> None:
+        """
+        Keep pending reservations until their jobs finish (bỏ hạn TTL khi giao dịch đã được gửi).
+        """
+        if not cert_ids:
+            return
+        await self.reservation_collection.update_many(
+            {"_id": {"$in": cert_ids}, "status": "pending", "token": token},
+            {"$unset": {"expiresAt": ""}}
+        )
+
+    async def mark_reservations_issued(self, cert_ids: List[str]) -> None:
+        """
+        Mark certificate IDs as issued (upsert, cho cả ID chưa từng được giữ chỗ qua API).
+        """
+        if not cert_ids:
+            return
+        now = int(datetime.utcnow().timestamp())
+        try:
+            await self.reservation_collection.bulk_write([
+                UpdateOne(
+                    {"_id": cert_id},
+                    {"$set": {"status": "issued", "updatedAt": now}, "$unset": {"expiresAt": "", "token": ""}},
+                    upsert=True
+                )
+                for cert_id in cert_ids
+            ], ordered=False)
+        except Exception as e:
+            logger.error(f"Lỗi khi cập nhật reservation: {str(e)}")
+            raise
+
+    async def delete_reservations(self, cert_ids: List[str], token: Optional[str] = None) -> int:
+        """
+        Release pending reservations (giao dịch không gửi được hoặc thất bại).
+
+        Args:
+            cert_ids (List[str]): Certificate IDs.
+            token (str): Chỉ xóa reservation của lần giữ chỗ này (None: mọi reservation pending).
+
+        Returns:
+            int: Số reservation đã xóa.
+        """
+        if not cert_ids:
+            return 0
+        query = {"_id": {"$in": cert_ids}, "status": "pending"}
+        if token is not None:
+            query["token"] = token
+        result = await self.reservation_collection.delete_many(query)
+        return result.deleted_count
+
+    async def insert_import(self, record: Dict[str, Any]) -> None:
+        """
+        Insert a bulk import record.
+
+        Args:
+            record (Dict[str, Any]): Import data (_id là import ID).
+        """
+        try:
+            await self.import_collection.insert_one(record)
+            logger.info(f"Add import ID: {record['_id']}")
+        except Exception as e:
+            logger.error(f"Lỗi khi thêm import: {str(e)}")
+            raise
+
+    async def update_import(self, import_id: str, update_data: Dict[str, Any], counters: Optional[Dict[str, int]] = None) -> None:
+        """
+        Update a bulk import record.
+
+        Args:
+            import_id (str): Import ID.
+            update_data (Dict[str, Any]): Dữ liệu cần cập nhật.
+            counters (Dict[str, int]): Các bộ đếm cần cộng thêm.
+        """
+        update = {"$set": update_data}
+        if counters:
+            update["$inc"] = counters
+        try:
+            await self.import_collection.update_one({"_id": import_id}, update)
+        except Exception as e:
+            logger.error(f"Lỗi khi cập nhật import: {str(e)}")
+            raise
+
+    async def find_import(self, import_id: str) -> Optional[Dict[str, Any]]:
+        return await self.import_collection.find_one({"_id": import_id})
+
+    async def get_checkpoint(self, name: str) -> Optional[int]:
+        """
+        Last processed block of an ingestion stream.
+
+        Args:
+            name (str): Tên luồng ingestion.
+
+        Returns:
+            Optional[int]: Số block hoặc None nếu chưa có checkpoint.
+        """
+        state = await self.sync_state_collection.find_one({"_id": name})
+        return state["lastBlock"] if state else None
+
+    async def save_checkpoint(self, name: str, block_number: int) -> None:
+        await self.sync_state_collection.update_one(
+            {"_id": name},
+            {"$set": {"lastBlock": block_number, "updatedAt": int(datetime.utcnow().timestamp())}},
+            upsert=True
+        )
+
+    async def insert_admin_log(self, admin_data: Dict[str, Any]) -> None:
         """
         Insert admin log into MongoDB.
 
@@ -178,7 +803,7 @@ class MongoDBClient:
             admin_data (Dict[str, Any]): Admin log data (address, status, txHash, timestamp, event).
         """
         try:
-            self.admin_log_collection.insert_one(admin_data)
+            await self.admin_log_collection.insert_one(admin_data)
             logger.info(f"Inserted admin log for {admin_data['address']}")
         except Exception as e:
             logger.error(f"Lỗi khi lưu admin log: {str(e)}")
@@ -0,0 +1,249 @@
+"""Shared application services and FastAPI dependencies
+
+Logic:
+Các client dùng chung (MongoDB, blockchain, PDF renderer, cache, job manager, ...) được tạo một lần,
+lazy, khi lifespan khởi động hoặc khi dependency đầu tiên được gọi, thay vì lúc import module:
+import ứng dụng không cần network. Route nhận chúng qua Depends(get_...), test có thể thay bằng
+app.dependency_overrides. Kiểm tra kết nối MongoDB và RPC chạy song song; thời gian từng pha
+khởi động (import, create, connect, warmup) được ghi vào startup_report.
+"""
+
+import time
+import asyncio
+from loguru import logger
+from typing import Dict, Optional
+from contextlib import contextmanager
+
+from backend.db.connector import MongoDBClient
+from backend.blockchain.blockchain import BlockchainClient
+from backend.blockchain.cross_verifier import CrossVerifier
+from backend.blockchain.admin_keys import AdminKeySet
+from backend.utils.auth import PasswordVerifier, TokenCache
+from backend.utils.pdf_cache import PdfCache
+from backend.utils.verify_cache import VerifyCache
+from backend.utils.pdf_renderer import PdfRenderer
+from backend.jobs.issuance import JobManager
+from backend.jobs.reservations import IdReservations
+from backend.jobs.bulk_import import CertificateImporter
+from backend.event_listener.event_listener import EventIngestor
+from backend.utils import metrics
+
+
+class StartupReport:
+    def __init__(self):
+        """
+        Thời gian (giây) của từng pha khởi động, theo thứ tự ghi nhận.
+        """
+        self.phases: Dict[str, float] = {}
+
+    def record(self, name: str, seconds: float) -> None:
+        self.phases[name] = seconds
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def as_dict(self) -> Dict[str, float]:
+        report = {name: round(seconds * 1000, 1) for name, seconds in self.phases.items()}
+        report['total'] = round(sum(self.phases.values()) * 1000, 1)
+        return report
+
+    def log(self) -> None:
+        logger.info("Startup (ms): " + ", ".join(f"{name}={ms}" for name, ms in self.as_dict().items()))
+
+
+class AppServices:
+    def __init__(self, mongo_client: Optional[MongoDBClient] = None, blockchain_client: Optional[BlockchainClient] = None):
+        """
+        Tạo toàn bộ service dùng chung. Không có network I/O ở đây.
+
+        Args:
+            mongo_client (MongoDBClient): Client có sẵn (mặc định tạo từ cấu hình).
+            blockchain_client (BlockchainClient): Client có sẵn (mặc định tạo từ cấu hình).
+        """
+        self.mongo_client = mongo_client or MongoDBClient()
+        self.blockchain_client = blockchain_client or BlockchainClient()
+        self.pdf_renderer = PdfRenderer()
+        self.pdf_cache = PdfCache()
+        self.verify_cache = VerifyCache()
+        self.cross_verifier = CrossVerifier(self.blockchain_client)
+        self.admin_keys = AdminKeySet()
+        self.id_reservations = IdReservations(self.mongo_client)
+        self.job_manager = JobManager(
+            self.mongo_client, self.blockchain_client, self.pdf_renderer, self.pdf_cache, self.verify_cache,
+            reservations=self.id_reservations
+        )
+        self.certificate_importer = CertificateImporter(
+            self.mongo_client, self.blockchain_client, self.job_manager, self.id_reservations
+        )
+        self.password_verifier = PasswordVerifier()
+        self.token_cache = TokenCache()
+        self.event_ingestor = EventIngestor(
+            self.mongo_client, self.blockchain_client,
+            pdf_cache=self.pdf_cache, verify_cache=self.verify_cache, admin_keys=self.admin_keys,
+            reservations=self.id_reservations
+        )
+        self._listener_task: Optional[asyncio.Task] = None
+        self.bind_metrics()
+
+    def bind_metrics(self) -> None:
+        """
+        Gắn các gauge của /metrics vào service của process này (giá trị được đọc khi scrape).
+        """
+        endpoints = getattr(self.blockchain_client.w3.provider, 'endpoints', [])
+        signers = self.blockchain_client.signers.signers
+        metrics.PENDING_TRANSACTIONS.set_function(lambda: self.blockchain_client.signers.pending_count)
+        metrics.SIGNER_PENDING_TRANSACTIONS.set_function(
+            lambda: [((signer.address,), signer.load) for signer in signers]
+        )
+        metrics.SIGNER_BALANCE.set_function(
+            lambda: [((signer.address,), signer.balance_eth) for signer in signers]
+        )
+        metrics.OUTSTANDING_JOBS.set_function(lambda: self.job_manager.outstanding)
+        metrics.DUPLICATE_IDS_REJECTED.set_function(lambda: self.id_reservations.rejected)
+        metrics.EVENT_LISTENER_LAG.set_function(lambda: self.event_ingestor.lag)
+        hit_ratio, hits, misses = metrics.cache_stats({
+            'verify': self.verify_cache, 'pdf': self.pdf_cache, 'token': self.token_cache
+        })
+        metrics.CACHE_HIT_RATIO.set_function(hit_ratio)
+        metrics.CACHE_HITS.set_function(hits)
+        metrics.CACHE_MISSES.set_function(misses)
+        metrics.PDF_RENDER_PENDING.set_function(lambda: self.pdf_renderer.pending)
+        metrics.AUTH_PENDING.set_function(lambda: self.password_verifier.pending)
+        metrics.AUTH_REJECTED.set_function(lambda: self.password_verifier.rejected)
+        metrics.RPC_ENDPOINT_LATENCY.set_function(
+            lambda: [((endpoint.name,), endpoint.latency) for endpoint in endpoints]
+        )
+        metrics.RPC_ENDPOINT_UP.set_function(
+            lambda: [((endpoint.name,), int(endpoint.state == 'closed')) for endpoint in endpoints]
+        )
+        metrics.RPC_ENDPOINT_ERRORS.set_function(
+            lambda: [((endpoint.name,), endpoint.errors) for endpoint in endpoints]
+        )
+
+    async def connect(self) -> None:
+        """
+        Kiểm tra kết nối MongoDB và RPC song song.
+        """
+        await asyncio.gather(self.mongo_client.ping(), self.blockchain_client.connect())
+
+    async def warm_up(self) -> None:
+        """
+        Tạo index, nạp tập admin và ID đã cấp, kiểm tra pool tài khoản ký, khởi động PDF worker
+        và tracker xác nhận giao dịch.
+        """
+        _, _, _, signer_admins, _ = await asyncio.gather(
+            self.mongo_client.ensure_indexes(),
+            self.admin_keys.load(self.mongo_client),
+            self.id_reservations.load(),
+            self.blockchain_client.signers.check_admins(self.blockchain_client.contract),
+            self.pdf_renderer.start()
+        )
+        # Chỉ tài khoản ký đã là admin trên contract mới được coi là người ký hợp lệ
+        self.admin_keys.trust(signer_admins)
+        await self.job_manager.start()
+
+    def start_event_listener(self) -> None:
+        self._listener_task = asyncio.create_task(self.event_ingestor.run())
+        logger.info("Bắt đầu lắng nghe sự kiện blockchain")
+
+    async def close(self) -> None:
+        if self._listener_task:
+            self._listener_task.cancel()
+            self._listener_task = None
+            logger.info("Ngừng lắng nghe sự kiện blockchain")
+        await self.job_manager.stop()
+        self.pdf_renderer.shutdown()
+        self.verify_cache.close()
+        self.blockchain_client.signer.shutdown()
+        close_provider = getattr(self.blockchain_client.w3.provider, 'close', None)
+        if close_provider:
+            close_provider()
+        self.password_verifier.shutdown()
+        await self.mongo_client.close()
+
+
+startup_report = StartupReport()
+metrics.STARTUP_PHASE_SECONDS.set_function(
+    lambda: [((name,), round(seconds, 4)) for name, seconds in startup_report.phases.items()]
+)
+_services: Optional[AppServices] = None
+
+
+def get_services() -> AppServices:
+    """
+    Service dùng chung của process, tạo ở lần gọi đầu tiên.
+    """
+    global _services
+    if _services is None:
+        with startup_report.phase('create'):
+            _services = AppServices()
+    return _services
+
+
+def use_services(services: AppServices) -> AppServices:
+    """
+    Dùng một AppServices có sẵn (vd. trên chain và MongoDB offline) thay cho service tạo từ cấu hình.
+    """
+    global _services
+    _services = services
+    return services
+
+
+async def close_services() -> None:
+    global _services
+    if _services is not None:
+        await _services.close()
+        _services = None
+
+
+def get_mongo_client() -> MongoDBClient:
+    return get_services().mongo_client
+
+
+def get_blockchain_client() -> BlockchainClient:
+    return get_services().blockchain_client
+
+
+def get_pdf_renderer() -> PdfRenderer:
+    return get_services().pdf_renderer
+
+
+def get_pdf_cache() -> PdfCache:
+    return get_services().pdf_cache
+
+
+def get_verify_cache() -> VerifyCache:
+    return get_services().verify_cache
+
+
+def get_cross_verifier() -> CrossVerifier:
+    return get_services().cross_verifier
+
+
+def get_admin_keys() -> AdminKeySet:
+    return get_services().admin_keys
+
+
+def get_id_reservations() -> IdReservations:
+    return get_services().id_reservations
+
+
+def get_job_manager() -> JobManager:
+    return get_services().job_manager
+
+
+def get_certificate_importer() -> CertificateImporter:
+    return get_services().certificate_importer
+
+
+def get_password_verifier() -> PasswordVerifier:
+    return get_services().password_verifier
+
+
+def get_token_cache() -> TokenCache:
+    return get_services().token_cache
@@ -1,50 +1,219 @@
+"""Blockchain event ingestion
+
+Logic:
+Lấy mọi loại sự kiện (EVENT_NAMES) bằng một lời gọi eth_getLogs cho mỗi khoảng block,
+áp dụng mỗi lô vào MongoDB bằng bulk_write và lưu block cuối cùng đã xử lý (checkpoint).
+Khi khởi động lại, backfill từ checkpoint theo các khoảng block tự điều chỉnh kích thước:
+thu nhỏ khi node từ chối (quá nhiều kết quả), mở rộng khi khoảng block thưa sự kiện.
+"""
+
 import asyncio
+from datetime import datetime
 from loguru import logger
+from hexbytes import HexBytes
 
 from backend.db.connector import MongoDBClient
+from backend.config.setting import listener_config
 from backend.blockchain.blockchain import BlockchainClient
 
 
-async def listen_events():
+CHECKPOINT_NAME = 'event_listener'
+EVENT_NAMES = ('CertificateIssued', 'CertificateRevoked', 'CertificatesRevoked', 'AdminAdded', 'AdminRemoved')
+RANGE_ERROR_MARKERS = (
+    'more than 10000 results',
+    'query returned more than',
+    'block range',
+    'response size exceeded',
+    'limit exceeded',
+    'too many',
+)
+
+
+def is_range_error(error: Exception) -> bool:
     """
-    Lắng nghe các sự kiện blockchain và cập nhật MongoDB.
+    Node từ chối eth_getLogs vì khoảng block quá lớn.
     """
-    mongo_client = MongoDBClient()
-    blockchain_client = BlockchainClient()
-
-    event_filter = blockchain_client.contract.events.CertificateIssued.create_filter(filter_params={'fromBlock': 'latest'})
-    revoke_filter = blockchain_client.contract.events.CertificateRevoked.create_filter(filter_params={'fromBlock': 'latest'})
-    admin_added_filter = blockchain_client.contract.events.AdminAdded.create_filter(filter_params={'fromBlock': 'latest'})
-    admin_removed_filter = blockchain_client.contract.events.AdminRemoved.create_filter(filter_params={'fromBlock': 'latest'})
-
-    while True:
-        try:
-            for event in event_filter.get_new_entries():
-                mongo_client.update_certificate(event['args']['id'], {
-                    'event': 'CertificateIssued',
-                    'recipientHash': event['args']['recipientHash'].hex(),
-                    'courseHash': event['args']['courseHash'].hex(),
-                    'issueDate': event['args']['issueDate'],
-                    'signature': event['args']['signature'].hex()
-                })
-                logger.info(f"Xử lý sự kiện CertificateIssued cho ID: {event['args']['id']}")
+    message = str(error).lower()
+    return any(marker in message for marker in RANGE_ERROR_MARKERS)
+
+
+class EventIngestor:
+    def __init__(self, mongo_client: MongoDBClient, blockchain_client: BlockchainClient, pdf_cache=None, verify_cache=None, admin_keys=None,
+                 reservations=None):
+        """
+        Khởi tạo engine ingestion sự kiện.
+
+        Args:
+            mongo_client (MongoDBClient): MongoDB client.
+            blockchain_client (BlockchainClient): Blockchain client.
+            pdf_cache (PdfCache): Cache PDF cần xóa khi chứng chỉ bị thu hồi.
+            verify_cache (VerifyCache): Cache tra cứu cần xóa khi chứng chỉ được cấp/thu hồi.
+            admin_keys (AdminKeySet): Tập admin cần cập nhật khi admin được thêm/xóa.
+            reservations (IdReservations): Reservation của ID cần đánh dấu đã cấp khi chứng chỉ được cấp.
+        """
+        self.mongo_client = mongo_client
+        self.blockchain_client = blockchain_client
+        self.pdf_cache = pdf_cache
+        self.verify_cache = verify_cache
+        self.admin_keys = admin_keys
+        self.reservations = reservations
+        self.chunk_size = listener_config.initial_chunk
+        self.chunk_ceiling = listener_config.max_chunk
+        self._successes = 0
+        self.head_block = None
+        self.last_block = None
+
+        events = blockchain_client.contract.events
+        self.events_by_topic = {
+            getattr(events, name).topic.lower(): getattr(events, name)() for name in EVENT_NAMES
+        }
+        self.topics = [list(self.events_by_topic)]
+
+    @property
+    def lag(self) -> int:
+        """
+        Số block chưa được xử lý so với head.
+        """
+        if self.head_block is None or self.last_block is None:
+            return 0
+        return max(self.head_block - self.last_block, 0)
+
+    def decode(self, log):
+        topic = log['topics'][0]
+        topic = (topic.to_0x_hex() if hasattr(topic, 'to_0x_hex') else str(topic)).lower()
+        event = self.events_by_topic.get(topic)
+        return event.process_log(log) if event else None
 
-            for event in revoke_filter.get_new_entries():
-                mongo_client.update_certificate(event['args']['id'], {
+    async def apply(self, events: list) -> None:
+        """
+        Áp dụng một lô sự kiện vào MongoDB (tối đa một bulk_write cho mỗi collection).
+        """
+        cert_updates = []
+        admin_updates = []
+        issued_ids = set()
+        revoked_ids = set()
+        now = int(datetime.utcnow().timestamp())
+
+        for event in events:
+            args = event['args']
+            tx_hash = HexBytes(event['transactionHash']).to_0x_hex()
+            if event['event'] == 'CertificateIssued':
+                cert_updates.append((args['id'], {
+                    'event': 'CertificateIssued',
+                    'recipientHash': HexBytes(args['recipientHash']).to_0x_hex(),
+                    'courseHash': HexBytes(args['courseHash']).to_0x_hex(),
+                    'issueDate': args['issueDate'],
+                    'signature': HexBytes(args['signature']).to_0x_hex()
+                }))
+                issued_ids.add(args['id'])
+            elif event['event'] == 'CertificateRevoked':
+                cert_updates.append((args['id'], {
                     'event': 'CertificateRevoked',
                     'revoked': True
+                }))
+                revoked_ids.add(args['id'])
+            elif event['event'] == 'CertificatesRevoked':
+                for cert_id in args['ids']:
+                    cert_updates.append((cert_id, {
+                        'event': 'CertificateRevoked',
+                        'revoked': True
+                    }))
+                    revoked_ids.add(cert_id)
+            elif event['event'] in ('AdminAdded', 'AdminRemoved'):
+                admin_updates.append({
+                    'address': args['admin'],
+                    'status': 'active' if event['event'] == 'AdminAdded' else 'removed',
+                    'txHash': tx_hash,
+                    'event': event['event'],
+                    'timestamp': now
                 })
-                logger.info(f"Xử lý sự kiện CertificateRevoked cho ID: {event['args']['id']}")
 
-            for event in admin_added_filter.get_new_entries():
-                mongo_client.update_admin(event['args']['admin'], 'active')
-                logger.info(f"Xử lý sự kiện AdminAdded cho địa chỉ: {event['args']['admin']}")
+        await self.mongo_client.bulk_update_certificates(cert_updates)
+        await self.mongo_client.bulk_update_admins(admin_updates)
+
+        if self.verify_cache:
+            for cert_id in issued_ids | revoked_ids:
+                self.verify_cache.invalidate(cert_id)
+        if self.pdf_cache:
+            for cert_id in revoked_ids:
+                await self.pdf_cache.invalidate(cert_id)
+        if self.admin_keys:
+            for admin in admin_updates:
+                self.admin_keys.set_status(admin['address'], admin['status'])
+        if self.reservations:
+            await self.reservations.mark_issued(issued_ids)
+
+    def _adapt_chunk(self, log_count: int) -> None:
+        # Trần kích thước sau lỗi range được nới dần sau mỗi 10 lần thành công liên tiếp
+        self._successes += 1
+        if self._successes % 10 == 0:
+            self.chunk_ceiling = min(self.chunk_ceiling * 2, listener_config.max_chunk)
+        if log_count < listener_config.target_logs // 4:
+            self.chunk_size = min(self.chunk_size * 2, self.chunk_ceiling)
+        elif log_count > listener_config.target_logs:
+            self.chunk_size = max(self.chunk_size // 2, listener_config.min_chunk)
+
+    async def sync(self) -> int:
+        """
+        Xử lý mọi block từ checkpoint đến head (trừ số block xác nhận).
+
+        Returns:
+            int: Số sự kiện đã xử lý.
+        """
+        self.head_block = await self.blockchain_client.get_block_number() - listener_config.confirmations
+        if self.last_block is None:
+            self.last_block = await self.mongo_client.get_checkpoint(CHECKPOINT_NAME)
+            if self.last_block is None:
+                start = listener_config.start_block
+                self.last_block = (start - 1) if start is not None else self.head_block
+                await self.mongo_client.save_checkpoint(CHECKPOINT_NAME, self.last_block)
+            logger.info(f"Event ingestion from block {self.last_block + 1}, head {self.head_block}")
 
-            for event in admin_removed_filter.get_new_entries():
-                mongo_client.update_admin(event['args']['admin'], 'removed')
-                logger.info(f"Xử lý sự kiện AdminRemoved cho địa chỉ: {event['args']['admin']}")
+        processed = 0
+        while self.last_block < self.head_block:
+            from_block = self.last_block + 1
+            to_block = min(from_block + self.chunk_size - 1, self.head_block)
+            try:
+                logs = await self.blockchain_client.get_logs(from_block, to_block, self.topics)
+            except Exception as e:
+                if not is_range_error(e) or self.chunk_size <= listener_config.min_chunk:
+                    raise
+                self.chunk_size = max(self.chunk_size // 2, listener_config.min_chunk)
+                self.chunk_ceiling = self.chunk_size
+                self._successes = 0
+                logger.warning(f"getLogs range {from_block}-{to_block} rejected, chunk size -> {self.chunk_size}")
+                continue
 
-        except Exception as e:
-            logger.error(f"Lỗi khi xử lý sự kiện: {str(e)}")
+            events = [event for event in map(self.decode, logs) if event]
+            await self.apply(events)
+            await self.mongo_client.save_checkpoint(CHECKPOINT_NAME, to_block)
+            self.last_block = to_block
+            processed += len(events)
+            self._adapt_chunk(len(logs))
+            if events:
+                logger.info(f"Xử lý {len(events)} sự kiện trong block {from_block}-{to_block}")
+        return processed
 
-        await asyncio.sleep(10)
\ No newline at end of file
+    async def run(self) -> None:
+        while True:
+            try:
+                await self.sync()
+            except Exception as e:
+                logger.error(f"Lỗi khi xử lý sự kiện: {str(e)}")
+            await asyncio.sleep(listener_config.poll_interval)
+
+
+async def listen_events(mongo_client: MongoDBClient, blockchain_client: BlockchainClient, pdf_cache=None, verify_cache=None, admin_keys=None,
+                        reservations=None):
+    """
+    Lắng nghe các sự kiện blockchain và cập nhật MongoDB.
+
+    Args:
+        mongo_client (MongoDBClient): MongoDB client dùng chung của ứng dụng.
+        blockchain_client (BlockchainClient): Blockchain client dùng chung của ứng dụng.
+        pdf_cache (PdfCache): Cache PDF cần xóa khi chứng chỉ bị thu hồi.
+        verify_cache (VerifyCache): Cache tra cứu cần xóa khi chứng chỉ được cấp/thu hồi.
+        admin_keys (AdminKeySet): Tập admin cần cập nhật khi admin được thêm/xóa.
+        reservations (IdReservations): Reservation của ID cần đánh dấu đã cấp khi chứng chỉ được cấp.
+    """
+    await EventIngestor(mongo_client, blockchain_client, pdf_cache, verify_cache, admin_keys, reservations).run()
@@ -0,0 +1,276 @@
+"""Streaming bulk certificate import
+
+Logic:
+File CSV/JSONL được ghi xuống đĩa rồi đọc lại từng lô nhỏ, nên bộ nhớ không phụ thuộc số dòng.
+Mỗi lô: kiểm tra dòng theo CertificateInput, giữ chỗ ID (bỏ qua ID đã cấp hoặc đang được cấp), tính hash/chữ ký song song,
+gửi giao dịch liên tiếp (nonce cấp cục bộ, không chờ biên nhận) và ghi job bằng một insert_many.
+Confirmation tracker xác nhận giao dịch như với /api/issue-certificate.
+Sau mỗi lô, số dòng đã xử lý được lưu lại: import bị gián đoạn có thể tiếp tục từ dòng đó.
+Dòng có ID đã được giữ chỗ (chứng chỉ đã cấp hoặc job đang chờ) được bỏ qua, nên tiếp tục một import không cấp trùng.
+"""
+
+import os
+import csv
+import json
+import uuid
+import asyncio
+import itertools
+from loguru import logger
+from datetime import datetime
+from pydantic import ValidationError
+from typing import Any, AsyncIterator, Dict, Iterator, List, Tuple
+
+from backend.config.setting import job_config
+from backend.utils.utils import CertificateInput
+from backend.jobs.issuance import JobManager
+from backend.jobs.reservations import IdReservations, RESERVATION_ISSUED
+
+
+IMPORT_PENDING = 'pending'
+IMPORT_RUNNING = 'running'
+IMPORT_COMPLETED = 'completed'
+IMPORT_FORMATS = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl'}
+
+
+class ImportRejected(Exception):
+    """
+    Raised when an import cannot be started (unsupported file or already running).
+    """
+
+
+def detect_format(filename: str) -> str:
+    extension = os.path.splitext(filename or '')[1].lower()
+    if extension not in IMPORT_FORMATS:
+        raise ImportRejected(f"Định dạng file không được hỗ trợ: {extension or filename} (chỉ hỗ trợ .csv, .jsonl)")
+    return IMPORT_FORMATS[extension]
+
+
+def iter_rows(path: str, fmt: str) -> Iterator[Tuple[int, Any]]:
+    """
+    Đọc lần lượt các dòng của file import.
+
+    Args:
+        path (str): Đường dẫn file.
+        fmt (str): 'csv' hoặc 'jsonl'.
+
+    Yields:
+        Tuple[int, Any]: (số thứ tự dòng, dict dữ liệu hoặc lỗi parse).
+    """
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        if fmt == 'csv':
+            yield from enumerate(csv.DictReader(f), start=1)
+            return
+        for number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield number, json.loads(line)
+            except ValueError as e:
+                yield number, e
+
+
+class CertificateImporter:
+    def __init__(self, mongo_client, blockchain_client, job_manager: JobManager, reservations: IdReservations):
+        """
+        Khởi tạo bulk importer.
+
+        Args:
+            mongo_client (MongoDBClient): MongoDB client.
+            blockchain_client (BlockchainClient): Blockchain client.
+            job_manager (JobManager): Job manager theo dõi các giao dịch đã gửi.
+            reservations (IdReservations): Giữ chỗ ID chứng chỉ trước khi gửi giao dịch.
+        """
+        self.mongo_client = mongo_client
+        self.blockchain_client = blockchain_client
+        self.job_manager = job_manager
+        self.reservations = reservations
+        self._running = set()
+
+    @staticmethod
+    def serialize(record: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Public view of an import.
+        """
+        return {
+            'importId': record['_id'],
+            'filename': record['filename'],
+            'format': record['format'],
+            'status': record['status'],
+            'rowsProcessed': record['rowsProcessed'],
+            'submitted': record['submitted'],
+            'skipped': record['skipped'],
+            'invalid': record['invalid'],
+            'failed': record['failed'],
+            'createdAt': record['createdAt'],
+            'updatedAt': record['updatedAt']
+        }
+
+    async def create(self, upload) -> Dict[str, Any]:
+        """
+        Lưu file upload xuống đĩa theo từng phần và tạo bản ghi import.
+
+        Args:
+            upload (UploadFile): File CSV/JSONL với các cột id, recipient, course.
+
+        Returns:
+            Dict[str, Any]: Bản ghi import.
+        """
+        fmt = detect_format(upload.filename)
+        import_id = uuid.uuid4().hex
+        os.makedirs(job_config.import_dir, exist_ok=True)
+        path = os.path.join(job_config.import_dir, f"{import_id}.{fmt}")
+        with open(path, 'wb') as f:
+            while chunk := await upload.read(1024 * 1024):
+                await asyncio.to_thread(f.write, chunk)
+
+        now = int(datetime.utcnow().timestamp())
+        record = {
+            '_id': import_id,
+            'filename': upload.filename,
+            'format': fmt,
+            'path': path,
+            'status': IMPORT_PENDING,
+            'rowsProcessed': 0,
+            'submitted': 0,
+            'skipped': 0,
+            'invalid': 0,
+            'failed': 0,
+            'createdAt': now,
+            'updatedAt': now
+        }
+        await self.mongo_client.insert_import(record)
+        return record
+
+    def claim(self, record: Dict[str, Any]) -> None:
+        """
+        Đánh dấu import đang chạy trong worker này, chặn hai lần chạy song song.
+        """
+        if record['status'] == IMPORT_COMPLETED:
+            raise ImportRejected(f"Import {record['_id']} đã hoàn tất")
+        if record['_id'] in self._running:
+            raise ImportRejected(f"Import {record['_id']} đang chạy")
+        self._running.add(record['_id'])
+
+    async def run(self, record: Dict[str, Any]) -> AsyncIterator[str]:
+        """
+        Chạy (hoặc tiếp tục) một import đã claim, trả kết quả từng dòng dạng NDJSON.
+
+        Args:
+            record (Dict[str, Any]): Bản ghi import.
+
+        Yields:
+            str: Một dòng JSON cho mỗi dòng dữ liệu, dòng cuối là tổng kết.
+        """
+        import_id = record['_id']
+        try:
+            offset = record['rowsProcessed']
+            await self.mongo_client.update_import(import_id, {
+                'status': IMPORT_RUNNING, 'updatedAt': int(datetime.utcnow().timestamp())
+            })
+            if offset:
+                logger.info(f"Resume import {import_id} after row {offset}")
+
+            rows = iter_rows(record['path'], record['format'])
+            while True:
+                batch = await asyncio.to_thread(list, itertools.islice(rows, job_config.import_batch_size))
+                if not batch:
+                    break
+                batch = [(number, row) for number, row in batch if number > offset]
+                if not batch:
+                    continue
+                # Lô đang gửi được hoàn tất kể cả khi client ngắt kết nối, để job và checkpoint khớp với giao dịch đã gửi
+                for result in await asyncio.shield(self._process(import_id, batch)):
+                    yield json.dumps(result) + '\n'
+
+            await self.mongo_client.update_import(import_id, {
+                'status': IMPORT_COMPLETED, 'updatedAt': int(datetime.utcnow().timestamp())
+            })
+            record = await self.mongo_client.find_import(import_id)
+            logger.info(f"Import {import_id} completed: {record['submitted']} submitted")
+            yield json.dumps({'summary': self.serialize(record)}) + '\n'
+        finally:
+            self._running.discard(import_id)
+
+    async def _process(self, import_id: str, batch: List[Tuple[int, Any]]) -> List[Dict[str, Any]]:
+        """
+        Kiểm tra, ký, gửi giao dịch và ghi job cho một lô dòng.
+        """
+        results = {}
+        valid = []
+        seen = set()
+        for number, row in batch:
+            try:
+                if isinstance(row, Exception):
+                    raise ValueError(f"JSON không hợp lệ: {row}")
+                if not isinstance(row, dict):
+                    raise ValueError("Mỗi dòng phải là một object")
+                data = CertificateInput(**row)
+            except (ValueError, ValidationError) as e:
+                results[number] = {'row': number, 'status': 'invalid', 'error': str(e)}
+                continue
+            if data.id in seen:
+                results[number] = {'row': number, 'id': data.id, 'status': 'skipped', 'error': 'ID bị trùng trong file'}
+                continue
+            seen.add(data.id)
+            valid.append((number, data))
+
+        if valid:
+            # Chờ trước khi giữ chỗ để reservation không hết hạn trong lúc chờ
+            await self._wait_for_capacity(import_id, len(valid))
+            token, conflicts = await self.reservations.reserve([data.id for _, data in valid])
+            for number, data in valid:
+                if data.id in conflicts:
+                    error = 'Chứng chỉ đã được cấp' if conflicts[data.id] == RESERVATION_ISSUED else 'Chứng chỉ đang được cấp'
+                    results[number] = {'row': number, 'id': data.id, 'status': 'skipped', 'error': error}
+            valid = [(number, data) for number, data in valid if data.id not in conflicts]
+
+        if valid:
+            try:
+                # Chia đều các dòng cho pool tài khoản; mỗi chứng chỉ được ký bằng khóa của tài khoản gửi nó
+                signers = await self.blockchain_client.signers.assign(len(valid))
+                signed = await self.blockchain_client.sign_certificates([data for _, data in valid], signers)
+            except Exception:
+                await self.reservations.release([data.id for _, data in valid], token)
+                raise
+            tx_hashes = await asyncio.gather(*[
+                self.blockchain_client.issue_certificate(
+                    data.id, recipient_hash, course_hash, signature, wait=False, signer=signer
+                )
+                for (_, data), (recipient_hash, course_hash, signature), signer in zip(valid, signed, signers)
+            ], return_exceptions=True)
+
+            entries = []
+            for (number, data), (recipient_hash, course_hash, signature), tx_hash in zip(valid, signed, tx_hashes):
+                if isinstance(tx_hash, Exception):
+                    error = getattr(tx_hash, 'detail', None) or str(tx_hash)
+                    results[number] = {'row': number, 'id': data.id, 'status': 'failed', 'error': error}
+                else:
+                    entries.append((number, (data, recipient_hash, course_hash, signature, tx_hash)))
+            await self.reservations.release(
+                [data.id for (_, data), tx_hash in zip(valid, tx_hashes) if isinstance(tx_hash, Exception)], token
+            )
+            await self.reservations.hold([entry[0].id for _, entry in entries], token)
+            jobs = await self.job_manager.create_issue_jobs([entry for _, entry in entries], import_id)
+            for (number, entry), job in zip(entries, jobs):
+                results[number] = {
+                    'row': number, 'id': job['certId'], 'status': 'submitted',
+                    'jobId': job['_id'], 'txHash': job['txHash']
+                }
+
+        counters = {'submitted': 0, 'skipped': 0, 'invalid': 0, 'failed': 0}
+        for result in results.values():
+            counters[result['status']] += 1
+        await self.mongo_client.update_import(import_id, {
+            'rowsProcessed': batch[-1][0],
+            'updatedAt': int(datetime.utcnow().timestamp())
+        }, counters)
+        return [results[number] for number, _ in batch]
+
+    async def _wait_for_capacity(self, import_id: str, count: int) -> None:
+        # Giới hạn số giao dịch chưa xác nhận của một import (mempool giới hạn giao dịch chờ mỗi tài khoản)
+        limit = job_config.import_max_in_flight * len(self.blockchain_client.signers)
+        while True:
+            outstanding = self.job_manager.outstanding_for(import_id)
+            if outstanding == 0 or outstanding + count <= limit:
+                return
+            await asyncio.sleep(job_config.poll_interval)
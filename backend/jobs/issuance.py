@@ -0,0 +1,377 @@
+"""Asynchronous issuance jobs
+
+Logic:
+/api/issue-certificate chỉ ký, gửi giao dịch và trả về 202 kèm job ID.
+Confirmation tracker poll biên nhận của mọi giao dịch đang chờ bằng JSON-RPC batch;
+khi giao dịch được mined: ghi chứng chỉ vào MongoDB, render PDF vào cache và cập nhật job.
+Trạng thái job được phát qua GET /api/jobs/{id} và stream server-sent events.
+Reservation của ID chứng chỉ được chuyển sang 'issued' khi giao dịch mined, hoặc giải phóng khi job thất bại.
+"""
+
+import json
+import time
+import uuid
+import asyncio
+from loguru import logger
+from hexbytes import HexBytes
+from datetime import datetime
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from backend.config.setting import job_config, web3_config
+from backend.utils.pdf_cache import PdfCache
+
+
+JOB_SUBMITTED = 'submitted'
+JOB_COMPLETED = 'completed'
+JOB_FAILED = 'failed'
+ACTIVE_STATUSES = [JOB_SUBMITTED]
+FINAL_STATUSES = (JOB_COMPLETED, JOB_FAILED)
+
+
+class JobManager:
+    def __init__(self, mongo_client, blockchain_client, pdf_renderer, pdf_cache, verify_cache=None, reservations=None):
+        """
+        Khởi tạo job manager và confirmation tracker.
+
+        Args:
+            mongo_client (MongoDBClient): MongoDB client.
+            blockchain_client (BlockchainClient): Blockchain client.
+            pdf_renderer (PdfRenderer): Renderer PDF.
+            pdf_cache (PdfCache): Cache PDF.
+            verify_cache (VerifyCache): Cache tra cứu cần xóa khi chứng chỉ được ghi.
+            reservations (IdReservations): Reservation của ID cần cập nhật khi job kết thúc.
+        """
+        self.mongo_client = mongo_client
+        self.blockchain_client = blockchain_client
+        self.pdf_renderer = pdf_renderer
+        self.pdf_cache = pdf_cache
+        self.verify_cache = verify_cache
+        self.reservations = reservations
+        self._outstanding = {}
+        self._missing_checked = {}
+        self._subscribers = defaultdict(set)
+        self._task = None
+
+    @property
+    def outstanding(self) -> int:
+        """
+        Số giao dịch đang chờ xác nhận.
+        """
+        return len({job['_id'] for job in self._outstanding.values()})
+
+    @staticmethod
+    def serialize(job: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Public view of a job.
+        """
+        return {
+            'jobId': job['_id'],
+            'type': job['type'],
+            'status': job['status'],
+            'certId': job['certId'],
+            'txHash': job.get('txHash'),
+            'pdfUrl': job.get('pdfUrl'),
+            'error': job.get('error'),
+            'createdAt': job['createdAt'],
+            'updatedAt': job['updatedAt']
+        }
+
+    async def start(self) -> None:
+        """
+        Nạp lại các job chưa hoàn tất và khởi động tracker.
+        """
+        for job in await self.mongo_client.find_jobs_by_status(ACTIVE_STATUSES):
+            for tx_hash in self._tx_hashes(job):
+                self._outstanding[tx_hash] = job
+        logger.info(f"Confirmation tracker started with {self.outstanding} outstanding jobs")
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await self.mongo_client.find_job(job_id)
+
+    async def find_active_job(self, cert_id: str) -> Optional[Dict[str, Any]]:
+        return await self.mongo_client.find_active_job(cert_id, ACTIVE_STATUSES)
+
+    @staticmethod
+    def _new_job(cert_id: str, recipient: str, course: str, recipient_hash: str, course_hash: str,
+                 signature: str, tx_hash, import_id: Optional[str] = None) -> Dict[str, Any]:
+        now = int(datetime.utcnow().timestamp())
+        job = {
+            '_id': uuid.uuid4().hex,
+            'type': 'issue_certificate',
+            'status': JOB_SUBMITTED,
+            'certId': cert_id,
+            'txHash': tx_hash.to_0x_hex(),
+            'certificate': {
+                'id': cert_id,
+                'recipient': recipient,
+                'recipientHash': recipient_hash,
+                'course': course,
+                'courseHash': course_hash,
+                'signature': signature
+            },
+            'createdAt': now,
+            'updatedAt': now
+        }
+        if import_id:
+            job['importId'] = import_id
+        return job
+
+    async def create_issue_job(self, data, recipient_hash: str, course_hash: str, signature: str, tx_hash) -> Dict[str, Any]:
+        """
+        Ghi job cấp chứng chỉ cho một giao dịch đã gửi và đưa vào tracker.
+
+        Args:
+            data (CertificateInput): Certificate data (id, recipient, course).
+            recipient_hash (str): Hash of recipient.
+            course_hash (str): Hash of course.
+            signature (str): Digital signature.
+            tx_hash: Transaction hash.
+
+        Returns:
+            Dict[str, Any]: Job vừa tạo.
+        """
+        job = self._new_job(data.id, data.recipient, data.course, recipient_hash, course_hash, signature, tx_hash)
+        await self.mongo_client.insert_job(job)
+        self._outstanding[tx_hash.to_0x_hex()] = job
+        return job
+
+    async def create_issue_jobs(self, entries: list, import_id: str) -> List[Dict[str, Any]]:
+        """
+        Ghi job cho nhiều giao dịch của một bulk import (một lần insert_many).
+        PDF của các job này không được render trước, chỉ render khi tải qua /api/certificates/{id}/pdf.
+
+        Args:
+            entries (list): Danh sách (CertificateInput, recipient_hash, course_hash, signature, tx_hash).
+            import_id (str): Import ID.
+
+        Returns:
+            List[Dict[str, Any]]: Các job vừa tạo.
+        """
+        jobs = [
+            self._new_job(data.id, data.recipient, data.course, recipient_hash, course_hash, signature, tx_hash, import_id)
+            for data, recipient_hash, course_hash, signature, tx_hash in entries
+        ]
+        await self.mongo_client.insert_jobs(jobs)
+        for job, entry in zip(jobs, entries):
+            self._outstanding[entry[4].to_0x_hex()] = job
+        return jobs
+
+    def outstanding_for(self, import_id: str) -> int:
+        """
+        Số giao dịch chưa xác nhận của một bulk import.
+        """
+        return len({job['_id'] for job in self._outstanding.values() if job.get('importId') == import_id})
+
+    @staticmethod
+    def _tx_hashes(job: Dict[str, Any]) -> List[str]:
+        # Giao dịch hiện tại và các giao dịch đã bị thay thế (fee bump): bất kỳ giao dịch nào cũng có thể được mined
+        return [HexBytes(tx_hash).to_0x_hex() for tx_hash in [job['txHash'], *job.get('replacedTxHashes', [])]]
+
+    def _forget(self, job: Dict[str, Any]) -> None:
+        for tx_hash in self._tx_hashes(job):
+            self._outstanding.pop(tx_hash, None)
+        self._missing_checked.pop(job['_id'], None)
+
+    def subscribe(self, job_id: str) -> asyncio.Queue:
+        queue = asyncio.Queue()
+        self._subscribers[job_id].add(queue)
+        return queue
+
+    def unsubscribe(self, job_id: str, queue: asyncio.Queue) -> None:
+        self._subscribers[job_id].discard(queue)
+        if not self._subscribers[job_id]:
+            del self._subscribers[job_id]
+
+    async def _update(self, job_id: str, data: Dict[str, Any]) -> None:
+        data['updatedAt'] = int(datetime.utcnow().timestamp())
+        job = await self.mongo_client.update_job(job_id, data)
+        if job:
+            for queue in self._subscribers.get(job_id, ()):
+                queue.put_nowait(job)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.poll()
+            except Exception as e:
+                logger.error(f"Lỗi confirmation tracker: {str(e)}")
+            await asyncio.sleep(job_config.poll_interval)
+
+    async def poll(self) -> None:
+        """
+        Một vòng tracker: lấy biên nhận theo lô và hoàn tất các job đã mined.
+        """
+        tx_hashes = list(self._outstanding)
+        for start in range(0, len(tx_hashes), job_config.receipt_batch_size):
+            chunk = tx_hashes[start:start + job_config.receipt_batch_size]
+            receipts = await self.blockchain_client.get_receipts(chunk)
+            mined = {tx_hash: receipt for tx_hash, receipt in receipts.items() if receipt}
+
+            succeeded, failed = [], []
+            for tx_hash, receipt in mined.items():
+                job = self._outstanding.get(tx_hash)
+                if job is None:
+                    continue
+                self._forget(job)
+                await self.blockchain_client.confirm_transaction(receipt['transactionHash'], receipt['gasUsed'])
+                if receipt['status'] == 1:
+                    succeeded.append((job, receipt))
+                else:
+                    logger.error(f"Transaction failed: {tx_hash} (job {job['_id']})")
+                    await self._update(job['_id'], {'status': JOB_FAILED, 'error': 'Transaction failed on blockchain'})
+                    failed.append(job['certId'])
+            if self.reservations and failed:
+                await self.reservations.release(failed)
+            if succeeded:
+                await self._finalize(succeeded)
+
+            for tx_hash in set(chunk) - set(mined):
+                await self._check_missing(tx_hash)
+
+    async def _check_missing(self, tx_hash: str) -> None:
+        """
+        Giao dịch quá hạn: job thất bại nếu giao dịch bị drop, còn nếu vẫn kẹt trong mempool
+        thì gửi giao dịch thay thế với phí cao hơn.
+        """
+        job = self._outstanding.get(tx_hash)
+        if job is None or tx_hash != self._tx_hashes(job)[0]:
+            return
+        now = time.time()
+        if now - job['createdAt'] < web3_config.tx_receipt_timeout:
+            return
+        if now - self._missing_checked.get(job['_id'], 0) < web3_config.tx_receipt_timeout:
+            return
+        self._missing_checked[job['_id']] = now
+        if await self.blockchain_client.handle_missing_transaction(HexBytes(tx_hash)):
+            self._forget(job)
+            await self._update(job['_id'], {'status': JOB_FAILED, 'error': 'Transaction dropped from mempool'})
+            if self.reservations:
+                await self.reservations.release([job['certId']])
+            return
+
+        replacement = await self.blockchain_client.replace_transaction(HexBytes(tx_hash))
+        if replacement is None:
+            return
+        job['replacedTxHashes'] = [*job.get('replacedTxHashes', []), job['txHash']]
+        job['txHash'] = replacement.to_0x_hex()
+        self._outstanding[replacement.to_0x_hex()] = job
+        await self._update(job['_id'], {'txHash': job['txHash'], 'replacedTxHashes': job['replacedTxHashes']})
+
+    async def _finalize(self, succeeded: list) -> None:
+        """
+        Ghi các chứng chỉ đã mined vào MongoDB (một lần insert_many) rồi render PDF.
+        """
+        if self.reservations:
+            # Giao dịch đã mined: ID đã được dùng trên blockchain kể cả khi ghi MongoDB lỗi
+            await self.reservations.mark_issued([job['certId'] for job, _ in succeeded])
+        timestamps = await self.blockchain_client.get_block_timestamps(
+            sorted({receipt['blockNumber'] for _, receipt in succeeded})
+        )
+        records = []
+        for job, receipt in succeeded:
+            records.append({
+                **job['certificate'],
+                'issueDate': timestamps[receipt['blockNumber']],
+                'txHash': receipt['transactionHash'].to_0x_hex(),
+                'revoked': False
+            })
+
+        failed_ids = set()
+        try:
+            await self.mongo_client.insert_certificates(records)
+        except Exception:
+            # Ghi lại từng bản ghi để chỉ đánh dấu lỗi các job thực sự lỗi
+            for record in records:
+                try:
+                    if not await self.mongo_client.find_certificate(record['id']):
+                        await self.mongo_client.insert_certificate(record)
+                except Exception as e:
+                    logger.error(f"Lỗi khi ghi chứng chỉ ID {record['id']}: {str(e)}")
+                    failed_ids.add(record['id'])
+
+        completed = [(job, record) for (job, _), record in zip(succeeded, records) if record['id'] not in failed_ids]
+        await asyncio.gather(*[
+            self._update(job['_id'], {'status': JOB_FAILED, 'error': 'Không thể ghi chứng chỉ vào database'})
+            for (job, _), record in zip(succeeded, records) if record['id'] in failed_ids
+        ])
+        await asyncio.gather(*[self._complete(job, record) for job, record in completed if not job.get('importId')])
+
+        # Job của bulk import: một bulk_write thay vì một lần cập nhật cho mỗi job
+        imported = [(job, record) for job, record in completed if job.get('importId')]
+        if imported:
+            now = int(datetime.utcnow().timestamp())
+            await self.mongo_client.bulk_update_jobs([
+                (job['_id'], {
+                    'status': JOB_COMPLETED,
+                    'txHash': record['txHash'],
+                    'pdfUrl': f"/api/certificates/{record['id']}/pdf",
+                    'updatedAt': now
+                })
+                for job, record in imported
+            ])
+            if self.verify_cache:
+                for _, record in imported:
+                    self.verify_cache.invalidate(record['id'])
+
+    async def _complete(self, job: Dict[str, Any], record: Dict[str, Any]) -> None:
+        if self.verify_cache:
+            self.verify_cache.invalidate(record['id'])
+        await self._render_pdf(record)
+        await self._update(job['_id'], {
+            'status': JOB_COMPLETED,
+            'txHash': record['txHash'],
+            'pdfUrl': f"/api/certificates/{record['id']}/pdf"
+        })
+        logger.info(f"Job {job['_id']} completed for certificate ID {record['id']}")
+
+    async def _render_pdf(self, record: Dict[str, Any]) -> None:
+        try:
+            pdf_data = await self.pdf_renderer.render(
+                cert_id=record['id'],
+                recipient=record['recipient'],
+                course=record['course'],
+                issue_date=datetime.fromtimestamp(record['issueDate']).strftime("%d/%m/%Y"),
+                tx_hash=record['txHash']
+            )
+            await self.pdf_cache.put(record['id'], PdfCache.cache_key(record['id'], record['txHash']), pdf_data)
+        except Exception as e:
+            # PDF vẫn được render lại khi tải qua /api/certificates/{id}/pdf
+            logger.error(f"Lỗi khi render PDF cho chứng chỉ ID {record['id']}: {str(e)}")
+
+    async def stream(self, job: Dict[str, Any], is_disconnected):
+        """
+        Server-sent events cho một job: gửi trạng thái hiện tại rồi mỗi lần thay đổi, đến khi kết thúc.
+        Nếu job do worker khác xử lý, trạng thái được đọc lại từ MongoDB định kỳ.
+
+        Args:
+            job (Dict[str, Any]): Job hiện tại.
+            is_disconnected: Coroutine function kiểm tra client đã ngắt kết nối.
+
+        Yields:
+            str: SSE frame.
+        """
+        queue = self.subscribe(job['_id'])
+        try:
+            current = job
+            yield f"event: status\ndata: {json.dumps(self.serialize(current))}\n\n"
+            while current['status'] not in FINAL_STATUSES:
+                if await is_disconnected():
+                    break
+                try:
+                    latest = await asyncio.wait_for(queue.get(), timeout=job_config.sse_refresh_interval)
+                except asyncio.TimeoutError:
+                    latest = await self.get_job(job['_id'])
+                if not latest or latest['updatedAt'] == current['updatedAt'] and latest['status'] == current['status']:
+                    yield ": keep-alive\n\n"
+                    continue
+                current = latest
+                yield f"event: status\ndata: {json.dumps(self.serialize(current))}\n\n"
+        finally:
+            self.unsubscribe(job['_id'], queue)
@@ -0,0 +1,143 @@
+"""Certificate ID reservations before issuance
+
+Logic:
+Trước khi ký và gửi giao dịch cấp chứng chỉ, ID được giữ chỗ để ID trùng bị từ chối ngay
+thay vì tốn gas cho một giao dịch revert ("Certificate ID already exists").
+- Trong bộ nhớ: tập ID đã cấp (nạp từ MongoDB khi khởi động, cập nhật bởi job tracker và event listener)
+  và các ID đang được cấp bởi process này; ID trùng bị từ chối không cần I/O.
+- Trong MongoDB: mỗi ID một bản ghi reservation (_id là certificate ID) nên hai request cùng ID,
+  kể cả ở hai process, chỉ một request giữ được chỗ. Reservation ở trạng thái 'pending' cho đến khi
+  job hoàn tất ('issued') hoặc thất bại (bị xóa). Reservation pending mà giao dịch chưa gửi được
+  (vd. process dừng giữa chừng) tự hết hạn sau RESERVATION_TTL giây (TTL index).
+"""
+
+import uuid
+from loguru import logger
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+RESERVATION_PENDING = 'pending'
+RESERVATION_ISSUED = 'issued'
+
+
+class IdReservations:
+    def __init__(self, mongo_client):
+        """
+        Khởi tạo tập reservation. Không có network I/O ở đây, gọi load() khi khởi động.
+
+        Args:
+            mongo_client (MongoDBClient): MongoDB client.
+        """
+        self.mongo_client = mongo_client
+        self._issued = set()
+        self._pending: Dict[str, str] = {}
+        self.rejected = 0
+
+    def __len__(self) -> int:
+        return len(self._issued) + len(self._pending)
+
+    def status(self, cert_id: str) -> Optional[str]:
+        """
+        Trạng thái đã biết trong process này: 'issued', 'pending' hoặc None.
+        """
+        if cert_id in self._issued:
+            return RESERVATION_ISSUED
+        if cert_id in self._pending:
+            return RESERVATION_PENDING
+        return None
+
+    async def load(self, batch_size: int = 1000) -> None:
+        """
+        Nạp ID đã cấp từ collection reservations và certificates. Chứng chỉ chưa có reservation
+        (dữ liệu có trước reservation, lô Merkle) được ghi bổ sung là 'issued'.
+        """
+        reserved = set()
+        async for reservation in self.mongo_client.iter_documents(
+            self.mongo_client.reservation_collection, {}, ['status'], batch_size=batch_size
+        ):
+            reserved.add(reservation['_id'])
+            if reservation.get('status') == RESERVATION_ISSUED:
+                self._issued.add(reservation['_id'])
+
+        missing = []
+        async for certificate in self.mongo_client.iter_documents(
+            self.mongo_client.cert_collection, {}, ['id'], batch_size=batch_size
+        ):
+            self._issued.add(certificate['id'])
+            if certificate['id'] not in reserved:
+                missing.append(certificate['id'])
+            if len(missing) >= batch_size:
+                await self.mongo_client.mark_reservations_issued(missing)
+                missing = []
+        await self.mongo_client.mark_reservations_issued(missing)
+        logger.info(f"ID reservations loaded: {len(self._issued)} issued IDs")
+
+    async def reserve(self, cert_ids: List[str]) -> Tuple[str, Dict[str, str]]:
+        """
+        Giữ chỗ các ID chưa được cấp hay đang được cấp.
+
+        Args:
+            cert_ids (List[str]): Certificate IDs (không trùng nhau).
+
+        Returns:
+            Tuple[str, Dict[str, str]]: (token của lần giữ chỗ, ID bị từ chối -> 'issued' hoặc 'pending').
+        """
+        token = uuid.uuid4().hex
+        conflicts = {}
+        for cert_id in cert_ids:
+            status = self.status(cert_id)
+            if status:
+                conflicts[cert_id] = status
+        candidates = [cert_id for cert_id in cert_ids if cert_id not in conflicts]
+        # Giữ chỗ trong bộ nhớ trước lần await đầu tiên: request trùng trong process này bị từ chối ngay
+        for cert_id in candidates:
+            self._pending[cert_id] = token
+        try:
+            taken = await self.mongo_client.insert_reservations(candidates, token)
+            if taken:
+                statuses = await self.mongo_client.find_reservations(list(taken))
+                for cert_id in taken:
+                    self._pending.pop(cert_id, None)
+                    # Reservation vừa bị xóa hoặc hết hạn giữa hai lệnh: coi như đang được cấp
+                    conflicts[cert_id] = statuses.get(cert_id, RESERVATION_PENDING)
+                    if conflicts[cert_id] == RESERVATION_ISSUED:
+                        self._issued.add(cert_id)
+        except Exception:
+            await self.release(candidates, token)
+            raise
+        self.rejected += len(conflicts)
+        return token, conflicts
+
+    async def hold(self, cert_ids: List[str], token: str) -> None:
+        """
+        Giao dịch đã được gửi: giữ reservation pending cho đến khi job hoàn tất hoặc thất bại.
+        """
+        await self.mongo_client.hold_reservations(cert_ids, token)
+
+    async def release(self, cert_ids: Iterable[str], token: Optional[str] = None) -> None:
+        """
+        Giải phóng reservation pending (giao dịch không gửi được, bị revert hoặc bị drop).
+
+        Args:
+            cert_ids (Iterable[str]): Certificate IDs.
+            token (str): Chỉ giải phóng reservation của lần giữ chỗ này (None: của job đã thất bại).
+        """
+        cert_ids = [cert_id for cert_id in cert_ids if cert_id not in self._issued]
+        for cert_id in cert_ids:
+            if token is None or self._pending.get(cert_id) == token:
+                self._pending.pop(cert_id, None)
+        try:
+            await self.mongo_client.delete_reservations(cert_ids, token)
+        except Exception as e:
+            # Reservation chưa gửi giao dịch vẫn hết hạn theo TTL
+            logger.error(f"Lỗi khi giải phóng reservation {cert_ids[:10]}: {str(e)}")
+
+    async def mark_issued(self, cert_ids: Iterable[str]) -> None:
+        """
+        Chứng chỉ đã được cấp trên blockchain: ID không bao giờ được giữ chỗ lại.
+        """
+        cert_ids = [cert_id for cert_id in cert_ids if cert_id not in self._issued]
+        for cert_id in cert_ids:
+            self._pending.pop(cert_id, None)
+            self._issued.add(cert_id)
+        await self.mongo_client.mark_reservations_issued(cert_ids)
@@ -0,0 +1,267 @@
+"""Migrate certificate state from the v1 contract to the v2 contract, then verify it
+
+Đọc trạng thái contract v1 (certificates, merkleRoots, revokedLeaves, admins) cho mọi chứng chỉ
+và admin có trong MongoDB, bằng eth_call theo lô tại một block cố định, rồi chép phần còn thiếu
+sang contract v2 (migrateCertificates / migrateBatchedIds / migrateMerkleRoots / migrateRevokedLeaves / addAdmin),
+giữ nguyên ngày cấp. Chạy lại an toàn: phần đã có trên v2 được bỏ qua.
+v1 xóa chứng chỉ khi thu hồi; bản ghi đã thu hồi trong MongoDB mà không còn trên v1 được chép với
+revoked = true (digest và ngày cấp lấy từ MongoDB) để ID không được cấp lại trên v2. Bản ghi đã thu hồi
+nhưng thiếu ngày cấp không chép được và được báo là không khớp. ID thuộc lô Merkle đã anchor trên v1
+được ghi vào batchedIds của v2.
+Sau đó đối chiếu v1 với v2 cho từng bản ghi, in mỗi bản ghi không khớp dạng JSON, dòng cuối là tổng kết.
+Exit code 1 nếu có bản ghi không khớp hoặc giao dịch lỗi.
+
+Quy trình: deploy contracts/certificate_v2.sol bằng tài khoản PRIVATE_KEY (owner của v2), dừng cấp/thu hồi
+trên v1, chạy script này, --finalize để đóng migration, rồi đặt CONTRACT_ADDRESS=<v2> và CONTRACT_VERSION=2.
+
+Usage:
+    python -m backend.migrate_contract --v2-address 0x... [--v1-address 0x...] [--batch-size 1000] [--dry-run]
+    python -m backend.migrate_contract --v2-address 0x... --verify-only
+    python -m backend.migrate_contract --v2-address 0x... --finalize
+"""
+
+import sys
+import json
+import time
+import asyncio
+import argparse
+from hexbytes import HexBytes
+from typing import Any, Dict, List
+
+from backend.db.connector import MongoDBClient
+from backend.config.setting import web3_config
+from backend.utils.merkle import certificate_leaf
+from backend.blockchain.blockchain import BlockchainClient, certificate_key, certificate_digest
+from backend.blockchain.cross_verifier import CrossVerifier
+
+
+class ContractMigrator:
+    def __init__(self, mongo_client: MongoDBClient, source: BlockchainClient, target: BlockchainClient,
+                 chunk_size: int = 200, gas_budget: int = web3_config.revoke_batch_gas, dry_run: bool = False):
+        """
+        Chép trạng thái contract v1 sang v2.
+
+        Args:
+            mongo_client (MongoDBClient): Nguồn danh sách chứng chỉ và admin.
+            source (BlockchainClient): Client của contract v1.
+            target (BlockchainClient): Client của contract v2 (khóa ký là owner của v2).
+            chunk_size (int): Số phần tử tối đa mỗi giao dịch migrate.
+            gas_budget (int): Gas limit tối đa mỗi giao dịch migrate.
+            dry_run (bool): Chỉ đếm, không gửi giao dịch.
+        """
+        self.mongo_client = mongo_client
+        self.source = CrossVerifier(source, cache=False)
+        self.target = CrossVerifier(target, cache=False)
+        self.client = target
+        self.chunk_size = chunk_size
+        self.gas_budget = gas_budget
+        self.dry_run = dry_run
+        self.summary = {
+            'checked': 0, 'migrated': 0, 'migratedRevoked': 0, 'alreadyMigrated': 0, 'absentOnV1': 0,
+            'revokedWithoutIssueDate': 0, 'batchedIds': 0, 'merkleRoots': 0, 'revokedLeaves': 0, 'admins': 0,
+            'failedTransactions': 0, 'consistent': 0, 'mismatched': 0
+        }
+
+    @staticmethod
+    def _v1_call(record: Dict[str, Any]) -> tuple:
+        return ('certificates', (record['id'],))
+
+    @staticmethod
+    def _v2_call(record: Dict[str, Any]) -> tuple:
+        return ('certificates', (certificate_key(record['id']),))
+
+    @staticmethod
+    def _batched_call(record: Dict[str, Any]) -> tuple:
+        return ('batchedIds', (certificate_key(record['id']),))
+
+    @staticmethod
+    def _leaf(record: Dict[str, Any]) -> bytes:
+        return certificate_leaf(record['id'], record['recipientHash'], record['courseHash'])
+
+    def _calls(self, records: List[Dict[str, Any]]):
+        source_calls, target_calls = [], []
+        for record in records:
+            if record.get('merkleRoot'):
+                root = HexBytes(record['merkleRoot'])
+                calls = [('merkleRoots', (root,)), ('revokedLeaves', (self._leaf(record),))]
+                source_calls += calls
+                target_calls += calls + [self._batched_call(record)]
+            else:
+                source_calls.append(self._v1_call(record))
+                target_calls.append(self._v2_call(record))
+        return source_calls, target_calls
+
+    async def _read(self, records: List[Dict[str, Any]], block: int):
+        source_calls, target_calls = self._calls(records)
+        source, target = await asyncio.gather(
+            self.source.call_many(source_calls, block), self.target.call_many(target_calls, block)
+        )
+        for values in (source, target):
+            errors = [value for value in values.values() if isinstance(value, Exception)]
+            if errors:
+                raise errors[0]
+        return source, target
+
+    async def _send(self, build, items: list) -> None:
+        if not items or self.dry_run:
+            return
+        chunks = await self.client.plan_batches(build, items, self.chunk_size, self.gas_budget)
+        for chunk, receipt in await self.client.send_batches(build, chunks):
+            if isinstance(receipt, Exception):
+                self.summary['failedTransactions'] += 1
+                print(json.dumps({'error': str(getattr(receipt, 'detail', receipt)), 'items': len(chunk)}))
+
+    async def migrate(self, records: List[Dict[str, Any]]) -> None:
+        """
+        Chép một lô bản ghi MongoDB: chứng chỉ cấp lẻ, Merkle root và leaf đã thu hồi còn thiếu trên v2.
+        """
+        block = await self.client.get_block_number()
+        source, target = await self._read(records, block)
+        certificates, batched, roots, leaves = [], {}, {}, set()
+        for record in records:
+            if record.get('merkleRoot'):
+                root_call = ('merkleRoots', (HexBytes(record['merkleRoot']),))
+                leaf_call = ('revokedLeaves', (self._leaf(record),))
+                batched_call = self._batched_call(record)
+                if source[root_call] and not target[root_call]:
+                    roots[root_call[1][0]] = source[root_call]
+                if source[root_call] and target[batched_call] != root_call[1][0]:
+                    batched[batched_call[1][0]] = root_call[1][0]
+                if source[leaf_call] and not target[leaf_call]:
+                    leaves.add(leaf_call[1][0])
+                continue
+            cert_id, recipient_hash, course_hash, issue_date, _ = source[self._v1_call(record)]
+            if target[self._v2_call(record)][1]:
+                self.summary['alreadyMigrated'] += 1
+            elif cert_id:
+                certificates.append((cert_id, certificate_digest(recipient_hash, course_hash), issue_date, False))
+            elif not record.get('revoked'):
+                self.summary['absentOnV1'] += 1
+            elif not record.get('issueDate'):
+                # Không có ngày cấp thì không chép được; verify báo bản ghi này không khớp
+                self.summary['revokedWithoutIssueDate'] += 1
+                print(json.dumps({'id': record['id'], 'error': "revoked on v1 without issueDate in MongoDB"}, ensure_ascii=False))
+            else:
+                # v1 đã xóa chứng chỉ khi thu hồi: chép với revoked = true để ID không được cấp lại
+                certificates.append((
+                    record['id'], certificate_digest(record['recipientHash'], record['courseHash']),
+                    record['issueDate'], True
+                ))
+
+        functions = self.client.contract.functions
+        await self._send(lambda chunk: functions.migrateCertificates(
+            [item[0] for item in chunk], [item[1] for item in chunk], [item[2] for item in chunk], [item[3] for item in chunk]
+        ), certificates)
+        await self._send(lambda chunk: functions.migrateBatchedIds(
+            [key for key, _ in chunk], [root for _, root in chunk]
+        ), list(batched.items()))
+        await self._send(lambda chunk: functions.migrateMerkleRoots(
+            [root for root, _ in chunk], [anchored_at for _, anchored_at in chunk]
+        ), list(roots.items()))
+        await self._send(functions.migrateRevokedLeaves, sorted(leaves))
+        revoked = sum(1 for item in certificates if item[3])
+        self.summary['migrated'] += len(certificates) - revoked
+        self.summary['migratedRevoked'] += revoked
+        self.summary['batchedIds'] += len(batched)
+        self.summary['merkleRoots'] += len(roots)
+        self.summary['revokedLeaves'] += len(leaves)
+
+    async def migrate_admins(self) -> None:
+        """
+        Thêm vào v2 các admin đang hoạt động trên v1 (theo danh sách admin trong MongoDB).
+        """
+        admins = [admin['address'] for admin in await self.mongo_client.find_all_admins() if admin.get('status') == 'active']
+        if not admins:
+            return
+        block = await self.client.get_block_number()
+        calls = [('admins', (address,)) for address in admins]
+        source, target = await asyncio.gather(self.source.call_many(calls, block), self.target.call_many(calls, block))
+        for call in calls:
+            if source[call] is True and target[call] is False:
+                self.summary['admins'] += 1
+                if not self.dry_run:
+                    await self.client.add_admin(call[1][0])
+
+    async def verify(self, records: List[Dict[str, Any]], block: int) -> None:
+        """
+        Đối chiếu v1 với v2 cho một lô bản ghi tại cùng một block.
+        """
+        source, target = await self._read(records, block)
+        for record in records:
+            self.summary['checked'] += 1
+            mismatches = []
+            if record.get('merkleRoot'):
+                root_call = ('merkleRoots', (HexBytes(record['merkleRoot']),))
+                for call in (root_call, ('revokedLeaves', (self._leaf(record),))):
+                    if source[call] != target[call]:
+                        mismatches.append(call[0])
+                if source[root_call] and target[self._batched_call(record)] != root_call[1][0]:
+                    mismatches.append('batchedIds')
+            else:
+                cert_id, recipient_hash, course_hash, issue_date, _ = source[self._v1_call(record)]
+                digest, v2_issue_date, revoked = target[self._v2_call(record)]
+                if bool(cert_id) != (bool(v2_issue_date) and not revoked):
+                    mismatches.append('exists')
+                elif cert_id:
+                    if digest != certificate_digest(recipient_hash, course_hash):
+                        mismatches.append('digest')
+                    if v2_issue_date != issue_date:
+                        mismatches.append('issueDate')
+                elif record.get('revoked') and not v2_issue_date:
+                    # Đã thu hồi trên v1 nhưng v2 không giữ ID: ID có thể bị cấp lại
+                    mismatches.append('revoked')
+            if mismatches:
+                self.summary['mismatched'] += 1
+                print(json.dumps({'id': record['id'], 'mismatches': mismatches}, ensure_ascii=False))
+            else:
+                self.summary['consistent'] += 1
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Migrate certificates from the v1 contract to the v2 contract")
+    parser.add_argument("--v1-address", default=web3_config.contract_address, help="v1 contract (default: CONTRACT_ADDRESS)")
+    parser.add_argument("--v2-address", required=True, help="Deployed v2 contract, owned by PRIVATE_KEY")
+    parser.add_argument("--batch-size", type=int, default=1000, help="MongoDB records read per batch")
+    parser.add_argument("--chunk-size", type=int, default=200, help="Items per migration transaction")
+    parser.add_argument("--dry-run", action="store_true", help="Count what would be migrated, send nothing")
+    parser.add_argument("--verify-only", action="store_true", help="Only compare v1 and v2")
+    parser.add_argument("--finalize", action="store_true", help="Close the v2 migration (no further migrate* calls)")
+    args = parser.parse_args()
+
+    mongo_client = MongoDBClient()
+    source = BlockchainClient(contract_address=args.v1_address, contract_version=1)
+    target = BlockchainClient(provider=source.w3.provider, contract_address=args.v2_address, contract_version=2)
+    await asyncio.gather(mongo_client.ping(), source.connect())
+    migrator = ContractMigrator(mongo_client, source, target, chunk_size=args.chunk_size, dry_run=args.dry_run)
+    started = time.perf_counter()
+
+    try:
+        if args.finalize:
+            receipt = await target.send_transaction(target.contract.functions.finalizeMigration())
+            print(json.dumps({'finalized': receipt['transactionHash'].to_0x_hex()}))
+            return 0
+
+        fields = ['id', 'recipientHash', 'courseHash', 'merkleRoot', 'revoked', 'issueDate']
+        phases = ['verify'] if args.verify_only else ['migrate'] if args.dry_run else ['migrate', 'verify']
+        for phase in phases:
+            if phase == 'migrate':
+                await migrator.migrate_admins()
+            block = await target.get_block_number()
+            batch = []
+            async for record in mongo_client.iter_documents(mongo_client.cert_collection, {}, fields, batch_size=args.batch_size):
+                batch.append(record)
+                if len(batch) >= args.batch_size:
+                    await (migrator.migrate(batch) if phase == 'migrate' else migrator.verify(batch, block))
+                    batch = []
+            if batch:
+                await (migrator.migrate(batch) if phase == 'migrate' else migrator.verify(batch, block))
+
+        migrator.summary['seconds'] = round(time.perf_counter() - started, 3)
+        print(json.dumps({'summary': migrator.summary}))
+        return 1 if migrator.summary['mismatched'] or migrator.summary['failedTransactions'] else 0
+    finally:
+        await mongo_client.close()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
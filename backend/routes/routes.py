@@ -1,51 +1,60 @@
 import os
 import jwt
-import bcrypt
+import json
 import asyncio
-from io import BytesIO
 from loguru import logger
 from datetime import datetime, timedelta
-from fastapi.responses import StreamingResponse
-from fastapi import APIRouter, HTTPException, Depends
+from typing import Any, Dict, List, Optional
+from fastapi.responses import StreamingResponse, Response, JSONResponse
+from fastapi import APIRouter, HTTPException, Depends, Query, Header, Request, UploadFile, File
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 
 from backend.db.connector import MongoDBClient
+from backend.config.setting import web3_config
 from backend.blockchain.blockchain import BlockchainClient
-from backend.utils.utils import CertificateInput, RevokeInput, AdminInput
-from backend.utils.pdf_generator import generate_certificate_pdf
+from backend.blockchain.cross_verifier import CrossVerifier
+from backend.blockchain.admin_keys import AdminKeySet, ADMIN_ACTIVE
+from backend.blockchain.signer import hash_text, recover_signer
+from backend.utils.merkle import certificate_leaf, verify_proof
+from backend.utils.utils import CertificateInput, BatchCertificateInput, RevokeInput, BatchRevokeInput, AdminInput, OfflineVerifyInput
+from backend.utils.auth import AuthBusy, PasswordVerifier, TokenCache
+from backend.utils.pdf_cache import PdfCache
+from backend.utils.verify_cache import VerifyCache
+from backend.utils.pdf_renderer import PdfRenderer, PdfQueueFull
+from backend.jobs.issuance import JobManager
+from backend.jobs.reservations import IdReservations, RESERVATION_ISSUED
+from backend.jobs.bulk_import import CertificateImporter, ImportRejected
+from backend.dependencies import (
+    get_mongo_client, get_blockchain_client, get_pdf_renderer, get_pdf_cache, get_verify_cache,
+    get_cross_verifier, get_admin_keys, get_job_manager, get_certificate_importer,
+    get_password_verifier, get_token_cache, get_id_reservations
+)
 
 router = APIRouter(prefix="/api", tags=["Certificate"])
 
-mongo_client = MongoDBClient()
-blockchain_client = BlockchainClient()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/token")
 
 SECRET_KEY = os.getenv("JWT_SECRET_KEY")
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    try:
-        # Nếu hashed_password là chuỗi, encode thành bytes
-        if isinstance(hashed_password, str):
-            hashed_password_bytes = hashed_password.encode('utf-8')
-        else:
-            hashed_password_bytes = hashed_password
-        return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password_bytes)
-    except ValueError as e:
-        logger.error(f"Lỗi xác thực mật khẩu: {str(e)}")
-        return False
-
-def verify_token(token: str = Depends(oauth2_scheme)):
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
-        if payload.get("role") != "super_admin":
-            raise HTTPException(status_code=403, detail="Không có quyền admin")
-        return payload
-    except Exception:
-        raise HTTPException(status_code=401, detail="Token không hợp lệ")
+def verify_token(token: str = Depends(oauth2_scheme), token_cache: TokenCache = Depends(get_token_cache)):
+    payload = token_cache.get(token)
+    if payload is None:
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
+        except Exception:
+            raise HTTPException(status_code=401, detail="Token không hợp lệ")
+        token_cache.set(token, payload)
+    if payload.get("role") != "super_admin":
+        raise HTTPException(status_code=403, detail="Không có quyền admin")
+    return payload
 
 # API tạo token
 @router.post("/token")
-async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends()):
+async def login_for_access_token(
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    mongo_client: MongoDBClient = Depends(get_mongo_client),
+    password_verifier: PasswordVerifier = Depends(get_password_verifier)
+):
     """
     Tạo token JWT cho người dùng.
 
@@ -56,8 +65,8 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
         dict: Token JWT và loại token.
     """
     try:
-        user = mongo_client.user_collection.find_one({"username": form_data.username})
-        if not user or not verify_password(form_data.password, user["password"]):
+        user = await mongo_client.find_user(form_data.username)
+        if not user or not await password_verifier.verify(form_data.password, user["password"]):
             raise HTTPException(status_code=401, detail="Tên người dùng hoặc mật khẩu không đúng")
         if user.get("role") != "super_admin":
             raise HTTPException(status_code=403, detail="Không có quyền admin")
@@ -70,73 +79,286 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
         token = jwt.encode(token_data, SECRET_KEY, algorithm="HS256")
         logger.info(f"Đã cấp token cho {form_data.username}")
         return {"access_token": token, "token_type": "bearer"}
+    except AuthBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Lỗi khi tạo token: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/issue-certificate")
-async def issue_certificate(data: CertificateInput, payload=Depends(verify_token)):
+@router.post("/issue-certificate", status_code=202)
+async def issue_certificate(
+    data: CertificateInput,
+    payload=Depends(verify_token),
+    job_manager: JobManager = Depends(get_job_manager),
+    blockchain_client: BlockchainClient = Depends(get_blockchain_client),
+    id_reservations: IdReservations = Depends(get_id_reservations)
+):
     """
-    Issue new certificate and save to MongoDB.
+    Issue new certificate: gửi giao dịch và trả về job theo dõi xác nhận.
+    Chứng chỉ được ghi vào MongoDB và PDF được render khi giao dịch mined.
+    ID được giữ chỗ trước khi ký: ID đã cấp bị từ chối (409) mà không gửi giao dịch,
+    ID đang được cấp trả về job hiện có.
 
     Args:
         data (CertificateInput): Certificate data (id, recipient, course).
 
     Returns:
-        dict: Thông báo và txHash.
+        JSONResponse: 202 với jobId, txHash, statusUrl và eventsUrl.
     """
     try:
-        recipient_hash = blockchain_client.calculate_hash(data.recipient)
-        course_hash = blockchain_client.calculate_hash(data.course)
-        signature = blockchain_client.create_signature(data.id, recipient_hash, course_hash)
+        token, conflicts = await id_reservations.reserve([data.id])
+        if conflicts.get(data.id) == RESERVATION_ISSUED:
+            raise HTTPException(status_code=409, detail=f"Chứng chỉ ID {data.id} đã được cấp")
+        if conflicts:
+            job = await job_manager.find_active_job(data.id)
+            if not job:
+                raise HTTPException(status_code=409, detail=f"Chứng chỉ ID {data.id} đang được cấp")
+        else:
+            try:
+                recipient_hash = blockchain_client.calculate_hash(data.recipient)
+                course_hash = blockchain_client.calculate_hash(data.course)
+                # Chữ ký phải của chính tài khoản gửi giao dịch (contract kiểm tra msg.sender)
+                signer = await blockchain_client.signers.acquire()
+                signature = blockchain_client.create_signature(data.id, recipient_hash, course_hash, signer=signer)
 
-        tx_receipt = await blockchain_client.issue_certificate(
-            data.id, recipient_hash, course_hash, signature
-        )
-        if tx_receipt.status == 0:
-            logger.error(f"Giao dịch cấp chứng chỉ ID {data.id} thất bại")
-            raise HTTPException(status_code=500, detail="Giao dịch thất bại trên blockchain")
-        
-        certificate_data = {
-            'id': data.id,
-            'recipient': data.recipient,
-            'recipientHash': recipient_hash,
-            'course': data.course,
-            'courseHash': course_hash,
-            'issueDate': int(blockchain_client.w3.eth.get_block('latest').timestamp),
-            'signature': signature,
-            'txHash': tx_receipt['transactionHash'].hex(),
-            'revoked': False
-        }
-        mongo_client.insert_certificate(certificate_data)
-        
-        tx_hash = tx_receipt['transactionHash'].hex()
-        block = blockchain_client.w3.eth.get_block(tx_receipt['blockNumber'])
-        issue_date = datetime.fromtimestamp(block['timestamp']).strftime("%d/%m/%Y")
-        pdf_data = generate_certificate_pdf(
-               cert_id=data.id,
-               recipient=data.recipient,
-               course=data.course,
-               issue_date=issue_date,
-               tx_hash=tx_hash
-            )
+                tx_hash = await blockchain_client.issue_certificate(
+                    data.id, recipient_hash, course_hash, signature, wait=False, signer=signer
+                )
+            except Exception:
+                await id_reservations.release([data.id], token)
+                raise
+            await id_reservations.hold([data.id], token)
+            job = await job_manager.create_issue_job(data, recipient_hash, course_hash, signature, tx_hash)
+            logger.info(f"Đã gửi giao dịch cấp chứng chỉ ID {data.id}, job {job['_id']}")
 
-        return StreamingResponse(
-               BytesIO(pdf_data),
-               media_type="application/pdf",
-               headers={"Content-Disposition": f"attachment; filename=certificate_{data.id}.pdf"}
-            )
-        
+        return JSONResponse(status_code=202, content={
+            **JobManager.serialize(job),
+            'statusUrl': f"/api/jobs/{job['_id']}",
+            'eventsUrl': f"/api/jobs/{job['_id']}/events"
+        })
+
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Lỗi khi cấp chứng chỉ: {str(e)}")
+        logger.error(f"Lỗi khi cấp chứng chỉ ID {data.id}: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/certificates/import")
+async def import_certificates(
+    file: UploadFile = File(...),
+    payload=Depends(verify_token),
+    certificate_importer: CertificateImporter = Depends(get_certificate_importer)
+):
+    """
+    Bulk import certificates from a CSV/JSONL file (cột id, recipient, course).
+
+    Args:
+        file (UploadFile): File CSV hoặc JSONL.
+
+    Returns:
+        StreamingResponse: Kết quả từng dòng dạng NDJSON, dòng cuối là tổng kết.
+    """
+    try:
+        record = await certificate_importer.create(file)
+        certificate_importer.claim(record)
+    except ImportRejected as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        logger.error(f"Lỗi khi cấp chứng chỉ ID {data.id}: {str(e)}")
+        logger.error(f"Lỗi khi tạo import: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+    logger.info(f"Import {record['_id']} started from {record['filename']}")
+    return StreamingResponse(
+        certificate_importer.run(record),
+        media_type="application/x-ndjson",
+        headers={"X-Import-Id": record['_id']}
+    )
+
+@router.post("/certificates/import/{import_id}/resume")
+async def resume_import(
+    import_id: str,
+    payload=Depends(verify_token),
+    mongo_client: MongoDBClient = Depends(get_mongo_client),
+    certificate_importer: CertificateImporter = Depends(get_certificate_importer)
+):
+    """
+    Tiếp tục một import bị gián đoạn từ dòng cuối cùng đã xử lý.
+
+    Args:
+        import_id (str): Import ID.
+
+    Returns:
+        StreamingResponse: Kết quả các dòng còn lại dạng NDJSON.
+    """
+    record = await mongo_client.find_import(import_id)
+    if not record:
+        raise HTTPException(status_code=404, detail="Không tìm thấy import")
+    try:
+        certificate_importer.claim(record)
+    except ImportRejected as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return StreamingResponse(
+        certificate_importer.run(record),
+        media_type="application/x-ndjson",
+        headers={"X-Import-Id": import_id}
+    )
+
+@router.get("/certificates/import/{import_id}")
+async def get_import(import_id: str, payload=Depends(verify_token), mongo_client: MongoDBClient = Depends(get_mongo_client)):
+    """
+    Trạng thái và bộ đếm của một import.
+    """
+    record = await mongo_client.find_import(import_id)
+    if not record:
+        raise HTTPException(status_code=404, detail="Không tìm thấy import")
+    return CertificateImporter.serialize(record)
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str, job_manager: JobManager = Depends(get_job_manager)):
+    """
+    Trạng thái của một job cấp chứng chỉ.
+
+    Args:
+        job_id (str): Job ID.
+
+    Returns:
+        dict: Trạng thái job (submitted, completed, failed).
+    """
+    job = await job_manager.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Không tìm thấy job")
+    return JobManager.serialize(job)
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str, request: Request, job_manager: JobManager = Depends(get_job_manager)):
+    """
+    Server-sent events theo dõi một job đến khi hoàn tất hoặc thất bại.
+
+    Args:
+        job_id (str): Job ID.
+
+    Returns:
+        StreamingResponse: text/event-stream.
+    """
+    job = await job_manager.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Không tìm thấy job")
+    return StreamingResponse(
+        job_manager.stream(job, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/issue-certificates/batch")
+async def issue_certificates_batch(
+    data: BatchCertificateInput,
+    payload=Depends(verify_token),
+    mongo_client: MongoDBClient = Depends(get_mongo_client),
+    blockchain_client: BlockchainClient = Depends(get_blockchain_client),
+    verify_cache: VerifyCache = Depends(get_verify_cache),
+    id_reservations: IdReservations = Depends(get_id_reservations)
+):
+    """
+    Issue a batch of certificates anchored by Merkle roots (một root và một giao dịch cho mỗi phần của lô,
+    theo MERKLE_BATCH_SIZE, MERKLE_BATCH_GAS). ID đã cấp hoặc đang được cấp bị từ chối (409) trước khi ký và gửi giao dịch.
+
+    Args:
+        data (BatchCertificateInput): Certificates of the batch (id, recipient, course).
+
+    Returns:
+        dict: Thông báo, số chứng chỉ đã cấp, các lô (merkleRoot, txHash, count) và các lô thất bại.
+    """
+    try:
+        certificates = data.certificates
+        if not certificates:
+            raise HTTPException(status_code=400, detail="Lô chứng chỉ rỗng")
+        if len(certificates) > web3_config.merkle_batch_max_size:
+            raise HTTPException(status_code=400, detail=f"Lô chứng chỉ vượt quá {web3_config.merkle_batch_max_size}")
+        ids = [cert.id for cert in certificates]
+        if len(set(ids)) != len(ids):
+            raise HTTPException(status_code=400, detail="ID chứng chỉ bị trùng trong lô")
+
+        token, conflicts = await id_reservations.reserve(ids)
+        if conflicts:
+            await id_reservations.release([cert_id for cert_id in ids if cert_id not in conflicts], token)
+            raise HTTPException(
+                status_code=409, detail=f"ID chứng chỉ đã được cấp hoặc đang được cấp: {', '.join(sorted(conflicts)[:20])}"
+            )
+
+        try:
+            signed = await blockchain_client.sign_certificates(certificates)
+            records = [
+                {
+                    'id': cert.id,
+                    'recipient': cert.recipient,
+                    'recipientHash': recipient_hash,
+                    'course': cert.course,
+                    'courseHash': course_hash,
+                    'signature': signature,
+                }
+                for cert, (recipient_hash, course_hash, signature) in zip(certificates, signed)
+            ]
+
+            results = await blockchain_client.anchor_merkle_batches(records)
+        except Exception:
+            await id_reservations.release(ids, token)
+            raise
+
+        batches = []
+        failed = []
+        anchored = []
+        for chunk, receipt in results:
+            chunk_ids = [record['id'] for record in chunk]
+            if isinstance(receipt, Exception):
+                await id_reservations.release(chunk_ids, token)
+                failed.append({'ids': chunk_ids, 'error': str(getattr(receipt, 'detail', receipt))})
+                continue
+            tree = blockchain_client.merkle_tree(chunk)
+            merkle_root = blockchain_client.w3.to_hex(tree.root)
+            tx_hash = receipt['transactionHash'].to_0x_hex()
+            block = await blockchain_client.get_block(receipt['blockNumber'])
+            for index, record in enumerate(chunk):
+                record.update({
+                    'issueDate': int(block['timestamp']),
+                    'txHash': tx_hash,
+                    'merkleRoot': merkle_root,
+                    'merkleProof': [blockchain_client.w3.to_hex(node) for node in tree.proof(index)],
+                    'event': 'MerkleRootAnchored',
+                    'revoked': False
+                })
+            anchored.extend(chunk)
+            batches.append({'merkleRoot': merkle_root, 'txHash': tx_hash, 'count': len(chunk)})
+
+        if anchored:
+            await id_reservations.mark_issued([record['id'] for record in anchored])
+            await mongo_client.insert_certificates(anchored)
+            for record in anchored:
+                verify_cache.invalidate(record['id'])
+
+        if failed and not anchored:
+            raise HTTPException(status_code=500, detail=failed[0]['error'])
+        return {
+            'message': f'Cấp {len(anchored)} chứng chỉ thành công',
+            'count': len(anchored),
+            'batches': batches,
+            'failed': failed
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Lỗi khi cấp lô chứng chỉ: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/revoke-certificate")
-async def revoke_certificate(data: RevokeInput, payload=Depends(verify_token)):
+async def revoke_certificate(
+    data: RevokeInput,
+    payload=Depends(verify_token),
+    mongo_client: MongoDBClient = Depends(get_mongo_client),
+    blockchain_client: BlockchainClient = Depends(get_blockchain_client),
+    verify_cache: VerifyCache = Depends(get_verify_cache),
+    pdf_cache: PdfCache = Depends(get_pdf_cache)
+):
     """
     Revoke certificate and update MongoDB.
 
@@ -147,86 +369,443 @@ async def revoke_certificate(data: RevokeInput, payload=Depends(verify_token)):
         dict: Thông báo và txHash.
     """
     try:
-        tx_receipt = await blockchain_client.revoke_certificate(data.id)
-        mongo_client.update_certificate(data.id, {
+        certificate = await mongo_client.find_certificate(data.id)
+        if certificate and certificate.get('merkleRoot'):
+            tx_receipt = await blockchain_client.revoke_batched_certificate(
+                data.id, certificate['recipientHash'], certificate['courseHash']
+            )
+        else:
+            tx_receipt = await blockchain_client.revoke_certificate(data.id)
+        await mongo_client.update_certificate(data.id, {
             'revoked': True,
-            'revokeTxHash': tx_receipt['transactionHash'].hex(),
+            'revokeTxHash': tx_receipt['transactionHash'].to_0x_hex(),
             'event': 'CertificateRevoked'
         })
+        verify_cache.invalidate(data.id)
+        await pdf_cache.invalidate(data.id)
         return {
             'message': 'Thu hồi chứng chỉ thành công',
-            'txHash': tx_receipt['transactionHash'].hex()
+            'txHash': tx_receipt['transactionHash'].to_0x_hex()
         }
     except Exception as e:
         logger.error(f"Lỗi khi thu hồi chứng chỉ: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/revoke-certificates/batch")
+async def revoke_certificates_batch(
+    data: BatchRevokeInput,
+    payload=Depends(verify_token),
+    mongo_client: MongoDBClient = Depends(get_mongo_client),
+    blockchain_client: BlockchainClient = Depends(get_blockchain_client),
+    verify_cache: VerifyCache = Depends(get_verify_cache),
+    pdf_cache: PdfCache = Depends(get_pdf_cache)
+):
+    """
+    Revoke many certificates: revokeCertificates theo lô vừa gas budget (REVOKE_BATCH_SIZE, REVOKE_BATCH_GAS),
+    chứng chỉ thuộc lô Merkle dùng revokeBatchedCertificate. MongoDB được cập nhật bằng một bulk_write.
+
+    Args:
+        data (BatchRevokeInput): Certificate IDs.
+
+    Returns:
+        dict: Số chứng chỉ đã thu hồi, các giao dịch, các lô thất bại, ID không tồn tại hoặc đã thu hồi.
+    """
+    try:
+        ids = list(dict.fromkeys(data.ids))
+        if not ids:
+            raise HTTPException(status_code=400, detail="Danh sách thu hồi rỗng")
+        if len(ids) > web3_config.revoke_max_ids:
+            raise HTTPException(status_code=400, detail=f"Danh sách thu hồi vượt quá {web3_config.revoke_max_ids}")
+
+        certificates = {cert['id']: cert for cert in await mongo_client.find_certificates_by_ids(ids)}
+        not_found = [cert_id for cert_id in ids if cert_id not in certificates]
+        already_revoked = [cert_id for cert_id in ids if certificates.get(cert_id, {}).get('revoked')]
+        targets = [certificates[cert_id] for cert_id in ids if cert_id in certificates and not certificates[cert_id].get('revoked')]
+
+        results = []
+        direct_ids = [cert['id'] for cert in targets if not cert.get('merkleRoot')]
+        if direct_ids:
+            results += await blockchain_client.revoke_certificates(direct_ids)
+        batched = [cert for cert in targets if cert.get('merkleRoot')]
+        if batched:
+            results += await blockchain_client.revoke_batched_certificates(batched)
+
+        updates = []
+        transactions = []
+        failed = []
+        for chunk, receipt in results:
+            if isinstance(receipt, Exception):
+                failed.append({'ids': chunk, 'error': str(getattr(receipt, 'detail', receipt))})
+                continue
+            tx_hash = receipt['transactionHash'].to_0x_hex()
+            transactions.append({'txHash': tx_hash, 'count': len(chunk)})
+            updates.extend((cert_id, {
+                'revoked': True,
+                'revokeTxHash': tx_hash,
+                'event': 'CertificateRevoked'
+            }) for cert_id in chunk)
+
+        await mongo_client.bulk_update_certificates(updates)
+        for cert_id, _ in updates:
+            verify_cache.invalidate(cert_id)
+            await pdf_cache.invalidate(cert_id)
+
+        if failed and not updates:
+            raise HTTPException(status_code=500, detail=failed[0]['error'])
+        return {
+            'message': f'Thu hồi {len(updates)} chứng chỉ thành công',
+            'revoked': len(updates),
+            'transactions': transactions,
+            'failed': failed,
+            'notFound': not_found,
+            'alreadyRevoked': already_revoked
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Lỗi khi thu hồi lô chứng chỉ: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def recover_certificate_signer(certificate: Dict[str, Any]) -> Optional[str]:
+    try:
+        return recover_signer(
+            certificate['id'], certificate['recipientHash'], certificate['courseHash'], certificate['signature']
+        )
+    except Exception as e:
+        logger.error(f"Không khôi phục được người ký chứng chỉ ID {certificate.get('id')}: {str(e)}")
+        return None
+
+def build_verify_response(certificate: Dict[str, Any]) -> Dict[str, Any]:
+    response = {
+        'id': certificate['id'],
+        'recipient': certificate['recipient'],
+        'recipientHash': certificate['recipientHash'][:18] + '...' + certificate['recipientHash'][-8:],
+        'course': certificate['course'],
+        'courseHash': certificate['courseHash'][:18] + '...' + certificate['courseHash'][-8:],
+        'issueDate': certificate['issueDate'],
+        'signature': certificate['signature'][:18] + '...' + certificate['signature'][-8:],
+        'signer': recover_certificate_signer(certificate),
+        'revoked': certificate["revoked"]
+    }
+    if certificate.get('merkleRoot'):
+        leaf = certificate_leaf(certificate['id'], certificate['recipientHash'], certificate['courseHash'])
+        response['merkleRoot'] = certificate['merkleRoot']
+        response['merkleProofValid'] = verify_proof(leaf, certificate['merkleProof'], certificate['merkleRoot'])
+    return response
+
+def with_signature_check(response: Dict[str, Any], admin_keys: AdminKeySet) -> Dict[str, Any]:
+    status = admin_keys.status(response['signer']) if response.get('signer') else None
+    return {
+        **response,
+        'signatureCheck': {
+            'signer': response.get('signer'),
+            'signerStatus': status,
+            'valid': status == ADMIN_ACTIVE
+        }
+    }
 
 @router.get("/verify-certificate/{id}")
-async def verify_certificate(id: str):
+async def verify_certificate(
+    id: str,
+    onchain: bool = Query(False),
+    offline: bool = Query(False),
+    mongo_client: MongoDBClient = Depends(get_mongo_client),
+    verify_cache: VerifyCache = Depends(get_verify_cache),
+    cross_verifier: CrossVerifier = Depends(get_cross_verifier),
+    admin_keys: AdminKeySet = Depends(get_admin_keys)
+):
     """
-    Tra cứu chứng chỉ từ blockchain và MongoDB.
+    Tra cứu chứng chỉ từ MongoDB, tùy chọn đối chiếu với trạng thái trên blockchain.
+
+    Args:
+        id (str): certificate ID.
+        onchain (bool): Đối chiếu bản ghi với smart contract (đọc tại block được pin, cache theo block).
+        offline (bool): Kiểm tra người ký (khôi phục từ chữ ký) với tập admin trong bộ nhớ, không cần RPC.
     """
     try:
-        certificate = mongo_client.find_certificate(id)
+        # Lấy trước khi đọc MongoDB: response cũ (bị invalidate trong lúc chờ) không được cache
+        generation = verify_cache.generation()
+        if not onchain:
+            hit, cached = await verify_cache.get(id)
+            if hit:
+                if cached is None:
+                    raise HTTPException(status_code=404, detail="Chứng chỉ không tồn tại")
+                return with_signature_check(cached, admin_keys) if offline else cached
+
+        certificate = await mongo_client.find_certificate(id)
         if not certificate:
             logger.error(f"Chứng chỉ ID {id} không tìm thấy trong database")
+            verify_cache.set_negative(id, generation)
             raise HTTPException(status_code=404, detail="Chứng chỉ không tồn tại")
-        
-        # cert_data = await blockchain_client.verify_certificate(id)
-        # if not cert_data:
-        #     raise HTTPException(status_code=404, detail="Không tìm thấy dữ liệu gốc")
-        
-        # if (certificate['recipientHash'] != cert_data[1].hex() or 
-        #     certificate['courseHash'] != cert_data[2].hex() or 
-        #     certificate['signature'] != cert_data[4].hex()):
-        #     logger.error(f"Dữ liệu chứng chỉ ID {id} không khớp giữa MongoDB và blockchain")
-        #     raise HTTPException(status_code=400, detail="Dữ liệu chứng chỉ không khớp")
-        
-        return {
-            'id': certificate['id'],
-            'recipient': certificate['recipient'],
-            'recipientHash': certificate['recipientHash'][:18] + '...' + certificate['recipientHash'][-8:],
-            'course': certificate['course'],
-            'courseHash': certificate['courseHash'][:18] + '...' + certificate['courseHash'][-8:],
-            'issueDate': certificate['issueDate'],
-            'signature': certificate['signature'][:18] + '...' + certificate['signature'][-8:],
-            'revoked': certificate["revoked"]
-        }
+
+        response = build_verify_response(certificate)
+        verify_cache.set(id, response, generation)
+        if onchain:
+            block, report = await cross_verifier.verify_record(certificate)
+            if report['consistent'] is False:
+                logger.error(f"Dữ liệu chứng chỉ ID {id} không khớp giữa MongoDB và blockchain: {report['mismatches']}")
+            response = {
+                **response,
+                'onchain': {
+                    'block': block,
+                    'consistent': report['consistent'],
+                    'mismatches': report['mismatches'],
+                    'error': report.get('error')
+                }
+            }
+        return with_signature_check(response, admin_keys) if offline else response
     except Exception as e:
         logger.error(f"Lỗi khi tra cứu chứng chỉ: {str(e)}")
         raise HTTPException(status_code=404, detail=str(e))
 
 
+@router.post("/verify-offline")
+async def verify_offline(data: OfflineVerifyInput, mongo_client: MongoDBClient = Depends(get_mongo_client), admin_keys: AdminKeySet = Depends(get_admin_keys)):
+    """
+    Kiểm tra một yêu cầu xác thực (id, tên người nhận, khóa học) bằng mật mã, không cần RPC.
+    Người ký được khôi phục từ chữ ký và so với tập admin trong bộ nhớ. Nếu không gửi kèm chữ ký,
+    chữ ký và trạng thái thu hồi được đọc từ MongoDB.
+
+    Args:
+        data (OfflineVerifyInput): id, recipient, course và (tùy chọn) signature.
+
+    Returns:
+        dict: Người ký, trạng thái của người ký và kết quả kiểm tra.
+    """
+    signature = data.signature
+    revoked = None
+    if signature is None:
+        certificate = await mongo_client.find_certificate(data.id)
+        if not certificate:
+            raise HTTPException(status_code=404, detail="Chứng chỉ không tồn tại")
+        signature = certificate['signature']
+        revoked = certificate['revoked']
+
+    recipient_hash = hash_text(data.recipient)
+    course_hash = hash_text(data.course)
+    try:
+        signer = recover_signer(data.id, recipient_hash, course_hash, signature)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Chữ ký không hợp lệ: {str(e)}")
+    # Dữ liệu bị sửa (tên, khóa học, ID) cho ra một địa chỉ ngẫu nhiên, không thuộc tập admin
+    status = admin_keys.status(signer)
+    return {
+        'id': data.id,
+        'recipientHash': recipient_hash,
+        'courseHash': course_hash,
+        'signer': signer,
+        'signerStatus': status,
+        'valid': status == ADMIN_ACTIVE,
+        'revoked': revoked
+    }
+
+
+@router.get("/verify-certificate/{id}/proof")
+async def verify_certificate_proof(id: str, mongo_client: MongoDBClient = Depends(get_mongo_client), blockchain_client: BlockchainClient = Depends(get_blockchain_client)):
+    """
+    Kiểm tra inclusion proof của chứng chỉ thuộc lô Merkle với root đã anchor trên blockchain.
+    """
+    certificate = await mongo_client.find_certificate(id)
+    if not certificate:
+        raise HTTPException(status_code=404, detail="Chứng chỉ không tồn tại")
+    if not certificate.get('merkleRoot'):
+        raise HTTPException(status_code=400, detail="Chứng chỉ không được cấp theo lô Merkle")
+
+    leaf = certificate_leaf(certificate['id'], certificate['recipientHash'], certificate['courseHash'])
+    valid_onchain = await blockchain_client.verify_merkle_proof(
+        certificate['merkleRoot'], leaf, certificate['merkleProof']
+    )
+    return {
+        'id': certificate['id'],
+        'merkleRoot': certificate['merkleRoot'],
+        'merkleProof': certificate['merkleProof'],
+        'leaf': blockchain_client.w3.to_hex(leaf),
+        'valid': valid_onchain,
+        'revoked': certificate['revoked']
+    }
+
+
+@router.get("/certificates/{id}/pdf")
+async def download_certificate_pdf(
+    id: str,
+    if_none_match: Optional[str] = Header(default=None),
+    mongo_client: MongoDBClient = Depends(get_mongo_client),
+    pdf_cache: PdfCache = Depends(get_pdf_cache),
+    pdf_renderer: PdfRenderer = Depends(get_pdf_renderer)
+):
+    """
+    Tải lại PDF chứng chỉ, phục vụ từ cache nội dung (ETag = content address).
+
+    Args:
+        id (str): certificate ID.
+        if_none_match (str): ETag trình duyệt/CDN đã có.
+
+    Returns:
+        Response: PDF, hoặc 304 nếu ETag khớp.
+    """
+    try:
+        certificate = await mongo_client.find_certificate(id)
+        if not certificate:
+            raise HTTPException(status_code=404, detail="Chứng chỉ không tồn tại")
+        if certificate.get('revoked'):
+            raise HTTPException(status_code=410, detail="Chứng chỉ đã bị thu hồi")
+
+        key = PdfCache.cache_key(id, certificate['txHash'])
+        etag = f'"{key}"'
+        headers = {
+            'ETag': etag,
+            'Cache-Control': 'no-cache',
+            'Content-Disposition': f"attachment; filename=certificate_{id}.pdf"
+        }
+        if if_none_match and (if_none_match.strip() == '*' or etag in [tag.strip() for tag in if_none_match.split(',')]):
+            return Response(status_code=304, headers=headers)
+
+        pdf_data = await pdf_cache.get(id, key)
+        if pdf_data is None:
+            pdf_data = await pdf_renderer.render(
+                cert_id=id,
+                recipient=certificate['recipient'],
+                course=certificate['course'],
+                issue_date=datetime.fromtimestamp(certificate['issueDate']).strftime("%d/%m/%Y"),
+                tx_hash=certificate['txHash']
+            )
+            await pdf_cache.put(id, key, pdf_data)
+
+        return Response(content=pdf_data, media_type="application/pdf", headers=headers)
+    except HTTPException:
+        raise
+    except PdfQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        logger.error(f"Lỗi khi tải PDF chứng chỉ: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def build_event_query(
+    event: Optional[str],
+    from_date: Optional[int],
+    to_date: Optional[int],
+    date_field: str,
+    revoked: Optional[bool] = None
+) -> Dict[str, Any]:
+    """
+    Tạo bộ lọc MongoDB cho danh sách sự kiện.
+    """
+    query = {}
+    if event:
+        query['event'] = event
+    if revoked is not None:
+        query['revoked'] = revoked
+    if from_date is not None or to_date is not None:
+        query[date_field] = {}
+        if from_date is not None:
+            query[date_field]['$gte'] = from_date
+        if to_date is not None:
+            query[date_field]['$lte'] = to_date
+    return query
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    return [field.strip() for field in fields.split(',') if field.strip()] if fields else None
+
+
 @router.get("/events")
-async def get_events():
+async def get_events(
+    event: Optional[str] = None,
+    revoked: Optional[bool] = None,
+    from_date: Optional[int] = None,
+    to_date: Optional[int] = None,
+    fields: Optional[str] = None,
+    certificate_cursor: Optional[str] = None,
+    admin_cursor: Optional[str] = None,
+    limit: int = Query(default=50, ge=1, le=500),
+    mongo_client: MongoDBClient = Depends(get_mongo_client)
+):
     """
-    Lấy tất cả sự kiện chứng chỉ và admin từ MongoDB.
+    Lấy một trang sự kiện chứng chỉ và admin từ MongoDB (keyset pagination trên _id).
+
+    Args:
+        event (str): Lọc theo loại sự kiện.
+        revoked (bool): Lọc chứng chỉ theo trạng thái thu hồi.
+        from_date (int), to_date (int): Khoảng thời gian (unix timestamp).
+        fields (str): Danh sách trường cần lấy, phân cách bởi dấu phẩy.
+        certificate_cursor (str), admin_cursor (str): Cursor trả về từ trang trước.
+        limit (int): Số bản ghi tối đa mỗi loại.
 
     Returns:
-        dict: Danh sách sự kiện.
+        dict: Danh sách sự kiện và cursor trang tiếp theo.
     """
     try:
-        cert_events = mongo_client.find_all_certificates()
-        admin_events = mongo_client.find_all_admins()
+        projection = parse_fields(fields)
+        cert_events, next_certificate_cursor = await mongo_client.find_certificates_page(
+            build_event_query(event, from_date, to_date, 'issueDate', revoked),
+            after=certificate_cursor, limit=limit, fields=projection
+        )
+        admin_events, next_admin_cursor = await mongo_client.find_admins_page(
+            build_event_query(event, from_date, to_date, 'timestamp'),
+            after=admin_cursor, limit=limit, fields=projection
+        )
         return {
             'certificate_events': cert_events,
-            'admin_events': admin_events
+            'admin_events': admin_events,
+            'next_certificate_cursor': next_certificate_cursor,
+            'next_admin_cursor': next_admin_cursor
         }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Lỗi khi lấy sự kiện: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/events/export")
+async def export_events(
+    type: str = Query(default='certificates', pattern='^(certificates|admins)$'),
+    event: Optional[str] = None,
+    revoked: Optional[bool] = None,
+    from_date: Optional[int] = None,
+    to_date: Optional[int] = None,
+    fields: Optional[str] = None,
+    mongo_client: MongoDBClient = Depends(get_mongo_client)
+):
+    """
+    Xuất sự kiện dạng NDJSON, stream trực tiếp từ cursor MongoDB (bộ nhớ không phụ thuộc số bản ghi).
+    """
+    if type == 'certificates':
+        collection = mongo_client.cert_collection
+        query = build_event_query(event, from_date, to_date, 'issueDate', revoked)
+    else:
+        collection = mongo_client.admin_collection
+        query = build_event_query(event, from_date, to_date, 'timestamp')
+
+    async def generate():
+        async for document in mongo_client.iter_documents(collection, query, parse_fields(fields)):
+            yield json.dumps(document, default=str, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(
+        generate(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f"attachment; filename={type}_events.ndjson"}
+    )
     
 
 @router.post("/add-admin")
-async def add_admin(data: AdminInput, payload=Depends(verify_token)):
+async def add_admin(
+    data: AdminInput,
+    payload=Depends(verify_token),
+    mongo_client: MongoDBClient = Depends(get_mongo_client),
+    blockchain_client: BlockchainClient = Depends(get_blockchain_client),
+    admin_keys: AdminKeySet = Depends(get_admin_keys)
+):
     try:
         if not data.address.startswith('0x') or len(data.address) != 42:
             raise ValueError("Địa chỉ admin không hợp lệ")
         
         tx_receipt = await blockchain_client.add_admin(data.address)
-        tx_hash = tx_receipt['transactionHash'].hex()
-        mongo_client.update_admin(data.address, 'active', tx_hash=tx_hash, event='AdminAdded')
+        tx_hash = tx_receipt['transactionHash'].to_0x_hex()
+        await mongo_client.update_admin(data.address, 'active', tx_hash=tx_hash, event='AdminAdded')
+        admin_keys.set_status(data.address, 'active')
         
         admin_data = {
             'address': data.address,
@@ -235,7 +814,7 @@ async def add_admin(data: AdminInput, payload=Depends(verify_token)):
             'timestamp': int(datetime.utcnow().timestamp()),
             'event': 'AdminAdded'
         }
-        mongo_client.insert_admin_log(admin_data)
+        await mongo_client.insert_admin_log(admin_data)
         short_tx_hash = f"{tx_hash[:8]}...{tx_hash[-4:]}"
         return {
             'message': 'Thêm admin thành công',
@@ -247,7 +826,13 @@ async def add_admin(data: AdminInput, payload=Depends(verify_token)):
 
 
 @router.post("/remove-admin")
-async def remove_admin(data: AdminInput, payload=Depends(verify_token)):
+async def remove_admin(
+    data: AdminInput,
+    payload=Depends(verify_token),
+    mongo_client: MongoDBClient = Depends(get_mongo_client),
+    blockchain_client: BlockchainClient = Depends(get_blockchain_client),
+    admin_keys: AdminKeySet = Depends(get_admin_keys)
+):
     """
     Xóa admin khỏi smart contract và MongoDB.
 
@@ -264,8 +849,9 @@ async def remove_admin(data: AdminInput, payload=Depends(verify_token)):
             raise ValueError("Địa chỉ admin không hợp lệ")
         
         tx_receipt = await blockchain_client.remove_admin(data.address)
-        tx_hash = tx_receipt['transactionHash'].hex()
-        mongo_client.update_admin(data.address, 'removed', tx_hash=tx_hash, event='AdminRemoved')
+        tx_hash = tx_receipt['transactionHash'].to_0x_hex()
+        await mongo_client.update_admin(data.address, 'removed', tx_hash=tx_hash, event='AdminRemoved')
+        admin_keys.set_status(data.address, 'removed')
 
         admin_data = {
             'address': str(data.address),
@@ -274,7 +860,7 @@ async def remove_admin(data: AdminInput, payload=Depends(verify_token)):
             'timestamp': int(datetime.utcnow().timestamp()),
             'event': 'AdminRemoved'
         }
-        mongo_client.insert_admin_log(admin_data)
+        await mongo_client.insert_admin_log(admin_data)
         short_tx_hash = f"{tx_hash[:8]}...{tx_hash[-4:]}"
         return {
             'message': 'Xóa admin thành công',
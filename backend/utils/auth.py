@@ -0,0 +1,142 @@
+"""Non-blocking password and token verification
+
+Logic:
+bcrypt.checkpw tốn hàng trăm ms CPU nên chạy trên một thread pool riêng (bcrypt nhả GIL),
+với giới hạn số lần kiểm tra đang chờ: khi đăng nhập dồn dập, yêu cầu vượt giới hạn bị từ chối
+(503) thay vì chiếm hết worker của các API công khai.
+Token đã xác thực được cache (key là SHA-256 của token, hết hạn theo exp) để bỏ qua việc
+kiểm tra HMAC ở các lần gọi API admin tiếp theo.
+"""
+
+import time
+import bcrypt
+import hashlib
+import asyncio
+from loguru import logger
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.config.setting import auth_config
+
+
+class AuthBusy(Exception):
+    """
+    Raised when too many password checks are already waiting.
+    """
+
+
+def _checkpw(plain_password: str, hashed_password) -> bool:
+    try:
+        # Nếu hashed_password là chuỗi, encode thành bytes
+        if isinstance(hashed_password, str):
+            hashed_password = hashed_password.encode('utf-8')
+        return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password)
+    except ValueError as e:
+        logger.error(f"Lỗi xác thực mật khẩu: {str(e)}")
+        return False
+
+
+class PasswordVerifier:
+    def __init__(self, workers: int = auth_config.bcrypt_workers, max_pending: int = auth_config.bcrypt_max_pending,
+                 queue_timeout: float = auth_config.bcrypt_queue_timeout):
+        """
+        Khởi tạo executor kiểm tra mật khẩu.
+
+        Args:
+            workers (int): Số thread chạy bcrypt song song.
+            max_pending (int): Số lần kiểm tra tối đa đang chạy hoặc chờ.
+            queue_timeout (float): Số giây chờ slot trước khi từ chối.
+        """
+        self.workers = workers
+        self.max_pending = max_pending
+        self.queue_timeout = queue_timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._slots = asyncio.Semaphore(max_pending)
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    async def verify(self, plain_password: str, hashed_password) -> bool:
+        """
+        Kiểm tra mật khẩu trên executor bcrypt.
+
+        Raises:
+            AuthBusy: Hàng đợi đầy quá queue_timeout giây.
+        """
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise AuthBusy("Hệ thống đang bận xử lý đăng nhập, vui lòng thử lại")
+
+        self.pending += 1
+        queued_at = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self._timed_checkpw, queued_at, plain_password, hashed_password)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+            self._slots.release()
+
+    def _timed_checkpw(self, queued_at: float, plain_password: str, hashed_password) -> bool:
+        waited = time.perf_counter() - queued_at
+        self.wait_seconds_total += waited
+        self.wait_seconds_max = max(self.wait_seconds_max, waited)
+        return _checkpw(plain_password, hashed_password)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'workers': self.workers,
+            'pending': self.pending,
+            'completed': self.completed,
+            'rejected': self.rejected,
+            'waitSecondsAvg': round(self.wait_seconds_total / self.completed, 4) if self.completed else 0.0,
+            'waitSecondsMax': round(self.wait_seconds_max, 4)
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class TokenCache:
+    def __init__(self, max_entries: int = auth_config.token_cache_size):
+        """
+        LRU các token đã xác thực, mỗi mục hết hạn theo exp của token.
+
+        Args:
+            max_entries (int): Số token tối đa được cache.
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode('utf-8')).digest()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.time():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, token: str, payload: Dict[str, Any]) -> None:
+        exp = payload.get('exp')
+        if not exp or self.max_entries <= 0:
+            return
+        key = self._key(token)
+        self._entries[key] = (exp, payload)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
@@ -0,0 +1,96 @@
+"""Merkle tree for batched certificate anchoring
+
+Logic:
+Leaf = keccak256(keccak256(abi.encodePacked(id, recipientHash, courseHash))).
+Node cha = keccak256 của hai node con đã sắp xếp (giống OpenZeppelin MerkleProof),
+nên proof chỉ là danh sách hash, không cần lưu vị trí trái/phải.
+Phải khớp với hàm verifyMerkleProof trong contracts/certificate.sol.
+"""
+
+from typing import List
+from eth_utils import keccak
+
+
+def _to_bytes(value) -> bytes:
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value)
+    return bytes.fromhex(value[2:] if value.startswith('0x') else value)
+
+
+def certificate_leaf(id: str, recipient_hash: str, course_hash: str) -> bytes:
+    """
+    Tính leaf của chứng chỉ trong cây Merkle.
+
+    Args:
+        id (str): certificate ID.
+        recipient_hash (str): Hash of recipient (hex).
+        course_hash (str): Hash of course (hex).
+
+    Returns:
+        bytes: Leaf 32 bytes.
+    """
+    message = keccak(id.encode('utf-8') + _to_bytes(recipient_hash) + _to_bytes(course_hash))
+    return keccak(message)
+
+
+def hash_pair(a: bytes, b: bytes) -> bytes:
+    return keccak(a + b) if a <= b else keccak(b + a)
+
+
+class MerkleTree:
+    def __init__(self, leaves: List[bytes]):
+        """
+        Xây cây Merkle từ danh sách leaf. Node lẻ ở cuối mỗi tầng được đẩy thẳng lên tầng trên.
+
+        Args:
+            leaves (List[bytes]): Các leaf 32 bytes.
+        """
+        if not leaves:
+            raise ValueError("Cây Merkle cần ít nhất một leaf")
+        self.levels = [list(leaves)]
+        while len(self.levels[-1]) > 1:
+            level = self.levels[-1]
+            parent = [hash_pair(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+            if len(level) % 2 == 1:
+                parent.append(level[-1])
+            self.levels.append(parent)
+
+    @property
+    def root(self) -> bytes:
+        return self.levels[-1][0]
+
+    def proof(self, index: int) -> List[bytes]:
+        """
+        Inclusion proof của leaf tại vị trí index.
+
+        Args:
+            index (int): Vị trí leaf.
+
+        Returns:
+            List[bytes]: Các node anh em từ dưới lên.
+        """
+        proof = []
+        for level in self.levels[:-1]:
+            sibling = index ^ 1
+            if sibling < len(level):
+                proof.append(level[sibling])
+            index //= 2
+        return proof
+
+
+def verify_proof(leaf: bytes, proof: List, root) -> bool:
+    """
+    Kiểm tra inclusion proof cục bộ (không cần RPC).
+
+    Args:
+        leaf (bytes): Leaf của chứng chỉ.
+        proof (List): Proof (bytes hoặc hex).
+        root: Merkle root (bytes hoặc hex).
+
+    Returns:
+        bool: True nếu proof hợp lệ.
+    """
+    computed = leaf
+    for node in proof:
+        computed = hash_pair(computed, _to_bytes(node))
+    return computed == _to_bytes(root)
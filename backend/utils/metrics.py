@@ -0,0 +1,306 @@
+"""Prometheus metrics (text exposition format)
+
+Logic:
+Registry nhỏ, không phụ thuộc thư viện ngoài, đủ cho histogram độ trễ và gauge.
+Mỗi tổ hợp label được bind một lần thành một child (chuỗi label đã format sẵn, mảng đếm theo bucket),
+đường nóng chỉ tra dict rồi tăng vài số đếm dưới một lock, không tạo chuỗi hay dict label mỗi request.
+Gauge được tính khi Prometheus scrape (callback), không tốn gì trên đường nóng.
+"""
+
+import time
+import inspect
+import threading
+from bisect import bisect_left
+from functools import wraps
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    return ','.join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class HistogramChild:
+    __slots__ = ('buckets', 'labels', 'counts', 'sum', 'count', '_lock')
+
+    def __init__(self, buckets: Tuple[float, ...], labels: str):
+        self.buckets = buckets
+        self.labels = labels
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        """
+        Histogram độ trễ (giây).
+
+        Args:
+            name (str): Tên metric.
+            documentation (str): Mô tả (dòng HELP).
+            labelnames (Sequence[str]): Tên các label.
+            buckets (Sequence[float]): Cận trên các bucket, tăng dần (+Inf được thêm tự động).
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._children: Dict[Tuple[str, ...], HistogramChild] = {}
+        self._lock = threading.Lock()
+        self._default = None if self.labelnames else self.labels()
+
+    def labels(self, *values) -> HistogramChild:
+        """
+        Child của một tổ hợp label; được tạo ở lần đầu và dùng lại về sau.
+        """
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = HistogramChild(self.buckets, _format_labels(self.labelnames, values))
+                    self._children[values] = child
+        return child
+
+    def observe(self, value: float) -> None:
+        """
+        Ghi nhận một giá trị cho histogram không có label.
+        """
+        self._default.observe(value)
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        bounds = [_format_value(bound) for bound in self.buckets] + ['+Inf']
+        for child in list(self._children.values()):
+            with child._lock:
+                counts, total, count = list(child.counts), child.sum, child.count
+            prefix = f"{child.labels}," if child.labels else ""
+            cumulative = 0
+            for bound, bucket_count in zip(bounds, counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            suffix = f"{{{child.labels}}}" if child.labels else ""
+            lines.append(f"{self.name}_sum{suffix} {_format_value(total)}")
+            lines.append(f"{self.name}_count{suffix} {count}")
+        return lines
+
+
+class Gauge:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), kind: str = 'gauge'):
+        """
+        Gauge (hoặc counter) có giá trị được tính khi scrape bằng callback.
+
+        Args:
+            name (str): Tên metric.
+            documentation (str): Mô tả (dòng HELP).
+            labelnames (Sequence[str]): Tên các label.
+            kind (str): 'gauge' hoặc 'counter' (dòng TYPE).
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.kind = kind
+        self._function: Optional[Callable] = None
+
+    def set_function(self, function: Optional[Callable]) -> None:
+        """
+        Callback trả về một số (không có label) hoặc iterable (label values, value).
+        """
+        self._function = function
+
+    def collect(self) -> List[str]:
+        if self._function is None:
+            return []
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        result = self._function()
+        if not self.labelnames:
+            result = [((), result)] if result is not None else []
+        for values, value in result:
+            if value is None:
+                continue
+            labels = _format_labels(self.labelnames, values)
+            lines.append(f"{self.name}{{{labels}}} {_format_value(value)}" if labels else f"{self.name} {_format_value(value)}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.collect())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+HTTP_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    'http_request_duration_seconds', 'API latency until response headers, by route template',
+    ('method', 'route', 'status')
+))
+RPC_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    'rpc_request_duration_seconds', 'JSON-RPC call latency including failover, by method',
+    ('method',)
+))
+MONGO_OPERATION_SECONDS = REGISTRY.register(Histogram(
+    'mongo_operation_duration_seconds', 'MongoDBClient operation latency, by operation',
+    ('operation',)
+))
+PDF_RENDER_SECONDS = REGISTRY.register(Histogram(
+    'pdf_render_duration_seconds', 'generate_certificate_pdf time inside the render worker'
+))
+PDF_QUEUE_SECONDS = REGISTRY.register(Histogram(
+    'pdf_render_queue_seconds', 'Time a PDF render waited for a queue slot and a worker'
+))
+
+PENDING_TRANSACTIONS = REGISTRY.register(Gauge(
+    'blockchain_pending_transactions', 'Transactions sent and not yet confirmed'
+))
+SIGNER_PENDING_TRANSACTIONS = REGISTRY.register(Gauge(
+    'blockchain_signer_pending_transactions', 'Transactions sent and not yet confirmed, by signer account', ('signer',)
+))
+SIGNER_BALANCE = REGISTRY.register(Gauge(
+    'blockchain_signer_balance_eth', 'Last read balance of each signer account', ('signer',)
+))
+OUTSTANDING_JOBS = REGISTRY.register(Gauge(
+    'issuance_outstanding_jobs', 'Issuance jobs waiting for their transaction receipt'
+))
+DUPLICATE_IDS_REJECTED = REGISTRY.register(Gauge(
+    'issuance_duplicate_ids_rejected_total', 'Certificate IDs rejected by the reservation check before signing',
+    kind='counter'
+))
+EVENT_LISTENER_LAG = REGISTRY.register(Gauge(
+    'event_listener_lag_blocks', 'Confirmed blocks not yet ingested by the event listener'
+))
+CACHE_HIT_RATIO = REGISTRY.register(Gauge(
+    'cache_hit_ratio', 'Hits over lookups since start, by cache', ('cache',)
+))
+CACHE_HITS = REGISTRY.register(Gauge(
+    'cache_hits_total', 'Cache hits since start, by cache', ('cache',), kind='counter'
+))
+CACHE_MISSES = REGISTRY.register(Gauge(
+    'cache_misses_total', 'Cache misses since start, by cache', ('cache',), kind='counter'
+))
+PDF_RENDER_PENDING = REGISTRY.register(Gauge(
+    'pdf_render_pending', 'PDF renders running or waiting for a worker'
+))
+AUTH_PENDING = REGISTRY.register(Gauge(
+    'auth_password_checks_pending', 'bcrypt password checks running or waiting'
+))
+AUTH_REJECTED = REGISTRY.register(Gauge(
+    'auth_password_checks_rejected_total', 'Logins rejected because the bcrypt queue was full', kind='counter'
+))
+RPC_ENDPOINT_LATENCY = REGISTRY.register(Gauge(
+    'rpc_endpoint_latency_ewma_seconds', 'EWMA latency of each RPC endpoint', ('endpoint',)
+))
+RPC_ENDPOINT_UP = REGISTRY.register(Gauge(
+    'rpc_endpoint_circuit_closed', '1 if the endpoint circuit breaker is closed', ('endpoint',)
+))
+RPC_ENDPOINT_ERRORS = REGISTRY.register(Gauge(
+    'rpc_endpoint_errors_total', 'Failed requests per RPC endpoint', ('endpoint',), kind='counter'
+))
+STARTUP_PHASE_SECONDS = REGISTRY.register(Gauge(
+    'startup_phase_seconds', 'Duration of each application startup phase', ('phase',)
+))
+
+
+def cache_stats(caches: Dict[str, object]):
+    """
+    Callback cho các gauge cache từ thuộc tính hits/misses của từng cache.
+    """
+    def hit_ratio():
+        for name, cache in caches.items():
+            total = cache.hits + cache.misses
+            yield (name,), cache.hits / total if total else 0.0
+
+    def hits():
+        return [((name,), cache.hits) for name, cache in caches.items()]
+
+    def misses():
+        return [((name,), cache.misses) for name, cache in caches.items()]
+
+    return hit_ratio, hits, misses
+
+
+def instrument_async_methods(histogram: Histogram, exclude: Iterable[str] = ()):
+    """
+    Class decorator: đo mọi coroutine method public của class với label là tên method.
+    Child của histogram được bind một lần lúc định nghĩa class.
+    """
+    excluded = set(exclude)
+
+    def decorate(cls):
+        for name, function in list(vars(cls).items()):
+            if name.startswith('_') or name in excluded:
+                continue
+            if not inspect.iscoroutinefunction(function):
+                continue  # bỏ qua hàm thường và async generator
+            setattr(cls, name, _timed(function, histogram.labels(name)))
+        return cls
+
+    return decorate
+
+
+def _timed(function, child: HistogramChild):
+    @wraps(function)
+    async def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await function(*args, **kwargs)
+        finally:
+            child.observe(time.perf_counter() - started)
+
+    return wrapper
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        """
+        ASGI middleware đo độ trễ mỗi request theo route template (không theo URL thật để
+        giới hạn số tổ hợp label), tính đến lúc gửi response headers để SSE/stream không làm lệch số liệu.
+        """
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                route = scope.get('route')
+                HTTP_REQUEST_SECONDS.labels(
+                    scope['method'], route.path if route is not None else '<unmatched>', message['status']
+                ).observe(time.perf_counter() - started)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
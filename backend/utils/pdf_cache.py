@@ -0,0 +1,184 @@
+"""Content-addressed PDF cache
+
+Logic:
+Key = sha256(certificate id, txHash, template version): PDF chỉ phụ thuộc vào ba giá trị này.
+Hai tầng: LRU trong bộ nhớ (giới hạn theo byte) và thư mục trên đĩa (xóa file cũ nhất khi vượt dung lượng).
+Tên file bắt đầu bằng hash của certificate id để có thể xóa toàn bộ PDF của một chứng chỉ khi thu hồi.
+"""
+
+import os
+import glob
+import asyncio
+import hashlib
+from loguru import logger
+from typing import Dict, Optional, Set
+from collections import OrderedDict
+
+from backend.config.setting import pdf_config
+
+
+# Tăng khi bố cục PDF (pdf_generator) thay đổi để cache không trả về PDF cũ
+TEMPLATE_VERSION = "1"
+
+
+class PdfCache:
+    def __init__(
+        self,
+        directory: str = pdf_config.cache_dir,
+        memory_max_bytes: int = pdf_config.cache_memory_max_bytes,
+        disk_max_bytes: int = pdf_config.cache_disk_max_bytes
+    ):
+        """
+        Khởi tạo cache PDF hai tầng.
+
+        Args:
+            directory (str): Thư mục lưu PDF trên đĩa.
+            memory_max_bytes (int): Dung lượng tối đa của tầng bộ nhớ.
+            disk_max_bytes (int): Dung lượng tối đa của tầng đĩa.
+        """
+        self.directory = directory
+        self.memory_max_bytes = memory_max_bytes
+        self.disk_max_bytes = disk_max_bytes
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        # certificate id -> các key đang ở tầng bộ nhớ (để invalidate không cần txHash)
+        self._memory_keys: Dict[str, Set[str]] = {}
+        self._disk_bytes = None
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def cache_key(cert_id: str, tx_hash: str, template_version: str = TEMPLATE_VERSION) -> str:
+        """
+        Content address of a certificate PDF.
+        """
+        return hashlib.sha256(f"{cert_id}\0{tx_hash}\0{template_version}".encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _id_prefix(cert_id: str) -> str:
+        return hashlib.sha256(cert_id.encode('utf-8')).hexdigest()[:16]
+
+    def _file_path(self, cert_id: str, key: str) -> str:
+        return os.path.join(self.directory, f"{self._id_prefix(cert_id)}-{key}.pdf")
+
+    def _remember(self, cert_id: str, key: str, data: bytes) -> None:
+        if len(data) > self.memory_max_bytes:
+            return
+        self._forget(key)
+        self._memory[key] = (cert_id, data)
+        self._memory_keys.setdefault(cert_id, set()).add(key)
+        self._memory_bytes += len(data)
+        while self._memory_bytes > self.memory_max_bytes:
+            self._forget(next(iter(self._memory)))
+
+    def _forget(self, key: str) -> None:
+        entry = self._memory.pop(key, None)
+        if entry is None:
+            return
+        cert_id, data = entry
+        self._memory_bytes -= len(data)
+        keys = self._memory_keys.get(cert_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._memory_keys[cert_id]
+
+    def _read_file(self, path: str) -> Optional[bytes]:
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+            return data
+        except FileNotFoundError:
+            return None
+
+    def _write_file(self, path: str, data: bytes) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        if self._disk_bytes is None:
+            self._disk_bytes = sum(os.path.getsize(p) for p in glob.glob(os.path.join(self.directory, "*.pdf")))
+        try:
+            # Ghi đè cùng key: chỉ tính phần chênh lệch dung lượng
+            previous = os.path.getsize(path)
+        except FileNotFoundError:
+            previous = 0
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        self._disk_bytes += len(data) - previous
+        if self._disk_bytes > self.disk_max_bytes:
+            self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        """
+        Xóa file ít được dùng nhất (theo mtime) đến khi còn 90% dung lượng cho phép.
+        """
+        files = sorted(glob.glob(os.path.join(self.directory, "*.pdf")), key=os.path.getmtime)
+        total = sum(os.path.getsize(p) for p in files)
+        target = self.disk_max_bytes * 0.9
+        for path in files:
+            if total <= target:
+                break
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+                total -= size
+            except FileNotFoundError:
+                continue
+        self._disk_bytes = total
+        logger.debug(f"PDF disk cache evicted down to {total} bytes")
+
+    def _remove_files(self, cert_id: str) -> int:
+        removed = 0
+        for path in glob.glob(os.path.join(self.directory, f"{self._id_prefix(cert_id)}-*.pdf")):
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+                removed += 1
+                if self._disk_bytes is not None:
+                    self._disk_bytes -= size
+            except FileNotFoundError:
+                continue
+        return removed
+
+    async def get(self, cert_id: str, key: str) -> Optional[bytes]:
+        """
+        Lấy PDF từ cache (bộ nhớ trước, sau đó đĩa).
+
+        Returns:
+            Optional[bytes]: Nội dung PDF hoặc None nếu chưa có.
+        """
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        data = await asyncio.to_thread(self._read_file, self._file_path(cert_id, key))
+        if data is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._remember(cert_id, key, data)
+        return data
+
+    async def put(self, cert_id: str, key: str, data: bytes) -> None:
+        """
+        Lưu PDF vào cả hai tầng cache.
+        """
+        self._remember(cert_id, key, data)
+        try:
+            await asyncio.to_thread(self._write_file, self._file_path(cert_id, key), data)
+        except OSError as e:
+            logger.error(f"Lỗi khi lưu PDF vào cache: {str(e)}")
+
+    async def invalidate(self, cert_id: str) -> None:
+        """
+        Xóa mọi PDF của chứng chỉ khỏi cả hai tầng cache (khi thu hồi).
+
+        Args:
+            cert_id (str): certificate ID.
+        """
+        for key in list(self._memory_keys.get(cert_id, ())):
+            self._forget(key)
+        removed = await asyncio.to_thread(self._remove_files, cert_id)
+        logger.info(f"Invalidated cached PDF for certificate {cert_id} ({removed} files)")
@@ -1,6 +1,6 @@
 import os
-import requests
 from io import BytesIO
+from typing import Optional
 from reportlab.lib import colors
 from reportlab.lib.units import inch
 from reportlab.pdfbase import pdfmetrics
@@ -8,37 +8,31 @@ from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.graphics.shapes import Drawing
 from reportlab.lib.pagesizes import A4, landscape
 from reportlab.graphics.barcode.qr import QrCodeWidget
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.styles import ParagraphStyle
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle
 
+from backend.utils.path import root_path
 
-font_path = "backend/static/DejaVuSans.ttf"
-pdfmetrics.registerFont(TTFont('DejaVu', font_path))
 
-def get_logo_image():
-    logo_path = "backend/static/hust.png"
-    if os.path.exists(logo_path):
-        return Image(logo_path, width=2 * inch, height=2 * inch)
-    else:
-        url = "https://www.python.org/static/community_logos/python-logo.png"
-        r = requests.get(url)
-        if r.status_code == 200:
-            tmp_path = "backend/static/hust.png"
-            with open(tmp_path, "wb") as f:
-                f.write(r.content)
-            img = Image(tmp_path, width=2 * inch, height=2 * inch)
-            img.hAlign = 'CENTER'
-            return img
-        else:
-            return None
+font_path = os.path.join(root_path, "static", "DejaVuSans.ttf")
+
+# Font, logo và style chỉ được nạp một lần mỗi process (xem init_pdf_resources)
+_resources = {}
 
-def generate_certificate_pdf(cert_id: str, recipient: str, course: str, issue_date: str, tx_hash: str):
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=landscape(A4), rightMargin=30, leftMargin=30, topMargin=30, bottomMargin=30)
-    elements = []
-    styles = getSampleStyleSheet()
 
-    title_style = ParagraphStyle(
+def init_pdf_resources(logo: Optional[bytes] = None):
+    """
+    Register the DejaVu font, keep the logo and build paragraph styles once per process.
+    Dùng làm initializer cho worker của PDF renderer.
+
+    Args:
+        logo (bytes): Ảnh logo do process cha nạp sẵn (pdf_renderer.load_logo); None thì PDF không có logo.
+    """
+    if _resources:
+        return
+    pdfmetrics.registerFont(TTFont('DejaVu', font_path))
+    _resources['logo'] = logo
+    _resources['title_style'] = ParagraphStyle(
         name='Title',
         fontName='DejaVu',
         fontSize=24,
@@ -46,7 +40,7 @@ def generate_certificate_pdf(cert_id: str, recipient: str, course: str, issue_da
         spaceAfter=20,
         textColor=colors.darkblue
     )
-    content_style = ParagraphStyle(
+    _resources['content_style'] = ParagraphStyle(
         name='Content',
         fontName='DejaVu',
         fontSize=14,
@@ -54,7 +48,7 @@ def generate_certificate_pdf(cert_id: str, recipient: str, course: str, issue_da
         spaceAfter=12,
         leading=18
     )
-    signature_style = ParagraphStyle(
+    _resources['signature_style'] = ParagraphStyle(
         name='Signature',
         fontName='DejaVu',
         fontSize=12,
@@ -62,6 +56,24 @@ def generate_certificate_pdf(cert_id: str, recipient: str, course: str, issue_da
         spaceAfter=8
     )
 
+
+def get_logo_image():
+    init_pdf_resources()
+    if not _resources['logo']:
+        return None
+    img = Image(BytesIO(_resources['logo']), width=2 * inch, height=2 * inch)
+    img.hAlign = 'CENTER'
+    return img
+
+def generate_certificate_pdf(cert_id: str, recipient: str, course: str, issue_date: str, tx_hash: str):
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=landscape(A4), rightMargin=30, leftMargin=30, topMargin=30, bottomMargin=30)
+    elements = []
+    init_pdf_resources()
+    title_style = _resources['title_style']
+    content_style = _resources['content_style']
+    signature_style = _resources['signature_style']
+
     elements.append(Paragraph("Chứng Nhận Hoàn Thành", title_style))
     elements.append(Spacer(1, 0.2 * inch))
 
@@ -111,6 +123,8 @@ def generate_certificate_pdf(cert_id: str, recipient: str, course: str, issue_da
     return pdf_data
 
 # if __name__ == "__main__":
+#     from backend.utils.pdf_renderer import load_logo
+#     init_pdf_resources(load_logo())
 #     pdf_data = generate_certificate_pdf(
 #         cert_id="CERT123456",
 #         recipient="Nguyen Van A",
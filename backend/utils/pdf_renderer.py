@@ -0,0 +1,159 @@
+"""PDF rendering service
+
+Logic:
+Render PDF chứng chỉ trên process pool để công việc CPU (ReportLab, QR) không chặn event loop.
+Mỗi worker nạp font và style một lần khi khởi động (init_pdf_resources).
+Logo được process cha đọc một lần (load_logo) rồi truyền cho worker, worker không đọc file hay tải mạng.
+Số job đang chờ bị giới hạn (bounded queue): job mới chờ tối đa queue_timeout giây rồi bị từ chối.
+"""
+
+import os
+import time
+import asyncio
+import requests
+import multiprocessing
+from loguru import logger
+from typing import Optional, Tuple
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+
+from backend.utils.path import root_path
+from backend.config.setting import pdf_config
+from backend.utils.metrics import PDF_RENDER_SECONDS, PDF_QUEUE_SECONDS
+
+
+class PdfQueueFull(Exception):
+    """
+    Raised when a render job cannot get a queue slot within queue_timeout.
+    """
+
+
+logo_path = os.path.join(root_path, "static", "hust.png")
+LOGO_URL = "https://www.python.org/static/community_logos/python-logo.png"
+
+
+def load_logo() -> Optional[bytes]:
+    """
+    Đọc logo chứng chỉ; tải về và lưu lại khi chưa có file.
+
+    Returns:
+        Optional[bytes]: Nội dung ảnh, None nếu không có file và không tải được.
+    """
+    if os.path.exists(logo_path):
+        with open(logo_path, "rb") as f:
+            return f.read()
+    try:
+        r = requests.get(LOGO_URL, timeout=10)
+    except requests.RequestException as e:
+        logger.warning(f"Cannot download certificate logo: {e}")
+        return None
+    if r.status_code != 200:
+        return None
+    with open(logo_path, "wb") as f:
+        f.write(r.content)
+    return r.content
+
+
+# ReportLab chỉ được import trong worker process, không làm chậm việc import ứng dụng
+def _init_worker(logo: Optional[bytes]) -> None:
+    from backend.utils.pdf_generator import init_pdf_resources
+    init_pdf_resources(logo)
+
+
+def _render(**kwargs) -> Tuple[bytes, float]:
+    from backend.utils.pdf_generator import generate_certificate_pdf
+    started = time.perf_counter()
+    pdf_data = generate_certificate_pdf(**kwargs)
+    return pdf_data, time.perf_counter() - started
+
+
+def _warmup() -> bool:
+    return True
+
+
+class PdfRenderer:
+    def __init__(
+        self,
+        workers: int = pdf_config.workers,
+        max_pending: int = pdf_config.max_pending,
+        queue_timeout: float = pdf_config.queue_timeout
+    ):
+        """
+        Khởi tạo PDF renderer (process pool chỉ được tạo khi gọi start()).
+
+        Args:
+            workers (int): Số process render.
+            max_pending (int): Số job tối đa đang render hoặc chờ trong pool.
+            queue_timeout (float): Số giây chờ slot trước khi từ chối job.
+        """
+        self.workers = workers
+        self.max_pending = max_pending
+        self.queue_timeout = queue_timeout
+        self._executor = None
+        self._slots = asyncio.Semaphore(max_pending)
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def start(self) -> None:
+        """
+        Đọc logo một lần, tạo process pool và pre-warm toàn bộ worker.
+        """
+        if self._executor:
+            return
+        logo = await asyncio.to_thread(load_logo)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context(pdf_config.mp_context),
+            initializer=_init_worker,
+            initargs=(logo,),
+        )
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*[
+            loop.run_in_executor(self._executor, _warmup) for _ in range(self.workers)
+        ])
+        logger.info(f"PDF renderer ready with {self.workers} workers")
+
+    async def render(self, cert_id: str, recipient: str, course: str, issue_date: str, tx_hash: str) -> bytes:
+        """
+        Render PDF chứng chỉ trên process pool.
+
+        Returns:
+            bytes: Nội dung PDF.
+        """
+        if not self._executor:
+            await self.start()
+        queued_at = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"PDF queue full ({self.max_pending} pending), reject certificate {cert_id}")
+            raise PdfQueueFull(f"PDF render queue full ({self.max_pending} pending)")
+
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            pdf_data, render_seconds = await loop.run_in_executor(
+                self._executor,
+                partial(
+                    _render,
+                    cert_id=cert_id,
+                    recipient=recipient,
+                    course=course,
+                    issue_date=issue_date,
+                    tx_hash=tx_hash
+                )
+            )
+            PDF_RENDER_SECONDS.observe(render_seconds)
+            PDF_QUEUE_SECONDS.observe(max(time.perf_counter() - queued_at - render_seconds, 0.0))
+            return pdf_data
+        finally:
+            self._pending -= 1
+            self._slots.release()
+
+    def shutdown(self) -> None:
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
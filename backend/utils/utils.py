@@ -1,3 +1,4 @@
+from typing import List, Optional
 from pydantic import BaseModel
 
 
@@ -6,8 +7,20 @@ class CertificateInput(BaseModel):
     recipient: str
     course: str
 
+class BatchCertificateInput(BaseModel):
+    certificates: List[CertificateInput]
+
+class OfflineVerifyInput(BaseModel):
+    id: str
+    recipient: str
+    course: str
+    signature: Optional[str] = None
+
 class RevokeInput(BaseModel):
     id: str
+
+class BatchRevokeInput(BaseModel):
+    ids: List[str]
     
 class AdminInput(BaseModel):
     address: str
\ No newline at end of file
@@ -0,0 +1,215 @@
+"""Read-through cache for /api/verify-certificate
+
+Logic:
+LRU + TTL trong process cho response tra cứu chứng chỉ, kể cả kết quả "không tồn tại"
+(negative cache, TTL ngắn) để quét ID hàng loạt không dồn vào MongoDB.
+Tùy chọn thêm tầng SQLite dùng chung giữa các worker trên cùng máy; khi bật tầng này,
+entry trong process chỉ sống local_ttl giây để giới hạn độ trễ invalidation giữa các worker.
+Cache bị xóa đúng ID khi thu hồi/cấp chứng chỉ (route hoặc event listener).
+
+Route lấy generation() trước khi đọc MongoDB và truyền lại cho set/set_negative: nếu ID bị invalidate
+trong lúc chờ MongoDB (thu hồi, cấp chứng chỉ đồng thời), response đã cũ và không được ghi vào cache.
+Mỗi invalidate đóng một mốc tăng dần cho ID; tầng dùng chung ghi mốc thời gian vào bảng verify_invalidations
+để worker khác cũng bỏ qua response đọc trước mốc đó.
+Lệnh SQLite chạy trên một thread riêng (theo thứ tự gửi), không chặn event loop: ghi và xóa không chờ kết quả,
+chỉ lần đọc tầng dùng chung khi trượt cache trong process là được await.
+"""
+
+import json
+import time
+import asyncio
+import sqlite3
+from loguru import logger
+from typing import Any, Dict, Optional, Tuple
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.config.setting import cache_config
+
+
+# (mốc invalidate trong process, thời gian thực cho tầng dùng chung)
+Generation = Tuple[int, float]
+
+
+class VerifyCache:
+    def __init__(
+        self,
+        max_entries: int = cache_config.verify_max_entries,
+        ttl: float = cache_config.verify_ttl,
+        negative_ttl: float = cache_config.verify_negative_ttl,
+        shared_path: Optional[str] = cache_config.verify_shared_path,
+        local_ttl: float = cache_config.verify_local_ttl
+    ):
+        """
+        Khởi tạo cache tra cứu.
+
+        Args:
+            max_entries (int): Số entry tối đa trong process.
+            ttl (float): Thời gian sống (giây) của kết quả tìm thấy.
+            negative_ttl (float): Thời gian sống (giây) của kết quả không tìm thấy.
+            shared_path (Optional[str]): File SQLite dùng chung giữa các worker (None: tắt).
+            local_ttl (float): Thời gian sống tối đa trong process khi bật tầng dùng chung.
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.local_ttl = local_ttl
+        self._entries = OrderedDict()
+        # ID -> mốc invalidate gần nhất (giới hạn max_entries); mốc lớn nhất đã bị loại khỏi danh sách
+        self._invalidated = OrderedDict()
+        self._forgotten = 0
+        self._clock = 0
+        self._shared = None
+        self._executor = None
+        self._pruned_at = 0.0
+        self.hits = 0
+        self.misses = 0
+        if shared_path:
+            self._shared = sqlite3.connect(shared_path, isolation_level=None, check_same_thread=False)
+            self._shared.execute("PRAGMA journal_mode=WAL")
+            self._shared.execute(
+                "CREATE TABLE IF NOT EXISTS verify_cache (id TEXT PRIMARY KEY, value TEXT, expires REAL)"
+            )
+            self._shared.execute(
+                "CREATE TABLE IF NOT EXISTS verify_invalidations (id TEXT PRIMARY KEY, at REAL)"
+            )
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="verify-cache")
+            logger.info(f"Verify cache shared store: {shared_path}")
+
+    def _local_expiry(self, now: float, ttl: float) -> float:
+        if self._shared:
+            ttl = min(ttl, self.local_ttl)
+        return now + ttl
+
+    def generation(self) -> Generation:
+        """
+        Mốc đọc: lấy trước khi đọc MongoDB, truyền cho set/set_negative.
+        """
+        return self._clock, time.time()
+
+    def _stale(self, cert_id: str, generation: Generation) -> bool:
+        return self._invalidated.get(cert_id, self._forgotten) > generation[0]
+
+    def _submit(self, fn, *args) -> None:
+        """
+        Chạy lệnh SQLite trên thread của tầng dùng chung, không chờ kết quả.
+        """
+        def run():
+            try:
+                fn(*args)
+            except Exception as e:
+                logger.error(f"Lỗi verify cache dùng chung: {str(e)}")
+        self._executor.submit(run)
+
+    async def get(self, cert_id: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """
+        Tra cache.
+
+        Returns:
+            Tuple[bool, Optional[Dict]]: (hit, response). Hit với response None là negative entry.
+        """
+        now = time.monotonic()
+        entry = self._entries.get(cert_id)
+        if entry is not None:
+            value, expires = entry
+            if expires > now:
+                self._entries.move_to_end(cert_id)
+                self.hits += 1
+                return True, value
+            del self._entries[cert_id]
+
+        if self._shared:
+            generation = self.generation()
+            row = await asyncio.get_running_loop().run_in_executor(self._executor, self._read_shared, cert_id)
+            # Entry đọc được trước một invalidate trong lúc chờ thì bỏ qua
+            if row and row[1] > time.time() and not self._stale(cert_id, generation):
+                value = json.loads(row[0]) if row[0] is not None else None
+                self._store_local(cert_id, value, time.monotonic(), row[1] - time.time())
+                self.hits += 1
+                return True, value
+
+        self.misses += 1
+        return False, None
+
+    def _read_shared(self, cert_id: str) -> Optional[tuple]:
+        return self._shared.execute(
+            "SELECT value, expires FROM verify_cache WHERE id = ?", (cert_id,)
+        ).fetchone()
+
+    def _store_local(self, cert_id: str, value: Optional[Dict[str, Any]], now: float, ttl: float) -> None:
+        self._entries[cert_id] = (value, self._local_expiry(now, ttl))
+        self._entries.move_to_end(cert_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _write_shared(self, cert_id: str, value: Optional[str], expires: float, read_at: float) -> None:
+        # Không ghi nếu một worker đã invalidate ID sau lúc response được đọc
+        self._shared.execute(
+            "INSERT OR REPLACE INTO verify_cache (id, value, expires) SELECT ?, ?, ? "
+            "WHERE NOT EXISTS (SELECT 1 FROM verify_invalidations WHERE id = ? AND at >= ?)",
+            (cert_id, value, expires, cert_id, read_at)
+        )
+
+    def _store(self, cert_id: str, value: Optional[Dict[str, Any]], ttl: float, generation: Generation) -> None:
+        if self._stale(cert_id, generation):
+            logger.debug(f"Verify cache: ID {cert_id} invalidated during lookup, response not cached")
+            return
+        self._store_local(cert_id, value, time.monotonic(), ttl)
+        if self._shared:
+            self._submit(
+                self._write_shared, cert_id, json.dumps(value) if value is not None else None,
+                time.time() + ttl, generation[1]
+            )
+
+    def set(self, cert_id: str, response: Dict[str, Any], generation: Generation) -> None:
+        self._store(cert_id, response, self.ttl, generation)
+
+    def set_negative(self, cert_id: str, generation: Generation) -> None:
+        self._store(cert_id, None, self.negative_ttl, generation)
+
+    def _invalidate_shared(self, cert_id: str, at: float) -> None:
+        self._shared.execute("DELETE FROM verify_cache WHERE id = ?", (cert_id,))
+        self._shared.execute("INSERT OR REPLACE INTO verify_invalidations (id, at) VALUES (?, ?)", (cert_id, at))
+        # Mốc cũ hơn TTL không còn chặn được lần ghi nào đang chờ
+        if at - self._pruned_at > self.ttl:
+            self._shared.execute("DELETE FROM verify_invalidations WHERE at < ?", (at - self.ttl,))
+            self._pruned_at = at
+
+    def invalidate(self, cert_id: str) -> None:
+        """
+        Xóa entry của một chứng chỉ ở mọi tầng và chặn ghi response đọc trước thời điểm này.
+        """
+        self._clock += 1
+        self._invalidated[cert_id] = self._clock
+        self._invalidated.move_to_end(cert_id)
+        while len(self._invalidated) > self.max_entries:
+            _, self._forgotten = self._invalidated.popitem(last=False)
+        self._entries.pop(cert_id, None)
+        if self._shared:
+            self._submit(self._invalidate_shared, cert_id, time.time())
+
+    def clear(self) -> None:
+        self._clock += 1
+        self._forgotten = self._clock
+        self._invalidated.clear()
+        self._entries.clear()
+        if self._shared:
+            self._submit(self._shared.execute, "DELETE FROM verify_cache")
+
+    def close(self) -> None:
+        """
+        Chờ các lệnh SQLite đang xếp hàng rồi đóng tầng dùng chung.
+        """
+        if self._shared:
+            self._executor.shutdown(wait=True)
+            self._shared.close()
+            self._shared = None
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / total if total else 0.0,
+            'entries': len(self._entries)
+        }
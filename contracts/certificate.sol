@@ -20,12 +20,27 @@ contract Certificate {
     // Quản lý quyền admin
     mapping(address => bool) public admins;
 
+    // Merkle root của các lô chứng chỉ (root => thời điểm anchor)
+    mapping(bytes32 => uint256) public merkleRoots;
+
+    // Chứng chỉ thuộc lô Merkle đã bị thu hồi (leaf => true)
+    mapping(bytes32 => bool) public revokedLeaves;
+
+    // ID đã được cấp theo lô Merkle (keccak256(id) => Merkle root), không được cấp lẻ lại
+    mapping(bytes32 => bytes32) public batchedIds;
+
     // Sự kiện khi chứng chỉ được cấp
     event CertificateIssued(string id, bytes32 recipientHash, bytes32 courseHash, uint256 issueDate, bytes signature);
 
     // Sự kiện khi chứng chỉ bị thu hồi
     event CertificateRevoked(string id);
 
+    // Sự kiện khi nhiều chứng chỉ bị thu hồi trong một giao dịch
+    event CertificatesRevoked(string[] ids);
+
+    // Sự kiện khi một lô chứng chỉ được anchor bằng Merkle root
+    event MerkleRootAnchored(bytes32 root, uint256 count, uint256 anchoredAt);
+
     // Sự kiện khi admin được thêm/xóa
     event AdminAdded(address admin);
     event AdminRemoved(address admin);
@@ -72,8 +87,8 @@ contract Certificate {
         // Kiểm tra độ dài ID để giới hạn gas
         require(bytes(id).length <= 32, "ID too long");
         
-        // Kiểm tra ID chứng chỉ chưa tồn tại
-        require(bytes(certificates[id].id).length == 0, "Certificate ID already exists");
+        // Kiểm tra ID chứng chỉ chưa tồn tại (kể cả trong lô Merkle)
+        require(isAvailable(id), "Certificate ID already exists");
         
         // Xác minh chữ ký
         require(
@@ -98,6 +113,77 @@ contract Certificate {
         emit CertificateRevoked(id);
     }
 
+    // Thu hồi nhiều chứng chỉ trong một giao dịch (một sự kiện cho cả lô)
+    function revokeCertificates(string[] memory ids) public onlyAdmin {
+        require(ids.length > 0, "Empty revocation list");
+        for (uint256 i = 0; i < ids.length; i++) {
+            require(bytes(certificates[ids[i]].id).length != 0, "Certificate does not exist");
+            delete certificates[ids[i]];
+        }
+        emit CertificatesRevoked(ids);
+    }
+
+    // Anchor Merkle root của một lô chứng chỉ: lưu root và ID của lô (một slot mỗi ID), không lưu dữ liệu chứng chỉ
+    function anchorMerkleRoot(bytes32 root, string[] memory ids) public onlyAdmin {
+        require(root != bytes32(0), "Invalid Merkle root");
+        require(ids.length > 0, "Empty batch");
+        require(merkleRoots[root] == 0, "Merkle root already anchored");
+        for (uint256 i = 0; i < ids.length; i++) {
+            require(bytes(ids[i]).length <= 32, "ID too long");
+            require(isAvailable(ids[i]), "Certificate ID already exists");
+            batchedIds[keccak256(bytes(ids[i]))] = root;
+        }
+        merkleRoots[root] = block.timestamp;
+        emit MerkleRootAnchored(root, ids.length, block.timestamp);
+    }
+
+    // Thu hồi chứng chỉ thuộc lô Merkle
+    function revokeBatchedCertificate(
+        string memory id,
+        bytes32 recipientHash,
+        bytes32 courseHash
+    ) public onlyAdmin {
+        require(batchedIds[keccak256(bytes(id))] != bytes32(0), "Certificate does not exist");
+        bytes32 leaf = merkleLeaf(id, recipientHash, courseHash);
+        require(!revokedLeaves[leaf], "Certificate already revoked");
+        revokedLeaves[leaf] = true;
+        emit CertificateRevoked(id);
+    }
+
+    // Kiểm tra inclusion proof của chứng chỉ đối với Merkle root đã anchor
+    function verifyMerkleProof(
+        bytes32 root,
+        bytes32 leaf,
+        bytes32[] memory proof
+    ) public view returns (bool) {
+        if (merkleRoots[root] == 0 || revokedLeaves[leaf]) {
+            return false;
+        }
+        bytes32 computed = leaf;
+        for (uint256 i = 0; i < proof.length; i++) {
+            bytes32 node = proof[i];
+            // Cặp node được sắp xếp trước khi hash, proof không cần vị trí trái/phải
+            computed = computed <= node
+                ? keccak256(abi.encodePacked(computed, node))
+                : keccak256(abi.encodePacked(node, computed));
+        }
+        return computed == root;
+    }
+
+    // Leaf của chứng chỉ trong cây Merkle (hash hai lần để khác độ dài với node trong)
+    function merkleLeaf(
+        string memory id,
+        bytes32 recipientHash,
+        bytes32 courseHash
+    ) public pure returns (bytes32) {
+        return keccak256(bytes.concat(keccak256(abi.encodePacked(id, recipientHash, courseHash))));
+    }
+
+    // ID chưa được cấp lẻ và không thuộc lô Merkle nào
+    function isAvailable(string memory id) internal view returns (bool) {
+        return bytes(certificates[id].id).length == 0 && batchedIds[keccak256(bytes(id))] == bytes32(0);
+    }
+
     // Tra cứu chứng chỉ
     function verifyCertificate(string memory id) public view returns (Cert memory) {
         require(bytes(certificates[id].id).length != 0, "Certificate does not exist");
@@ -0,0 +1,276 @@
+// SPDX-License-Identifier: SEE LICENSE IN LICENSE
+pragma solidity ^0.8.19;
+
+// Phiên bản 2: chứng chỉ được lưu theo key bytes32 = keccak256(id), chỉ giữ dữ liệu cần để xác minh.
+// ID và chữ ký nằm trong calldata và sự kiện CertificateIssued (giống v1), không lưu trong storage.
+contract CertificateV2 {
+    // Địa chỉ chủ sở hữu hợp đồng
+    address public immutable owner;
+
+    // Cấu trúc chứng chỉ: 2 slot (digest; issueDate và revoked dùng chung một slot)
+    struct Cert {
+        bytes32 digest;         // keccak256(recipientHash, courseHash)
+        uint64 issueDate;       // Ngày cấp (0: chưa cấp)
+        bool revoked;           // Đã thu hồi
+    }
+
+    // Lưu trữ chứng chỉ theo key = keccak256(id)
+    mapping(bytes32 => Cert) public certificates;
+
+    // Quản lý quyền admin
+    mapping(address => bool) public admins;
+
+    // Merkle root của các lô chứng chỉ (root => thời điểm anchor)
+    mapping(bytes32 => uint256) public merkleRoots;
+
+    // Chứng chỉ thuộc lô Merkle đã bị thu hồi (leaf => true)
+    mapping(bytes32 => bool) public revokedLeaves;
+
+    // ID đã được cấp theo lô Merkle (keccak256(id) => Merkle root), không được cấp lẻ lại
+    mapping(bytes32 => bytes32) public batchedIds;
+
+    // Cho phép chủ hợp đồng chép trạng thái từ hợp đồng v1 cho đến khi finalizeMigration
+    bool public migrationOpen = true;
+
+    // Sự kiện khi chứng chỉ được cấp (cùng chữ ký với v1)
+    event CertificateIssued(string id, bytes32 recipientHash, bytes32 courseHash, uint256 issueDate, bytes signature);
+
+    // Sự kiện khi chứng chỉ bị thu hồi
+    event CertificateRevoked(string id);
+
+    // Sự kiện khi nhiều chứng chỉ bị thu hồi trong một giao dịch
+    event CertificatesRevoked(string[] ids);
+
+    // Sự kiện khi một lô chứng chỉ được anchor bằng Merkle root
+    event MerkleRootAnchored(bytes32 root, uint256 count, uint256 anchoredAt);
+
+    // Sự kiện khi chứng chỉ được chép từ hợp đồng v1
+    event CertificatesMigrated(string[] ids);
+
+    // Sự kiện khi kết thúc giai đoạn chép dữ liệu
+    event MigrationFinalized();
+
+    // Sự kiện khi admin được thêm/xóa
+    event AdminAdded(address admin);
+    event AdminRemoved(address admin);
+
+    // Constructor: gán chủ hợp đồng và thêm admin đầu tiên
+    constructor() {
+        owner = msg.sender;
+        admins[msg.sender] = true;
+    }
+
+    // Modifier: chỉ admin được gọi
+    modifier onlyAdmin() {
+        require(admins[msg.sender], "Only admin can call");
+        _;
+    }
+
+    // Modifier: chỉ chủ hợp đồng được gọi
+    modifier onlyOwner() {
+        require(msg.sender == owner, "Only owner can call");
+        _;
+    }
+
+    // Modifier: chỉ trong giai đoạn chép dữ liệu
+    modifier duringMigration() {
+        require(migrationOpen, "Migration finalized");
+        _;
+    }
+
+    // Thêm admin mới
+    function addAdmin(address newAdmin) public onlyOwner {
+        admins[newAdmin] = true;
+        emit AdminAdded(newAdmin);
+    }
+
+    // Xóa admin
+    function removeAdmin(address adminAddress) public onlyOwner {
+        require(adminAddress != msg.sender, "Cannot remove yourself");
+        require(admins[adminAddress], "Admin does not exist");
+        admins[adminAddress] = false;
+        emit AdminRemoved(adminAddress);
+    }
+
+    // Key của chứng chỉ trong mapping certificates
+    function certificateKey(string memory id) public pure returns (bytes32) {
+        return keccak256(bytes(id));
+    }
+
+    // Digest của người nhận và khóa học được lưu trên chain
+    function certificateDigest(bytes32 recipientHash, bytes32 courseHash) public pure returns (bytes32) {
+        return keccak256(abi.encodePacked(recipientHash, courseHash));
+    }
+
+    // Cấp chứng chỉ. Giao dịch đã được admin ký nên không ecrecover lại chữ ký chứng chỉ;
+    // chữ ký được phát trong sự kiện để xác minh off-chain.
+    function issueCertificate(
+        string calldata id,
+        bytes32 recipientHash,
+        bytes32 courseHash,
+        bytes calldata signature
+    ) external onlyAdmin {
+        require(bytes(id).length <= 32, "ID too long");
+        require(signature.length == 65, "Invalid signature length");
+
+        bytes32 key = keccak256(bytes(id));
+        require(isAvailable(key), "Certificate ID already exists");
+        Cert storage cert = certificates[key];
+        cert.digest = keccak256(abi.encodePacked(recipientHash, courseHash));
+        cert.issueDate = uint64(block.timestamp);
+
+        emit CertificateIssued(id, recipientHash, courseHash, block.timestamp, signature);
+    }
+
+    // Thu hồi chứng chỉ (chỉ đổi cờ revoked, ID không được cấp lại)
+    function revokeCertificate(string calldata id) external onlyAdmin {
+        _revoke(keccak256(bytes(id)));
+        emit CertificateRevoked(id);
+    }
+
+    // Thu hồi nhiều chứng chỉ trong một giao dịch (một sự kiện cho cả lô)
+    function revokeCertificates(string[] calldata ids) external onlyAdmin {
+        require(ids.length > 0, "Empty revocation list");
+        for (uint256 i = 0; i < ids.length; i++) {
+            _revoke(keccak256(bytes(ids[i])));
+        }
+        emit CertificatesRevoked(ids);
+    }
+
+    function _revoke(bytes32 key) internal {
+        Cert storage cert = certificates[key];
+        require(cert.issueDate != 0 && !cert.revoked, "Certificate does not exist");
+        cert.revoked = true;
+    }
+
+    // Chép chứng chỉ từ hợp đồng v1, giữ nguyên ngày cấp. Chứng chỉ đã thu hồi (bị xóa khỏi v1)
+    // được chép với revoked = true để ID không được cấp lại trên v2.
+    function migrateCertificates(
+        string[] calldata ids,
+        bytes32[] calldata digests,
+        uint64[] calldata issueDates,
+        bool[] calldata revoked
+    ) external onlyOwner duringMigration {
+        require(
+            ids.length == digests.length && ids.length == issueDates.length && ids.length == revoked.length,
+            "Length mismatch"
+        );
+        for (uint256 i = 0; i < ids.length; i++) {
+            require(issueDates[i] != 0, "Invalid issue date");
+            bytes32 key = keccak256(bytes(ids[i]));
+            require(isAvailable(key), "Certificate ID already exists");
+            Cert storage cert = certificates[key];
+            cert.digest = digests[i];
+            cert.issueDate = issueDates[i];
+            cert.revoked = revoked[i];
+        }
+        emit CertificatesMigrated(ids);
+    }
+
+    // Chép ID đã cấp theo lô Merkle từ hợp đồng v1 (key = keccak256(id))
+    function migrateBatchedIds(
+        bytes32[] calldata keys,
+        bytes32[] calldata roots
+    ) external onlyOwner duringMigration {
+        require(keys.length == roots.length, "Length mismatch");
+        for (uint256 i = 0; i < keys.length; i++) {
+            require(roots[i] != bytes32(0), "Invalid Merkle root");
+            require(certificates[keys[i]].issueDate == 0, "Certificate ID already exists");
+            batchedIds[keys[i]] = roots[i];
+        }
+    }
+
+    // Chép Merkle root đã anchor từ hợp đồng v1
+    function migrateMerkleRoots(
+        bytes32[] calldata roots,
+        uint256[] calldata anchoredAt
+    ) external onlyOwner duringMigration {
+        require(roots.length == anchoredAt.length, "Length mismatch");
+        for (uint256 i = 0; i < roots.length; i++) {
+            require(roots[i] != bytes32(0) && anchoredAt[i] != 0, "Invalid Merkle root");
+            merkleRoots[roots[i]] = anchoredAt[i];
+        }
+    }
+
+    // Chép leaf đã thu hồi từ hợp đồng v1
+    function migrateRevokedLeaves(bytes32[] calldata leaves) external onlyOwner duringMigration {
+        for (uint256 i = 0; i < leaves.length; i++) {
+            revokedLeaves[leaves[i]] = true;
+        }
+    }
+
+    // Kết thúc giai đoạn chép dữ liệu
+    function finalizeMigration() external onlyOwner duringMigration {
+        migrationOpen = false;
+        emit MigrationFinalized();
+    }
+
+    // Anchor Merkle root của một lô chứng chỉ: lưu root và ID của lô (một slot mỗi ID), không lưu dữ liệu chứng chỉ
+    function anchorMerkleRoot(bytes32 root, string[] calldata ids) external onlyAdmin {
+        require(root != bytes32(0), "Invalid Merkle root");
+        require(ids.length > 0, "Empty batch");
+        require(merkleRoots[root] == 0, "Merkle root already anchored");
+        for (uint256 i = 0; i < ids.length; i++) {
+            require(bytes(ids[i]).length <= 32, "ID too long");
+            bytes32 key = keccak256(bytes(ids[i]));
+            require(isAvailable(key), "Certificate ID already exists");
+            batchedIds[key] = root;
+        }
+        merkleRoots[root] = block.timestamp;
+        emit MerkleRootAnchored(root, ids.length, block.timestamp);
+    }
+
+    // Thu hồi chứng chỉ thuộc lô Merkle
+    function revokeBatchedCertificate(
+        string calldata id,
+        bytes32 recipientHash,
+        bytes32 courseHash
+    ) external onlyAdmin {
+        require(batchedIds[keccak256(bytes(id))] != bytes32(0), "Certificate does not exist");
+        bytes32 leaf = merkleLeaf(id, recipientHash, courseHash);
+        require(!revokedLeaves[leaf], "Certificate already revoked");
+        revokedLeaves[leaf] = true;
+        emit CertificateRevoked(id);
+    }
+
+    // Kiểm tra inclusion proof của chứng chỉ đối với Merkle root đã anchor
+    function verifyMerkleProof(
+        bytes32 root,
+        bytes32 leaf,
+        bytes32[] memory proof
+    ) public view returns (bool) {
+        if (merkleRoots[root] == 0 || revokedLeaves[leaf]) {
+            return false;
+        }
+        bytes32 computed = leaf;
+        for (uint256 i = 0; i < proof.length; i++) {
+            bytes32 node = proof[i];
+            // Cặp node được sắp xếp trước khi hash, proof không cần vị trí trái/phải
+            computed = computed <= node
+                ? keccak256(abi.encodePacked(computed, node))
+                : keccak256(abi.encodePacked(node, computed));
+        }
+        return computed == root;
+    }
+
+    // Leaf của chứng chỉ trong cây Merkle (hash hai lần để khác độ dài với node trong)
+    function merkleLeaf(
+        string memory id,
+        bytes32 recipientHash,
+        bytes32 courseHash
+    ) public pure returns (bytes32) {
+        return keccak256(bytes.concat(keccak256(abi.encodePacked(id, recipientHash, courseHash))));
+    }
+
+    // ID chưa được cấp lẻ (kể cả đã thu hồi) và không thuộc lô Merkle nào
+    function isAvailable(bytes32 key) internal view returns (bool) {
+        return certificates[key].issueDate == 0 && batchedIds[key] == bytes32(0);
+    }
+
+    // Tra cứu chứng chỉ theo key = keccak256(id)
+    function verifyCertificate(bytes32 key) public view returns (bytes32 digest, uint256 issueDate, bool revoked) {
+        Cert storage cert = certificates[key];
+        require(cert.issueDate != 0, "Certificate does not exist");
+        return (cert.digest, cert.issueDate, cert.revoked);
+    }
+}
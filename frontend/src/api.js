@@ -39,7 +39,7 @@ const api = {
     );
   },
 
-  issueCertificate: async (data, token, config = {}) => {
+  issueCertificate: async (data, token) => {
     return await axios.post(
       `${API_URL}/api/issue-certificate`,
       data,
@@ -47,11 +47,18 @@ const api = {
         headers: {
           Authorization: `Bearer ${token}`,
         },
-        ...config
       }
     );
   },
 
+  jobEvents: (jobId) => {
+    return new EventSource(`${API_URL}/api/jobs/${jobId}/events`);
+  },
+
+  downloadCertificatePdf: async (id) => {
+    return await axios.get(`${API_URL}/api/certificates/${id}/pdf`, { responseType: 'blob' });
+  },
+
   revokeCertificate: async (data, token) => {
     return await axios.post(
       `${API_URL}/api/revoke-certificate`,
@@ -67,8 +74,8 @@ const api = {
   verifyCertificate: async (id) => {
     return await axios.get(`${API_URL}/api/verify-certificate/${id}`);
   },
-  getEvents: async () => {
-    return await axios.get(`${API_URL}/api/events`);
+  getEvents: async (params = {}) => {
+    return await axios.get(`${API_URL}/api/events`, { params });
   },
 };
 
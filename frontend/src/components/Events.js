@@ -4,23 +4,29 @@ import api from '../api';
 
 function Events() {
   const [events, setEvents] = useState({ certificate_events: [], admin_events: [] });
+  const [cursors, setCursors] = useState({ certificate: null, admin: null });
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState('');
 
+  const fetchEvents = async (params = {}) => {
+    const token = localStorage.getItem('token');
+    if (!token) {
+      throw new Error('Vui lòng đăng nhập');
+    }
+    const response = await api.getEvents(params);
+    if (!response.data || !Array.isArray(response.data.admin_events)) {
+      throw new Error('Dữ liệu admin_events không hợp lệ');
+    }
+    return response.data;
+  };
+
   useEffect(() => {
-    const fetchEvents = async () => {
+    const loadFirstPage = async () => {
       try {
-        const token = localStorage.getItem('token');
-        if (!token) {
-          throw new Error('Vui lòng đăng nhập');
-        }
-        const response = await api.getEvents({
-          headers: { Authorization: `Bearer ${token}` }
-        });
-        if (!response.data || !Array.isArray(response.data.admin_events)) {
-          throw new Error('Dữ liệu admin_events không hợp lệ');
-        }
-        setEvents(response.data);
+        const data = await fetchEvents();
+        setEvents({ certificate_events: data.certificate_events, admin_events: data.admin_events });
+        setCursors({ certificate: data.next_certificate_cursor, admin: data.next_admin_cursor });
         toast.success('Tải sự kiện thành công');
       } catch (error) {
         setError(error.response?.data?.detail || error.message || 'Lỗi khi tải sự kiện');
@@ -29,9 +35,30 @@ function Events() {
         setLoading(false);
       }
     };
-    fetchEvents();
+    loadFirstPage();
   }, []);
 
+  const loadMore = async (type) => {
+    setLoadingMore(true);
+    try {
+      const params = type === 'certificate'
+        ? { certificate_cursor: cursors.certificate, limit: 50 }
+        : { admin_cursor: cursors.admin, limit: 50 };
+      const data = await fetchEvents(params);
+      if (type === 'certificate') {
+        setEvents((prev) => ({ ...prev, certificate_events: [...prev.certificate_events, ...data.certificate_events] }));
+        setCursors((prev) => ({ ...prev, certificate: data.next_certificate_cursor }));
+      } else {
+        setEvents((prev) => ({ ...prev, admin_events: [...prev.admin_events, ...data.admin_events] }));
+        setCursors((prev) => ({ ...prev, admin: data.next_admin_cursor }));
+      }
+    } catch (error) {
+      toast.error(error.response?.data?.detail || error.message || 'Lỗi khi tải sự kiện');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const truncateString = (str, startLen = 6, endLen = 4) => {
     if (typeof str !== 'string' || !str) {
       return 'N/A';
@@ -75,6 +102,15 @@ function Events() {
               </tbody>
             </table>
           </div>
+          {cursors.certificate && (
+            <button
+              onClick={() => loadMore('certificate')}
+              className="mt-2 bg-blue-600 text-white px-4 py-2 rounded hover:bg-blue-700"
+              disabled={loadingMore}
+            >
+              {loadingMore ? 'Đang tải...' : 'Tải thêm'}
+            </button>
+          )}
           <h3 className="text-lg font-bold mt-6 mb-2">Sự kiện Admin</h3>
           <div className="overflow-x-auto">
             <table className="min-w-full bg-white shadow-md rounded">
@@ -125,6 +161,15 @@ function Events() {
               </tbody>
             </table>
           </div>
+          {cursors.admin && (
+            <button
+              onClick={() => loadMore('admin')}
+              className="mt-2 bg-blue-600 text-white px-4 py-2 rounded hover:bg-blue-700"
+              disabled={loadingMore}
+            >
+              {loadingMore ? 'Đang tải...' : 'Tải thêm'}
+            </button>
+          )}
         </>
       )}
     </div>
@@ -14,6 +14,23 @@ function IssueCert({ token }) {
     setFormData({ ...formData, [e.target.name]: e.target.value });
   };
 
+  // Theo dõi job qua server-sent events đến khi hoàn tất hoặc thất bại
+  const waitForJob = (jobId) => new Promise((resolve, reject) => {
+    const source = api.jobEvents(jobId);
+    source.addEventListener('status', (event) => {
+      const job = JSON.parse(event.data);
+      if (job.status === 'completed' || job.status === 'failed') {
+        source.close();
+        resolve(job);
+      }
+    });
+    source.onerror = () => {
+      if (source.readyState === EventSource.CLOSED) {
+        reject(new Error('Mất kết nối khi chờ xác nhận giao dịch'));
+      }
+    };
+  });
+
   const handleSubmit = async (e) => {
     e.preventDefault();
     if (!token) {
@@ -22,15 +39,19 @@ function IssueCert({ token }) {
     }
     setLoading(true);
     try {
-      const response = await api.issueCertificate(formData, token, {
-        responseType: 'blob' // Nhận dữ liệu dạng blob (file PDF)
-      });
+      const response = await api.issueCertificate(formData, token);
+      toast.info('Đã gửi giao dịch, đang chờ xác nhận trên blockchain...');
+      const job = await waitForJob(response.data.jobId);
+      if (job.status === 'failed') {
+        throw new Error(job.error || 'Giao dịch thất bại trên blockchain');
+      }
       toast.success('Cấp chứng chỉ thành công!');
-      
-      const url = window.URL.createObjectURL(new Blob([response.data], { type: 'application/pdf' }));
+
+      const pdf = await api.downloadCertificatePdf(job.certId);
+      const url = window.URL.createObjectURL(new Blob([pdf.data], { type: 'application/pdf' }));
       const link = document.createElement('a');
       link.href = url;
-      link.setAttribute('download', `certificate_${formData.id}.pdf`);
+      link.setAttribute('download', `certificate_${job.certId}.pdf`);
       document.body.appendChild(link);
       link.click();
       link.remove();
@@ -38,7 +59,7 @@ function IssueCert({ token }) {
 
       setFormData({ id: '', recipient: '', course: '' });
     } catch (error) {
-      toast.error(error.response?.data?.detail || 'Lỗi khi cấp chứng chỉ');
+      toast.error(error.response?.data?.detail || error.message || 'Lỗi khi cấp chứng chỉ');
     } finally {
       setLoading(false);
     }
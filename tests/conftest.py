@@ -0,0 +1,128 @@
+"""Shared fixtures: in-process chain (eth-tester) and MongoDB stand-in from backend.benchmarks.offline_stack
+
+Test chain cần solc (py-solc-x tự cài nếu chưa có); khi không cài được, các test dùng chain bị skip,
+trừ khi REQUIRE_SOLC=1 (CI): khi đó chúng fail thay vì skip.
+"""
+
+import os
+
+# Cấu hình tối thiểu để import backend không cần .env; không có kết nối thật nào được mở
+for name, value in {
+    'INFURA_URL': 'http://127.0.0.1:8545',
+    'PRIVATE_KEY': '0x' + '11' * 32,
+    'CONTRACT_ADDRESS': '0x' + '00' * 20,
+    'MONGODB_URI': 'mongodb://127.0.0.1:27017/certificate_test',
+    'JWT_SECRET_KEY': 'offline-test-' + '0' * 32,
+    'JOB_POLL_INTERVAL': '0.05',
+    'EVENT_CONFIRMATIONS': '0',
+}.items():
+    os.environ.setdefault(name, value)
+
+from datetime import datetime, timedelta
+import jwt
+import httpx
+import pytest
+
+from backend.benchmarks import offline_stack
+
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
+
+
+@pytest.fixture(scope='session')
+def solc():
+    """
+    Skip test khi không biên dịch được contract (không có solc và không tải được); fail nếu REQUIRE_SOLC=1.
+    """
+    try:
+        offline_stack.compile_certificate_contract(offline_stack.DEFAULT_SOLC_VERSION, 1)
+    except Exception as e:
+        message = f"solc {offline_stack.DEFAULT_SOLC_VERSION} is not available: {e}"
+        if os.environ.get('REQUIRE_SOLC') == '1':
+            pytest.fail(message)
+        pytest.skip(message)
+
+
+@pytest.fixture
+def chain(solc):
+    return offline_stack.OfflineChain()
+
+
+@pytest.fixture
+def tester_client():
+    """
+    BlockchainClient trên eth-tester không có contract (không cần solc): ký, gửi giao dịch thường, ABI.
+    """
+    from web3 import EthereumTesterProvider
+    from backend.blockchain.blockchain import BlockchainClient
+
+    provider = EthereumTesterProvider()
+    keys = provider.ethereum_tester.backend.account_keys
+    client = BlockchainClient(
+        provider=provider,
+        private_key=keys[0].to_hex(),
+        contract_address=provider.ethereum_tester.get_accounts()[-1],
+        max_workers=1,
+        signer_keys=[keys[1].to_hex()]
+    )
+    yield client
+    client.signer.shutdown()
+
+
+@pytest.fixture
+async def blockchain(chain):
+    """
+    BlockchainClient nối với contract v1 trên chain offline.
+    """
+    blockchain = chain.blockchain_client()
+    yield blockchain
+    blockchain.signer.shutdown()
+
+
+@pytest.fixture
+def mongo_client():
+    return offline_stack.offline_mongo_client("certificate_test")
+
+
+@pytest.fixture
+async def services(chain, mongo_client):
+    """
+    AppServices trên chain và MongoDB offline, đã warm up; đóng sau test.
+    """
+    from backend.dependencies import AppServices
+
+    services = AppServices(mongo_client=mongo_client, blockchain_client=chain.blockchain_client())
+    await services.connect()
+    await services.warm_up()
+    yield services
+    await services.close()
+
+
+@pytest.fixture
+def auth_headers():
+    token = jwt.encode(
+        {'sub': 'test', 'role': 'super_admin', 'exp': datetime.utcnow() + timedelta(hours=1)},
+        os.environ['JWT_SECRET_KEY'], algorithm='HS256'
+    )
+    return {'Authorization': f"Bearer {token}"}
+
+
+@pytest.fixture
+async def client(services):
+    """
+    Client ASGI của ứng dụng; mọi dependency get_... trả về service của fixture services.
+    """
+    from backend import dependencies
+    from backend.app import app
+
+    app.dependency_overrides[dependencies.get_services] = lambda: services
+    for name in dir(dependencies):
+        if name.startswith('get_') and hasattr(services, name[len('get_'):]):
+            app.dependency_overrides[getattr(dependencies, name)] = lambda attr=name[len('get_'):]: getattr(services, attr)
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            yield client
+    finally:
+        app.dependency_overrides.clear()
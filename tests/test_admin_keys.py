@@ -0,0 +1,60 @@
+import pytest
+
+from backend.blockchain.blockchain import BlockchainClient
+from backend.blockchain.admin_keys import AdminKeySet
+
+pytestmark = pytest.mark.anyio
+
+COURSE = "Khóa học Python Nâng cao"
+
+
+def test_removed_signer_is_no_longer_trusted():
+    admin_keys = AdminKeySet()
+    admin_keys.trust(["0xAbC0000000000000000000000000000000000001"])
+    assert admin_keys.status("0xabc0000000000000000000000000000000000001") == 'active'
+
+    admin_keys.set_status("0xabc0000000000000000000000000000000000001", 'removed')
+    assert admin_keys.status("0xABC0000000000000000000000000000000000001") == 'removed'
+
+
+@pytest.fixture
+async def services(chain, mongo_client):
+    # Pool có một tài khoản chưa được addAdmin trên contract
+    from backend.dependencies import AppServices
+
+    blockchain_client = BlockchainClient(
+        provider=chain.provider, private_key=chain.private_key, contract_address=chain.contract_address,
+        max_workers=1, signer_keys=chain.signer_keys[:1]
+    )
+    services = AppServices(mongo_client=mongo_client, blockchain_client=blockchain_client)
+    await services.connect()
+    await services.warm_up()
+    yield services
+    await services.close()
+
+
+async def verify_offline(client, services, cert_id: str, signer) -> dict:
+    blockchain = services.blockchain_client
+    signature = blockchain.create_signature(
+        cert_id, blockchain.calculate_hash("Nguyễn Văn A"), blockchain.calculate_hash(COURSE), signer
+    )
+    response = await client.post("/api/verify-offline", json={
+        'id': cert_id, 'recipient': "Nguyễn Văn A", 'course': COURSE, 'signature': signature
+    })
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+async def test_only_confirmed_active_signers_are_valid(client, services):
+    primary, unconfirmed = services.blockchain_client.signers.signers
+    assert not unconfirmed.enabled
+
+    result = await verify_offline(client, services, "ADMIN-1", primary)
+    assert (result['signerStatus'], result['valid']) == ('active', True)
+
+    result = await verify_offline(client, services, "ADMIN-2", unconfirmed)
+    assert (result['signer'], result['signerStatus'], result['valid']) == (unconfirmed.address, None, False)
+
+    services.admin_keys.set_status(primary.address, 'removed')
+    result = await verify_offline(client, services, "ADMIN-3", primary)
+    assert (result['signerStatus'], result['valid']) == ('removed', False)
@@ -0,0 +1,116 @@
+import time
+import asyncio
+
+import anyio
+import pytest
+
+from backend.dependencies import AppServices
+from backend.jobs.issuance import JOB_SUBMITTED
+
+pytestmark = pytest.mark.anyio
+
+COURSE = "Khóa học Python Nâng cao"
+
+
+@pytest.fixture
+def receipts_released():
+    return asyncio.Event()
+
+
+@pytest.fixture
+def receipts_polled():
+    return asyncio.Event()
+
+
+@pytest.fixture
+async def services(tester_client, mongo_client, receipts_released, receipts_polled, monkeypatch):
+    """
+    AppServices trên BlockchainClient eth-tester không có contract (không cần solc): giao dịch cấp được gửi thật,
+    get_receipts của tracker chờ receipts_released trước khi đọc biên nhận.
+    """
+    async def check_admins(contract):
+        return [signer.address for signer in tester_client.signers.signers]
+
+    get_receipts = tester_client.get_receipts
+
+    async def gated_receipts(tx_hashes):
+        receipts_polled.set()
+        await receipts_released.wait()
+        return await get_receipts(tx_hashes)
+
+    monkeypatch.setattr(tester_client.signers, 'check_admins', check_admins)
+    monkeypatch.setattr(tester_client, 'get_receipts', gated_receipts)
+    services = AppServices(mongo_client=mongo_client, blockchain_client=tester_client)
+    await services.connect()
+    await services.warm_up()
+    yield services
+    await services.close()
+
+
+async def issue(client, headers, cert_id: str) -> str:
+    response = await client.post('/api/issue-certificate', headers=headers, json={
+        'id': cert_id, 'recipient': f"Recipient {cert_id}", 'course': COURSE
+    })
+    assert response.status_code == 202, response.text
+    return response.json()['jobId']
+
+
+async def wait_jobs(services, job_ids, timeout: float = 30) -> None:
+    pending = set(job_ids)
+    deadline = time.monotonic() + timeout
+    while pending:
+        assert time.monotonic() < deadline, f"jobs not done: {pending}"
+        for job_id in list(pending):
+            job = await services.mongo_client.find_job(job_id)
+            if job['status'] in ('completed', 'failed'):
+                assert job['status'] == 'completed', job
+                pending.discard(job_id)
+        await asyncio.sleep(0.02)
+
+
+def check_certificate(cert_id: str, body: dict) -> None:
+    assert body['id'] == cert_id
+    assert body['recipient'] == f"Recipient {cert_id}"
+    assert body['course'] == COURSE
+    assert body['revoked'] is False
+
+
+async def test_verify_stays_correct_during_issuance(services, client, auth_headers, receipts_released, receipts_polled):
+    issued = [f"ISSUED-{index}" for index in range(5)]
+    receipts_released.set()
+    await wait_jobs(services, [await issue(client, auth_headers, cert_id) for cert_id in issued])
+
+    new = [f"NEW-{index}" for index in range(10)]
+    for cert_id in new:
+        # Kết quả âm được cache trước khi cấp; phải bị xóa khi chứng chỉ được ghi
+        assert (await client.get(f"/api/verify-certificate/{cert_id}")).status_code == 404
+
+    # Tracker bị chặn trong get_receipts: giao dịch cấp còn pending trong suốt các lần tra cứu
+    receipts_released.clear()
+    receipts_polled.clear()
+    job_ids = await asyncio.gather(*[issue(client, auth_headers, cert_id) for cert_id in new])
+    with anyio.fail_after(10):
+        await receipts_polled.wait()
+
+    async def verify_all() -> None:
+        for cert_id in issued + new:
+            response = await client.get(f"/api/verify-certificate/{cert_id}")
+            if cert_id in issued:
+                assert response.status_code == 200, (cert_id, response.text)
+                check_certificate(cert_id, response.json())
+            else:
+                assert response.status_code == 404, (cert_id, response.text)
+
+    with anyio.fail_after(10):
+        await asyncio.gather(*[verify_all() for _ in range(4)])
+    assert not receipts_released.is_set()
+    assert [job['status'] for job in [await services.mongo_client.find_job(job_id) for job_id in job_ids]] == [JOB_SUBMITTED] * len(new)
+
+    receipts_released.set()
+    await wait_jobs(services, job_ids)
+    for cert_id in issued + new:
+        response = await client.get(f"/api/verify-certificate/{cert_id}?offline=true")
+        assert response.status_code == 200, response.text
+        body = response.json()
+        check_certificate(cert_id, body)
+        assert body['signatureCheck']['valid'] is True, body['signatureCheck']
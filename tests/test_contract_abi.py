@@ -0,0 +1,41 @@
+import json
+
+import pytest
+from eth_abi import grammar
+from eth_utils.abi import collapse_if_tuple
+from web3 import Web3
+
+from backend.config.setting import abi_config
+from backend.compile_contracts import DEFAULT_SOLC_VERSION, compile_certificate_contract, same_abi
+
+VERSIONS = (1, 2)
+
+
+def load_abi(version: int) -> list:
+    with open(abi_config.path_for(version)) as f:
+        return json.load(f)
+
+
+def parameters(abi: list):
+    for entry in abi:
+        for param in entry.get('inputs', []) + entry.get('outputs', []):
+            yield entry.get('name', entry['type']), param
+
+
+@pytest.mark.parametrize('version', VERSIONS)
+def test_abi_parameters_are_well_formed(version):
+    codec = Web3().codec
+    for name, param in parameters(load_abi(version)):
+        abi_type = collapse_if_tuple(param)
+        grammar.parse(abi_type)
+        assert codec.is_encodable_type(abi_type), (name, param)
+        # Tên tham số không được là tên kiểu (dấu hiệu name/type bị đảo)
+        assert param['name'] == '' or not codec.is_encodable_type(param['name']), (name, param)
+        internal = param['internalType']
+        assert internal == param['type'] or internal.startswith(('struct ', 'contract ', 'enum ')), (name, param)
+
+
+@pytest.mark.parametrize('version', VERSIONS)
+def test_abi_matches_solc(solc, version):
+    abi, _ = compile_certificate_contract(DEFAULT_SOLC_VERSION, version)
+    assert same_abi(abi, load_abi(version)), "run python -m backend.compile_contracts"
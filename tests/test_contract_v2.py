@@ -0,0 +1,146 @@
+import pytest
+from hexbytes import HexBytes
+
+from backend.benchmarks import offline_stack
+from backend.blockchain.blockchain import BlockchainClient, certificate_key, certificate_digest
+from backend.blockchain.cross_verifier import CrossVerifier
+from backend.migrate_contract import ContractMigrator
+
+pytestmark = pytest.mark.anyio
+
+COURSE = "Khóa học Python Nâng cao"
+
+
+@pytest.fixture
+async def blockchain_v2(solc):
+    chain = offline_stack.OfflineChain(contract_version=2)
+    blockchain = chain.blockchain_client()
+    yield blockchain
+    blockchain.signer.shutdown()
+
+
+def reverts(function_call, sender, reason: str) -> None:
+    # eth-tester báo revert bằng TransactionFailed, node thật bằng ContractLogicError
+    with pytest.raises(Exception, match=reason):
+        function_call.call({'from': sender})
+
+
+def hashes(blockchain, cert_id: str) -> tuple:
+    return blockchain.calculate_hash(f"Recipient {cert_id}"), blockchain.calculate_hash(COURSE)
+
+
+async def issue(blockchain, cert_id: str) -> dict:
+    recipient_hash, course_hash = hashes(blockchain, cert_id)
+    signature = blockchain.create_signature(cert_id, recipient_hash, course_hash)
+    receipt = await blockchain.issue_certificate(cert_id, recipient_hash, course_hash, signature)
+    assert receipt['status'] == 1
+    issue_date = blockchain.w3.eth.get_block(receipt['blockNumber'])['timestamp']
+    return {'id': cert_id, 'recipientHash': recipient_hash, 'courseHash': course_hash, 'signature': signature,
+            'issueDate': issue_date, 'revoked': False}
+
+
+async def anchor(blockchain, ids: list) -> list:
+    course_hash = blockchain.calculate_hash(COURSE)
+    records = [{'id': cert_id, 'recipientHash': blockchain.calculate_hash(f"Recipient {cert_id}"), 'courseHash': course_hash}
+               for cert_id in ids]
+    (chunk, receipt), = await blockchain.anchor_merkle_batches(records)
+    assert receipt['status'] == 1
+    tree = blockchain.merkle_tree(chunk)
+    return [dict(record, merkleRoot='0x' + tree.root.hex(), merkleProof=['0x' + node.hex() for node in tree.proof(index)], revoked=False)
+            for index, record in enumerate(chunk)]
+
+
+async def test_v2_views_decode(blockchain_v2):
+    record = await issue(blockchain_v2, "V2-1")
+    owner = blockchain_v2.signers.primary.address
+
+    assert await blockchain_v2.signers.check_admins(blockchain_v2.contract) == [owner]
+    digest, issue_date, revoked = await blockchain_v2.verify_certificate("V2-1")
+    assert (digest, issue_date, revoked) == (certificate_digest(record['recipientHash'], record['courseHash']), record['issueDate'], False)
+    assert tuple(blockchain_v2.contract.functions.certificates(certificate_key("V2-1")).call()) == (digest, issue_date, False)
+
+    verifier = CrossVerifier(blockchain_v2, cache=False)
+    _, report = await verifier.verify_record(record)
+    assert report['consistent'] is True, report
+
+    (_, receipt), = await blockchain_v2.revoke_certificates(["V2-1"])
+    assert receipt['status'] == 1
+    _, report = await verifier.verify_record(dict(record, revoked=True))
+    assert report['consistent'] is True, report
+    # ID đã thu hồi không được cấp lại
+    signature = blockchain_v2.create_signature("V2-1", record['recipientHash'], record['courseHash'])
+    reverts(blockchain_v2.contract.functions.issueCertificate(
+        "V2-1", HexBytes(record['recipientHash']), HexBytes(record['courseHash']), HexBytes(signature)
+    ), owner, "Certificate ID already exists")
+
+
+async def test_v2_batched_ids(blockchain_v2):
+    records = await anchor(blockchain_v2, ["V2-M1", "V2-M2", "V2-M3"])
+    functions = blockchain_v2.contract.functions
+    owner = blockchain_v2.signers.primary.address
+    root = HexBytes(records[0]['merkleRoot'])
+
+    assert functions.batchedIds(certificate_key("V2-M2")).call() == root
+    record = records[1]
+    signature = blockchain_v2.create_signature(record['id'], record['recipientHash'], record['courseHash'])
+    reverts(functions.issueCertificate(
+        record['id'], HexBytes(record['recipientHash']), HexBytes(record['courseHash']), HexBytes(signature)
+    ), owner, "Certificate ID already exists")
+    reverts(functions.anchorMerkleRoot(blockchain_v2.w3.keccak(text="other"), ["V2-M2"]), owner, "Certificate ID already exists")
+    reverts(functions.revokeBatchedCertificate("UNKNOWN", HexBytes(record['recipientHash']), HexBytes(record['courseHash'])),
+            owner, "Certificate does not exist")
+
+    receipt = await blockchain_v2.revoke_batched_certificate(record['id'], record['recipientHash'], record['courseHash'])
+    assert receipt['status'] == 1
+    _, reports = await CrossVerifier(blockchain_v2, cache=False).verify([dict(record, revoked=True), records[0]])
+    assert [report['consistent'] for report in reports] == [True, True]
+
+
+def deploy_v2(chain) -> str:
+    abi, bytecode = offline_stack.compile_certificate_contract(offline_stack.DEFAULT_SOLC_VERSION, 2)
+    w3 = chain.contract.w3
+    tx_hash = w3.eth.contract(abi=abi, bytecode=bytecode).constructor().transact({'from': chain.deployer})
+    return w3.eth.get_transaction_receipt(tx_hash)['contractAddress']
+
+
+async def test_migration_keeps_revoked_and_batched_ids(chain, blockchain, mongo_client):
+    active = await issue(blockchain, "MIG-ACTIVE")
+    revoked = await issue(blockchain, "MIG-REVOKED")
+    no_date = await issue(blockchain, "MIG-NODATE")
+    await blockchain.revoke_certificates(["MIG-REVOKED", "MIG-NODATE"])
+    batched = await anchor(blockchain, ["MIG-M1", "MIG-M2"])
+    await blockchain.revoke_batched_certificate("MIG-M1", batched[0]['recipientHash'], batched[0]['courseHash'])
+    records = [active, dict(revoked, revoked=True), dict(no_date, revoked=True, issueDate=None),
+               dict(batched[0], revoked=True), batched[1]]
+
+    target = BlockchainClient(provider=chain.provider, private_key=chain.private_key, contract_address=deploy_v2(chain),
+                              max_workers=1, contract_version=2)
+    try:
+        migrator = ContractMigrator(mongo_client, blockchain, target)
+        await migrator.migrate(records)
+        await migrator.verify(records, await target.get_block_number())
+        # Chạy lại: không còn gì để chép
+        rerun = ContractMigrator(mongo_client, blockchain, target)
+        await rerun.migrate(records)
+    finally:
+        target.signer.shutdown()
+
+    summary = migrator.summary
+    assert (summary['migrated'], summary['migratedRevoked'], summary['revokedWithoutIssueDate']) == (1, 1, 1)
+    assert (summary['batchedIds'], summary['merkleRoots'], summary['revokedLeaves'], summary['failedTransactions']) == (2, 1, 1, 0)
+    # Bản ghi thiếu ngày cấp không chép được và bị báo không khớp
+    assert (summary['consistent'], summary['mismatched']) == (4, 1)
+    assert (rerun.summary['alreadyMigrated'], rerun.summary['migrated'], rerun.summary['migratedRevoked']) == (2, 0, 0)
+    assert (rerun.summary['batchedIds'], rerun.summary['merkleRoots'], rerun.summary['revokedLeaves']) == (0, 0, 0)
+
+    functions = target.contract.functions
+    owner = target.signers.primary.address
+    assert tuple(functions.certificates(certificate_key("MIG-REVOKED")).call()) == (
+        certificate_digest(revoked['recipientHash'], revoked['courseHash']), revoked['issueDate'], True
+    )
+    for cert_id in ("MIG-REVOKED", "MIG-M2"):
+        recipient_hash, course_hash = hashes(target, cert_id)
+        reverts(functions.issueCertificate(
+            cert_id, HexBytes(recipient_hash), HexBytes(course_hash),
+            HexBytes(target.create_signature(cert_id, recipient_hash, course_hash))
+        ), owner, "Certificate ID already exists")
@@ -0,0 +1,50 @@
+import pytest
+
+from backend.config.setting import listener_config
+from backend.blockchain.cross_verifier import CrossVerifier, normalize_hex
+from backend.event_listener.event_listener import EventIngestor
+
+pytestmark = pytest.mark.anyio
+
+
+def test_normalize_hex():
+    assert normalize_hex(b'\xab\x01') == normalize_hex('0xAB01') == normalize_hex('ab01') == 'ab01'
+    assert normalize_hex(None) == ''
+
+
+@pytest.fixture(autouse=True)
+def backfill(monkeypatch):
+    # Listener đọc lại từ block đầu tiên thay vì bắt đầu ở head
+    monkeypatch.setattr(listener_config, 'start_block', 0)
+
+
+async def issue(blockchain, cert_id: str) -> None:
+    recipient_hash = blockchain.calculate_hash(f"Recipient {cert_id}")
+    course_hash = blockchain.calculate_hash("Khóa học Python Nâng cao")
+    signature = blockchain.create_signature(cert_id, recipient_hash, course_hash)
+    receipt = await blockchain.issue_certificate(cert_id, recipient_hash, course_hash, signature)
+    assert receipt['status'] == 1
+
+
+async def test_listener_written_record_is_consistent(blockchain, mongo_client):
+    await issue(blockchain, "LISTENED-1")
+    # Bản ghi chỉ có dữ liệu do event listener ghi từ sự kiện CertificateIssued
+    await mongo_client.insert_certificate({'id': "LISTENED-1", 'revoked': False})
+    await EventIngestor(mongo_client, blockchain).sync()
+    record = await mongo_client.find_certificate("LISTENED-1")
+    assert record['signature'].startswith('0x') and record['issueDate']
+
+    _, report = await CrossVerifier(blockchain, cache=False).verify_record(record)
+    assert report == {'id': "LISTENED-1", 'consistent': True, 'mismatches': []}
+
+
+async def test_hex_format_of_stored_record_does_not_matter(blockchain, mongo_client):
+    await issue(blockchain, "LEGACY-1")
+    await mongo_client.insert_certificate({'id': "LEGACY-1", 'revoked': False})
+    await EventIngestor(mongo_client, blockchain).sync()
+    record = await mongo_client.find_certificate("LEGACY-1")
+    legacy = dict(record, **{field: record[field].removeprefix('0x').upper() for field in ('recipientHash', 'courseHash', 'signature')})
+    tampered = dict(record, courseHash=blockchain.calculate_hash("Khóa học khác"))
+
+    _, reports = await CrossVerifier(blockchain, cache=False).verify([legacy, tampered])
+    assert [report['mismatches'] for report in reports] == [[], ['courseHash']]
@@ -0,0 +1,93 @@
+import pytest
+from hexbytes import HexBytes
+from eth_abi import encode
+
+from backend.config.setting import listener_config
+from backend.utils.pdf_cache import PdfCache
+from backend.utils.verify_cache import VerifyCache
+from backend.event_listener.event_listener import EventIngestor
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_apply_stores_0x_hex_like_the_issuance_path(tester_client, mongo_client):
+    recipient_hash = tester_client.calculate_hash("Nguyễn Văn A")
+    course_hash = tester_client.calculate_hash("Khóa học Python Nâng cao")
+    signature = tester_client.create_signature("CERT-1", recipient_hash, course_hash)
+    await mongo_client.insert_certificate({'id': "CERT-1", 'recipientHash': recipient_hash, 'courseHash': course_hash,
+                                           'signature': signature, 'revoked': False})
+    tx_hash = HexBytes(b'\x01' * 32)
+
+    # Tham số bytes của sự kiện được web3 decode thành bytes, transactionHash là HexBytes
+    await EventIngestor(mongo_client, tester_client).apply([{
+        'event': 'CertificateIssued',
+        'transactionHash': tx_hash,
+        'args': {
+            'id': "CERT-1",
+            'recipientHash': bytes(HexBytes(recipient_hash)),
+            'courseHash': bytes(HexBytes(course_hash)),
+            'issueDate': 1700000000,
+            'signature': bytes(HexBytes(signature)),
+        },
+    }, {
+        'event': 'AdminAdded',
+        'transactionHash': tx_hash,
+        'args': {'admin': tester_client.admin_address},
+    }])
+
+    record = await mongo_client.find_certificate("CERT-1")
+    assert (record['recipientHash'], record['courseHash'], record['signature']) == (recipient_hash, course_hash, signature)
+    assert signature.startswith('0x') and len(signature) == 2 + 65 * 2
+    admins = await mongo_client.find_all_admins()
+    assert admins[0]['txHash'] == tx_hash.to_0x_hex()
+
+
+def certificates_revoked_log(client, ids: list, block_number: int) -> dict:
+    """
+    Log thô của sự kiện CertificatesRevoked(string[] ids) như eth_getLogs trả về (không cần contract đã deploy).
+    """
+    return {
+        'address': client.contract.address,
+        'topics': [HexBytes(client.contract.events.CertificatesRevoked.topic)],
+        'data': HexBytes(encode(['string[]'], [ids])),
+        'blockNumber': block_number,
+        'blockHash': HexBytes(b'\x02' * 32),
+        'transactionHash': HexBytes(b'\x03' * 32),
+        'transactionIndex': 0,
+        'logIndex': 0,
+        'removed': False,
+    }
+
+
+async def test_sync_applies_certificates_revoked(tester_client, mongo_client, tmp_path, monkeypatch):
+    ids = ["CERT-1", "CERT-2", "CERT-3"]
+    for cert_id in ids:
+        await mongo_client.insert_certificate({'id': cert_id, 'revoked': False})
+    verify_cache = VerifyCache()
+    pdf_cache = PdfCache(directory=str(tmp_path))
+    for cert_id in ids:
+        verify_cache.set(cert_id, {'id': cert_id, 'revoked': False}, verify_cache.generation())
+        await pdf_cache.put(cert_id, PdfCache.cache_key(cert_id, "0x01"), b"%PDF")
+
+    async def get_block_number():
+        return 5
+
+    async def get_logs(from_block, to_block, topics):
+        assert HexBytes(tester_client.contract.events.CertificatesRevoked.topic).to_0x_hex() in topics[0]
+        return [certificates_revoked_log(tester_client, ids[:2], 3)] if from_block <= 3 <= to_block else []
+
+    monkeypatch.setattr(listener_config, 'start_block', 0)
+    monkeypatch.setattr(tester_client, 'get_block_number', get_block_number)
+    monkeypatch.setattr(tester_client, 'get_logs', get_logs)
+    ingestor = EventIngestor(mongo_client, tester_client, pdf_cache=pdf_cache, verify_cache=verify_cache)
+
+    assert await ingestor.sync() == 1
+
+    records = {cert_id: await mongo_client.find_certificate(cert_id) for cert_id in ids}
+    assert [records[cert_id]['revoked'] for cert_id in ids] == [True, True, False]
+    assert records["CERT-1"]['event'] == 'CertificateRevoked'
+    assert [await verify_cache.get(cert_id) for cert_id in ids] == [
+        (False, None), (False, None), (True, {'id': "CERT-3", 'revoked': False})
+    ]
+    assert [await pdf_cache.get(cert_id, PdfCache.cache_key(cert_id, "0x01")) for cert_id in ids] == [None, None, b"%PDF"]
+    assert await mongo_client.get_checkpoint('event_listener') == 5
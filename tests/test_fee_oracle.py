@@ -0,0 +1,40 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def fee_history_calls(tester_client, monkeypatch):
+    calls = []
+    fee_history = tester_client.w3.eth.fee_history
+
+    def counting_fee_history(*args, **kwargs):
+        calls.append(args)
+        return fee_history(*args, **kwargs)
+
+    monkeypatch.setattr(tester_client.w3.eth, 'fee_history', counting_fee_history)
+    return calls
+
+
+async def test_fees_refresh_once_per_observed_block(tester_client, fee_history_calls):
+    w3 = tester_client.w3
+    oracle = tester_client.fee_oracle
+    sender, receiver = w3.eth.accounts[:2]
+
+    await tester_client.get_block_number()
+    first = await oracle.fees()
+    assert await oracle.fees() == first
+    assert len(fee_history_calls) == 1
+
+    # Receipt tracker đọc head trong cùng batch với biên nhận: block mới làm mới phí đúng một lần
+    tx_hash = w3.eth.send_transaction({'from': sender, 'to': receiver, 'value': 1})
+    receipts = await tester_client.get_receipts([tx_hash.to_0x_hex()])
+    assert receipts[tx_hash.to_0x_hex()]['blockNumber'] == w3.eth.block_number
+    await oracle.fees()
+    await oracle.fees()
+    assert len(fee_history_calls) == 2
+
+    # Không có block mới: vẫn dùng cache
+    await tester_client.get_receipts([tx_hash.to_0x_hex()])
+    await oracle.fees()
+    assert len(fee_history_calls) == 2
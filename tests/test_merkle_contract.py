@@ -0,0 +1,132 @@
+import pytest
+
+from backend.config.setting import web3_config
+from backend.utils.merkle import certificate_leaf
+
+pytestmark = pytest.mark.anyio
+
+COURSE = "Khóa học Python Nâng cao"
+
+
+def batch(blockchain, prefix: str, count: int) -> list:
+    course_hash = blockchain.calculate_hash(COURSE)
+    return [
+        {'id': f"{prefix}-{index}", 'recipientHash': blockchain.calculate_hash(f"Recipient {index}"), 'courseHash': course_hash}
+        for index in range(count)
+    ]
+
+
+def reverts(function_call, sender, reason: str) -> None:
+    # eth-tester báo revert bằng TransactionFailed, node thật bằng ContractLogicError
+    with pytest.raises(Exception, match=reason):
+        function_call.call({'from': sender})
+
+
+async def anchor(blockchain, records: list) -> list:
+    results = await blockchain.anchor_merkle_batches(records)
+    for _, receipt in results:
+        assert not isinstance(receipt, Exception), receipt
+        assert receipt['status'] == 1
+    return results
+
+
+async def test_anchor_splits_batches_and_verifies_proofs(chain, blockchain, monkeypatch):
+    monkeypatch.setattr(web3_config, 'merkle_batch_size', 3)
+    records = batch(blockchain, "MERKLE", 7)
+
+    results = await anchor(blockchain, records)
+
+    assert [len(chunk) for chunk, _ in results] == [3, 3, 1]
+    for chunk, _ in results:
+        tree = blockchain.merkle_tree(chunk)
+        assert chain.contract.functions.merkleRoots(tree.root).call() > 0
+        for index, record in enumerate(chunk):
+            leaf = certificate_leaf(record['id'], record['recipientHash'], record['courseHash'])
+            assert chain.contract.functions.merkleLeaf(
+                record['id'], bytes.fromhex(record['recipientHash'][2:]), bytes.fromhex(record['courseHash'][2:])
+            ).call() == leaf
+            assert chain.contract.functions.batchedIds(blockchain.w3.keccak(text=record['id'])).call() == tree.root
+            proof = [blockchain.w3.to_hex(node) for node in tree.proof(index)]
+            assert await blockchain.verify_merkle_proof(blockchain.w3.to_hex(tree.root), leaf, proof) is True
+
+    # Proof của lô khác hoặc root chưa anchor không hợp lệ
+    (first, _), (second, _) = results[:2]
+    leaf = certificate_leaf(first[0]['id'], first[0]['recipientHash'], first[0]['courseHash'])
+    other = blockchain.merkle_tree(second)
+    assert await blockchain.verify_merkle_proof(
+        blockchain.w3.to_hex(other.root), leaf, [blockchain.w3.to_hex(node) for node in other.proof(0)]
+    ) is False
+    unknown_root = blockchain.w3.to_hex(blockchain.w3.keccak(text="not anchored"))
+    assert await blockchain.verify_merkle_proof(unknown_root, leaf, []) is False
+
+
+async def test_batched_ids_cannot_be_issued_again(chain, blockchain):
+    records = batch(blockchain, "BATCHED", 2)
+    (chunk, _), = await anchor(blockchain, records)
+    record = records[0]
+    signature = blockchain.create_signature(record['id'], record['recipientHash'], record['courseHash'])
+    functions = chain.contract.functions
+
+    reverts(functions.issueCertificate(
+        record['id'], bytes.fromhex(record['recipientHash'][2:]), bytes.fromhex(record['courseHash'][2:]),
+        bytes.fromhex(signature.removeprefix('0x'))
+    ), chain.deployer, "Certificate ID already exists")
+    # Cùng ID trong một lô khác, hoặc ID đã cấp lẻ, cũng bị từ chối
+    reverts(functions.anchorMerkleRoot(blockchain.w3.keccak(text="other root"), [record['id']]), chain.deployer,
+            "Certificate ID already exists")
+    reverts(functions.anchorMerkleRoot(blockchain.merkle_tree(chunk).root, ["NEW-ID"]), chain.deployer,
+            "Merkle root already anchored")
+    reverts(functions.anchorMerkleRoot(blockchain.w3.keccak(text="empty"), []), chain.deployer, "Empty batch")
+
+    recipient_hash = blockchain.calculate_hash("Recipient")
+    course_hash = blockchain.calculate_hash(COURSE)
+    await blockchain.issue_certificate(
+        "SINGLE", recipient_hash, course_hash, blockchain.create_signature("SINGLE", recipient_hash, course_hash)
+    )
+    reverts(functions.anchorMerkleRoot(blockchain.w3.keccak(text="single"), ["SINGLE"]), chain.deployer,
+            "Certificate ID already exists")
+
+
+async def test_revoke_batched_certificate(chain, blockchain):
+    records = batch(blockchain, "REVOKE", 4)
+    (chunk, _), = await anchor(blockchain, records)
+    tree = blockchain.merkle_tree(chunk)
+    root = blockchain.w3.to_hex(tree.root)
+    record = chunk[1]
+    leaf = certificate_leaf(record['id'], record['recipientHash'], record['courseHash'])
+    proof = [blockchain.w3.to_hex(node) for node in tree.proof(1)]
+    assert await blockchain.verify_merkle_proof(root, leaf, proof) is True
+
+    receipt = await blockchain.revoke_batched_certificate(record['id'], record['recipientHash'], record['courseHash'])
+    assert receipt['status'] == 1
+    assert chain.contract.functions.revokedLeaves(leaf).call() is True
+    assert await blockchain.verify_merkle_proof(root, leaf, proof) is False
+    # Các chứng chỉ khác của lô vẫn hợp lệ
+    other = chunk[0]
+    assert await blockchain.verify_merkle_proof(root, certificate_leaf(
+        other['id'], other['recipientHash'], other['courseHash']
+    ), [blockchain.w3.to_hex(node) for node in tree.proof(0)]) is True
+
+    functions = chain.contract.functions
+    hashes = (bytes.fromhex(record['recipientHash'][2:]), bytes.fromhex(record['courseHash'][2:]))
+    reverts(functions.revokeBatchedCertificate(record['id'], *hashes), chain.deployer, "Certificate already revoked")
+    reverts(functions.revokeBatchedCertificate("UNKNOWN", *hashes), chain.deployer, "Certificate does not exist")
+
+
+async def test_batch_issue_route(services, client, auth_headers, monkeypatch):
+    monkeypatch.setattr(web3_config, 'merkle_batch_size', 2)
+    certificates = [{'id': f"ROUTE-{index}", 'recipient': f"Recipient {index}", 'course': COURSE} for index in range(5)]
+
+    response = await client.post('/api/issue-certificates/batch', headers=auth_headers, json={'certificates': certificates})
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body['count'] == 5 and body['failed'] == []
+    assert [batch['count'] for batch in body['batches']] == [2, 2, 1]
+    for certificate in certificates:
+        verified = (await client.get(f"/api/verify-certificate/{certificate['id']}")).json()
+        assert verified['merkleProofValid'] is True
+        assert verified['merkleRoot'] in {batch['merkleRoot'] for batch in body['batches']}
+
+    response = await client.post('/api/issue-certificate', headers=auth_headers, json=certificates[0])
+    assert response.status_code == 409
@@ -0,0 +1,41 @@
+import asyncio
+import pytest
+from web3 import EthereumTesterProvider
+
+from backend.blockchain.blockchain import BlockchainClient, is_nonce_error
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def threaded_client():
+    """
+    BlockchainClient trên eth-tester với thread pool RPC nhiều thread (không cần solc).
+    """
+    provider = EthereumTesterProvider()
+    keys = provider.ethereum_tester.backend.account_keys
+    client = BlockchainClient(
+        provider=provider,
+        private_key=keys[0].to_hex(),
+        contract_address=provider.ethereum_tester.get_accounts()[-1],
+        max_workers=8,
+        signer_keys=[]
+    )
+    yield client
+    client.signer.shutdown()
+
+
+async def test_concurrent_submissions_from_one_signer(threaded_client):
+    signer = threaded_client.signers.primary
+    calls = [threaded_client.contract.functions.revokeCertificate(f"NONCE-{i}") for i in range(40)]
+
+    results = await asyncio.gather(
+        *(threaded_client.submit_transaction(call, gas=100_000, signer=signer) for call in calls),
+        return_exceptions=True
+    )
+
+    errors = [result for result in results if isinstance(result, Exception)]
+    assert not any(is_nonce_error(error) for error in errors), errors
+    assert errors == []
+    assert threaded_client.w3.eth.get_transaction_count(signer.address) == len(calls)
+    assert signer.load == len(calls)
@@ -0,0 +1,114 @@
+import sys
+import json
+import asyncio
+
+import pytest
+from web3 import Web3, EthereumTesterProvider
+
+from backend.blockchain.blockchain import BlockchainClient
+from backend.benchmarks import load_benchmark
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_mongo_stand_in_round_trip(mongo_client):
+    await mongo_client.ensure_indexes()
+    await mongo_client.insert_certificates([
+        {'id': f"CERT-{index}", 'revoked': False} for index in range(3)
+    ])
+
+    assert (await mongo_client.find_certificate("CERT-1"))['revoked'] is False
+    assert await mongo_client.bulk_update_certificates([("CERT-1", {'revoked': True})]) == 1
+    assert (await mongo_client.find_certificate("CERT-1"))['revoked'] is True
+    assert await mongo_client.find_certificate("CERT-9") is None
+
+    page, cursor = await mongo_client.find_certificates_page({}, limit=2, fields=['id'])
+    assert len(page) == 2 and cursor == page[-1]['_id']
+    rest, cursor = await mongo_client.find_certificates_page({}, after=cursor, limit=2)
+    assert len(rest) == 1 and cursor is None
+    assert await mongo_client.find_certificate_ids(["CERT-0", "CERT-9"]) == {"CERT-0"}
+
+
+async def test_batch_request_without_provider_batching():
+    # EthereumTesterProvider không có make_batch_request: BlockchainClient gọi lần lượt
+    provider = EthereumTesterProvider()
+    w3 = Web3(provider)
+    sender, receiver = w3.eth.accounts[:2]
+    tx_hash = w3.eth.send_transaction({'from': sender, 'to': receiver, 'value': 1})
+    client = BlockchainClient(
+        provider=provider,
+        private_key=provider.ethereum_tester.backend.account_keys[0].to_hex(),
+        contract_address=receiver,
+        max_workers=1
+    )
+    try:
+        missing = '0x' + '00' * 32
+        receipts = await client.get_receipts([tx_hash.to_0x_hex(), missing])
+        receipt = receipts[tx_hash.to_0x_hex()]
+        assert receipt['status'] == 1 and receipt['blockNumber'] == 1 and receipt['gasUsed'] == 21000
+        assert receipts[missing] is None
+
+        timestamps = await client.get_block_timestamps([0, 1])
+        assert timestamps[1] == w3.eth.get_block(1)['timestamp']
+
+        responses = await client.batch_request([('eth_blockNumber', []), ('eth_getBlockByNumber', ['0x99', False])])
+        assert responses[0]['result'] == 1
+        assert 'error' in responses[1] or responses[1]['result'] is None
+    finally:
+        client.signer.shutdown()
+
+
+def floor_baseline(**meta):
+    meta = {'scenarios': list(load_benchmark.SCENARIOS), 'contract_version': 1, **meta}
+    results = [
+        {'scenario': scenario, 'concurrency': concurrency, 'throughput': 0, 'p95_ms': None, 'errors': {}}
+        for concurrency in meta['concurrency'] for scenario in load_benchmark.SCENARIOS if scenario != 'ingest'
+    ]
+    results.append({'scenario': 'ingest', 'concurrency': 1, 'throughput': 0, 'p95_ms': None, 'errors': {}})
+    return {'meta': meta, 'results': results}
+
+
+@pytest.mark.parametrize('signers', [1, 3])
+def test_load_benchmark_smoke(solc, monkeypatch, capsys, tmp_path, signers):
+    output = tmp_path / "load.json"
+    # Baseline sàn (throughput 0, không p95): chỉ kiểm tra đường --baseline, tham số chạy và lỗi mới
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps(floor_baseline(requests=4, concurrency=[1, 2], ingest_runs=1, signers=signers)))
+    monkeypatch.setattr(sys, 'argv', [
+        'load_benchmark', '--requests', '4', '--concurrency', '1,2', '--ingest-runs', '1', '--confirm-timeout', '30',
+        '--signers', str(signers), '--output', str(output), '--baseline', str(baseline)
+    ])
+    assert asyncio.run(load_benchmark.main()) == 0
+    # Mọi tài khoản ký đều gửi giao dịch cấp chứng chỉ
+    transactions = json.loads(output.read_text())['meta']['signer_transactions']
+    assert len(transactions) == signers and all(transactions.values()), transactions
+
+    results = [line for line in capsys.readouterr().out.splitlines() if line.startswith('{')]
+    scenarios = {json.loads(line)['scenario'] for line in results}
+    assert scenarios == set(load_benchmark.SCENARIOS)
+    for line in results:
+        assert json.loads(line)['errors'] == {}, line
+
+
+def test_load_benchmark_compare():
+    baseline = floor_baseline(requests=4, concurrency=[1], ingest_runs=1, signers=1)
+    for result in baseline['results']:
+        result.update(throughput=100.0, p95_ms=10.0)
+    meta = dict(baseline['meta'])
+    results = [dict(result) for result in baseline['results']]
+    assert load_benchmark.compare(results, baseline, 0.2, meta) == []
+
+    # Tham số khác baseline: chỉ báo tham số, không so số liệu
+    regressions = load_benchmark.compare(results, baseline, 0.2, {**meta, 'requests': 100})
+    assert regressions == ["baseline was recorded with requests=4, this run uses requests=100"]
+
+    results[0].update(throughput=79.0)
+    results[1].update(p95_ms=12.5)
+    results[2].update(errors={'HTTPStatusError': 1})
+    regressions = load_benchmark.compare(results[:-1], baseline, 0.2, meta)
+    assert regressions == [
+        "issue@1: throughput 79.0 < baseline 100.0",
+        "issue_confirmed@1: p95 12.5 ms > baseline 10.0 ms",
+        "issue_duplicate@1: errors {'HTTPStatusError': 1}",
+        "ingest@1: missing from this run",
+    ]
@@ -0,0 +1,36 @@
+import os
+import pytest
+
+from backend.utils.pdf_cache import PdfCache
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return PdfCache(directory=str(tmp_path), memory_max_bytes=1024, disk_max_bytes=10_000)
+
+
+async def test_invalidate_without_tx_hash_clears_memory(cache):
+    keys = [PdfCache.cache_key("CERT-1", tx_hash) for tx_hash in ("0x01", "0x02")]
+    for key in keys:
+        await cache.put("CERT-1", key, b"%PDF" + key.encode())
+    other = PdfCache.cache_key("CERT-2", "0x03")
+    await cache.put("CERT-2", other, b"%PDF-other")
+
+    await cache.invalidate("CERT-1")
+
+    assert [await cache.get("CERT-1", key) for key in keys] == [None, None]
+    assert await cache.get("CERT-2", other) == b"%PDF-other"
+    assert cache._memory_bytes == len(b"%PDF-other")
+    assert list(os.listdir(cache.directory)) == [os.path.basename(cache._file_path("CERT-2", other))]
+
+
+async def test_overwrite_counts_disk_bytes_once(cache):
+    key = PdfCache.cache_key("CERT-1", "0x01")
+    for _ in range(5):
+        await cache.put("CERT-1", key, b"x" * 1000)
+    await cache.put("CERT-1", key, b"x" * 600)
+
+    assert cache._disk_bytes == 600
+    assert cache._memory_bytes == 600
@@ -0,0 +1,34 @@
+import pytest
+
+from backend.utils import pdf_renderer
+from backend.utils.pdf_renderer import PdfRenderer
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_logo_is_loaded_once_in_parent(monkeypatch):
+    with open(pdf_renderer.logo_path, "rb") as f:
+        logo = f.read()
+    calls = []
+
+    def load_logo():
+        calls.append(1)
+        return logo
+
+    monkeypatch.setattr(pdf_renderer, "load_logo", load_logo)
+    renderer = PdfRenderer(workers=2, max_pending=4)
+    try:
+        await renderer.start()
+        pdfs = [
+            await renderer.render(f"PDF-{i}", "Nguyễn Văn A", "Khóa học Python", "01/01/2024", "0x" + "ab" * 32)
+            for i in range(3)
+        ]
+    finally:
+        renderer.shutdown()
+
+    assert calls == [1]
+    assert all(pdf.startswith(b"%PDF") for pdf in pdfs)
+    # Worker nhận logo từ process cha: PDF lớn hơn bản render không có logo
+    from backend.utils.pdf_generator import generate_certificate_pdf, init_pdf_resources
+    init_pdf_resources(None)
+    assert len(pdfs[0]) > len(generate_certificate_pdf("PDF-0", "Nguyễn Văn A", "Khóa học Python", "01/01/2024", "0x" + "ab" * 32))
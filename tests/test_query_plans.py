@@ -0,0 +1,66 @@
+import os
+import pytest
+from pymongo import IndexModel, DESCENDING
+
+from backend.config.setting import db_config
+from backend.db.connector import MongoDBClient, QueryPlanError
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def fail_on_collscan(monkeypatch):
+    monkeypatch.setattr(db_config, 'query_plan_check', 'fail')
+
+
+async def test_hot_queries_use_indexes(mongo_client, fail_on_collscan):
+    await mongo_client.ensure_indexes()
+    await mongo_client.insert_certificate({'id': "CERT-1", 'revoked': False})
+
+    report = await mongo_client.explain_queries()
+    assert {name: stages for name, stages in report.items() if {'COLLSCAN', 'SORT'} & set(stages)} == {}
+
+    # Các truy vấn của connector chạy ở chế độ fail: COLLSCAN sẽ raise QueryPlanError
+    assert (await mongo_client.find_certificate("CERT-1"))['id'] == "CERT-1"
+    await mongo_client.update_certificate("CERT-1", {'revoked': True})
+    assert await mongo_client.find_certificate_ids(["CERT-1", "CERT-2"]) == {"CERT-1"}
+    assert len(await mongo_client.find_certificates_by_ids(["CERT-1"])) == 1
+    assert await mongo_client.find_user("admin") is None
+    await mongo_client.update_admin('0x' + '00' * 20, 'active')
+    assert await mongo_client.find_active_job("CERT-1", ['pending']) is None
+    assert await mongo_client.find_jobs_by_status(['pending']) == []
+    assert await mongo_client.find_job_cert_ids(["CERT-1"], ['pending']) == set()
+    assert await mongo_client.find_reservations(["CERT-1"]) == {}
+
+    # Trang sự kiện: lọc (bằng/khoảng) kèm sort _id không được sort trong bộ nhớ
+    date_range = {'$gte': 0, '$lte': 2 ** 31}
+    assert (await mongo_client.find_certificates_page({'issueDate': date_range}))[0] == []
+    assert (await mongo_client.find_certificates_page({'event': 'CertificateIssued', 'issueDate': date_range}))[0] == []
+    assert len((await mongo_client.find_certificates_page({'revoked': True}))[0]) == 1
+    assert (await mongo_client.find_admins_page({'event': 'AdminAdded', 'timestamp': date_range}))[0] == []
+    assert [doc['id'] async for doc in mongo_client.iter_documents(mongo_client.cert_collection, {}, ['id'])] == ["CERT-1"]
+
+
+async def test_collscan_fails_without_indexes(mongo_client, fail_on_collscan):
+    with pytest.raises(QueryPlanError, match="COLLSCAN"):
+        await mongo_client.find_certificate("CERT-1")
+
+
+async def test_in_memory_sort_fails_without_sort_index(mongo_client, fail_on_collscan):
+    # Index chỉ trên issueDate phục vụ bộ lọc nhưng không phục vụ sort _id của keyset pagination
+    await mongo_client.cert_collection.create_indexes([IndexModel([("issueDate", DESCENDING)], name="issueDate")])
+    with pytest.raises(QueryPlanError, match="SORT"):
+        await mongo_client.find_certificates_page({'issueDate': {'$gte': 0}})
+
+
+@pytest.mark.skipif(not os.environ.get('MONGODB_TEST_URI'), reason="MONGODB_TEST_URI is not set (real mongod)")
+async def test_hot_queries_use_indexes_on_mongod():
+    mongo_client = MongoDBClient(uri=os.environ['MONGODB_TEST_URI'], db_name="certificate_query_plans")
+    try:
+        await mongo_client.client.drop_database("certificate_query_plans")
+        await mongo_client.ensure_indexes()
+        report = await mongo_client.explain_queries()
+        assert {name: stages for name, stages in report.items() if {'COLLSCAN', 'SORT'} & set(stages)} == {}
+    finally:
+        await mongo_client.client.drop_database("certificate_query_plans")
+        await mongo_client.close()
@@ -0,0 +1,77 @@
+import pytest
+
+from backend.config.setting import web3_config, listener_config
+from backend.event_listener.event_listener import EventIngestor
+
+pytestmark = pytest.mark.anyio
+
+COURSE = "Khóa học Python Nâng cao"
+
+
+def reverts(function_call, sender, reason: str) -> None:
+    # eth-tester báo revert bằng TransactionFailed, node thật bằng ContractLogicError
+    with pytest.raises(Exception, match=reason):
+        function_call.call({'from': sender})
+
+
+async def issue(blockchain, ids: list) -> list:
+    records = []
+    for cert_id in ids:
+        recipient_hash = blockchain.calculate_hash(f"Recipient {cert_id}")
+        course_hash = blockchain.calculate_hash(COURSE)
+        signature = blockchain.create_signature(cert_id, recipient_hash, course_hash)
+        receipt = await blockchain.issue_certificate(cert_id, recipient_hash, course_hash, signature)
+        assert receipt['status'] == 1
+        records.append({'id': cert_id, 'recipientHash': recipient_hash, 'courseHash': course_hash,
+                        'signature': signature, 'revoked': False})
+    return records
+
+
+def exists(chain, cert_id: str) -> bool:
+    return chain.contract.functions.certificates(cert_id).call()[0] == cert_id
+
+
+async def test_revoke_certificates_in_batches(chain, blockchain, monkeypatch):
+    monkeypatch.setattr(web3_config, 'revoke_batch_size', 2)
+    ids = [f"REVOKE-{index}" for index in range(5)]
+    await issue(blockchain, ids)
+
+    results = await blockchain.revoke_certificates(ids[:3])
+
+    assert [chunk for chunk, _ in results] == [ids[:2], ids[2:3]]
+    for chunk, receipt in results:
+        assert receipt['status'] == 1
+        events = chain.contract.events.CertificatesRevoked().process_receipt(receipt)
+        assert [list(event['args']['ids']) for event in events] == [chunk]
+    assert [exists(chain, cert_id) for cert_id in ids] == [False, False, False, True, True]
+
+
+async def test_revoke_certificates_rejects_unknown_and_revoked_ids(chain, blockchain):
+    ids = ["KNOWN-1", "KNOWN-2"]
+    await issue(blockchain, ids)
+    (_, receipt), = await blockchain.revoke_certificates(["KNOWN-1"])
+    assert receipt['status'] == 1
+
+    functions = chain.contract.functions
+    reverts(functions.revokeCertificates(["KNOWN-2", "UNKNOWN"]), chain.deployer, "Certificate does not exist")
+    reverts(functions.revokeCertificates(["KNOWN-2", "KNOWN-1"]), chain.deployer, "Certificate does not exist")
+    reverts(functions.revokeCertificates([]), chain.deployer, "Empty revocation list")
+    reverts(functions.revokeCertificates(["KNOWN-2"]), chain.tester.get_accounts()[-1], "Only admin can call")
+    with pytest.raises(Exception, match="Certificate does not exist"):
+        await blockchain.revoke_certificates(["KNOWN-2", "UNKNOWN"])
+    # Cả lô bị revert: chứng chỉ hợp lệ trong lô vẫn còn trên contract
+    assert exists(chain, "KNOWN-2")
+
+
+async def test_listener_applies_certificates_revoked(chain, blockchain, mongo_client, monkeypatch):
+    monkeypatch.setattr(listener_config, 'start_block', 0)
+    ids = [f"LISTEN-{index}" for index in range(3)]
+    for record in await issue(blockchain, ids):
+        await mongo_client.insert_certificate(record)
+    await blockchain.revoke_certificates(ids[:2])
+
+    await EventIngestor(mongo_client, blockchain).sync()
+
+    records = [await mongo_client.find_certificate(cert_id) for cert_id in ids]
+    assert [record['revoked'] for record in records] == [True, True, False]
+    assert [record['event'] for record in records] == ['CertificateRevoked', 'CertificateRevoked', 'CertificateIssued']
@@ -0,0 +1,75 @@
+import pytest
+from web3 import Web3
+
+from backend.blockchain.rpc_transport import MultiEndpointProvider, CIRCUIT_CLOSED, CIRCUIT_OPEN
+from backend.benchmarks.rpc_failover_benchmark import FakeRPCServer
+
+FAILURE_THRESHOLD = 3
+
+
+@pytest.fixture
+def servers():
+    servers = FakeRPCServer("fast", 0.0), FakeRPCServer("slow", 0.1)
+    yield servers
+    for server in servers:
+        server.stop()
+
+
+@pytest.fixture
+def provider(servers):
+    fast, slow = servers
+    provider = MultiEndpointProvider(
+        [fast.url, slow.url], pool_size=4, timeout=5, failure_threshold=FAILURE_THRESHOLD, circuit_reset=60
+    )
+    w3 = Web3(provider)
+    for _ in range(4):
+        w3.eth.block_number  # đo EWMA ban đầu của cả hai endpoint
+    for server in servers:
+        server.reset_counters()
+    yield provider
+    provider.close()
+
+
+def requests_to(server) -> int:
+    return sum(server.requests.values())
+
+
+@pytest.mark.parametrize("failure", ["error", "down", "rate_limit"])
+def test_failing_endpoint_opens_circuit_and_reads_move(servers, provider, failure):
+    fast, slow = servers
+    w3 = Web3(provider)
+    assert w3.eth.block_number == 1000
+    assert (requests_to(fast), requests_to(slow)) == (1, 0)
+
+    fast.mode = failure
+    for _ in range(10):
+        assert w3.eth.block_number == 1000
+    fast_endpoint, slow_endpoint = provider.endpoints
+    # Sau FAILURE_THRESHOLD lỗi liên tiếp endpoint bị bỏ qua, mọi lời gọi đều thành công qua endpoint khỏe
+    assert (fast_endpoint.state, slow_endpoint.state) == (CIRCUIT_OPEN, CIRCUIT_CLOSED)
+    assert requests_to(fast) == 1 + FAILURE_THRESHOLD
+    assert requests_to(slow) == 10
+
+    # Hết RPC_CIRCUIT_RESET: một request thử đóng lại circuit, endpoint nhanh nhận lại traffic
+    fast.mode = 'ok'
+    provider.circuit_reset = 0
+    w3.eth.block_number
+    assert fast_endpoint.state == CIRCUIT_CLOSED
+    fast.reset_counters()
+    w3.eth.block_number
+    assert requests_to(fast) == 1
+
+
+def test_write_endpoint_moves_when_it_goes_down(servers, provider):
+    fast, slow = servers
+    w3 = Web3(provider)
+    w3.eth.send_raw_transaction(b'\x00')
+    assert provider.write_endpoint.url == fast.url
+
+    fast.mode = 'down'
+    w3.eth.send_raw_transaction(b'\x00')
+    assert provider.write_endpoint.url == slow.url
+    slow.reset_counters()
+    fast.mode = 'ok'
+    w3.eth.send_raw_transaction(b'\x00')
+    assert slow.requests['eth_sendRawTransaction'] == 1
@@ -0,0 +1,48 @@
+import pytest
+
+from backend.utils.utils import CertificateInput
+from backend.blockchain.signer import CertificateSigner, recover_signer
+
+pytestmark = pytest.mark.anyio
+
+
+def make_certificates(count: int) -> list:
+    return [
+        CertificateInput(id=f"SIGN-{i}", recipient=f"Nguyễn Văn A {i}", course=f"Khóa học Python {i % 3}")
+        for i in range(count)
+    ]
+
+
+def expected_signatures(client, certificates: list, signers: list) -> list:
+    signed = []
+    for cert, signer in zip(certificates, signers):
+        recipient_hash = client.calculate_hash(cert.recipient)
+        course_hash = client.calculate_hash(cert.course)
+        signed.append((recipient_hash, course_hash, client.create_signature(cert.id, recipient_hash, course_hash, signer)))
+    return signed
+
+
+@pytest.fixture
+def pool_signer(tester_client):
+    # process_threshold=1: mọi lô đều đi qua process pool
+    signer = CertificateSigner(tester_client.signer.private_keys, workers=2, process_threshold=1)
+    yield signer
+    signer.shutdown()
+
+
+async def test_batch_signing_matches_create_signature(tester_client, pool_signer):
+    certificates = make_certificates(9)
+    signers = [tester_client.signers.signers[i % 2] for i in range(len(certificates))]
+    addresses = [signer.address for signer in signers]
+    expected = expected_signatures(tester_client, certificates, signers)
+
+    assert pool_signer.sign(certificates, addresses) == expected
+    assert await pool_signer.sign_many(certificates, addresses) == expected
+    assert pool_signer._pool is not None
+    assert [recover_signer(c.id, *signed) for c, signed in zip(certificates, expected)] == addresses
+
+
+async def test_sign_certificates_matches_create_signature(tester_client):
+    certificates = make_certificates(3)
+    expected = expected_signatures(tester_client, certificates, [None] * len(certificates))
+    assert await tester_client.sign_certificates(certificates) == expected
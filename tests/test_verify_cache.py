@@ -0,0 +1,100 @@
+import asyncio
+
+import httpx
+import pytest
+
+from backend import dependencies
+from backend.utils.verify_cache import VerifyCache
+
+pytestmark = pytest.mark.anyio
+
+RESPONSE = {'id': "CERT-1", 'revoked': False}
+
+
+async def test_set_skipped_when_invalidated_during_lookup():
+    cache = VerifyCache()
+    generation = cache.generation()
+    cache.invalidate("CERT-1")
+    cache.set("CERT-1", RESPONSE, generation)
+    cache.set_negative("CERT-2", generation)
+
+    assert await cache.get("CERT-1") == (False, None)
+    # Invalidate một ID khác không chặn ghi
+    assert await cache.get("CERT-2") == (True, None)
+
+    cache.set("CERT-1", RESPONSE, cache.generation())
+    assert await cache.get("CERT-1") == (True, RESPONSE)
+
+
+async def test_forgotten_invalidations_stay_conservative():
+    cache = VerifyCache(max_entries=2)
+    generation = cache.generation()
+    for cert_id in ("CERT-1", "CERT-2", "CERT-3"):
+        cache.invalidate(cert_id)
+    cache.set("CERT-1", RESPONSE, generation)
+    assert await cache.get("CERT-1") == (False, None)
+
+
+async def test_shared_store_skips_responses_read_before_another_worker_invalidated(tmp_path):
+    path = str(tmp_path / "verify.sqlite")
+    reader, writer = VerifyCache(shared_path=path), VerifyCache(shared_path=path)
+    generation = reader.generation()
+    writer.invalidate("CERT-1")
+    writer.close()
+    reader.set("CERT-1", RESPONSE, generation)
+    reader.set("CERT-2", {'id': "CERT-2"}, generation)
+    reader.close()
+
+    fresh = VerifyCache(shared_path=path)
+    try:
+        assert await fresh.get("CERT-1") == (False, None)
+        assert await fresh.get("CERT-2") == (True, {'id': "CERT-2"})
+    finally:
+        fresh.close()
+
+
+@pytest.fixture
+def verify_cache():
+    return VerifyCache()
+
+
+@pytest.fixture
+async def verify_client(mongo_client, verify_cache):
+    from backend.app import app
+
+    app.dependency_overrides[dependencies.get_mongo_client] = lambda: mongo_client
+    app.dependency_overrides[dependencies.get_verify_cache] = lambda: verify_cache
+    app.dependency_overrides[dependencies.get_cross_verifier] = lambda: None
+    app.dependency_overrides[dependencies.get_admin_keys] = lambda: None
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            yield client
+    finally:
+        app.dependency_overrides.clear()
+
+
+async def test_revocation_during_lookup_is_not_cached(mongo_client, verify_cache, verify_client, monkeypatch):
+    await mongo_client.insert_certificate({
+        'id': "CERT-1", 'recipient': "A", 'recipientHash': '0x' + '11' * 32, 'course': "B",
+        'courseHash': '0x' + '22' * 32, 'issueDate': 1, 'signature': '0x' + '33' * 65, 'revoked': False
+    })
+    find_certificate = mongo_client.find_certificate
+    read, resume = asyncio.Event(), asyncio.Event()
+
+    async def slow_find(cert_id):
+        certificate = await find_certificate(cert_id)
+        read.set()
+        await resume.wait()
+        return certificate
+
+    monkeypatch.setattr(mongo_client, 'find_certificate', slow_find)
+    lookup = asyncio.create_task(verify_client.get("/api/verify-certificate/CERT-1"))
+    await read.wait()
+    # Thu hồi trong lúc route đang chờ MongoDB
+    await mongo_client.update_certificate("CERT-1", {'revoked': True})
+    verify_cache.invalidate("CERT-1")
+    resume.set()
+    assert (await lookup).json()['revoked'] is False
+
+    monkeypatch.setattr(mongo_client, 'find_certificate', find_certificate)
+    assert (await verify_client.get("/api/verify-certificate/CERT-1")).json()['revoked'] is True